@@ -0,0 +1,86 @@
+"""
+Benchmark the route solvers and compare against a stored baseline.
+
+Usage:
+    python scripts/benchmark_routes.py --output benchmarks/routes.json
+    python scripts/benchmark_routes.py --sizes 10 100 --cvrp data/cvrp/A-n32-k5.vrp
+    python scripts/benchmark_routes.py --baseline benchmarks/routes.json
+
+Exits with status 1 when a result regresses against the baseline.
+"""
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.models.route_benchmark import (  # noqa: E402
+    STANDARD_SIZES,
+    compare_reports,
+    load_cvrp_instance,
+    load_report,
+    run_suite,
+    save_report,
+    solver_modes,
+    synthetic_instance,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Route solver benchmark suite")
+    parser.add_argument('--sizes', type=int, nargs='*', default=list(STANDARD_SIZES),
+                        help="Synthetic instance sizes (hotspots)")
+    parser.add_argument('--cvrp', nargs='*', default=[],
+                        help="CVRPLIB .vrp files to include")
+    parser.add_argument('--modes', nargs='*', default=None, choices=sorted(solver_modes()),
+                        help="Solver modes (all by default)")
+    parser.add_argument('--repeats', type=int, default=1,
+                        help="Runs per instance and mode; the median time is reported")
+    parser.add_argument('--seed', type=int, default=0, help="Instance and solver seed")
+    parser.add_argument('--time-limit-ms', type=float, default=None,
+                        help="Search budget per solve")
+    parser.add_argument('--output', default=None, help="Write the JSON report here")
+    parser.add_argument('--baseline', default=None, help="Compare against this JSON report")
+    return parser.parse_args()
+
+
+def print_results(report):
+    print(f"{'instance':<22}{'mode':<12}{'routes':>7}{'distance':>12}"
+          f"{'unassigned':>12}{'violations':>12}{'time (s)':>10}")
+    for r in report['results']:
+        print(f"{r['instance']:<22}{r['mode']:<12}{r['routes']:>7}{r['total_distance']:>12.1f}"
+              f"{r['unassigned']:>12}{sum(r['violations'].values()):>12}"
+              f"{r['wall_time_s']:>10.3f}")
+
+
+def print_comparison(rows):
+    print()
+    print(f"{'instance':<22}{'mode':<12}{'distance':>10}{'time':>10}  regressions")
+    for row in rows:
+        print(f"{row['instance']:<22}{row['mode']:<12}{row['distance_change']:>+10.2%}"
+              f"{row['time_change']:>+10.1%}  {', '.join(row['regressions']) or '-'}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    instances = [synthetic_instance(size, seed=args.seed) for size in args.sizes]
+    instances += [load_cvrp_instance(path) for path in args.cvrp]
+    report = run_suite(instances, args.modes, args.repeats, args.seed, args.time_limit_ms)
+    print_results(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        save_report(report, args.output)
+        print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        rows = compare_reports(report, load_report(args.baseline))
+        print_comparison(rows)
+        if any(row['regressions'] for row in rows):
+            print("\n❌ Regressions against the baseline")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
@@ -0,0 +1,104 @@
+"""
+Precompute the crime-map prediction tensor for a city.
+
+The API slices the stored tensor per request (GET /api/crime-map/hotspots)
+and picks up a rebuilt file without restarting.
+
+Usage:
+    python scripts/build_prediction_store.py --output-dir data/predictions
+    python scripts/build_prediction_store.py --incidents data/incidents.csv --no-forecast
+    python scripts/build_prediction_store.py --start-date 2026-01-01 --horizon-days 60
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.api.routers.crime_map import (  # noqa: E402
+    CITY_CENTERS,
+    GRID_HALF_CELLS,
+    GRID_RESOLUTION,
+)
+from src.models.prediction_store import (  # noqa: E402
+    PredictionStore,
+    build_prediction_tensor,
+    grid_cells,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the crime-map prediction store")
+    parser.add_argument('--city', default='chicago', choices=sorted(CITY_CENTERS))
+    parser.add_argument('--start-date', default=date.today().isoformat(),
+                        help="First forecast day (YYYY-MM-DD)")
+    parser.add_argument('--horizon-days', type=int, default=30, help="Days to forecast")
+    parser.add_argument('--crime-types', nargs='*', default=None,
+                        help="Crime types to slice by (every type in the data by default)")
+    parser.add_argument('--half-cells', type=int, default=GRID_HALF_CELLS,
+                        help="Grid cells on each side of the city centre")
+    parser.add_argument('--incidents', default=None,
+                        help="Incident CSV (latitude, longitude, incident_date, crime_type); "
+                             "loaded through the ETL pipeline by default")
+    parser.add_argument('--no-forecast', action='store_true',
+                        help="Skip the Prophet forecast of daily city totals")
+    parser.add_argument('--output-dir', default=os.environ.get('PREDICTION_STORE_DIR'),
+                        help="Store directory (default: $PREDICTION_STORE_DIR)")
+    return parser.parse_args()
+
+
+def forecast_daily_totals(start_date, horizon_days):
+    """Prophet forecast of city-wide incidents for each horizon day"""
+    from src.data.etl import CrimeDataETL
+    from src.models.prophet_forecaster import CrimeForecaster
+
+    daily = CrimeDataETL().process()
+    forecaster = CrimeForecaster()
+    forecaster.fit(daily, target_column='total_crimes')
+    last_day = pd.to_datetime(daily['ds']).max()
+    periods = (pd.Timestamp(start_date) - last_day).days + horizon_days
+    forecast = forecaster.forecast(periods=max(periods, horizon_days), include_history=False)
+    yhat = forecast.set_index(pd.to_datetime(forecast['ds']))['yhat']
+    horizon = pd.date_range(pd.Timestamp(start_date), periods=horizon_days, freq='D')
+    return yhat.reindex(horizon).to_numpy()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if not args.output_dir:
+        sys.exit("No store directory: pass --output-dir or set PREDICTION_STORE_DIR")
+    start_date = datetime.strptime(args.start_date, "%Y-%m-%d").date()
+
+    if args.incidents:
+        incidents = pd.read_csv(args.incidents)
+    else:
+        from src.data.etl import CrimeDataETL
+        incidents = CrimeDataETL().load_chicago_data()
+
+    daily_totals = None
+    if not args.no_forecast:
+        daily_totals = forecast_daily_totals(start_date, args.horizon_days)
+        if pd.isna(daily_totals).any():
+            sys.exit("Forecast does not cover the horizon; check --start-date")
+
+    cells = grid_cells(CITY_CENTERS[args.city], GRID_RESOLUTION, args.half_cells)
+    tensor = build_prediction_tensor(
+        incidents,
+        args.city,
+        cells,
+        start_date,
+        horizon_days=args.horizon_days,
+        crime_types=args.crime_types,
+        daily_totals=daily_totals,
+        model_version='kde-weekday-v1' if daily_totals is None else 'kde-prophet-v1',
+    )
+    PredictionStore(args.output_dir).put(tensor)
+    print(f"✅ {args.city}: {len(cells)} cells x {tensor.n_days} days x "
+          f"{len(tensor.crime_types)} crime types ({tensor.start_date} to {tensor.end_date}) "
+          f"written to {args.output_dir}")
@@ -8,12 +8,14 @@ Provides REST API endpoints for:
 - Border analytics
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime, timedelta
 import logging
+import threading
 
+import pandas as pd
 from pydantic import BaseModel
 # Lazy imports for optional dependencies
 # Path is already set above
@@ -21,7 +23,12 @@ from pydantic import BaseModel
 try:
     from src.models.prophet_forecaster import CrimeForecaster
     from src.models.dbscan_hotspots import CrimeHotspotDetector
+    from src.models.st_dbscan import SpaceTimeHotspotDetector
     from src.models.route_optimizer import PatrolRouteOptimizer, Hotspot, PatrolRoute
+    from src.models.vrp_solver import SavingsRouteSolver
+    from src.models.road_network import RoadNetwork, RoadNetworkMatrixCache
+    from src.models.sector_solver import SectorRouteSolver
+    from src.models.prize_collecting import PrizeCollectingSolver
     from src.data.etl import CrimeDataETL
     HAS_FULL_DEPS = True
 except ImportError:
@@ -30,9 +37,15 @@ except ImportError:
     HAS_FULL_DEPS = False
     CrimeForecaster = None
     CrimeHotspotDetector = None
+    SpaceTimeHotspotDetector = None
     PatrolRouteOptimizer = None
     Hotspot = None
     PatrolRoute = None
+    SavingsRouteSolver = None
+    RoadNetwork = None
+    RoadNetworkMatrixCache = None
+    SectorRouteSolver = None
+    PrizeCollectingSolver = None
     CrimeDataETL = None
 
 # Import routers - using absolute imports from project root
@@ -47,6 +60,10 @@ from src.api.routers import crime_map
 from src.api.routers import temporal_patterns
 from src.api.routers import bias_analysis
 from src.api.routers import explainability
+from src.api.routers import route_sessions
+from src.api.routers import tiles
+from src.models.incident_counts import IncidentCountCube
+from src.utils.arrow_ipc import ARROW_STREAM, negotiate, to_arrow_stream
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +73,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Response header of POST /api/v1/route listing the cluster_ids no route could take
+UNASSIGNED_HEADER = "X-Unassigned-Hotspots"
+
 # CORS middleware - allow Vercel deployments and local development
 app.add_middleware(
     CORSMiddleware,
@@ -68,6 +88,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[UNASSIGNED_HEADER],
 )
 
 # Include routers
@@ -75,11 +96,16 @@ app.include_router(crime_map.router)
 app.include_router(temporal_patterns.router)
 app.include_router(bias_analysis.router)
 app.include_router(explainability.router)
+app.include_router(route_sessions.router)
+app.include_router(tiles.router)
 
 # Global model instances (in production, use dependency injection)
 forecaster = None
 hotspot_detector = None
 route_optimizer = None
+road_matrix_cache = None  # Road distances/travel times when an OSM extract is configured
+incident_counts = None  # Summed-area tables behind /api/v1/stats, built from the loaded incidents
+incident_counts_lock = threading.Lock()  # One lazy build when concurrent stats requests miss
 
 
 # Pydantic models
@@ -100,6 +126,8 @@ class HotspotRequest(BaseModel):
     eps: float = 0.01
     min_samples: int = 10
     min_days: Optional[int] = None
+    eps_days: Optional[float] = None  # Temporal radius; enables space-time clustering
+    emerging_days: int = 30  # Space-time hotspots first seen this recently are emerging
 
 
 class HotspotResponse(BaseModel):
@@ -111,12 +139,24 @@ class HotspotResponse(BaseModel):
     area_km2: float
 
 
+class SpaceTimeHotspotResponse(HotspotResponse):
+    first_seen: str
+    last_seen: str
+    active_days: int
+    is_emerging: bool
+
+
 class RouteRequest(BaseModel):
     hotspots: List[Dict[str, Any]]  # List of hotspot dictionaries
     num_officers: int
     depot_latitude: float
     depot_longitude: float
     max_route_distance_km: float = 50.0
+    max_shift_hours: float = 8.0
+    time_limit_ms: Optional[int] = None  # Search budget; uses the savings + local search solver
+    n_starts: Optional[int] = None  # Parallel randomized restarts for the savings solver
+    sector_size: Optional[int] = None  # Split large instances into sectors of ~this many hotspots
+    prize_collecting: bool = False  # Cover the highest-priority hotspots when not all fit
 
 
 class RouteResponse(BaseModel):
@@ -126,10 +166,11 @@ class RouteResponse(BaseModel):
     estimated_duration_hours: float
 
 
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize models on startup"""
-    global forecaster, hotspot_detector, route_optimizer
+    global forecaster, hotspot_detector, route_optimizer, road_matrix_cache, incident_counts
     
     if not HAS_FULL_DEPS:
         logger.warning("Some dependencies not available. Crime map endpoint will work, but forecast/hotspot endpoints may not.")
@@ -140,6 +181,24 @@ async def startup_event():
     forecaster = CrimeForecaster()
     hotspot_detector = CrimeHotspotDetector()
     route_optimizer = PatrolRouteOptimizer()
+
+    # Optional local street graph (OSM XML extract) for road travel times;
+    # hierarchies are built on first start and cached next to the extract
+    extract = os.environ.get("ROAD_NETWORK_EXTRACT")
+    if extract:
+        road_matrix_cache = RoadNetworkMatrixCache(RoadNetwork.from_osm(extract))
+        road_matrix_cache.network.hierarchy('time')
+        road_matrix_cache.network.hierarchy('distance')
+        crime_map.road_network = road_matrix_cache.network
+        route_sessions.road_matrix_cache = road_matrix_cache
+
+    # Incident points for the vector tile layer and the stats count tables
+    try:
+        incidents = CrimeDataETL().load_chicago_data()
+        tiles.set_incidents(incidents)
+        incident_counts = IncidentCountCube.from_incidents(incidents)
+    except Exception as e:
+        logger.warning(f"Incident tiles and counts unavailable: {e}")
     
     logger.info("Foresight API ready")
 
@@ -154,8 +213,10 @@ async def root():
             "forecast": "/api/v1/forecast",
             "hotspots": "/api/v1/hotspots",
             "route": "/api/v1/route",
+            "route-sessions": "/api/v1/route-sessions",
             "stats": "/api/v1/stats",
             "crime-map": "/api/crime-map/hotspots",
+            "tiles": "/tiles/{layer}/{z}/{x}/{y}.mvt",
             "temporal-analysis": "/api/temporal/analysis",
             "temporal-forecast": "/api/temporal/forecast",
             "temporal-anomalies": "/api/temporal/anomalies",
@@ -224,17 +285,31 @@ async def get_forecast(request: ForecastRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/v1/hotspots", response_model=List[HotspotResponse])
-async def get_hotspots(request: HotspotRequest):
+@app.post(
+    "/api/v1/hotspots",
+    response_model=List[Union[SpaceTimeHotspotResponse, HotspotResponse]]
+)
+async def get_hotspots(request: HotspotRequest, http_request: Request, response: Response):
     """
     Detect crime hotspots using DBSCAN
     
+    With eps_days, clusters incidents in space and time (ST-DBSCAN) and
+    returns each hotspot's first_seen, last_seen, active_days and whether it
+    is emerging (first seen within emerging_days); min_days is ignored.
+    
+    Responds with an Arrow IPC stream of the same columns when the client
+    sends ``Accept: application/vnd.apache.arrow.stream``.
+    
     Args:
         request: Hotspot detection parameters
         
     Returns:
         List of detected hotspots
     """
+    media_type = negotiate(http_request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail="Arrow responses need pyarrow installed")
+    response.headers["Vary"] = "Accept"
     if hotspot_detector is None:
         raise HTTPException(status_code=503, detail="Hotspot detector not initialized")
     
@@ -252,30 +327,58 @@ async def get_hotspots(request: HotspotRequest):
         hotspot_detector.eps = request.eps
         hotspot_detector.min_samples = request.min_samples
         
-        hotspots_df = hotspot_detector.detect_hotspots(df)
-        
-        # Filter stable hotspots if requested
-        if request.min_days:
-            hotspots_df = hotspot_detector.filter_stable_hotspots(
-                hotspots_df,
-                min_days=request.min_days
+        if request.eps_days:
+            st_detector = SpaceTimeHotspotDetector(
+                eps=request.eps,
+                eps_days=request.eps_days,
+                min_samples=request.min_samples
             )
-            hotspots_df = hotspots_df[hotspots_df['is_stable_hotspot']]
+            hotspots_df = st_detector.detect_hotspots(df)
+            
+            # Clusters are already bounded in time, so min_days does not apply;
+            # each carries its lifetime and whether it appeared recently
+            density_df = st_detector.calculate_hotspot_density(hotspots_df)
+            emerging = st_detector.find_emerging_hotspots(
+                hotspots_df, window_days=request.emerging_days
+            )
+            density_df['is_emerging'] = density_df['cluster_id'].isin(emerging['cluster_id'])
+            for column in ('first_seen', 'last_seen'):
+                density_df[column] = pd.to_datetime(density_df[column]).map(pd.Timestamp.isoformat)
+            model = SpaceTimeHotspotResponse
+        else:
+            hotspots_df = hotspot_detector.detect_hotspots(df)
+            
+            # Filter stable hotspots if requested
+            if request.min_days:
+                hotspots_df = hotspot_detector.filter_stable_hotspots(
+                    hotspots_df,
+                    min_days=request.min_days
+                )
+                hotspots_df = hotspots_df[hotspots_df['is_stable_hotspot']]
+            
+            # Calculate density metrics
+            density_df = hotspot_detector.calculate_hotspot_density(hotspots_df)
+            model = HotspotResponse
         
-        # Calculate density metrics
-        density_df = hotspot_detector.calculate_hotspot_density(hotspots_df)
+        if media_type == ARROW_STREAM:
+            # Same fields and types as the JSON response, one column each
+            columns = {
+                name: density_df[name].to_numpy(dtype=field.annotation)
+                for name, field in model.model_fields.items()
+            }
+            return Response(
+                content=to_arrow_stream(columns),
+                media_type=ARROW_STREAM,
+                headers={"Vary": "Accept"}
+            )
         
         # Format response
         responses = []
         for _, row in density_df.iterrows():
-            responses.append(HotspotResponse(
-                cluster_id=int(row['cluster_id']),
-                center_latitude=float(row['center_latitude']),
-                center_longitude=float(row['center_longitude']),
-                n_incidents=int(row['n_incidents']),
-                density_per_km2=float(row['density_per_km2']),
-                area_km2=float(row['area_km2'])
-            ))
+            responses.append(model(**{
+                name: field.annotation(row[name])
+                for name, field in model.model_fields.items()
+            }))
         
         return responses
         
@@ -285,15 +388,19 @@ async def get_hotspots(request: HotspotRequest):
 
 
 @app.post("/api/v1/route", response_model=List[RouteResponse])
-async def optimize_route(request: RouteRequest):
+def optimize_route(request: RouteRequest, response: Response):
     """
     Optimize patrol routes for officers
     
+    A plain def: FastAPI runs it in the threadpool, so a solve with a
+    time_limit_ms budget does not block the event loop.
+    
     Args:
         request: Route optimization parameters
         
     Returns:
-        List of optimized patrol routes
+        List of optimized patrol routes; the cluster_ids of hotspots left
+        unassigned are in the X-Unassigned-Hotspots header (comma-separated)
     """
     if route_optimizer is None:
         raise HTTPException(status_code=503, detail="Route optimizer not initialized")
@@ -312,14 +419,45 @@ async def optimize_route(request: RouteRequest):
             hotspots.append(hotspot)
         
         # Optimize routes
-        route_optimizer.max_route_distance_km = request.max_route_distance_km
-        
-        routes = route_optimizer.optimize(
-            hotspots=hotspots,
-            num_officers=request.num_officers,
-            depot_lat=request.depot_latitude,
-            depot_lon=request.depot_longitude
-        )
+        if request.prize_collecting:
+            solver = PrizeCollectingSolver(
+                max_route_distance_km=request.max_route_distance_km,
+                max_shift_hours=request.max_shift_hours,
+                distance_cache=road_matrix_cache
+            )
+        elif request.sector_size:
+            solver = SectorRouteSolver(
+                sector_size=request.sector_size,
+                max_route_distance_km=request.max_route_distance_km,
+                max_shift_hours=request.max_shift_hours,
+                distance_cache=road_matrix_cache
+            )
+        elif request.time_limit_ms or request.n_starts or road_matrix_cache is not None:
+            solver = SavingsRouteSolver(
+                max_route_distance_km=request.max_route_distance_km,
+                max_shift_hours=request.max_shift_hours,
+                distance_cache=road_matrix_cache,
+                n_starts=request.n_starts or 1
+            )
+        else:
+            solver = None
+
+        if solver is not None:
+            routes = solver.solve(
+                hotspots=hotspots,
+                num_officers=request.num_officers,
+                depot_lat=request.depot_latitude,
+                depot_lon=request.depot_longitude,
+                time_limit_ms=request.time_limit_ms
+            )
+        else:
+            route_optimizer.max_route_distance_km = request.max_route_distance_km
+            routes = route_optimizer.optimize(
+                hotspots=hotspots,
+                num_officers=request.num_officers,
+                depot_lat=request.depot_latitude,
+                depot_lon=request.depot_longitude
+            )
         
         # Format response
         responses = []
@@ -331,6 +469,13 @@ async def optimize_route(request: RouteRequest):
                 estimated_duration_hours=route.estimated_duration
             ))
         
+        if solver is not None:
+            unassigned = [h.cluster_id for h in solver.unassigned_]
+        else:
+            routed = {hotspot_id for r in responses for hotspot_id in r.hotspot_ids}
+            unassigned = [h.cluster_id for h in hotspots if h.cluster_id not in routed]
+        
+        response.headers[UNASSIGNED_HEADER] = ",".join(map(str, unassigned))
         return responses
         
     except Exception as e:
@@ -339,43 +484,72 @@ async def optimize_route(request: RouteRequest):
 
 
 @app.get("/api/v1/stats")
-async def get_stats():
+def get_stats(
+    crime_type: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    bbox: Optional[str] = None
+):
     """
     Get crime statistics summary
     
+    Counts come from summed-area tables over the incident grid, so every
+    filter combination costs a few table lookups. Rectangles are counted at
+    grid-cell (~2km) granularity. Without filters every incident counts,
+    including those without a location or date.
+    
+    A plain def: FastAPI runs it in the threadpool, so building the tables
+    when startup could not does not block the event loop.
+    
+    Args:
+        crime_type: Only count this crime type
+        start_date: First day counted (YYYY-MM-DD, inclusive)
+        end_date: Last day counted (YYYY-MM-DD, inclusive)
+        bbox: Viewport as west,south,east,north in degrees
+    
     Returns:
         Dictionary with crime statistics
     """
+    global incident_counts
     try:
-        # Load data
-        etl = CrimeDataETL()
-        df = etl.load_chicago_data()
-        
-        # Calculate statistics
-        total_incidents = len(df)
-        
-        if 'incident_date' in df.columns:
-            date_range = {
-                'start': df['incident_date'].min().isoformat(),
-                'end': df['incident_date'].max().isoformat()
-            }
-        else:
-            date_range = None
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    viewport = crime_map.parse_bbox(bbox)
+    
+    try:
+        with incident_counts_lock:
+            if incident_counts is None:
+                if CrimeDataETL is None:
+                    raise HTTPException(status_code=503, detail="Incident data not available")
+                incident_counts = IncidentCountCube.from_incidents(CrimeDataETL().load_chicago_data())
+        counts = incident_counts.counts(viewport, start, end)
         
-        if 'crime_type' in df.columns:
-            top_crimes = df['crime_type'].value_counts().head(5).to_dict()
-        else:
-            top_crimes = {}
+        if crime_type:
+            counts = {crime_type: counts.get(crime_type, 0)}
+        top_crimes = dict(sorted(counts.items(), key=lambda item: -item[1])[:5])
         
         stats = {
-            'total_incidents': total_incidents,
-            'date_range': date_range,
-            'top_crime_types': top_crimes,
+            'total_incidents': sum(counts.values()),
+            'date_range': {
+                'start': incident_counts.date_range[0].isoformat(),
+                'end': incident_counts.date_range[1].isoformat()
+            },
+            'top_crime_types': {name: n for name, n in top_crimes.items() if n > 0},
+            'filters': {
+                'crime_type': crime_type,
+                'start_date': start_date,
+                'end_date': end_date,
+                'bbox': viewport
+            },
             'timestamp': datetime.utcnow().isoformat()
         }
         
         return stats
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Stats error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,12 +1,60 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+import re
+import time
 import numpy as np
 from scipy.spatial import distance
 
+from src.models.hotspot_stream import HotspotBroadcaster, HotspotLayer
+from src.models.isochrones import RasterGrid, response_time_raster
+from src.models.prediction_store import (
+    INCIDENTS_AT_FULL_INTENSITY, PredictionStore, cell_side_km, city_grid as store_city_grid,
+    resolution_for_zoom, risk_levels, roll_up
+)
+from src.utils.geo import haversine_km
+from src.utils.arrow_ipc import ARROW_STREAM, negotiate, to_arrow_stream
+from src.utils.cells import (
+    cell_resolution, cell_size_deg, cell_to_boundary, cell_to_latlng, cell_to_token,
+    latlng_to_cell, token_to_cell
+)
+
 router = APIRouter(prefix="/api/crime-map", tags=["crime-map"])
 
+# Heatmap grid: hierarchical cells at GRID_RESOLUTION, offset i in [-GRID_HALF_CELLS, GRID_HALF_CELLS)
+# from the cell containing the city center; grid_id is the cell token
+GRID_RESOLUTION = 15
+GRID_SIZE_DEG = cell_size_deg(GRID_RESOLUTION)  # 0.02 deg, ~2km grid cells
+GRID_HALF_CELLS = 10
+CITY_CENTERS = {"chicago": (41.8781, -87.6298)}
+
+# Road network for response times; set at startup when an OSM extract is configured
+road_network = None
+
+# IDs issued before hierarchical cells: offsets from the city's center cell
+LEGACY_GRID_ID = re.compile(r"^grid_(-?\d+)_(-?\d+)$")
+
+# Model predictions written by scripts/build_prediction_store.py; cities
+# without a stored tensor fall back to the synthetic grid
+prediction_store = PredictionStore(os.environ.get("PREDICTION_STORE_DIR"))
+
+TIME_WINDOW_DAYS = {"24h": 1, "7d": 7, "30d": 30}
+
+# Cells at or below this intensity are left off the map
+MIN_HOTSPOT_INTENSITY = 0.1
+
+# Live hotspot streams: today's 24h predictions per city, pushed as deltas
+broadcaster = HotspotBroadcaster()
+_live_keys = {}  # city -> (tensor, date) the live layer was built from
+_live_checked = {}  # city -> monotonic time the store was last checked
+STORE_POLL_SECONDS = 2.0
+STREAM_HEARTBEAT_SECONDS = 15.0
+
 class CrimeHotspot(BaseModel):
     lat: float
     lng: float
@@ -25,45 +73,68 @@ class HeatmapData(BaseModel):
     grid_resolution: str
     total_predicted_incidents: int
 
-@router.get("/hotspots", response_model=HeatmapData)
-async def get_crime_hotspots(
-    city: str = Query("chicago", description="City name"),
-    crime_type: str = Query("all", description="Crime type filter"),
-    date: Optional[str] = Query(None, description="Prediction date (YYYY-MM-DD)"),
-    time_window: str = Query("24h", description="Time window: 24h, 7d, 30d")
-):
+def city_grid(center) -> RasterGrid:
+    """Heatmap grid around a city: rows/cols align with cells at GRID_RESOLUTION"""
+    return store_city_grid(center, GRID_RESOLUTION, GRID_HALF_CELLS)
+
+
+def resolve_cell(grid_id: str, city: str = "chicago") -> int:
     """
-    Get crime prediction hotspots for heatmap visualization.
-    
-    Returns grid-based predictions with intensity scores for mapping.
+    Cell ID of a grid/location identifier
+
+    Accepts cell tokens at any resolution, and legacy ``grid_{i}_{j}``
+    IDs, which are offsets from the city's center cell.
+
+    Raises:
+        ValueError: If the identifier is neither
+    """
+    legacy = LEGACY_GRID_ID.match(grid_id)
+    if legacy:
+        grid = city_grid(CITY_CENTERS.get(city.lower(), CITY_CENTERS["chicago"]))
+        i, j = int(legacy.group(1)), int(legacy.group(2))
+        lat = grid.lat0 + (i + GRID_HALF_CELLS) * GRID_SIZE_DEG
+        lng = grid.lon0 + (j + GRID_HALF_CELLS) * GRID_SIZE_DEG
+        return int(latlng_to_cell(lat, lng, GRID_RESOLUTION))
+    return token_to_cell(grid_id)
+
+
+def predict_grid(center, crime_type: str = "all", rng=np.random,
+                 days: int = 1) -> List[CrimeHotspot]:
+    """
+    Grid-cell risk predictions around a city center
+
+    Args:
+        center: (lat, lng) of the city center
+        crime_type: Crime type label for the predictions
+        rng: Random source (np.random or a seeded np.random.RandomState)
+        days: Length of the prediction window in days
+
+    Returns:
+        Cells above the significance threshold, in grid order
     """
-    
     # Generate synthetic hotspot data (replace with actual ML predictions)
-    prediction_date = date or datetime.now().strftime("%Y-%m-%d")
-    
-    # Chicago coordinates (example)
-    city_center = {"chicago": (41.8781, -87.6298)}
-    center = city_center.get(city.lower(), (41.8781, -87.6298))
-    
-    # Generate hotspots in a grid pattern
     hotspots = []
-    grid_size = 0.02  # ~2km grid cells
+    grid = city_grid(center)
+    lats, lngs = grid.centers()
+    cells = latlng_to_cell(lats, lngs, GRID_RESOLUTION)
     
-    for i in range(-10, 10):
-        for j in range(-10, 10):
-            lat = center[0] + i * grid_size
-            lng = center[1] + j * grid_size
+    for i in range(-GRID_HALF_CELLS, GRID_HALF_CELLS):
+        for j in range(-GRID_HALF_CELLS, GRID_HALF_CELLS):
+            row, col = i + GRID_HALF_CELLS, j + GRID_HALF_CELLS
+            lat = float(lats[row, col])
+            lng = float(lngs[row, col])
             
             # Calculate intensity based on distance from center
             dist = np.sqrt(i**2 + j**2)
             intensity = max(0, 1 - (dist / 15))
             
             # Add some randomness
-            intensity *= np.random.uniform(0.5, 1.5)
-            intensity = min(1.0, max(0.0, intensity))
+            intensity *= rng.uniform(0.5, 1.5)
+            # Thresholds apply to the rounded intensity the client sees
+            intensity = round(min(1.0, max(0.0, intensity)), 3)
             
-            if intensity > 0.1:  # Only include significant hotspots
-                predicted_incidents = int(intensity * 10)
+            if intensity > MIN_HOTSPOT_INTENSITY:  # Only include significant hotspots
+                predicted_incidents = int(intensity * INCIDENTS_AT_FULL_INTENSITY * days)
                 
                 # Determine risk level
                 if intensity > 0.8:
@@ -78,15 +149,202 @@ async def get_crime_hotspots(
                 hotspots.append(CrimeHotspot(
                     lat=lat,
                     lng=lng,
-                    intensity=round(intensity, 3),
+                    intensity=intensity,
                     crime_type=crime_type,
                     predicted_incidents=predicted_incidents,
-                    confidence=round(np.random.uniform(0.65, 0.95), 2),
-                    grid_id=f"grid_{i}_{j}",
+                    confidence=round(rng.uniform(0.65, 0.95), 2),
+                    grid_id=cell_to_token(cells[row, col]),
                     risk_level=risk_level
                 ))
+    return hotspots
+
+
+def parse_bbox(bbox: Optional[str]) -> Optional[List[float]]:
+    """(west, south, east, north) of a bbox query parameter; 400 when malformed"""
+    if bbox is None:
+        return None
+    try:
+        box = [float(v) for v in bbox.split(",")]
+    except ValueError:
+        box = []
+    if len(box) != 4 or not np.isfinite(box).all() or box[1] > box[3]:
+        raise HTTPException(status_code=400, detail="bbox must be 'west,south,east,north'")
+    return box
+
+
+def overlaps_bbox(south, west, north, east, bbox: List[float]) -> np.ndarray:
+    """Whether each box (or point, with south == north, west == east) meets a bbox"""
+    bbox_west, bbox_south, bbox_east, bbox_north = bbox
+    south, west, north, east = (np.asarray(v) for v in (south, west, north, east))
+    if bbox_west <= bbox_east:
+        in_lng = (east >= bbox_west) & (west <= bbox_east)
+    else:
+        # Crosses the antimeridian
+        in_lng = (east >= bbox_west) | (west <= bbox_east)
+    return in_lng & (north >= bbox_south) & (south <= bbox_north)
+
+
+def stored_hotspots(tensor, crime_type: str, start, end, bbox=None,
+                    resolution: Optional[int] = None) -> dict:
+    """
+    Significant cells of a stored prediction window as CrimeHotspot columns
+
+    Only cells in the viewport are read, through the tensor's spatial index;
+    below the stored resolution, cells are summed into their parents.
+
+    Args:
+        tensor: The city's PredictionTensor
+        crime_type: Crime type (case-insensitive; "all" for every type)
+        start: First day of the window
+        end: Last day of the window (inclusive)
+        bbox: Optional (west, south, east, north) viewport
+        resolution: Cell resolution to return (default: the stored one)
+
+    Returns:
+        {CrimeHotspot field: array}, one entry per cell above MIN_HOTSPOT_INTENSITY
+    """
+    resolution = tensor.resolution if resolution is None else min(resolution, tensor.resolution)
+    types = {t.lower(): t for t in tensor.crime_types}
+    if crime_type.lower() not in types:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No predictions for crime type {crime_type!r}; have {list(tensor.crime_types)}"
+        )
+    # Parents that overlap the viewport have all their children within one
+    # parent cell of it
+    index = None if bbox is None else tensor.cells_in(bbox, margin=cell_size_deg(resolution))
+    try:
+        expected, confidence = tensor.between(types[crime_type.lower()], start, end, index)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    if resolution == tensor.resolution:
+        cells = tensor.cells if index is None else tensor.cells[index]
+        tokens = tensor.tokens if index is None else tensor.tokens[index]
+        lat, lng = tensor.centers if index is None else (c[index] for c in tensor.centers)
+    else:
+        cells, expected, confidence = roll_up(
+            tensor.cells if index is None else tensor.cells[index], expected, confidence,
+            resolution
+        )
+        tokens = np.array([cell_to_token(cell) for cell in cells.tolist()], dtype=str)
+        lat, lng = cell_to_latlng(cells)
+
+    # Coarser cells report their mean intensity, so colours hold across zooms
+    days = (end - start).days + 1
+    fine_cells_per_cell = 4 ** (tensor.resolution - resolution)
+    full_intensity = days * INCIDENTS_AT_FULL_INTENSITY * fine_cells_per_cell
+    # Risk levels are read off the rounded intensity the client sees
+    intensity = np.round(np.clip(expected / full_intensity, 0.0, 1.0), 3)
+    keep = intensity > MIN_HOTSPOT_INTENSITY
+    if bbox is not None:
+        # Cells that overlap the viewport, not just those centred in it
+        keep &= overlaps_bbox(*cell_to_boundary(cells), bbox)
+    keep = np.flatnonzero(keep)
+    return {
+        "lat": lat[keep],
+        "lng": lng[keep],
+        "intensity": intensity[keep],
+        "crime_type": np.full(len(keep), crime_type),
+        "predicted_incidents": expected[keep].astype(np.int64),
+        "confidence": np.round(confidence[keep].astype(float), 2),
+        "grid_id": tokens[keep],
+        "risk_level": risk_levels(intensity[keep]),
+    }
+
+
+def synthetic_hotspots(city: str, crime_type: str, start, end) -> List[CrimeHotspot]:
+    """predict_grid() for a city and window, seeded so repeated requests agree"""
+    center = CITY_CENTERS.get(city.lower(), CITY_CENTERS["chicago"])
+    key = f"{city.lower()}-{crime_type}-{start}-{end}"
+    seed = int(hashlib.blake2b(key.encode(), digest_size=4).hexdigest(), 16)
+    return predict_grid(
+        center, crime_type, rng=np.random.RandomState(seed), days=(end - start).days + 1
+    )
+
+
+@router.get("/hotspots", response_model=HeatmapData)
+async def get_crime_hotspots(
+    request: Request,
+    response: Response,
+    city: str = Query("chicago", description="City name"),
+    crime_type: str = Query("all", description="Crime type filter"),
+    date: Optional[str] = Query(None, description="Prediction date (YYYY-MM-DD)"),
+    time_window: str = Query("24h", description="Time window: 24h, 7d, 30d"),
+    end_date: Optional[str] = Query(
+        None, description="Last day of a custom window from date (YYYY-MM-DD); overrides time_window"
+    ),
+    bbox: Optional[str] = Query(None, description="Viewport: west,south,east,north in degrees"),
+    zoom: Optional[float] = Query(None, ge=0, le=24, description="Map zoom for the cell size")
+):
+    """
+    Get crime prediction hotspots for heatmap visualization.
+    
+    Returns grid-based predictions with intensity scores for mapping.
+    With ``bbox`` only cells overlapping the viewport are returned; with
+    ``zoom`` model predictions are aggregated to cells sized for that zoom
+    (finer zooms get the stored 2km cells).
+    With ``Accept: application/vnd.apache.arrow.stream`` the hotspots come
+    back as Arrow columns and the other fields as schema metadata.
+    """
+    media_type = negotiate(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(status_code=406, detail="Arrow responses need pyarrow installed")
+    response.headers["Vary"] = "Accept"
+
+    if time_window not in TIME_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"time_window must be one of {sorted(TIME_WINDOW_DAYS)}"
+        )
+    prediction_date = date or datetime.now().strftime("%Y-%m-%d")
+    try:
+        start = datetime.strptime(prediction_date, "%Y-%m-%d").date()
+        end = (
+            datetime.strptime(end_date, "%Y-%m-%d").date() if end_date
+            else start + timedelta(days=TIME_WINDOW_DAYS[time_window] - 1)
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="date and end_date must be YYYY-MM-DD")
+    if end < start:
+        raise HTTPException(status_code=400, detail="end_date is before date")
+    viewport = parse_bbox(bbox)
+    center = CITY_CENTERS.get(city.lower(), CITY_CENTERS["chicago"])
+
+    tensor = prediction_store.get(city.lower())
+    if tensor is not None:
+        resolution = (
+            tensor.resolution if zoom is None else resolution_for_zoom(zoom, tensor.resolution)
+        )
+        columns = stored_hotspots(tensor, crime_type, start, end, viewport, resolution)
+        radius = float(haversine_km(center[0], center[1], *tensor.centers).max(initial=0.0))
+        metadata = {
+            "prediction_date": prediction_date,
+            "model_version": tensor.model_version,
+            "coverage_area": {
+                "center": {"lat": center[0], "lng": center[1]},
+                "radius_km": round(radius, 1)
+            },
+            "grid_resolution": f"{round(cell_side_km(resolution))}km",
+            "total_predicted_incidents": int(columns["predicted_incidents"].sum())
+        }
+        if media_type == ARROW_STREAM:
+            return Response(
+                content=to_arrow_stream(columns, metadata),
+                media_type=ARROW_STREAM,
+                headers={"Vary": "Accept"}
+            )
+        keys = list(columns)
+        rows = zip(*(values.tolist() for values in columns.values()))
+        return JSONResponse(
+            {"hotspots": [dict(zip(keys, row)) for row in rows], **metadata},
+            headers={"Vary": "Accept"}
+        )
+
+    hotspots = synthetic_hotspots(city, crime_type, start, end)
+    if viewport is not None:
+        hotspots = [h for h in hotspots if overlaps_bbox(h.lat, h.lng, h.lat, h.lng, viewport)]
     
-    return HeatmapData(
+    data = HeatmapData(
         hotspots=hotspots,
         prediction_date=prediction_date,
         model_version="v2.3.1",
@@ -97,17 +355,213 @@ async def get_crime_hotspots(
         grid_resolution="2km",
         total_predicted_incidents=sum(h.predicted_incidents for h in hotspots)
     )
+    if media_type == ARROW_STREAM:
+        columns = {
+            name: np.array([getattr(h, name) for h in hotspots], dtype=field.annotation)
+            for name, field in CrimeHotspot.model_fields.items()
+        }
+        metadata = data.model_dump(exclude={"hotspots"})
+        return Response(
+            content=to_arrow_stream(columns, metadata),
+            media_type=ARROW_STREAM,
+            headers={"Vary": "Accept"}
+        )
+    return data
+
+
+def live_hotspots(city: str, tensor, today) -> tuple:
+    """
+    A city's hotspots for the 24h from today, as served by /hotspots
+
+    Returns:
+        Tuple of ({CrimeHotspot field: array}, cell side in degrees); from
+        the stored tensor when there is one, else the synthetic grid
+    """
+    if tensor is None:
+        hotspots = synthetic_hotspots(city, "all", today, today)
+        columns = {
+            name: np.array([getattr(h, name) for h in hotspots], dtype=field.annotation)
+            for name, field in CrimeHotspot.model_fields.items()
+        }
+        return columns, GRID_SIZE_DEG
+    cell_deg = cell_size_deg(tensor.resolution)
+    try:
+        return stored_hotspots(tensor, "all", today, today), cell_deg
+    except HTTPException:
+        # Today is outside the stored horizon: nothing to show until a rebuild
+        empty = {
+            name: np.array([], dtype=field.annotation)
+            for name, field in CrimeHotspot.model_fields.items()
+        }
+        return empty, cell_deg
+
+
+def live_layer(city: str, tensor, today) -> HotspotLayer:
+    """live_hotspots() as a stream layer"""
+    columns, cell_deg = live_hotspots(city, tensor, today)
+    return HotspotLayer(
+        grid_id=columns["grid_id"], lat=columns["lat"], lng=columns["lng"],
+        intensity=columns["intensity"], cell_deg=cell_deg
+    )
+
+
+def refresh_live_layer(city: str, force: bool = False) -> int:
+    """
+    Publish a city's live layer when its predictions or the date changed
+
+    The store is checked at most every STORE_POLL_SECONDS however many
+    clients are streaming. Batch or ingestion jobs that update predictions
+    in-process can call this with ``force=True`` to push immediately.
+
+    Returns:
+        Number of changed cells published
+    """
+    now = time.monotonic()
+    if not force and now - _live_checked.get(city, -np.inf) < STORE_POLL_SECONDS:
+        return 0
+    _live_checked[city] = now
+    tensor = prediction_store.get(city)
+    key = (tensor, datetime.now().date())
+    previous = _live_keys.get(city)
+    if previous is not None and previous[0] is key[0] and previous[1] == key[1]:
+        return 0
+    _live_keys[city] = key
+    return broadcaster.publish(city, live_layer(city, tensor, key[1]))
+
+
+def format_event(message: dict) -> str:
+    """Server-Sent Events frame of a stream message"""
+    data = json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {message['type']}\nid: {message['version']}\ndata: {data}\n\n"
+
+
+@router.get("/hotspots/stream")
+async def stream_hotspots(
+    request: Request,
+    city: str = Query("chicago", description="City name"),
+    bbox: Optional[str] = Query(None, description="Viewport: west,south,east,north in degrees")
+):
+    """
+    Live hotspot changes as Server-Sent Events.
+
+    The first ``snapshot`` event holds every hotspot in the viewport (today's
+    24h predictions, as /hotspots); each ``delta`` event after it holds only
+    the cells whose intensity changed (``cells``) or that dropped below the
+    significance threshold (``removed``). Bursts of updates are coalesced
+    into one event, and a client too far behind is sent a new snapshot.
+    """
+    viewport = parse_bbox(bbox)
+    city = city.lower()
+    refresh_live_layer(city)
+    subscription = broadcaster.subscribe(city, viewport)
+
+    async def events():
+        try:
+            idle = 0.0
+            while not await request.is_disconnected():
+                message = await subscription.next_message(STORE_POLL_SECONDS)
+                if message is not None:
+                    idle = 0.0
+                    yield format_event(message)
+                    continue
+                refresh_live_layer(city)
+                idle += STORE_POLL_SECONDS
+                if idle >= STREAM_HEARTBEAT_SECONDS:
+                    idle = 0.0
+                    yield ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+class ResponseTimeGrid(BaseModel):
+    origin: dict  # Centre of cell (0, 0), the south-west corner of the grid
+    cell_deg: float
+    resolution: int  # Cell resolution of grid_ids
+    grid_ids: List[List[str]]  # [row][col] cell tokens, as in the hotspots' grid_id
+    rows: int
+    cols: int
+    source: str
+    depots: List[dict]
+    minutes: List[List[Optional[float]]]  # [row][col]; null where unreachable
+    nearest_depot: List[List[int]]
+    coverage: dict  # Threshold minutes -> share of cells reachable
+
+
+def _parse_depots(depots: Optional[str], center) -> List[tuple]:
+    if not depots:
+        return [center]
+    try:
+        pairs = [tuple(float(v) for v in pair.split(",")) for pair in depots.split(";") if pair]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="depots must be 'lat,lon;lat,lon;...'")
+    if not pairs or any(len(pair) != 2 for pair in pairs):
+        raise HTTPException(status_code=400, detail="depots must be 'lat,lon;lat,lon;...'")
+    return pairs
+
+
+@router.get("/response-times", response_model=ResponseTimeGrid)
+def get_response_times(
+    city: str = Query("chicago", description="City name"),
+    depots: Optional[str] = Query(None, description="Stations as 'lat,lon;lat,lon' (default: city center)"),
+    speed_kmh: float = Query(30.0, gt=0, description="Response speed when no road network is loaded"),
+    thresholds: str = Query("5,10,15", description="Coverage thresholds in minutes")
+):
+    """
+    Travel time from the nearest station to every heatmap grid cell.
+
+    The raster uses the heatmap grid layout, with each cell's ID in
+    grid_ids, so it can be joined or multiplied cell-by-cell with risk.
+
+    A plain def: FastAPI runs it in the threadpool, so snapping stations and
+    the Dijkstra over the road network do not block the event loop.
+    """
+    center = CITY_CENTERS.get(city.lower(), CITY_CENTERS["chicago"])
+    stations = _parse_depots(depots, center)
+    try:
+        limits = [float(t) for t in thresholds.split(",") if t]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="thresholds must be comma-separated minutes")
+
+    grid = city_grid(center)
+    raster = response_time_raster(grid, stations, network=road_network, speed_kmh=speed_kmh)
+    minutes = np.round(raster.minutes, 2)
+    cells = latlng_to_cell(*grid.centers(), GRID_RESOLUTION)
+
+    return ResponseTimeGrid(
+        origin={"lat": grid.lat0, "lng": grid.lon0},
+        cell_deg=grid.cell_deg,
+        resolution=GRID_RESOLUTION,
+        grid_ids=[[cell_to_token(c) for c in row] for row in cells],
+        rows=grid.n_rows,
+        cols=grid.n_cols,
+        source=raster.source,
+        depots=[{"lat": lat, "lng": lng} for lat, lng in stations],
+        minutes=[[float(v) if np.isfinite(v) else None for v in row] for row in minutes],
+        nearest_depot=raster.nearest_depot.tolist(),
+        coverage={str(t): round(share, 4) for t, share in raster.coverage(limits).items()}
+    )
 
 
 @router.get("/temporal-patterns")
 async def get_temporal_patterns(
-    grid_id: str = Query(..., description="Grid cell ID"),
+    grid_id: str = Query(..., description="Cell token (legacy grid_{i}_{j} IDs are accepted)"),
     days: int = Query(7, description="Number of days to analyze")
 ):
     """
     Get temporal crime patterns for a specific grid cell.
     Shows hourly and daily patterns.
     """
+    try:
+        cell = resolve_cell(grid_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cell_lat, cell_lng = cell_to_latlng(cell)
     
     # Generate synthetic temporal data
     hours = list(range(24))
@@ -126,7 +580,9 @@ async def get_temporal_patterns(
         })
     
     return {
-        "grid_id": grid_id,
+        "grid_id": cell_to_token(cell),
+        "resolution": int(cell_resolution(cell)),
+        "center": {"lat": float(cell_lat), "lng": float(cell_lng)},
         "hourly_pattern": [
             {"hour": h, "incidents": hourly_incidents[h]}
             for h in hours
@@ -15,9 +15,20 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
 import numpy as np
 
+from src.api.routers.crime_map import resolve_cell
+from src.utils.cells import cell_to_token
+
 router = APIRouter(prefix="/api/explainability", tags=["explainability"])
 
 
+def _cell_token(location_id: str) -> str:
+    """Canonical cell token of a location, shared with the crime map's grid_id"""
+    try:
+        return cell_to_token(resolve_cell(location_id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 class FeatureContribution(BaseModel):
     feature_name: str
     value: float
@@ -64,12 +75,13 @@ class GlobalFeatureImportance(BaseModel):
 
 @router.get("/explain-prediction", response_model=PredictionExplanation)
 async def explain_prediction(
-    location_id: str = Query(..., description="Grid or location identifier"),
+    location_id: str = Query(..., description="Cell token (legacy grid_{i}_{j} IDs are accepted)"),
     time_window: str = Query("24h", description="Prediction time window")
 ):
     """
     Explain a specific crime prediction using SHAP-like feature contributions.
     """
+    location_id = _cell_token(location_id)
     
     # Simulate a prediction with explainability
     prediction_id = f"pred_{location_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
@@ -237,13 +249,14 @@ async def get_confidence_breakdown(
 
 @router.post("/what-if", response_model=WhatIfScenario)
 async def what_if_analysis(
-    location_id: str = Query(..., description="Grid or location identifier"),
+    location_id: str = Query(..., description="Cell token (legacy grid_{i}_{j} IDs are accepted)"),
     feature_name: str = Query(..., description="Feature to modify"),
     new_value: float = Query(..., description="New feature value")
 ):
     """
     Simulate what-if scenarios by modifying feature values.
     """
+    _cell_token(location_id)
     
     # Get original prediction (simplified)
     original_prediction = 0.68
@@ -355,12 +368,13 @@ async def get_global_feature_importance():
 
 @router.get("/prediction-timeline")
 async def get_prediction_timeline(
-    location_id: str = Query(..., description="Grid or location identifier"),
+    location_id: str = Query(..., description="Cell token (legacy grid_{i}_{j} IDs are accepted)"),
     days_back: int = Query(7, description="Days of historical predictions")
 ):
     """
     Show how prediction and confidence have evolved over time for a location.
     """
+    location_id = _cell_token(location_id)
     
     timeline = []
     base_date = datetime.now()
@@ -0,0 +1,188 @@
+"""
+Route Session API Router for Foresight
+
+Stateful patrol routing for live shifts:
+- Create a session from an initial route optimization
+- Apply deltas (add/remove hotspot, remove officer, move depot)
+- Each delta is repaired locally instead of re-solving the whole plan
+"""
+
+from collections import OrderedDict
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+import threading
+import time
+import uuid
+
+from src.models.route_session import RouteSession, SessionHotspot
+from src.models.vrp_solver import SavingsRouteSolver
+
+router = APIRouter(prefix="/api/v1/route-sessions", tags=["route-sessions"])
+
+# Sessions are held in memory; the least recently used are evicted first
+MAX_SESSIONS = 64
+_sessions: "OrderedDict[str, RouteSession]" = OrderedDict()
+_sessions_lock = threading.Lock()  # Sessions are created from threadpool workers
+
+# Road distances for new sessions; set at startup when an OSM extract is configured
+road_matrix_cache = None
+
+
+class SessionHotspotInput(BaseModel):
+    cluster_id: int
+    latitude: float
+    longitude: float
+    priority: float = 1.0
+    density: float = 0.0
+
+
+class RouteSessionRequest(BaseModel):
+    hotspots: List[SessionHotspotInput]
+    num_officers: int
+    depot_latitude: float
+    depot_longitude: float
+    max_route_distance_km: float = 50.0
+    max_shift_hours: float = 8.0
+    time_limit_ms: Optional[int] = None  # Budget for the initial solve
+
+
+class RouteDelta(BaseModel):
+    op: str  # "add_hotspot", "remove_hotspot", "remove_officer", "move_depot"
+    hotspot: Optional[SessionHotspotInput] = None
+    hotspot_id: Optional[int] = None
+    officer_id: Optional[int] = None
+    depot_latitude: Optional[float] = None
+    depot_longitude: Optional[float] = None
+
+
+class SessionRoute(BaseModel):
+    officer_id: int
+    hotspot_ids: List[int]
+    total_distance_km: float
+    estimated_duration_hours: float
+
+
+class RouteSessionState(BaseModel):
+    session_id: str
+    routes: List[SessionRoute]
+    unassigned_hotspot_ids: List[int]
+    elapsed_ms: float
+
+
+def _to_hotspot(data: SessionHotspotInput) -> SessionHotspot:
+    return SessionHotspot(
+        cluster_id=data.cluster_id,
+        center_lat=data.latitude,
+        center_lon=data.longitude,
+        priority=data.priority,
+        density=data.density
+    )
+
+
+def _state(session_id: str, session: RouteSession, started: float) -> RouteSessionState:
+    return RouteSessionState(
+        session_id=session_id,
+        routes=[
+            SessionRoute(
+                officer_id=route.officer_id,
+                hotspot_ids=[h.cluster_id for h in route.hotspots],
+                total_distance_km=route.total_distance,
+                estimated_duration_hours=route.estimated_duration
+            )
+            for route in session.routes()
+        ],
+        unassigned_hotspot_ids=[h.cluster_id for h in session.unassigned_hotspots()],
+        elapsed_ms=round((time.perf_counter() - started) * 1000.0, 3)
+    )
+
+
+def _get_session(session_id: str) -> RouteSession:
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Route session {session_id} not found")
+        _sessions.move_to_end(session_id)
+    return session
+
+
+@router.post("", response_model=RouteSessionState)
+def create_route_session(request: RouteSessionRequest):
+    """
+    Solve an initial patrol plan and keep it as a session.
+
+    A plain def: the initial solve runs in the threadpool, not on the event loop.
+    """
+    started = time.perf_counter()
+    solver = SavingsRouteSolver(
+        max_route_distance_km=request.max_route_distance_km,
+        max_shift_hours=request.max_shift_hours,
+        distance_cache=road_matrix_cache
+    )
+    try:
+        session = RouteSession(
+            hotspots=[_to_hotspot(h) for h in request.hotspots],
+            num_officers=request.num_officers,
+            depot_lat=request.depot_latitude,
+            depot_lon=request.depot_longitude,
+            solver=solver,
+            time_limit_ms=request.time_limit_ms
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    session_id = uuid.uuid4().hex
+    with _sessions_lock:
+        _sessions[session_id] = session
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    return _state(session_id, session, started)
+
+
+@router.get("/{session_id}", response_model=RouteSessionState)
+async def get_route_session(session_id: str):
+    """
+    Current routes of a session.
+    """
+    started = time.perf_counter()
+    return _state(session_id, _get_session(session_id), started)
+
+
+@router.post("/{session_id}/deltas", response_model=RouteSessionState)
+async def apply_route_delta(session_id: str, delta: RouteDelta):
+    """
+    Apply one change to a session and return the repaired routes.
+    """
+    session = _get_session(session_id)
+    started = time.perf_counter()
+    try:
+        if delta.op == "add_hotspot" and delta.hotspot is not None:
+            session.add_hotspot(_to_hotspot(delta.hotspot))
+        elif delta.op == "remove_hotspot" and delta.hotspot_id is not None:
+            session.remove_hotspot(delta.hotspot_id)
+        elif delta.op == "remove_officer" and delta.officer_id is not None:
+            session.remove_officer(delta.officer_id)
+        elif (
+            delta.op == "move_depot"
+            and delta.depot_latitude is not None
+            and delta.depot_longitude is not None
+        ):
+            session.move_depot(delta.depot_latitude, delta.depot_longitude)
+        else:
+            raise HTTPException(status_code=400, detail=f"Invalid delta: {delta.op}")
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _state(session_id, session, started)
+
+
+@router.delete("/{session_id}")
+async def delete_route_session(session_id: str):
+    """
+    Close a session.
+    """
+    _get_session(session_id)
+    with _sessions_lock:
+        _sessions.pop(session_id, None)
+    return {"session_id": session_id, "deleted": True}
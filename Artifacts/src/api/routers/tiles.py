@@ -0,0 +1,157 @@
+"""
+Vector Tile API Router for Foresight
+
+Serves incidents, hotspot centroids and risk grid cells as Mapbox Vector
+Tiles so the map only downloads what is on screen:
+- GET /tiles/{layer}/{z}/{x}/{y}.mvt
+- GET /tiles/layers
+- GET /tiles/clusters (zoom-dependent incident clusters as GeoJSON)
+
+Tiles are cached in memory (and on disk when TILE_CACHE_DIR is set) per
+layer version; loading new data under a new version invalidates them.
+"""
+
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Optional
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+from src.api.routers import crime_map
+from src.utils.mapbox import MapboxVisualizer
+from src.utils.mvt import MEDIA_TYPE, TileCache, TileLayer, TileStore
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/tiles", tags=["tiles"])
+
+tile_store = TileStore(TileCache(cache_dir=os.environ.get("TILE_CACHE_DIR")))
+
+# Layers rebuilt from the daily grid predictions
+PREDICTION_LAYERS = ("hotspots", "risk")
+
+# Cluster index behind the clusters endpoint, built by set_incidents
+visualizer = MapboxVisualizer()
+
+
+def set_incidents(df, version: Optional[str] = None):
+    """
+    Publish incident points as the ``incidents`` layer and index their clusters
+
+    Indexing runs here, at load time, so cluster requests only query it.
+
+    Args:
+        df: DataFrame with latitude/longitude and optional crime_type/arrest columns
+        version: Dataset version (defaults to a digest of the coordinates)
+    """
+    df = df.dropna(subset=["latitude", "longitude"])
+    lat = df["latitude"].to_numpy(dtype=float)
+    lon = df["longitude"].to_numpy(dtype=float)
+    if version is None:
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(np.ascontiguousarray(lat).tobytes())
+        digest.update(np.ascontiguousarray(lon).tobytes())
+        version = digest.hexdigest()
+    properties = {}
+    if "crime_type" in df.columns:
+        properties["crime_type"] = df["crime_type"].astype(str).to_numpy()
+    if "arrest" in df.columns:
+        properties["arrest"] = df["arrest"].fillna(False).astype(bool).to_numpy()
+    tile_store.set_layer(TileLayer("incidents", lat, lon, properties, version=version))
+    visualizer.build_cluster_index(df, version)
+
+
+def _refresh_predictions(city: str = "chicago"):
+    """
+    Rebuild the prediction layers when the date or the stored predictions change
+
+    The layers show the same cells as /api/crime-map/hotspots and its live
+    stream: the prediction store's tensor, or the synthetic grid without one.
+    """
+    today = datetime.now().date()
+    tensor = crime_map.prediction_store.get(city)
+    if tensor is None:
+        source = "synthetic"
+    else:
+        source = f"{tensor.model_version}-{crime_map.prediction_store.version(city)}"
+    version = f"{city}-{today}-{source}"
+    current = tile_store.layers.get("risk")
+    if current is not None and current.version == version:
+        return
+
+    columns, cell_deg = crime_map.live_hotspots(city, tensor, today)
+    lat, lon = columns["lat"], columns["lng"]
+    properties = {
+        name: columns[name]
+        for name in ("intensity", "risk_level", "grid_id", "predicted_incidents")
+    }
+    tile_store.set_layer(TileLayer("hotspots", lat, lon, properties, version=version))
+    tile_store.set_layer(
+        TileLayer("risk", lat, lon, properties, version=version, cell_size_deg=cell_deg)
+    )
+
+
+@router.get("/layers")
+async def get_layers():
+    """Available tile layers with their versions and feature counts"""
+    _refresh_predictions()
+    return {
+        "layers": [
+            {"name": name, "version": layer.version, "features": len(layer)}
+            for name, layer in tile_store.layers.items()
+        ],
+        "cache": tile_store.cache.info(),
+    }
+
+
+@router.get("/clusters")
+async def get_clusters(
+    bbox: str = Query(..., description="west,south,east,north in degrees"),
+    zoom: float = Query(..., ge=0, le=24),
+):
+    """
+    Incident clusters in the viewport as GeoJSON.
+
+    Clusters carry point_count like Mapbox GL's client-side clustering, so
+    the same layer styles work without shipping every incident.
+    """
+    if "incidents" not in tile_store.layers:
+        raise HTTPException(status_code=404, detail="No incidents loaded")
+    try:
+        box = [float(v) for v in bbox.split(",")]
+        if len(box) != 4:
+            raise ValueError("bbox needs four values")
+        if box[1] > box[3]:
+            raise ValueError("south is above north")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+    return visualizer.create_cluster_map_data(box, zoom)
+
+
+@router.get("/{layer}/{z}/{x}/{y}.mvt")
+async def get_tile(layer: str, z: int, x: int, y: int, request: Request):
+    """
+    One Mapbox Vector Tile of a layer.
+
+    Empty tiles are answered with 204; clients can revalidate with the ETag,
+    which changes whenever the layer's data version does.
+    """
+    if layer in PREDICTION_LAYERS:
+        _refresh_predictions()
+    if layer not in tile_store.layers:
+        raise HTTPException(status_code=404, detail=f"Unknown tile layer: {layer}")
+
+    etag = f'"{layer}-{tile_store.layers[layer].version}-{z}-{x}-{y}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    try:
+        tile = tile_store.tile(layer, z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not tile:
+        return Response(status_code=204, headers=headers)
+    return Response(content=tile, media_type=MEDIA_TYPE, headers=headers)
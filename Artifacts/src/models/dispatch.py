@@ -0,0 +1,313 @@
+"""
+Real-Time Dispatch Insertion
+
+Assigns an emerging hotspot to the patrol unit that can absorb it most
+cheaply. Live unit positions are kept in a uniform grid hash over a local
+kilometre plane, so a position update is a couple of dictionary operations
+and a nearest-unit query only touches the cells around the hotspot.
+
+For a new hotspot only the k units nearest to it are evaluated: each
+unit's remaining path (current position -> remaining stops -> depot) is
+checked for the cheapest feasible insertion position, vectorized over the
+path legs. With thousands of units a decision takes a few milliseconds.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import logging
+import math
+
+import numpy as np
+
+from src.utils.geo import haversine_km, to_local_km
+
+logger = logging.getLogger(__name__)
+
+# Grid cell edge in km; about the spacing of units in a dense deployment
+DEFAULT_CELL_KM = 1.0
+
+# Units evaluated per insertion decision
+DEFAULT_CANDIDATES = 8
+
+
+@dataclass
+class DispatchUnit:
+    """Patrol unit on duty: live position and the stops it still has to visit"""
+
+    officer_id: int
+    lat: float
+    lon: float
+    stops: List = field(default_factory=list)  # Remaining Hotspot objects, in order
+    budget_km: float = math.inf  # Distance the unit may still drive this shift
+
+
+@dataclass
+class DispatchDecision:
+    """Cheapest feasible insertion of a hotspot into a unit's route"""
+
+    officer_id: int
+    position: int  # Index in the unit's remaining stops
+    added_km: float
+    distance_to_unit_km: float
+
+
+class UnitGridIndex:
+    """Grid hash of unit positions with O(1) updates and ring-by-ring nearest queries"""
+
+    def __init__(self, origin_lat: float, origin_lon: float, cell_km: float = DEFAULT_CELL_KM):
+        """
+        Initialize index
+
+        Args:
+            origin_lat: Latitude of the projection origin (e.g. the depot)
+            origin_lon: Longitude of the projection origin
+            cell_km: Grid cell edge length in kilometres
+        """
+        self.origin = (origin_lat, origin_lon)
+        self.cell_km = cell_km
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._position: Dict[int, Tuple[float, float]] = {}
+        self._cell_of: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._position)
+
+    def _project(self, lat: float, lon: float) -> Tuple[float, float]:
+        x, y = to_local_km(lat, lon, *self.origin)
+        return float(x), float(y)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_km), math.floor(y / self.cell_km)
+
+    def update(self, unit_id: int, lat: float, lon: float):
+        """Insert a unit or move it to a new position"""
+        x, y = self._project(lat, lon)
+        cell = self._cell(x, y)
+        old = self._cell_of.get(unit_id)
+        if old != cell:
+            if old is not None:
+                self._cells[old].discard(unit_id)
+                if not self._cells[old]:
+                    del self._cells[old]
+            self._cells.setdefault(cell, set()).add(unit_id)
+            self._cell_of[unit_id] = cell
+        self._position[unit_id] = (x, y)
+
+    def remove(self, unit_id: int):
+        """Drop a unit from the index"""
+        cell = self._cell_of.pop(unit_id)
+        del self._position[unit_id]
+        self._cells[cell].discard(unit_id)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def nearest(self, lat: float, lon: float, k: int) -> List[Tuple[float, int]]:
+        """
+        k units nearest to a point
+
+        Cells are scanned in square rings around the query cell. Every unit
+        outside ring r is at least r cells away, so the scan stops once the
+        k-th best distance is within that bound.
+
+        Returns:
+            List of (planar distance in km, unit_id), nearest first
+        """
+        if not self._position or k < 1:
+            return []
+        x, y = self._project(lat, lon)
+        cx, cy = self._cell(x, y)
+        k = min(k, len(self._position))
+        found: List[Tuple[float, int]] = []
+        seen = 0
+        ring = 0
+        while True:
+            for cell in _ring_cells(cx, cy, ring):
+                units = self._cells.get(cell)
+                if not units:
+                    continue
+                for unit_id in units:
+                    ux, uy = self._position[unit_id]
+                    found.append((math.hypot(ux - x, uy - y), unit_id))
+                seen += len(units)
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                if found[-1][0] <= ring * self.cell_km or seen == len(self._position):
+                    return found
+            ring += 1
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    """Cells at Chebyshev distance ``ring`` from (cx, cy)"""
+    if ring == 0:
+        yield cx, cy
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cy - ring
+        yield cx + dx, cy + ring
+    for dy in range(-ring + 1, ring):
+        yield cx - ring, cy + dy
+        yield cx + ring, cy + dy
+
+
+class Dispatcher:
+    """Live patrol units with cheapest-insertion dispatch of new hotspots"""
+
+    def __init__(
+        self,
+        depot_lat: float,
+        depot_lon: float,
+        candidates: int = DEFAULT_CANDIDATES,
+        cell_km: float = DEFAULT_CELL_KM,
+    ):
+        """
+        Initialize dispatcher
+
+        Args:
+            depot_lat: Depot latitude; every route ends there
+            depot_lon: Depot longitude
+            candidates: Number of nearest units evaluated per decision
+            cell_km: Grid cell edge length of the unit index
+        """
+        self.depot = (depot_lat, depot_lon)
+        self.candidates = candidates
+        self.index = UnitGridIndex(depot_lat, depot_lon, cell_km)
+        self.units: Dict[int, DispatchUnit] = {}
+        # Remaining path per unit as (lat, lon) arrays: position, stops..., depot
+        self._paths: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_routes(
+        cls,
+        routes: Sequence,
+        depot_lat: float,
+        depot_lon: float,
+        max_route_distance_km: float = math.inf,
+        **kwargs,
+    ) -> 'Dispatcher':
+        """
+        Start dispatching from a shift plan; every unit is at the depot
+
+        Args:
+            routes: PatrolRoute / PlannedRoute objects (officer_id, hotspots, total_distance)
+            depot_lat: Depot latitude
+            depot_lon: Depot longitude
+            max_route_distance_km: Route length limit used for the remaining budgets
+            **kwargs: Dispatcher arguments
+
+        Returns:
+            Dispatcher with one unit per route
+        """
+        dispatcher = cls(depot_lat, depot_lon, **kwargs)
+        for route in routes:
+            dispatcher.add_unit(
+                DispatchUnit(
+                    officer_id=route.officer_id,
+                    lat=depot_lat,
+                    lon=depot_lon,
+                    stops=list(route.hotspots),
+                    budget_km=max_route_distance_km,
+                )
+            )
+        return dispatcher
+
+    def add_unit(self, unit: DispatchUnit):
+        """Put a unit on duty (replaces one with the same officer_id)"""
+        self.units[unit.officer_id] = unit
+        self.index.update(unit.officer_id, unit.lat, unit.lon)
+        self._rebuild_path(unit)
+
+    def remove_unit(self, officer_id: int) -> DispatchUnit:
+        """Take a unit off duty; its remaining stops are returned with it"""
+        self.index.remove(officer_id)
+        del self._paths[officer_id]
+        return self.units.pop(officer_id)
+
+    def update_position(self, officer_id: int, lat: float, lon: float, visited: int = 0):
+        """
+        Record a unit's new position
+
+        Args:
+            officer_id: Unit that moved
+            lat: New latitude
+            lon: New longitude
+            visited: Number of leading stops completed since the last update
+        """
+        unit = self.units[officer_id]
+        unit.budget_km -= float(haversine_km(unit.lat, unit.lon, lat, lon))
+        unit.lat, unit.lon = lat, lon
+        if visited:
+            del unit.stops[:visited]
+        self.index.update(officer_id, lat, lon)
+        self._rebuild_path(unit)
+
+    def best_insertion(self, hotspot) -> Optional[DispatchDecision]:
+        """
+        Cheapest feasible insertion of a hotspot among the nearest units
+
+        Args:
+            hotspot: Hotspot object (center_lat/center_lon)
+
+        Returns:
+            DispatchDecision, or None if none of the nearest units can take it
+            within its remaining budget
+        """
+        lat, lon = hotspot.center_lat, hotspot.center_lon
+        nearest = self.index.nearest(lat, lon, self.candidates)
+        if not nearest:
+            return None
+
+        # One vectorized evaluation over the legs of all candidate paths
+        paths = [self._paths[unit_id] for _, unit_id in nearest]
+        path_lat = np.concatenate([p[0] for p in paths])
+        path_lon = np.concatenate([p[1] for p in paths])
+        to_new = haversine_km(path_lat, path_lon, lat, lon)
+        legs = haversine_km(path_lat[:-1], path_lon[:-1], path_lat[1:], path_lon[1:])
+
+        best = None
+        offset = 0
+        for (distance, unit_id), (unit_lat, _) in zip(nearest, paths):
+            n = len(unit_lat)
+            start, end = offset, offset + n - 1
+            added = to_new[start:end] + to_new[start + 1 : end + 1] - legs[start:end]
+            remaining = legs[start:end].sum()
+            offset += n
+            feasible = remaining + added <= self.units[unit_id].budget_km + 1e-9
+            if not feasible.any():
+                continue
+            position = int(np.argmin(np.where(feasible, added, np.inf)))
+            cost = float(added[position])
+            if best is None or cost < best.added_km:
+                best = DispatchDecision(unit_id, position, cost, distance)
+        return best
+
+    def assign(self, hotspot) -> Optional[DispatchDecision]:
+        """
+        Insert a hotspot into the best unit's route
+
+        Returns:
+            The applied DispatchDecision, or None if no nearby unit can take it
+        """
+        decision = self.best_insertion(hotspot)
+        if decision is None:
+            logger.info(f"No unit near ({hotspot.center_lat:.4f}, {hotspot.center_lon:.4f})")
+            return None
+        unit = self.units[decision.officer_id]
+        unit.stops.insert(decision.position, hotspot)
+        path_lat, path_lon = self._paths[unit.officer_id]
+        self._paths[unit.officer_id] = (
+            np.insert(path_lat, decision.position + 1, hotspot.center_lat),
+            np.insert(path_lon, decision.position + 1, hotspot.center_lon),
+        )
+        return decision
+
+    def remaining_distance(self, officer_id: int) -> float:
+        """Distance left on a unit's route from its current position back to the depot"""
+        path_lat, path_lon = self._paths[officer_id]
+        return float(haversine_km(path_lat[:-1], path_lon[:-1], path_lat[1:], path_lon[1:]).sum())
+
+    def _rebuild_path(self, unit: DispatchUnit):
+        self._paths[unit.officer_id] = (
+            np.array([unit.lat] + [h.center_lat for h in unit.stops] + [self.depot[0]]),
+            np.array([unit.lon] + [h.center_lon for h in unit.stops] + [self.depot[1]]),
+        )
@@ -0,0 +1,243 @@
+"""
+Hotspot Delta Streams
+
+Pushes crime-map changes to subscribed clients instead of having them poll
+the whole grid. Publishers hand the broadcaster a city's full hotspot layer
+whenever predictions change; it diffs the layer against the previous one
+once and forwards only the changed cells to each subscriber whose viewport
+they fall in, so work scales with churn rather than clients x grid size.
+
+Subscribers coalesce: pending changes are kept per cell, so a burst of
+publishes between two sends collapses into one message holding the latest
+value of each cell, and a slow client's backlog is bounded by its viewport.
+A client whose backlog outgrows MAX_PENDING_CELLS gets a fresh snapshot of
+its viewport instead of the delta.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import asyncio
+import logging
+import threading
+
+import numpy as np
+
+from src.models.prediction_store import risk_levels
+
+logger = logging.getLogger(__name__)
+
+# Intensities are served rounded to 3 decimals; smaller moves are not changes
+CHANGE_EPSILON = 5e-4
+
+# Pending cells past which a subscriber is resynchronized with a snapshot
+MAX_PENDING_CELLS = 5000
+
+# Wait after the first change of a burst so the rest of it joins the same message
+COALESCE_SECONDS = 0.25
+
+
+@dataclass
+class HotspotLayer:
+    """Every significant cell of a city's live predictions"""
+
+    grid_id: np.ndarray  # Cell tokens
+    lat: np.ndarray
+    lng: np.ndarray
+    intensity: np.ndarray  # 0-1, rounded as served
+    cell_deg: float = 0.0  # Cell side; subscribers see cells overlapping their bbox
+
+    @classmethod
+    def empty(cls, cell_deg: float = 0.0) -> "HotspotLayer":
+        return cls(np.array([], dtype=str), np.array([]), np.array([]), np.array([]), cell_deg)
+
+    def entries(self, index: np.ndarray) -> List[Dict]:
+        """Wire form of the cells at ``index``"""
+        index = np.asarray(index, dtype=int)
+        return [
+            {"grid_id": g, "lat": lat, "lng": lng, "intensity": i, "risk_level": r}
+            for g, lat, lng, i, r in zip(
+                self.grid_id[index].tolist(),
+                self.lat[index].tolist(),
+                self.lng[index].tolist(),
+                self.intensity[index].tolist(),
+                risk_levels(self.intensity[index]).tolist(),
+            )
+        ]
+
+    def in_bbox(self, bbox: Optional[Sequence[float]], index: Optional[np.ndarray] = None):
+        """Positions (into ``index``, or the layer) of cells overlapping a bbox"""
+        index = np.arange(len(self.grid_id)) if index is None else np.asarray(index, dtype=int)
+        if bbox is None:
+            return np.arange(len(index))
+        west, south, east, north = bbox
+        half = self.cell_deg / 2.0
+        lat, lng = self.lat[index], self.lng[index]
+        if west <= east:
+            in_lng = (lng + half >= west) & (lng - half <= east)
+        else:
+            # Crosses the antimeridian
+            in_lng = (lng + half >= west) | (lng - half <= east)
+        return np.flatnonzero(in_lng & (lat + half >= south) & (lat - half <= north))
+
+
+class Subscription:
+    """One client's viewport on a city's stream"""
+
+    def __init__(self, broadcaster: "HotspotBroadcaster", city: str, bbox, loop):
+        self.broadcaster = broadcaster
+        self.city = city
+        self.bbox = bbox
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Optional[Dict]] = {}  # grid_id -> entry, None when removed
+        self._resync = True  # The first message is a snapshot
+        self._event.set()
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            # The client's event loop is gone; close() will follow
+            pass
+
+    def offer(self, changed: List[Dict], removed: List[str]):
+        """Merge changes into the pending backlog (called by the broadcaster)"""
+        if not changed and not removed:
+            return
+        with self._lock:
+            if not self._resync:
+                for entry in changed:
+                    self._pending[entry["grid_id"]] = entry
+                for grid_id in removed:
+                    self._pending[grid_id] = None
+                if len(self._pending) > MAX_PENDING_CELLS:
+                    self._pending.clear()
+                    self._resync = True
+        self._wake()
+
+    def resync(self):
+        """Replace the backlog with a snapshot on the next message"""
+        with self._lock:
+            self._pending.clear()
+            self._resync = True
+        self._wake()
+
+    def drain(self) -> Optional[Dict]:
+        """The coalesced message for everything pending, or None when nothing is"""
+        with self._lock:
+            self._event.clear()
+            resync, pending = self._resync, self._pending
+            self._resync, self._pending = False, {}
+        if resync:
+            return self.broadcaster.snapshot(self.city, self.bbox)
+        if not pending:
+            return None
+        return {
+            "type": "delta",
+            "city": self.city,
+            "version": self.broadcaster.versions.get(self.city, 0),
+            "cells": [entry for entry in pending.values() if entry is not None],
+            "removed": [grid_id for grid_id, entry in pending.items() if entry is None],
+        }
+
+    async def next_message(
+        self, timeout: float, coalesce_seconds: float = COALESCE_SECONDS
+    ) -> Optional[Dict]:
+        """
+        Wait for the next coalesced message
+
+        Returns:
+            The message, or None when nothing changed within ``timeout``
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if coalesce_seconds > 0:
+            await asyncio.sleep(coalesce_seconds)
+        return self.drain()
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class HotspotBroadcaster:
+    """Latest hotspot layer per city, fanned out to viewport subscriptions as deltas"""
+
+    def __init__(self):
+        self._layers: Dict[str, HotspotLayer] = {}
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.versions: Dict[str, int] = {}
+
+    def subscribe(self, city: str, bbox: Optional[Sequence[float]] = None) -> Subscription:
+        """Subscribe from the running event loop; the first message is a snapshot"""
+        subscription = Subscription(self, city, bbox, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(city, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.city, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+
+    def subscriber_count(self, city: str) -> int:
+        return len(self._subscriptions.get(city, []))
+
+    def snapshot(self, city: str, bbox: Optional[Sequence[float]] = None) -> Dict:
+        """Every cell of the current layer in a bbox"""
+        layer = self._layers.get(city, HotspotLayer.empty())
+        return {
+            "type": "snapshot",
+            "city": city,
+            "version": self.versions.get(city, 0),
+            "cells": layer.entries(layer.in_bbox(bbox)),
+            "removed": [],
+        }
+
+    def publish(self, city: str, layer: HotspotLayer) -> int:
+        """
+        Replace a city's layer and push the difference to its subscribers
+
+        Returns:
+            Number of changed cells (added, updated or removed)
+        """
+        with self._lock:
+            previous = self._layers.get(city, HotspotLayer.empty(layer.cell_deg))
+            self._layers[city] = layer
+            _, new_common, old_common = np.intersect1d(
+                layer.grid_id, previous.grid_id, assume_unique=True, return_indices=True
+            )
+            moved = (
+                np.abs(layer.intensity[new_common] - previous.intensity[old_common])
+                > CHANGE_EPSILON
+            )
+            changed = np.concatenate(
+                [
+                    new_common[moved],
+                    np.setdiff1d(np.arange(len(layer.grid_id)), new_common, assume_unique=True),
+                ]
+            ).astype(int)
+            removed = np.setdiff1d(np.arange(len(previous.grid_id)), old_common, assume_unique=True)
+            n_changed = len(changed) + len(removed)
+            if n_changed:
+                self.versions[city] = self.versions.get(city, 0) + 1
+            subscriptions = list(self._subscriptions.get(city, []))
+
+        if n_changed and subscriptions:
+            changed_entries = layer.entries(changed)
+            removed_ids = previous.grid_id[removed].tolist()
+            for subscription in subscriptions:
+                visible = layer.in_bbox(subscription.bbox, changed)
+                gone = previous.in_bbox(subscription.bbox, removed)
+                subscription.offer(
+                    [changed_entries[i] for i in visible], [removed_ids[i] for i in gone]
+                )
+        logger.debug(
+            f"Published {city} v{self.versions.get(city, 0)}: {n_changed} changed cells "
+            f"to {len(subscriptions)} subscribers"
+        )
+        return n_changed
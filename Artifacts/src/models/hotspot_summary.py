@@ -0,0 +1,72 @@
+"""
+Hotspot Summary Tables
+
+Builds the per-cluster density table returned by
+``CrimeHotspotDetector.calculate_hotspot_density`` for the alternative
+hotspot engines, so every engine feeds the API and dashboard the same shape.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+import pandas as pd
+
+from src.utils.geo import convex_hull_area_km2
+
+DENSITY_COLUMNS = [
+    'cluster_id',
+    'center_latitude',
+    'center_longitude',
+    'n_incidents',
+    'density_per_km2',
+    'area_km2',
+]
+
+
+def summarize_clusters(
+    df: pd.DataFrame,
+    cluster_column: str = 'cluster',
+    extra_columns: Optional[Dict[str, Union[str, Tuple[str, str]]]] = None,
+) -> pd.DataFrame:
+    """
+    Calculate centre, size, area and density for each labelled cluster
+
+    Args:
+        df: Incidents with latitude, longitude and a cluster label column
+            (-1 marks noise and is skipped)
+        cluster_column: Name of the cluster label column
+        extra_columns: Optional mapping of output column -> aggregation
+            ('first', 'min', 'max', 'mode') over a same-named input column,
+            or -> (input column, aggregation)
+
+    Returns:
+        DataFrame with DENSITY_COLUMNS plus any extra columns, sorted by
+        density (highest first)
+    """
+    extra_columns = extra_columns or {}
+    columns = DENSITY_COLUMNS + list(extra_columns)
+
+    clustered = df[df[cluster_column] >= 0]
+    if len(clustered) == 0:
+        return pd.DataFrame(columns=columns)
+
+    rows: List[Dict] = []
+    for cluster_id, group in clustered.groupby(cluster_column, sort=True):
+        area_km2 = convex_hull_area_km2(group['latitude'].values, group['longitude'].values)
+        row = {
+            'cluster_id': int(cluster_id),
+            'center_latitude': float(group['latitude'].mean()),
+            'center_longitude': float(group['longitude'].mean()),
+            'n_incidents': int(len(group)),
+            'density_per_km2': float(len(group) / area_km2),
+            'area_km2': float(area_km2),
+        }
+        for column, spec in extra_columns.items():
+            source, how = spec if isinstance(spec, tuple) else (column, spec)
+            values = group[source]
+            if how == 'mode':
+                row[column] = values.mode().iloc[0]
+            else:
+                row[column] = getattr(values, how)()
+        rows.append(row)
+
+    summary = pd.DataFrame(rows, columns=columns)
+    return summary.sort_values('density_per_km2', ascending=False).reset_index(drop=True)
@@ -0,0 +1,323 @@
+"""
+Incident Count Cube
+
+Summed-area tables of incident counts per crime type over (day, grid row,
+grid column), so "how many incidents of type X in this rectangle in this
+period" is eight table lookups instead of a mask over every incident.
+
+The grid is the hierarchical cell grid (src.utils.cells) at one resolution,
+cropped to the bulk of the incidents: rows and columns between the
+EXTENT_QUANTILE quantiles, so a few bad geocodes hundreds of kilometres
+away do not stretch the table over empty cells. Entry [t, d, r, c] of the
+table counts incidents of type t on days < d in rows < r and columns < c,
+so any box of days, rows and columns is an inclusion-exclusion over its
+eight corners. Rectangles are answered at cell granularity: every cell a
+rectangle touches counts in full.
+
+Incidents the table does not hold are still counted:
+
+- off the grid (spilled): a per-type daily prefix plane for unfiltered
+  areas, and kept as points for rectangles, which mask them directly
+- without a location: in the same plane, so only unfiltered areas count them
+- without a date: per-type totals, counted only when no filter applies
+"""
+
+from datetime import date
+from typing import Dict, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.utils.cells import ORIGIN_LAT, ORIGIN_LON, cell_size_deg
+
+logger = logging.getLogger(__name__)
+
+# 0.02 degree (~2 km) cells, as on the crime map
+DEFAULT_RESOLUTION = 15
+
+UNKNOWN_TYPE = "UNKNOWN"
+
+# Grid rows and columns outside these quantiles of the incidents spill out of the table
+EXTENT_QUANTILE = 0.001
+
+_SPILL_COLUMNS = ("type", "day", "row", "col")
+
+# Corner signs of the inclusion-exclusion: the upper corner adds, the lower subtracts
+_SIGNS = np.array([-1, 1])
+
+
+class IncidentCountCube:
+    """Per-type 3-D prefix sums of daily incident counts over a cell grid"""
+
+    def __init__(
+        self,
+        table: np.ndarray,
+        crime_types: Sequence[str],
+        start_date: date,
+        resolution: int,
+        row0: int,
+        col0: int,
+        outside: Optional[np.ndarray] = None,
+        spill: Optional[pd.DataFrame] = None,
+        undated: Optional[np.ndarray] = None,
+        date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]] = None,
+    ):
+        """
+        Args:
+            table: (n_types, n_days + 1, n_rows + 1, n_cols + 1) prefix sums
+            crime_types: Crime type of each table plane
+            start_date: Day of table index 1 along the day axis
+            resolution: Cell resolution of the grid
+            row0, col0: Global cell row and column of grid row/column 0
+            outside: (n_types, n_days + 1) daily prefix sums of dated
+                incidents off the grid or without a location
+            spill: Dated incidents off the grid (type, day, row, col, with
+                global cell rows and columns)
+            undated: Incidents without a date per type
+            date_range: First and last incident timestamps
+        """
+        n_types, n_days = table.shape[0], table.shape[1] - 1
+        self.table = table
+        self.crime_types = tuple(crime_types)
+        self.start_date = start_date
+        self.resolution = resolution
+        self.row0 = row0
+        self.col0 = col0
+        self.outside = (
+            np.zeros((n_types, n_days + 1), dtype=np.int64) if outside is None else outside
+        )
+        self.spill = (
+            pd.DataFrame({name: np.array([], dtype=np.int64) for name in _SPILL_COLUMNS})
+            if spill is None
+            else spill
+        )
+        self.undated = np.zeros(n_types, dtype=np.int64) if undated is None else undated
+        self.date_range = date_range
+        self._type_index = {t: i for i, t in enumerate(self.crime_types)}
+
+    @property
+    def n_days(self) -> int:
+        return self.table.shape[1] - 1
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(rows, cols) of the grid"""
+        return self.table.shape[2] - 1, self.table.shape[3] - 1
+
+    @property
+    def end_date(self) -> date:
+        """Last day with counts"""
+        return (pd.Timestamp(self.start_date) + pd.Timedelta(days=self.n_days - 1)).date()
+
+    @classmethod
+    def from_incidents(
+        cls, df: pd.DataFrame, resolution: int = DEFAULT_RESOLUTION
+    ) -> "IncidentCountCube":
+        """
+        Build the cube from incident records
+
+        Args:
+            df: Incidents with latitude, longitude, incident_date and
+                optionally crime_type
+            resolution: Cell resolution of the grid
+
+        Returns:
+            IncidentCountCube over the bulk of the incidents' extent and
+            their date range
+        """
+        if "crime_type" in df:
+            types, type_codes = np.unique(
+                df["crime_type"].fillna(UNKNOWN_TYPE).astype(str), return_inverse=True
+            )
+        else:
+            types, type_codes = np.array([UNKNOWN_TYPE]), np.zeros(len(df), dtype=np.int64)
+        type_codes = type_codes.reshape(-1)
+
+        timestamps = pd.to_datetime(df["incident_date"])
+        dated = timestamps.notna().to_numpy()
+        if not dated.any():
+            raise ValueError("No dated incidents to count")
+        undated = np.bincount(type_codes[~dated], minlength=len(types))
+        dates = timestamps[dated].dt.normalize()
+        start = dates.min()
+        days = ((dates - start).dt.days).to_numpy()
+        n_days = int(days.max()) + 1
+        type_codes = type_codes[dated]
+
+        size = cell_size_deg(resolution)
+        lat = df["latitude"].to_numpy(float)[dated]
+        lon = df["longitude"].to_numpy(float)[dated]
+        located = ~(np.isnan(lat) | np.isnan(lon))
+        rows = np.floor((lat[located] - ORIGIN_LAT) / size).astype(np.int64)
+        cols = np.floor((lon[located] - ORIGIN_LON) / size).astype(np.int64)
+        if len(rows):
+            row0, row1 = np.quantile(rows, [EXTENT_QUANTILE, 1 - EXTENT_QUANTILE], method="nearest")
+            col0, col1 = np.quantile(cols, [EXTENT_QUANTILE, 1 - EXTENT_QUANTILE], method="nearest")
+        else:
+            row0 = row1 = col0 = col1 = 0
+        on_grid = (rows >= row0) & (rows <= row1) & (cols >= col0) & (cols <= col1)
+
+        # Dated incidents the table does not hold: unlocated, then spilled
+        off_table = np.ones(len(days), dtype=bool)
+        off_table[np.flatnonzero(located)[on_grid]] = False
+        outside = np.zeros((len(types), n_days + 1), dtype=np.int64)
+        np.add.at(outside, (type_codes[off_table], days[off_table] + 1), 1)
+        np.cumsum(outside, axis=1, out=outside)
+        spilled = ~on_grid
+        spill = pd.DataFrame(
+            {
+                "type": type_codes[located][spilled],
+                "day": days[located][spilled],
+                "row": rows[spilled],
+                "col": cols[spilled],
+            }
+        )
+
+        # A zero plane ahead of every axis keeps the corner lookups branch-free
+        shape = (len(types), n_days + 1, int(row1 - row0) + 2, int(col1 - col0) + 2)
+        dtype = np.int32 if len(df) < np.iinfo(np.int32).max else np.int64
+        table = np.zeros(shape, dtype=dtype)
+        # Counts per occupied cell only; a bincount over the whole table would
+        # allocate it again as int64
+        flat, counts = np.unique(
+            np.ravel_multi_index(
+                (
+                    type_codes[located][on_grid],
+                    days[located][on_grid] + 1,
+                    rows[on_grid] - row0 + 1,
+                    cols[on_grid] - col0 + 1,
+                ),
+                shape,
+            ),
+            return_counts=True,
+        )
+        table.reshape(-1)[flat] = counts
+        for axis in (1, 2, 3):
+            np.cumsum(table, axis=axis, out=table)
+
+        logger.info(
+            f"Incident count cube: {len(types)} types x {n_days} days x "
+            f"{shape[2] - 1}x{shape[3] - 1} cells ({table.nbytes / 1e6:.1f} MB); "
+            f"{len(spill)} incidents off the grid, {int((~located).sum())} unlocated, "
+            f"{int(undated.sum())} undated"
+        )
+        return cls(
+            table,
+            types.tolist(),
+            start.date(),
+            resolution,
+            int(row0),
+            int(col0),
+            outside=outside,
+            spill=spill,
+            undated=undated,
+            date_range=(timestamps.min(), timestamps.max()),
+        )
+
+    def _day_span(self, start: Optional[date], end: Optional[date]) -> Tuple[int, int]:
+        """Half-open table day range of an inclusive date range"""
+        d0 = 0 if start is None else (pd.Timestamp(start) - pd.Timestamp(self.start_date)).days
+        d1 = (
+            self.n_days
+            if end is None
+            else (pd.Timestamp(end) - pd.Timestamp(self.start_date)).days + 1
+        )
+        d0 = int(np.clip(d0, 0, self.n_days))
+        return d0, int(np.clip(d1, d0, self.n_days))
+
+    def _cell_range(self, bbox: Sequence[float]) -> Tuple[int, int, int, int]:
+        """Half-open global (row0, row1, col0, col1) of the cells a bbox touches"""
+        west, south, east, north = bbox
+        if south > north or west > east:
+            raise ValueError(f"Invalid bbox {tuple(bbox)}")
+        size = cell_size_deg(self.resolution)
+        return (
+            int(np.floor((south - ORIGIN_LAT) / size)),
+            int(np.floor((north - ORIGIN_LAT) / size)) + 1,
+            int(np.floor((west - ORIGIN_LON) / size)),
+            int(np.floor((east - ORIGIN_LON) / size)) + 1,
+        )
+
+    def _cell_span(self, bbox: Optional[Sequence[float]]) -> Tuple[int, int, int, int]:
+        """Half-open grid (row0, row1, col0, col1) of the cells a bbox touches"""
+        n_rows, n_cols = self.shape
+        if bbox is None:
+            return 0, n_rows, 0, n_cols
+        r0, r1, c0, c1 = self._cell_range(bbox)
+        r0, c0 = int(np.clip(r0 - self.row0, 0, n_rows)), int(np.clip(c0 - self.col0, 0, n_cols))
+        return (
+            r0,
+            int(np.clip(r1 - self.row0, r0, n_rows)),
+            c0,
+            int(np.clip(c1 - self.col0, c0, n_cols)),
+        )
+
+    def _box(self, planes, bbox, start, end) -> np.ndarray:
+        if bbox is not None and bbox[0] > bbox[2]:
+            # Crosses the antimeridian: count both sides
+            west, south, east, north = bbox
+            return self._box(planes, (west, south, 180.0, north), start, end) + self._box(
+                planes, (-180.0, south, east, north), start, end
+            )
+        d0, d1 = self._day_span(start, end)
+        r0, r1, c0, c1 = self._cell_span(bbox)
+        corners = self.table[np.ix_(planes, [d0, d1], [r0, r1], [c0, c1])]
+        totals = np.einsum("tijk,i,j,k->t", corners, _SIGNS, _SIGNS, _SIGNS).astype(np.int64)
+        if bbox is None:
+            totals += self.outside[planes, d1] - self.outside[planes, d0]
+            if start is None and end is None:
+                totals += self.undated[planes]
+        elif len(self.spill):
+            r0, r1, c0, c1 = self._cell_range(bbox)
+            spill = self.spill
+            inside = (
+                spill["day"].between(d0, d1 - 1)
+                & spill["row"].between(r0, r1 - 1)
+                & spill["col"].between(c0, c1 - 1)
+            )
+            totals += np.bincount(spill["type"][inside], minlength=len(self.crime_types))[planes]
+        return totals
+
+    def counts(
+        self,
+        bbox: Optional[Sequence[float]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Dict[str, int]:
+        """
+        Incidents per crime type in a rectangle and date range
+
+        Args:
+            bbox: (west, south, east, north) in degrees; west > east crosses
+                the antimeridian (default: everywhere, including incidents
+                without a location)
+            start, end: Inclusive date range (default: all days, including
+                incidents without a date)
+
+        Returns:
+            {crime type: count}
+        """
+        totals = self._box(np.arange(len(self.crime_types)), bbox, start, end)
+        return dict(zip(self.crime_types, totals.tolist()))
+
+    def count(
+        self,
+        crime_type: Optional[str] = None,
+        bbox: Optional[Sequence[float]] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> int:
+        """
+        Incidents of one crime type (or all types) in a rectangle and date range
+
+        Args:
+            crime_type: Crime type (default: all types)
+            bbox: (west, south, east, north) in degrees, as in counts (default: everywhere)
+            start, end: Inclusive date range (default: all days)
+        """
+        if crime_type is None:
+            return sum(self.counts(bbox, start, end).values())
+        if crime_type not in self._type_index:
+            return 0
+        return int(self._box([self._type_index[crime_type]], bbox, start, end)[0])
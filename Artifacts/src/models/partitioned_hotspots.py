@@ -0,0 +1,243 @@
+"""
+Partitioned Hotspot Detection
+
+Runs DBSCAN hotspot detection separately for each police district or crime
+type in a process pool instead of one serial ``detect_hotspots`` call per
+partition. District partitions carry a halo of neighbouring incidents within
+``eps`` so core points at a border see their full neighbourhood, and clusters
+that straddle a border are stitched back together afterwards.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from sklearn.cluster import DBSCAN
+
+from src.models.hotspot_summary import summarize_clusters
+
+logger = logging.getLogger(__name__)
+
+# Partition columns that split the city spatially and therefore need a halo
+SPATIAL_PARTITIONS = {'district', 'beat', 'ward', 'community_area'}
+
+
+def _cluster_partition(
+    coords: np.ndarray,
+    n_members: int,
+    eps: float,
+    min_samples: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster one partition (members followed by halo points)
+
+    Only the members' labels and core flags are returned; halo points are
+    labelled by their own partition.
+    """
+    if len(coords) == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=bool)
+
+    model = DBSCAN(eps=eps, min_samples=min_samples).fit(coords)
+    core = np.zeros(len(coords), dtype=bool)
+    core[model.core_sample_indices_] = True
+    return model.labels_[:n_members], core[:n_members]
+
+
+def _halo_indices(coords: np.ndarray, members: np.ndarray, eps: float) -> np.ndarray:
+    """Indices of non-member points within eps of any member"""
+    points = coords[members]
+    lower = points.min(axis=0) - eps
+    upper = points.max(axis=0) + eps
+    in_box = np.all((coords >= lower) & (coords <= upper), axis=1)
+    candidates = np.setdiff1d(np.flatnonzero(in_box), members, assume_unique=True)
+    if len(candidates) == 0:
+        return candidates
+
+    dist, _ = cKDTree(points).query(coords[candidates], k=1, distance_upper_bound=eps * 1.000001)
+    return candidates[dist <= eps]
+
+
+class PartitionedHotspotDetector:
+    """Detect hotspots per district or crime type in parallel"""
+
+    def __init__(
+        self,
+        eps: float = 0.01,
+        min_samples: int = 10,
+        partition_by: str = 'district',
+        top_n_partitions: Optional[int] = None,
+        halo: Optional[bool] = None,
+        n_jobs: Optional[int] = None,
+    ):
+        """
+        Initialize partitioned hotspot detector
+
+        Args:
+            eps: DBSCAN neighbourhood radius in degrees (as CrimeHotspotDetector)
+            min_samples: Minimum incidents to form a core point
+            partition_by: Column to split on, e.g. 'district' or 'crime_type'
+            top_n_partitions: Only cluster the N largest partitions
+                (e.g. the top crime types); None clusters all of them
+            halo: Add an eps-wide halo and merge clusters across partition
+                borders; defaults to True for spatial partition columns
+            n_jobs: Worker processes (defaults to the CPU count; 1 runs inline)
+        """
+        self.eps = eps
+        self.min_samples = min_samples
+        self.partition_by = partition_by
+        self.top_n_partitions = top_n_partitions
+        self.halo = partition_by in SPATIAL_PARTITIONS if halo is None else halo
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+
+    def detect_hotspots(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Cluster every partition and merge clusters across partition borders
+
+        Args:
+            df: Incidents with latitude, longitude and the partition column
+
+        Returns:
+            Copy of the clustered incidents with 'cluster' (-1 for noise,
+            unique across partitions) and 'is_hotspot' columns
+        """
+        if self.partition_by not in df.columns:
+            raise ValueError(f"Partition column '{self.partition_by}' not found")
+
+        valid = df['latitude'].notna() & df['longitude'].notna() & df[self.partition_by].notna()
+        if self.top_n_partitions:
+            top = df.loc[valid, self.partition_by].value_counts().head(self.top_n_partitions)
+            valid &= df[self.partition_by].isin(top.index)
+
+        result = df[valid].copy()
+        coords = result[['latitude', 'longitude']].to_numpy(dtype=float)
+        codes, partitions = pd.factorize(result[self.partition_by])
+
+        members = [np.flatnonzero(codes == code) for code in range(len(partitions))]
+        halos = [
+            _halo_indices(coords, idx, self.eps) if self.halo else np.empty(0, dtype=int)
+            for idx in members
+        ]
+
+        logger.info(
+            f"Clustering {len(result)} incidents in {len(partitions)} "
+            f"'{self.partition_by}' partitions"
+        )
+        outputs = self._run_partitions(coords, members, halos)
+
+        # Give every partition-local cluster a globally unique id
+        labels = np.full(len(result), -1, dtype=int)
+        core = np.zeros(len(result), dtype=bool)
+        n_clusters = 0
+        for idx, (local_labels, local_core) in zip(members, outputs):
+            labels[idx] = np.where(local_labels >= 0, local_labels + n_clusters, -1)
+            core[idx] = local_core
+            n_clusters += int(local_labels.max()) + 1 if len(local_labels) else 0
+
+        if self.halo:
+            labels = self._merge_across_borders(coords, labels, core, members, halos, n_clusters)
+
+        # Compact to 0..K-1
+        clustered = labels >= 0
+        _, labels[clustered] = np.unique(labels[clustered], return_inverse=True)
+
+        result['cluster'] = labels
+        result['is_hotspot'] = clustered
+        logger.info(f"Found {int(labels.max()) + 1 if clustered.any() else 0} partitioned hotspots")
+        return result
+
+    def calculate_hotspot_density(self, hotspots_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate density metrics with the owning partition of each hotspot
+
+        Args:
+            hotspots_df: Output of detect_hotspots
+
+        Returns:
+            Density table (same columns as CrimeHotspotDetector) plus the
+            partition column; border-crossing clusters report the partition
+            holding most of their incidents
+        """
+        return summarize_clusters(hotspots_df, extra_columns={self.partition_by: 'mode'})
+
+    def _run_partitions(
+        self,
+        coords: np.ndarray,
+        members: List[np.ndarray],
+        halos: List[np.ndarray],
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Cluster each partition inline or in a process pool"""
+        tasks = [
+            (np.vstack([coords[idx], coords[halo]]), len(idx), self.eps, self.min_samples)
+            for idx, halo in zip(members, halos)
+        ]
+        if self.n_jobs == 1 or len(tasks) <= 1:
+            return [_cluster_partition(*task) for task in tasks]
+
+        with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(tasks))) as pool:
+            return list(pool.map(_cluster_partition, *zip(*tasks)))
+
+    def _merge_across_borders(
+        self,
+        coords: np.ndarray,
+        labels: np.ndarray,
+        core: np.ndarray,
+        members: List[np.ndarray],
+        halos: List[np.ndarray],
+        n_clusters: int,
+    ) -> np.ndarray:
+        """
+        Union clusters linked by core points on either side of a border
+
+        Core flags come from each point's own partition, where its
+        neighbourhood is complete. Border points left as noise by their own
+        partition are attached to a neighbouring partition's cluster.
+        """
+        labels = labels.copy()
+        edges: List[Tuple[int, int]] = []
+
+        for idx, halo in zip(members, halos):
+            core_idx = idx[core[idx]]
+            if len(core_idx) == 0 or len(halo) == 0:
+                continue
+
+            neighbours = cKDTree(coords[core_idx]).query_ball_point(coords[halo], r=self.eps)
+            for point, found in zip(halo, neighbours):
+                if not found:
+                    continue
+                found_labels = labels[core_idx[found]]
+                if core[point]:
+                    edges.extend((labels[point], other) for other in set(found_labels))
+                elif labels[point] == -1:
+                    labels[point] = found_labels[0]
+
+        if not edges or n_clusters == 0:
+            return labels
+
+        src, dst = np.array(edges).T
+        graph = coo_matrix((np.ones(len(src)), (src, dst)), shape=(n_clusters, n_clusters))
+        _, component = connected_components(graph, directed=False)
+        return np.where(labels >= 0, component[np.maximum(labels, 0)], -1)
+
+
+if __name__ == "__main__":
+    # Example usage
+    rng = np.random.default_rng(42)
+    n = 5000
+    sample_df = pd.DataFrame(
+        {
+            'latitude': 41.88 + rng.normal(0, 0.03, n),
+            'longitude': -87.63 + rng.normal(0, 0.03, n),
+            'crime_type': rng.choice(['THEFT', 'BATTERY', 'ASSAULT'], n),
+        }
+    )
+    sample_df['district'] = (sample_df['longitude'] > -87.63).astype(int) + 1
+
+    detector = PartitionedHotspotDetector(eps=0.005, min_samples=20, n_jobs=2)
+    hotspots_df = detector.detect_hotspots(sample_df)
+    print(detector.calculate_hotspot_density(hotspots_df).head())
@@ -0,0 +1,447 @@
+"""
+Crime-Map Prediction Store
+
+Precomputed expected-incident tensors for the crime-map grid, filled by a
+batch job (scripts/build_prediction_store.py) and sliced by the API, so a
+request costs one array reduction instead of running models per cell.
+
+A city's tensor holds expected incidents per (crime type, horizon day,
+cell) over the hierarchical cells of the crime-map grid. It is stored
+type-major so every (type, date range) slice is one contiguous block.
+Expected counts combine:
+- where: a per-type KDE surface of past incidents sampled at cell centres
+- how many: the per-type daily mean by weekday, optionally rescaled so the
+  daily city total follows a forecast (e.g. CrimeForecaster's yhat)
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import cached_property
+from typing import Dict, Optional, Sequence, Tuple
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from src.models.isochrones import RasterGrid
+from src.models.kde_hotspots import KDEHotspotEngine
+from src.utils.cells import (
+    cell_resolution,
+    cell_size_deg,
+    cell_to_latlng,
+    cell_to_parent,
+    cell_to_token,
+    latlng_to_cell,
+)
+from src.utils.geo import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+ALL_TYPES = "all"
+
+# Daily expected incidents at which a cell's intensity saturates at 1
+INCIDENTS_AT_FULL_INTENSITY = 10.0
+
+# Intensity thresholds for low / medium / high / critical (exclusive lower bounds)
+RISK_THRESHOLDS = np.array([0.3, 0.6, 0.8])
+RISK_LEVELS = np.array(["low", "medium", "high", "critical"])
+
+# Smoothed past incidents per cell at which confidence is ~63% of the way to its maximum
+CONFIDENCE_SUPPORT = 20.0
+MIN_CONFIDENCE = 0.5
+MAX_CONFIDENCE = 0.95
+
+# Cell resolution drawn at map zoom 0; each zoom level halves cells like it
+# halves tiles, which puts ~18 cells across a tile at every zoom
+RESOLUTION_AT_ZOOM_0 = 5
+
+
+def risk_levels(intensity: np.ndarray) -> np.ndarray:
+    """Risk level label of each 0-1 intensity"""
+    return RISK_LEVELS[np.searchsorted(RISK_THRESHOLDS, intensity, side="left")]
+
+
+def cell_side_km(resolution: int) -> float:
+    """North-south side of a cell in kilometres"""
+    return cell_size_deg(resolution) * np.pi * EARTH_RADIUS_KM / 180.0
+
+
+def resolution_for_zoom(zoom: float, finest: int) -> int:
+    """Cell resolution to draw at a map zoom, capped at the finest stored one"""
+    return int(np.clip(np.floor(zoom) + RESOLUTION_AT_ZOOM_0, 0, finest))
+
+
+def roll_up(
+    cells: np.ndarray, expected: np.ndarray, confidence: np.ndarray, resolution: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aggregate per-cell predictions to coarser parent cells
+
+    Args:
+        cells: Cell IDs, all at one resolution finer than or equal to ``resolution``
+        expected: Expected incidents per cell
+        confidence: Confidence per cell
+        resolution: Resolution to aggregate to
+
+    Returns:
+        Tuple of (parent cells, summed expected incidents, mean confidence)
+    """
+    parents, inverse = np.unique(cell_to_parent(cells, resolution), return_inverse=True)
+    children = np.bincount(inverse, minlength=len(parents))
+    return (
+        parents,
+        np.bincount(inverse, weights=expected, minlength=len(parents)),
+        np.bincount(inverse, weights=confidence, minlength=len(parents)) / children,
+    )
+
+
+@dataclass
+class PredictionTensor:
+    """Expected incidents for one city's grid over a forecast horizon"""
+
+    city: str
+    start_date: date  # Horizon day 0
+    resolution: int
+    cells: np.ndarray  # (n_cells,) cell IDs at ``resolution``
+    crime_types: Tuple[str, ...]
+    expected: np.ndarray  # (n_types, n_days, n_cells) float32 expected incidents
+    confidence: np.ndarray  # (n_types, n_cells) float32
+    model_version: str
+
+    @property
+    def n_days(self) -> int:
+        return self.expected.shape[1]
+
+    @cached_property
+    def cumulative(self) -> np.ndarray:
+        """
+        (n_types, n_days + 1, n_cells) running totals of expected incidents
+
+        Entry [t, d] sums horizon days before d, so any date range is one
+        subtraction of two rows. Accumulated in float64 so short windows
+        late in the horizon keep their precision.
+        """
+        cumulative = np.zeros(
+            (self.expected.shape[0], self.n_days + 1, self.expected.shape[2]), dtype=np.float64
+        )
+        np.cumsum(self.expected, axis=1, dtype=np.float64, out=cumulative[:, 1:])
+        return cumulative
+
+    @cached_property
+    def centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(lat, lon) of every cell centre"""
+        return cell_to_latlng(self.cells)
+
+    @cached_property
+    def tokens(self) -> np.ndarray:
+        """Cell token of every cell, as in the crime map's grid_id"""
+        return np.array([cell_to_token(cell) for cell in self.cells.tolist()])
+
+    @cached_property
+    def index(self) -> cKDTree:
+        """KD-tree over cell centres as (lon, lat), for viewport queries"""
+        lat, lon = self.centers
+        return cKDTree(np.column_stack([lon, lat]))
+
+    def cells_in(self, bbox: Sequence[float], margin: float = 0.0) -> np.ndarray:
+        """
+        Indices of the cells whose centre lies in a bbox
+
+        Args:
+            bbox: (west, south, east, north) in degrees
+            margin: Degrees to grow the bbox by on every side
+
+        Returns:
+            Sorted cell indices
+        """
+        west, south, east, north = bbox
+        if south > north:
+            raise ValueError(f"Invalid bbox {tuple(bbox)}: south > north")
+        if east < west:
+            # Crosses the antimeridian: query both sides
+            left = self.cells_in((west, south, 180.0, north), margin)
+            right = self.cells_in((-180.0, south, east, north), margin)
+            return np.union1d(left, right)
+        west, south, east, north = west - margin, south - margin, east + margin, north + margin
+        center = [(west + east) / 2.0, (south + north) / 2.0]
+        half = max(east - west, north - south) / 2.0
+        candidates = np.asarray(self.index.query_ball_point(center, half, p=np.inf), dtype=int)
+        lat, lon = self.centers
+        inside = (
+            (lon[candidates] >= west)
+            & (lon[candidates] <= east)
+            & (lat[candidates] >= south)
+            & (lat[candidates] <= north)
+        )
+        return np.sort(candidates[inside])
+
+    @property
+    def end_date(self) -> date:
+        """Last day covered by the horizon"""
+        return self.start_date + timedelta(days=self.n_days - 1)
+
+    def window(
+        self, crime_type: str, start: date, days: int, cells: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Expected incidents over ``days`` days from ``start`` (see between())"""
+        return self.between(crime_type, start, start + timedelta(days=days - 1), cells)
+
+    def between(
+        self, crime_type: str, start: date, end: date, cells: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expected incidents from ``start`` to ``end`` inclusive
+
+        Args:
+            crime_type: One of crime_types
+            start: First day of the window
+            end: Last day of the window
+            cells: Indices of the cells to return (default: all)
+
+        Returns:
+            Tuple of (expected incidents per cell, confidence per cell)
+
+        Raises:
+            KeyError: Unknown crime type
+            ValueError: Window empty or outside the horizon
+        """
+        if crime_type not in self.crime_types:
+            raise KeyError(crime_type)
+        first = (start - self.start_date).days
+        stop = (end - self.start_date).days + 1
+        if stop <= first:
+            raise ValueError(f"Window ends ({end}) before it starts ({start})")
+        if first < 0 or stop > self.n_days:
+            raise ValueError(
+                f"No predictions for {start} to {end}; horizon is "
+                f"{self.start_date} to {self.end_date}"
+            )
+        t = self.crime_types.index(crime_type)
+        cumulative = self.cumulative[t]
+        if cells is None:
+            return cumulative[stop] - cumulative[first], self.confidence[t]
+        return cumulative[stop, cells] - cumulative[first, cells], self.confidence[t, cells]
+
+    def save(self, path: str):
+        """Write the tensor as an .npz archive (written aside, then moved into place)"""
+        meta = {
+            "city": self.city,
+            "start_date": self.start_date.isoformat(),
+            "resolution": self.resolution,
+            "crime_types": list(self.crime_types),
+            "model_version": self.model_version,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            meta=np.array(json.dumps(meta)),
+            cells=self.cells,
+            expected=self.expected,
+            confidence=self.confidence,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PredictionTensor":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(
+                city=meta["city"],
+                start_date=date.fromisoformat(meta["start_date"]),
+                resolution=meta["resolution"],
+                cells=data["cells"],
+                crime_types=tuple(meta["crime_types"]),
+                expected=data["expected"],
+                confidence=data["confidence"],
+                model_version=meta["model_version"],
+            )
+
+
+class PredictionStore:
+    """City -> PredictionTensor, persisted as {directory}/{city}.npz"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._tensors: Dict[str, PredictionTensor] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._revisions: Dict[str, int] = {}
+
+    def _path(self, city: str) -> str:
+        return os.path.join(self.directory, f"{city}.npz")
+
+    def put(self, tensor: PredictionTensor):
+        """Publish a tensor (and persist it when the store has a directory)"""
+        if self.directory:
+            path = self._path(tensor.city)
+            tensor.save(path)
+            self._mtimes[tensor.city] = os.stat(path).st_mtime
+        self._publish(tensor.city, tensor)
+
+    def _publish(self, city: str, tensor: PredictionTensor):
+        # Running totals are built before the tensor serves its first request
+        tensor.cumulative
+        self._tensors[city] = tensor
+        self._revisions[city] = self._revisions.get(city, 0) + 1
+
+    def version(self, city: str) -> str:
+        """
+        Identity of a city's current tensor, for cache keys
+
+        The file's mtime when the store is on disk (so it survives restarts),
+        else a count of the tensors published in this process.
+        """
+        if city in self._mtimes:
+            return f"m{int(self._mtimes[city] * 1e6):x}"
+        return f"r{self._revisions.get(city, 0)}"
+
+    def get(self, city: str) -> Optional[PredictionTensor]:
+        """
+        Tensor for a city, reloaded when the batch job has replaced its file
+
+        Returns:
+            The tensor, or None when the city has no predictions
+        """
+        if self.directory:
+            path = self._path(city)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                return self._tensors.get(city)
+            if self._mtimes.get(city) != mtime:
+                self._publish(city, PredictionTensor.load(path))
+                self._mtimes[city] = mtime
+                logger.info(f"Loaded predictions for {city} from {path}")
+        return self._tensors.get(city)
+
+
+def city_grid(center: Tuple[float, float], resolution: int, half_cells: int) -> RasterGrid:
+    """
+    Crime-map grid around a city centre
+
+    2 * half_cells rows and columns of cells at ``resolution`` around the
+    cell containing ``center``, so raster rows/columns align with cells.
+    """
+    lat, lon = cell_to_latlng(latlng_to_cell(center[0], center[1], resolution))
+    return RasterGrid.centered(float(lat), float(lon), cell_size_deg(resolution), half_cells)
+
+
+def grid_cells(center: Tuple[float, float], resolution: int, half_cells: int) -> np.ndarray:
+    """Cells of city_grid() in row-major order from the south-west corner"""
+    grid = city_grid(center, resolution, half_cells)
+    return latlng_to_cell(*grid.centers(), resolution).ravel()
+
+
+def build_prediction_tensor(
+    incidents: pd.DataFrame,
+    city: str,
+    cells: np.ndarray,
+    start_date: date,
+    horizon_days: int = 30,
+    crime_types: Optional[Sequence[str]] = None,
+    daily_totals: Optional[Sequence[float]] = None,
+    bandwidth_m: float = 1000.0,
+    model_version: str = "kde-weekday-v1",
+) -> PredictionTensor:
+    """
+    Expected incidents per cell, day and crime type from incident history
+
+    Args:
+        incidents: Past incidents with latitude, longitude, incident_date and
+            (for per-type slices) crime_type
+        city: City key of the tensor
+        cells: Grid cells (all at one resolution), e.g. from grid_cells()
+        start_date: First forecast day
+        horizon_days: Days to forecast
+        crime_types: Types to slice by, besides "all" (default: every type
+            in the data)
+        daily_totals: Optional forecast of city-wide incidents per horizon
+            day; rescales every type's daily expectation to match it
+        bandwidth_m: KDE bandwidth for the spatial distribution
+        model_version: Recorded with the tensor
+
+    Returns:
+        PredictionTensor over ``cells``
+    """
+    cells = np.asarray(cells, dtype=np.int64)
+    resolutions = np.unique(cell_resolution(cells))
+    if len(resolutions) != 1:
+        raise ValueError("Grid cells must all have the same resolution")
+    resolution = int(resolutions[0])
+    cell_lat, cell_lon = cell_to_latlng(cells)
+    df = incidents.dropna(subset=["latitude", "longitude", "incident_date"])
+    dates = pd.to_datetime(df["incident_date"]).dt.normalize()
+    if dates.empty:
+        raise ValueError("No dated incidents to build predictions from")
+    history = pd.date_range(dates.min(), dates.max(), freq="D")
+    # Days without incidents count as zero in the weekday means
+    weekday_days = np.maximum(np.bincount(history.weekday, minlength=7), 1)
+
+    if crime_types is None:
+        crime_types = sorted(df["crime_type"].dropna().unique()) if "crime_type" in df else []
+    types = (ALL_TYPES,) + tuple(t for t in crime_types if t != ALL_TYPES)
+
+    horizon = pd.date_range(pd.Timestamp(start_date), periods=horizon_days, freq="D")
+    half = cell_size_deg(resolution) / 2.0
+    bounds = (
+        cell_lat.min() - half,
+        cell_lon.min() - half,
+        cell_lat.max() + half,
+        cell_lon.max() + half,
+    )
+    engine = KDEHotspotEngine(bandwidth_m=bandwidth_m, cell_size_m=max(bandwidth_m / 4.0, 50.0))
+
+    expected = np.zeros((len(types), horizon_days, len(cells)), dtype=np.float32)
+    confidence = np.zeros((len(types), len(cells)), dtype=np.float32)
+    for t, crime_type in enumerate(types):
+        mask = (
+            np.ones(len(df), dtype=bool)
+            if crime_type == ALL_TYPES
+            else (df["crime_type"] == crime_type).to_numpy()
+        )
+        if not mask.any():
+            confidence[t] = MIN_CONFIDENCE
+            continue
+        subset = df[mask]
+        surface = engine.fit(subset, weights=np.ones(len(subset)), bounds=bounds)
+        density = surface.sample(cell_lat, cell_lon)
+        total = density.sum()
+        share = density / total if total > 0 else np.full(len(cells), 1.0 / len(cells))
+
+        per_weekday = np.bincount(dates[mask].dt.weekday, minlength=7) / weekday_days
+        daily = per_weekday[horizon.weekday]
+        expected[t] = daily[:, None] * share[None, :]
+
+        # Confidence grows with the smoothed number of past incidents per cell
+        support = share * mask.sum() * min(1.0, 365.0 / len(history))
+        confidence[t] = MIN_CONFIDENCE + (MAX_CONFIDENCE - MIN_CONFIDENCE) * (
+            1.0 - np.exp(-support / CONFIDENCE_SUPPORT)
+        )
+
+    if daily_totals is not None:
+        daily_totals = np.asarray(daily_totals, dtype=float)[:horizon_days]
+        if len(daily_totals) != horizon_days:
+            raise ValueError(f"daily_totals covers {len(daily_totals)} of {horizon_days} days")
+        baseline = expected[0].sum(axis=1)
+        scale = np.where(
+            baseline > 0, np.maximum(daily_totals, 0.0) / np.maximum(baseline, 1e-12), 1.0
+        )
+        expected *= scale[None, :, None].astype(np.float32)
+
+    logger.info(
+        f"Prediction tensor for {city}: {len(cells)} cells x {horizon_days} days x "
+        f"{len(types)} crime types from {len(df)} incidents"
+    )
+    return PredictionTensor(
+        city=city,
+        start_date=start_date,
+        resolution=resolution,
+        cells=cells,
+        crime_types=types,
+        expected=expected,
+        confidence=confidence,
+        model_version=model_version,
+    )
@@ -0,0 +1,244 @@
+"""
+Prize-Collecting Patrol Routing
+
+When officers cannot reach every hotspot within the route limits, the plan
+should cover the most important ones rather than drop hotspots
+arbitrarily. This solver treats ``Hotspot.priority`` as a prize and
+maximizes the total prize collected under the distance and shift budgets
+(a team orienteering problem):
+
+1. Greedy insertion: repeatedly insert the hotspot with the best
+   priority / detour ratio at its cheapest feasible position, both into
+   the savings plan and into empty routes (the better start is kept).
+2. Local search (2-opt, Or-opt, relocate, exchange, 2-opt*) shortens the
+   routes, which frees budget for another insertion round.
+3. Drop/add moves swap a routed hotspot for a nearby unrouted one with a
+   higher priority whenever the route stays within its limits.
+
+Steps 2-3 repeat until nothing improves or the time budget runs out.
+Insertion costs are only recomputed for the route that changed, so a
+district-sized instance is planned in tens of milliseconds.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import logging
+import time
+
+import numpy as np
+
+from src.models.vrp_solver import LocalSearch, PlannedRoute, SavingsRouteSolver, _run_start
+
+logger = logging.getLogger(__name__)
+
+# Detour (km) added to every insertion cost so co-located hotspots still rank by priority
+DETOUR_EPS = 1e-3
+
+
+class PrizeCollectingSolver(SavingsRouteSolver):
+    """Route planner that maximizes covered priority within the route limits"""
+
+    def solve(
+        self,
+        hotspots: Sequence,
+        num_officers: int,
+        depot_lat: float,
+        depot_lon: float,
+        time_limit_ms: Optional[float] = None,
+    ) -> List[PlannedRoute]:
+        """
+        Plan routes collecting the most hotspot priority
+
+        Args:
+            hotspots: Hotspot objects (center_lat/center_lon/priority)
+            num_officers: Maximum number of routes
+            depot_lat: Depot latitude
+            depot_lon: Depot longitude
+            time_limit_ms: Wall-clock budget; the best plan so far is returned
+
+        Returns:
+            List of non-empty routes. Hotspots left out are in
+            ``unassigned_``; the collected priority is ``collected_priority_``.
+        """
+        start = time.perf_counter()
+        deadline = None if time_limit_ms is None else start + time_limit_ms / 1000.0
+        self.unassigned_ = list(hotspots)
+        self.collected_priority_ = 0.0
+        if not hotspots or num_officers < 1:
+            return []
+
+        matrix, durations = self.distance_cache.get_matrices(hotspots, depot_lat, depot_lon)
+        prizes = np.array([0.0] + [float(getattr(h, 'priority', 1.0)) for h in hotspots])
+
+        limit, hours = self.limits(durations is not None)
+        budget = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+        _, _, seeded, _ = _run_start(
+            matrix, durations, self.settings(), num_officers, prizes[1:].tolist(), 0, budget
+        )
+        best, rounds = None, 0
+        # Two starts: the savings plan and ratio-greedy insertion into empty routes
+        for routes in (seeded, []):
+            routes = [list(route) for route in routes]
+            routes += [[] for _ in range(num_officers - len(routes))]
+            search = LocalSearch(
+                matrix, routes, limit, self.n_neighbors, durations=durations, time_limit=hours
+            )
+            rounds += self._improve(search, prizes, deadline)
+            if best is None or _collected(search, prizes) > _collected(best, prizes) + 1e-9:
+                best = search
+        search = best
+
+        routed = [node for route in search.routes for node in route]
+        unrouted = sorted(set(range(1, len(prizes))) - set(routed))
+        self.unassigned_ = [hotspots[node - 1] for node in unrouted]
+        self.collected_priority_ = float(prizes[routed].sum())
+        planned = self._to_routes(hotspots, matrix, search.routes, durations)
+        logger.info(
+            f"Collected priority {self.collected_priority_:.1f} of {prizes.sum():.1f} "
+            f"({len(routed)}/{len(hotspots)} hotspots, {search.total_length():.1f} km) "
+            f"in {rounds} rounds, {time.perf_counter() - start:.3f}s"
+        )
+        return planned
+
+    def _improve(self, search: LocalSearch, prizes: np.ndarray, deadline: Optional[float]) -> int:
+        """
+        Alternate insertion, local search and drop/add moves until nothing changes
+
+        Returns:
+            Number of rounds run
+        """
+        rounds = 0
+        self._fill(search, prizes, deadline)
+        while deadline is None or time.perf_counter() < deadline:
+            rounds += 1
+            search.run(deadline)
+            swapped = self._swap(search, prizes, deadline)
+            added = self._fill(search, prizes, deadline)
+            if not swapped and not added:
+                break
+        return rounds
+
+    def _fill(self, search: LocalSearch, prizes: np.ndarray, deadline: Optional[float]) -> int:
+        """
+        Greedy insertion by priority / detour ratio
+
+        Returns:
+            Number of hotspots inserted
+        """
+        nodes = np.array([node for node in range(1, len(prizes)) if search.route_of[node] < 0])
+        if len(nodes) == 0:
+            return 0
+        costs = np.empty((len(search.routes), len(nodes)))
+        positions = np.empty((len(search.routes), len(nodes)), dtype=int)
+        for idx in range(len(search.routes)):
+            costs[idx], positions[idx] = _insertion_costs(search, idx, nodes)
+
+        inserted = 0
+        while deadline is None or time.perf_counter() < deadline:
+            route_choice = costs.argmin(axis=0)
+            best = costs[route_choice, np.arange(len(nodes))]
+            feasible = np.isfinite(best)
+            if not feasible.any():
+                break
+            ratio = np.where(
+                feasible, prizes[nodes] / (np.maximum(best, 0.0) + DETOUR_EPS), -np.inf
+            )
+            j = int(np.argmax(ratio))
+            idx = int(route_choice[j])
+            search.insert_at(int(nodes[j]), idx, int(positions[idx, j]))
+            inserted += 1
+
+            costs[:, j] = np.inf
+            costs[idx], positions[idx] = _insertion_costs(search, idx, nodes)
+            costs[idx, _routed_mask(search, nodes)] = np.inf
+        return inserted
+
+    def _swap(self, search: LocalSearch, prizes: np.ndarray, deadline: Optional[float]) -> int:
+        """
+        Drop/add moves: replace a routed hotspot with a nearby unrouted one
+        of higher priority when the route stays within its limits
+
+        Returns:
+            Number of swaps applied
+        """
+        unrouted = [node for node in range(1, len(prizes)) if search.route_of[node] < 0]
+        unrouted.sort(key=lambda node: prizes[node], reverse=True)
+        swaps = 0
+        for node in unrouted:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            victims = [
+                other
+                for other in search.neighbors[node]
+                if search.route_of[other] >= 0 and prizes[other] < prizes[node]
+            ]
+            for victim in sorted(victims, key=lambda other: prizes[other]):
+                idx = search.route_of[victim]
+                pos = _swap_position(search, idx, victim, node)
+                if pos is None:
+                    continue
+                search.remove(victim)
+                search.insert_at(node, idx, pos)
+                swaps += 1
+                break
+        return swaps
+
+
+def _collected(search: LocalSearch, prizes: np.ndarray) -> float:
+    """Total priority of the routed hotspots"""
+    return float(sum(prizes[route].sum() for route in search.routes if route))
+
+
+def _routed_mask(search: LocalSearch, nodes: np.ndarray) -> np.ndarray:
+    """Mask of nodes that are already in a route"""
+    route_of = np.asarray(search.route_of)
+    return route_of[nodes] >= 0
+
+
+def _insertion_costs(
+    search: LocalSearch, idx: int, nodes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cheapest feasible insertion of every node into one route
+
+    Returns:
+        Tuple of (added km per node, inf if it does not fit; position per node)
+    """
+    seq = np.asarray([0] + search.routes[idx] + [0])
+    before, after = seq[:-1], seq[1:]
+    matrix = search.matrix
+    cost = (
+        matrix[np.ix_(before, nodes)]
+        + matrix[np.ix_(nodes, after)].T
+        - np.asarray(matrix[before, after], dtype=float)[:, None]
+    )
+    feasible = search.lengths[idx] + cost <= search.limit
+    if search.durations is not None:
+        durations = search.durations
+        extra = (
+            durations[np.ix_(before, nodes)]
+            + durations[np.ix_(nodes, after)].T
+            - np.asarray(durations[before, after], dtype=float)[:, None]
+        )
+        feasible &= search.times[idx] + extra <= search.time_limit
+    cost = np.where(feasible, cost, np.inf)
+    pos = cost.argmin(axis=0)
+    return cost[pos, np.arange(len(nodes))], pos
+
+
+def _swap_position(search: LocalSearch, idx: int, victim: int, node: int) -> Optional[int]:
+    """Best position for node in route idx once victim is taken out, if it fits"""
+    route = [other for other in search.routes[idx] if other != victim]
+    seq = np.asarray([0] + route + [0])
+    before, after = seq[:-1], seq[1:]
+    matrix = search.matrix
+    base = float(matrix[before, after].sum(dtype=float))
+    cost = matrix[before, node] + matrix[node, after] - matrix[before, after]
+    feasible = base + cost <= search.limit
+    if search.durations is not None:
+        durations = search.durations
+        base_time = float(durations[before, after].sum(dtype=float))
+        extra = durations[before, node] + durations[node, after] - durations[before, after]
+        feasible &= base_time + extra <= search.time_limit
+    if not feasible.any():
+        return None
+    return int(np.argmin(np.where(feasible, cost, np.inf)))
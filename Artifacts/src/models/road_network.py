@@ -0,0 +1,685 @@
+"""
+Local Road-Network Travel-Time Engine
+
+Loads the drivable street graph from a local OpenStreetMap XML extract
+(.osm, .osm.gz or .osm.bz2) and answers many-to-many distance and travel-
+time queries without an external routing service.
+
+Queries use a contraction hierarchy (CH): nodes are contracted in order of
+importance, adding shortcut edges that preserve shortest paths. A query
+then only searches "upward" from every source and target and joins the
+two search spaces, which are a few hundred nodes each even on a city
+graph. Hierarchies are built once per metric and cached on disk next to
+the extract, and snapped many-to-many tables are cached in memory.
+
+PBF extracts need converting first (``osmium cat city.osm.pbf -o city.osm``).
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import bz2
+import gzip
+import heapq
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+from scipy.spatial import cKDTree
+
+from src.models.distance_matrix import DistanceMatrixCache
+from src.utils.geo import haversine_km, to_local_km
+
+logger = logging.getLogger(__name__)
+
+# Default free-flow speeds by OSM highway class, used when maxspeed is missing
+DEFAULT_SPEEDS_KMH = {
+    'motorway': 90.0,
+    'trunk': 70.0,
+    'primary': 50.0,
+    'secondary': 45.0,
+    'tertiary': 40.0,
+    'unclassified': 30.0,
+    'residential': 30.0,
+    'living_street': 10.0,
+    'service': 20.0,
+}
+for _road in ('motorway', 'trunk', 'primary', 'secondary', 'tertiary'):
+    DEFAULT_SPEEDS_KMH[f'{_road}_link'] = DEFAULT_SPEEDS_KMH[_road] * 0.7
+
+# Speed for the leg between a hotspot and its snapped street node
+ACCESS_SPEED_KMH = 15.0
+
+# Witness searches stop after settling this many nodes (more shortcuts, faster build)
+WITNESS_SETTLE_LIMIT = 60
+
+# Sources/targets per upward-search batch (bounds the dense scipy output)
+QUERY_CHUNK = 64
+
+# Downward edges per node checked when stalling a search
+STALL_EDGES = 4
+
+# Relative margin before a node counts as stalled (guards against rounding ties)
+STALL_TOLERANCE = 1e-12
+
+# Weights must be positive: scipy's sparse graphs treat explicit zeros as no edge
+MIN_WEIGHT = 1e-9
+
+
+@dataclass
+class RoadGraph:
+    """Directed drivable street graph"""
+
+    lat: np.ndarray
+    lon: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    length_km: np.ndarray
+    time_h: np.ndarray
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.lat)
+
+
+def _parse_speed(value: Optional[str]) -> Optional[float]:
+    """maxspeed tag in km/h ("50", "30 mph"); None if unparseable"""
+    if not value:
+        return None
+    parts = value.split()
+    try:
+        speed = float(parts[0])
+    except ValueError:
+        return None
+    if len(parts) > 1 and parts[1].lower() == 'mph':
+        speed *= 1.609344
+    return speed if speed > 0 else None
+
+
+def _open_extract(path: str):
+    if path.endswith('.pbf'):
+        raise ValueError(
+            "PBF extracts are not supported; convert first with "
+            "`osmium cat extract.osm.pbf -o extract.osm`"
+        )
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def load_osm_graph(path: str) -> RoadGraph:
+    """
+    Parse drivable ways from an OSM XML extract
+
+    Args:
+        path: Path to a .osm, .osm.gz or .osm.bz2 file
+
+    Returns:
+        RoadGraph with one directed edge per way segment and direction
+    """
+    coords: Dict[int, Tuple[float, float]] = {}
+    segments: List[Tuple[int, int, float, int]] = []  # (from, to, speed, direction)
+
+    with _open_extract(path) as handle:
+        refs: List[int] = []
+        tags: Dict[str, str] = {}
+        for _, elem in ET.iterparse(handle, events=('end',)):
+            if elem.tag == 'node':
+                coords[int(elem.get('id'))] = (float(elem.get('lat')), float(elem.get('lon')))
+                # A node's own tags (traffic signals, ...) must not reach the next way
+                refs, tags = [], {}
+                elem.clear()
+            elif elem.tag == 'nd':
+                refs.append(int(elem.get('ref')))
+            elif elem.tag == 'tag':
+                tags[elem.get('k')] = elem.get('v')
+            elif elem.tag == 'way':
+                highway = tags.get('highway')
+                if highway in DEFAULT_SPEEDS_KMH and len(refs) > 1:
+                    speed = _parse_speed(tags.get('maxspeed')) or DEFAULT_SPEEDS_KMH[highway]
+                    oneway = tags.get('oneway', '')
+                    if oneway in ('yes', 'true', '1'):
+                        direction = 1
+                    elif oneway == '-1':
+                        direction = -1
+                    elif highway == 'motorway' or tags.get('junction') == 'roundabout':
+                        direction = 1
+                    else:
+                        direction = 0
+                    for a, b in zip(refs[:-1], refs[1:]):
+                        segments.append((a, b, speed, direction))
+                refs, tags = [], {}
+                elem.clear()
+            elif elem.tag == 'relation':
+                refs, tags = [], {}
+                elem.clear()
+
+    segments = [s for s in segments if s[0] in coords and s[1] in coords]
+    osm_ids = sorted({node for s in segments for node in s[:2]})
+    index = {osm_id: i for i, osm_id in enumerate(osm_ids)}
+    lat = np.array([coords[i][0] for i in osm_ids])
+    lon = np.array([coords[i][1] for i in osm_ids])
+
+    a = np.array([index[s[0]] for s in segments], dtype=np.int64)
+    b = np.array([index[s[1]] for s in segments], dtype=np.int64)
+    speed = np.array([s[2] for s in segments])
+    direction = np.array([s[3] for s in segments])
+    length = haversine_km(lat[a], lon[a], lat[b], lon[b])
+
+    forward = direction >= 0
+    backward = direction <= 0
+    src = np.concatenate([a[forward], b[backward]])
+    dst = np.concatenate([b[forward], a[backward]])
+    length_km = np.concatenate([length[forward], length[backward]])
+    time_h = length_km / np.concatenate([speed[forward], speed[backward]])
+    logger.info(f"Loaded {len(lat)} street nodes and {len(src)} directed edges from {path}")
+    return RoadGraph(lat, lon, src, dst, length_km, time_h)
+
+
+def _cheapest_per_row(graph: csr_matrix, k: int) -> csr_matrix:
+    """Keep the k lowest-weight entries of every row"""
+    coo = graph.tocoo()
+    order = np.lexsort((coo.data, coo.row))
+    row, col, data = coo.row[order], coo.col[order], coo.data[order]
+    position = np.arange(len(row)) - np.searchsorted(row, row)
+    keep = position < k
+    return csr_matrix((data[keep], (row[keep], col[keep])), shape=graph.shape)
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy over one edge weight, answering many-to-many queries"""
+
+    def __init__(self, n_nodes: int, up_forward: csr_matrix, up_backward: csr_matrix):
+        """
+        Initialize from prebuilt upward graphs (use ``build`` to construct)
+
+        Args:
+            n_nodes: Number of graph nodes
+            up_forward: Edges u -> v with rank[v] > rank[u] (original direction)
+            up_backward: Reversed edges v -> u with rank[u] > rank[v]
+        """
+        self.n_nodes = n_nodes
+        self.up_forward = up_forward
+        self.up_backward = up_backward
+        # Downward edges used to stall searches: each node's few cheapest
+        # (stalling fewer nodes only costs query time, never correctness)
+        self._stall_forward = _cheapest_per_row(up_backward, STALL_EDGES)
+        self._stall_backward = _cheapest_per_row(up_forward, STALL_EDGES)
+
+    @classmethod
+    def build(
+        cls, n_nodes: int, src: np.ndarray, dst: np.ndarray, weight: np.ndarray
+    ) -> 'ContractionHierarchy':
+        """
+        Contract every node, cheapest (fewest added shortcuts) first
+
+        Args:
+            n_nodes: Number of graph nodes
+            src, dst: Directed edge endpoints
+            weight: Edge weights (length or travel time)
+
+        Returns:
+            ContractionHierarchy
+        """
+        start = time.perf_counter()
+        # Adjacency of the remaining (uncontracted) graph; contracted nodes are
+        # unlinked from their neighbours so searches never see them
+        out: List[Dict[int, float]] = [{} for _ in range(n_nodes)]
+        inn: List[Dict[int, float]] = [{} for _ in range(n_nodes)]
+        for u, v, w in zip(src.tolist(), dst.tolist(), weight.tolist()):
+            w = max(w, MIN_WEIGHT)
+            if u != v and w < out[u].get(v, np.inf):
+                out[u][v] = w
+                inn[v][u] = w
+
+        def witness_distances(
+            source: int, skip: int, targets: Dict[int, float], limit: float
+        ) -> Dict[int, float]:
+            """Bounded Dijkstra from source that avoids the node being contracted"""
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            remaining = len(targets)
+            while heap and settled < WITNESS_SETTLE_LIMIT:
+                d, node = heapq.heappop(heap)
+                if d > limit:
+                    break
+                if d > dist[node]:
+                    continue
+                if node in targets:
+                    remaining -= 1
+                    if not remaining:
+                        break
+                settled += 1
+                for nxt, w in out[node].items():
+                    nd = d + w
+                    if nd < dist.get(nxt, np.inf) and nxt != skip:
+                        dist[nxt] = nd
+                        heapq.heappush(heap, (nd, nxt))
+            return dist
+
+        def shortcuts(node: int) -> List[Tuple[int, int, float]]:
+            """Edges needed to keep shortest paths through node once it is removed"""
+            outs = out[node]
+            if not outs:
+                return []
+            added = []
+            for u, w_in in inn[node].items():
+                targets = {x: w_out for x, w_out in outs.items() if x != u}
+                if not targets:
+                    continue
+                dist = witness_distances(u, node, targets, w_in + max(targets.values()))
+                added.extend(
+                    (u, x, w_in + w_out)
+                    for x, w_out in targets.items()
+                    if dist.get(x, np.inf) > w_in + w_out
+                )
+            return added
+
+        def priority(node: int, added: List) -> int:
+            # Edge difference, plus terms that spread contraction evenly over the graph
+            edge_difference = len(added) - len(out[node]) - len(inn[node])
+            return 2 * edge_difference + deleted[node] + depth[node]
+
+        depth = [0] * n_nodes
+        deleted = [0] * n_nodes
+        heap = [(priority(node, shortcuts(node)), node) for node in range(n_nodes)]
+        heapq.heapify(heap)
+        contracted = bytearray(n_nodes)
+        # Upward edges (from, to, weight) of the forward and the reversed graph
+        upward: Tuple[List, List] = ([], [])
+        while heap:
+            _, node = heapq.heappop(heap)
+            if contracted[node]:
+                continue
+            # Lazy update: re-evaluate and requeue if no longer the cheapest
+            added = shortcuts(node)
+            current = priority(node, added)
+            if heap and current > heap[0][0]:
+                heapq.heappush(heap, (current, node))
+                continue
+
+            contracted[node] = 1
+            for x, w in out[node].items():
+                upward[0].append((node, x, w))
+                del inn[x][node]
+            for u, w in inn[node].items():
+                # Reverse graph: walking u -> node backwards climbs from node to u
+                upward[1].append((node, u, w))
+                del out[u][node]
+            for neighbor in set(out[node]) | set(inn[node]):
+                depth[neighbor] = max(depth[neighbor], depth[node] + 1)
+                deleted[neighbor] += 1
+            out[node], inn[node] = {}, {}
+            for u, x, w in added:
+                if w < out[u].get(x, np.inf):
+                    out[u][x] = w
+                    inn[x][u] = w
+
+        graphs = []
+        for edges in upward:
+            tails, heads, weights = zip(*edges) if edges else ((), (), ())
+            graphs.append(csr_matrix((weights, (tails, heads)), shape=(n_nodes, n_nodes)))
+        logger.info(
+            f"Contracted {n_nodes} nodes in {time.perf_counter() - start:.1f}s "
+            f"({sum(map(len, upward)) - len(src)} shortcuts)"
+        )
+        return cls(n_nodes, *graphs)
+
+    def many_to_many(self, sources: Sequence[int], targets: Sequence[int]) -> np.ndarray:
+        """
+        Shortest-path weights from every source to every target
+
+        Args:
+            sources: Source node indices
+            targets: Target node indices
+
+        Returns:
+            (len(sources), len(targets)) array (inf where unreachable)
+        """
+        unique_sources, source_pos = np.unique(
+            np.asarray(sources, dtype=np.int64), return_inverse=True
+        )
+        unique_targets, target_pos = np.unique(
+            np.asarray(targets, dtype=np.int64), return_inverse=True
+        )
+        f_rows, f_nodes, f_dist = self._search_space(
+            self.up_forward, self._stall_forward, unique_sources
+        )
+        b_rows, b_nodes, b_dist = self._search_space(
+            self.up_backward, self._stall_backward, unique_targets
+        )
+
+        # Join the two search spaces at every node both of them reached
+        result = np.full((len(unique_sources), len(unique_targets)), np.inf)
+        meet = np.intersect1d(f_nodes, b_nodes)
+        bounds = zip(
+            np.searchsorted(f_nodes, meet).tolist(),
+            np.searchsorted(f_nodes, meet, side='right').tolist(),
+            np.searchsorted(b_nodes, meet).tolist(),
+            np.searchsorted(b_nodes, meet, side='right').tolist(),
+        )
+        for f_lo, f_hi, b_lo, b_hi in bounds:
+            rows, cols = f_rows[f_lo:f_hi], b_rows[b_lo:b_hi]
+            if 4 * len(rows) * len(cols) >= result.size:
+                # Nodes near the top are in most search spaces: update the
+                # whole matrix in place rather than gather/scatter a block
+                f = np.full(result.shape[0], np.inf)
+                b = np.full(result.shape[1], np.inf)
+                f[rows], b[cols] = f_dist[f_lo:f_hi], b_dist[b_lo:b_hi]
+                np.minimum(result, np.add.outer(f, b), out=result)
+            else:
+                block = np.ix_(rows, cols)
+                result[block] = np.minimum(
+                    result[block], f_dist[f_lo:f_hi, None] + b_dist[None, b_lo:b_hi]
+                )
+        return result[np.ix_(source_pos, target_pos)]
+
+    @staticmethod
+    def _search_space(
+        up: csr_matrix, down: csr_matrix, starts: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Upward Dijkstra from every start, with stall-on-demand applied afterwards
+
+        A node is stalled when a higher neighbour reaches it more cheaply
+        through a downward edge; its upward distance is then not a shortest
+        distance, so it can never be the meeting node of a shortest path.
+
+        Returns:
+            (start index, node, distance) entries sorted by node
+        """
+        # Restrict both graphs to the nodes any start can reach upwards, so
+        # the per-start searches only touch (and return) that small subgraph
+        reach = np.flatnonzero(np.isfinite(dijkstra(up, indices=starts, min_only=True)))
+        up, down = up[reach][:, reach], down[reach][:, reach]
+        starts = np.searchsorted(reach, starts)
+
+        rows, nodes, dists = [], [], []
+        degree = np.diff(down.indptr)
+        for offset in range(0, len(starts), QUERY_CHUNK):
+            dist = np.atleast_2d(
+                dijkstra(up, directed=True, indices=starts[offset : offset + QUERY_CHUNK])
+            )
+            r, v = np.nonzero(np.isfinite(dist))
+            d = dist[r, v]
+
+            # Check every reached node's downward edges against its distance
+            counts = degree[v]
+            entry = np.repeat(np.arange(len(v)), counts)
+            edge = np.arange(len(entry)) - np.repeat(np.cumsum(counts) - counts, counts)
+            edge += down.indptr[v][entry]
+            via = dist[r[entry], down.indices[edge]] + down.data[edge]
+            stalled = np.zeros(len(v), dtype=bool)
+            stalled[entry[via < d[entry] * (1.0 - STALL_TOLERANCE)]] = True
+
+            keep = ~stalled
+            rows.append(r[keep] + offset)
+            nodes.append(reach[v[keep]])
+            dists.append(d[keep])
+        rows, nodes, dists = (np.concatenate(x) for x in (rows, nodes, dists))
+        order = np.argsort(nodes, kind='stable')
+        return rows[order], nodes[order], dists[order]
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            n_nodes=self.n_nodes,
+            **{
+                f'{name}_{part}': getattr(getattr(self, name), part)
+                for name in ('up_forward', 'up_backward')
+                for part in ('data', 'indices', 'indptr')
+            },
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'ContractionHierarchy':
+        with np.load(path) as data:
+            n = int(data['n_nodes'])
+            graphs = [
+                csr_matrix(
+                    (data[f'{name}_data'], data[f'{name}_indices'], data[f'{name}_indptr']),
+                    shape=(n, n),
+                )
+                for name in ('up_forward', 'up_backward')
+            ]
+        return cls(n, *graphs)
+
+
+class RoadNetwork:
+    """Street graph with cached contraction hierarchies for distance and travel time"""
+
+    def __init__(self, graph: RoadGraph, cache_prefix: Optional[str] = None, max_tables: int = 16):
+        """
+        Initialize network
+
+        Args:
+            graph: Drivable street graph
+            cache_prefix: Path prefix for hierarchy files (no disk cache if omitted)
+            max_tables: Number of snapped many-to-many tables kept in memory
+        """
+        self.graph = graph
+        self.cache_prefix = cache_prefix
+        self.max_tables = max_tables
+        self._hierarchies: Dict[str, ContractionHierarchy] = {}
+        self._tables: 'OrderedDict[Tuple, Tuple[np.ndarray, np.ndarray]]' = OrderedDict()
+
+        # Only snap to the largest strongly connected component, so every
+        # snapped pair has a path
+        adjacency = csr_matrix(
+            (np.ones(len(graph.src)), (graph.src, graph.dst)),
+            shape=(graph.n_nodes, graph.n_nodes),
+        )
+        _, labels = connected_components(adjacency, directed=True, connection='strong')
+        self._snappable = np.flatnonzero(labels == np.bincount(labels).argmax())
+        self._origin = (float(graph.lat.mean()), float(graph.lon.mean()))
+        x, y = to_local_km(graph.lat[self._snappable], graph.lon[self._snappable], *self._origin)
+        self._tree = cKDTree(np.column_stack([x, y]))
+
+    @classmethod
+    def from_osm(cls, path: str, cache: bool = True) -> 'RoadNetwork':
+        """
+        Load a network from an OSM XML extract
+
+        Args:
+            path: Extract path
+            cache: Store/reuse contraction hierarchies next to the extract
+
+        Returns:
+            RoadNetwork
+        """
+        prefix = None
+        if cache:
+            stat = os.stat(path)
+            prefix = f"{path}.{int(stat.st_mtime)}-{stat.st_size}"
+        return cls(load_osm_graph(path), cache_prefix=prefix)
+
+    def hierarchy(self, metric: str = 'time') -> ContractionHierarchy:
+        """
+        Contraction hierarchy for 'time' (hours) or 'distance' (km), built on first use
+
+        Args:
+            metric: Edge weight to minimise
+
+        Returns:
+            ContractionHierarchy
+        """
+        if metric not in ('time', 'distance'):
+            raise ValueError(f"Unknown metric: {metric}")
+        if metric in self._hierarchies:
+            return self._hierarchies[metric]
+
+        path = f"{self.cache_prefix}.{metric}.ch.npz" if self.cache_prefix else None
+        if path and os.path.exists(path):
+            hierarchy = ContractionHierarchy.load(path)
+        else:
+            weight = self.graph.time_h if metric == 'time' else self.graph.length_km
+            hierarchy = ContractionHierarchy.build(
+                self.graph.n_nodes, self.graph.src, self.graph.dst, weight
+            )
+            if path:
+                hierarchy.save(path)
+        self._hierarchies[metric] = hierarchy
+        return hierarchy
+
+    def snap(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest routable street node for each point
+
+        Returns:
+            Tuple of (node indices, straight-line access distance in km)
+        """
+        x, y = to_local_km(lat, lon, *self._origin)
+        access, idx = self._tree.query(np.column_stack([np.atleast_1d(x), np.atleast_1d(y)]))
+        return self._snappable[idx], access
+
+    def matrices(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Road distance and travel time between all points
+
+        Distances follow the shortest path and times the fastest one; both
+        include the access legs between each point and its snapped node.
+
+        Args:
+            lat, lon: Point coordinates in degrees
+
+        Returns:
+            Tuple of (distance_km, time_hours) square matrices with zero diagonals
+        """
+        nodes, access = self.snap(lat, lon)
+        key = tuple(nodes.tolist())
+        if key in self._tables:
+            self._tables.move_to_end(key)
+            distance, duration = self._tables[key]
+        else:
+            distance = self.hierarchy('distance').many_to_many(nodes, nodes)
+            duration = self.hierarchy('time').many_to_many(nodes, nodes)
+            self._tables[key] = (distance, duration)
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+
+        legs = access[:, None] + access[None, :]
+        distance = distance + legs
+        duration = duration + legs / ACCESS_SPEED_KMH
+        np.fill_diagonal(distance, 0.0)
+        np.fill_diagonal(duration, 0.0)
+        return distance, duration
+
+
+class RoadNetworkMatrixCache(DistanceMatrixCache):
+    """DistanceMatrixCache serving road distances, plus matching travel times"""
+
+    def __init__(self, network: RoadNetwork, max_entries: int = 16):
+        """
+        Initialize cache
+
+        Args:
+            network: Road network to query
+            max_entries: Number of matrix pairs kept (least recently used evicted)
+        """
+        super().__init__(max_entries=max_entries)
+        self.network = network
+        self._durations: Dict[str, np.ndarray] = {}
+
+    def get_for_coordinates(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Road distance matrix in km for depot-first coordinate arrays"""
+        return self.matrices_for_coordinates(lat, lon)[0]
+
+    def matrices_for_coordinates(
+        self, lat: np.ndarray, lon: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Road distance (km) and travel-time (hours) matrices for depot-first
+        coordinate arrays
+
+        Both come from the same cache entry under the lock, so a concurrent
+        request cannot evict one between the two lookups.
+        """
+        key = self.key(lat, lon)
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None:
+                self.hits += 1
+                self._matrices.move_to_end(key)
+                return matrix, self._durations[key]
+
+            self.misses += 1
+            distance, duration = self.network.matrices(lat, lon)
+            # The solver reverses route segments, so use the slower direction
+            matrix = np.maximum(distance, distance.T)
+            duration = np.maximum(duration, duration.T)
+            matrix.setflags(write=False)
+            duration.setflags(write=False)
+
+            self._matrices[key] = matrix
+            self._durations[key] = duration
+            while len(self._matrices) > self.max_entries:
+                evicted, _ = self._matrices.popitem(last=False)
+                del self._durations[evicted]
+        return matrix, duration
+
+    def get_matrices(
+        self, hotspots: Sequence, depot_lat: float, depot_lon: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Road distance and travel-time matrices for a depot and hotspot list"""
+        lat, lon = self.coordinates(hotspots, depot_lat, depot_lon)
+        return self.matrices_for_coordinates(lat, lon)
+
+    def get_durations(self, hotspots: Sequence, depot_lat: float, depot_lon: float) -> np.ndarray:
+        """
+        Travel-time matrix matching ``get``
+
+        Returns:
+            (N + 1, N + 1) read-only matrix in hours, depot at index 0
+        """
+        return self.get_matrices(hotspots, depot_lat, depot_lon)[1]
+
+    def _one_to_many(self, metric: str, lat: float, lon: float, to_lat, to_lon):
+        """Road weights from one point to many in the slower direction, and access legs in km"""
+        nodes, access = self.network.snap(
+            np.concatenate([[lat], np.atleast_1d(to_lat)]),
+            np.concatenate([[lon], np.atleast_1d(to_lon)]),
+        )
+        hierarchy = self.network.hierarchy(metric)
+        there = hierarchy.many_to_many(nodes[:1], nodes[1:])[0]
+        back = hierarchy.many_to_many(nodes[1:], nodes[:1])[:, 0]
+        return np.maximum(there, back), access[0] + access[1:]
+
+    def distances_from(self, lat: float, lon: float, to_lat, to_lon) -> np.ndarray:
+        """Road distances in km from one point to many, in the slower direction"""
+        road, legs = self._one_to_many('distance', lat, lon, to_lat, to_lon)
+        return road + legs
+
+    def durations_from(self, lat: float, lon: float, to_lat, to_lon) -> np.ndarray:
+        """Road travel times in hours from one point to many, in the slower direction"""
+        road, legs = self._one_to_many('time', lat, lon, to_lat, to_lon)
+        return road + legs / ACCESS_SPEED_KMH
+
+    def clear(self):
+        """Drop all cached matrices"""
+        with self._lock:
+            self._matrices.clear()
+            self._durations.clear()
+
+
+if __name__ == "__main__":
+    # Example usage: python -m src.models.road_network city.osm
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    network = RoadNetwork.from_osm(sys.argv[1])
+    network.hierarchy('time')
+    network.hierarchy('distance')
+
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(network.graph.lat.min(), network.graph.lat.max(), 300)
+    lon = rng.uniform(network.graph.lon.min(), network.graph.lon.max(), 300)
+    start = time.perf_counter()
+    distance, duration = network.matrices(lat, lon)
+    print(f"300x300 road matrices in {(time.perf_counter() - start) * 1000:.0f} ms")
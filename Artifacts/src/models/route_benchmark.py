@@ -0,0 +1,477 @@
+"""
+Route Solver Benchmark Suite
+
+Runs every route solver mode on a fixed set of instances and records plan
+quality (total distance, constraint violations, unserved hotspots) and
+wall time, so changes to the solvers can be compared against a stored
+baseline report.
+
+Instances come from two sources:
+- Synthetic Chicago-like instances: hotspots clustered around neighbourhood
+  centres inside the city bounds, generated from a fixed seed.
+- Standard CVRP instance files (CVRPLIB / TSPLIB ``.vrp`` format) loaded
+  from disk. Coordinates are planar, so distances are rounded Euclidean
+  and the best known cost is read from a ``.sol`` file next to the
+  instance if present. The solvers have no vehicle capacity, so capacity
+  overflow is reported as a constraint violation.
+"""
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import json
+import logging
+import math
+import os
+import platform
+import re
+import time
+
+import numpy as np
+
+from src.models.distance_matrix import DistanceMatrixCache
+from src.models.prize_collecting import PrizeCollectingSolver
+from src.models.sector_solver import SectorRouteSolver
+from src.models.vrp_solver import SavingsRouteSolver
+
+logger = logging.getLogger(__name__)
+
+# Chicago bounds (lat_min, lat_max, lon_min, lon_max) and the default depot
+CHICAGO_BOUNDS = (41.65, 42.02, -87.94, -87.53)
+CHICAGO_DEPOT = (41.8781, -87.6298)
+
+# Synthetic instance sizes shipped with the suite
+STANDARD_SIZES = (10, 100, 1000, 5000)
+
+# Relative distance increase / time slowdown counted as a regression
+DISTANCE_TOLERANCE = 0.01
+TIME_TOLERANCE = 0.5
+# Wall-time differences below this many seconds are noise
+TIME_FLOOR_S = 0.05
+
+REPORT_VERSION = 1
+
+
+@dataclass
+class BenchmarkInstance:
+    """Routing instance: depot, hotspots and fleet/limit settings"""
+
+    name: str
+    depot: tuple
+    hotspots: List
+    num_officers: int
+    max_route_distance_km: float = 50.0
+    max_shift_hours: float = 8.0
+    capacity: Optional[float] = None  # Per-route demand limit (CVRP instances)
+    best_known: Optional[float] = None  # Best known total distance, if published
+    planar: bool = False  # Coordinates are x/y units, not lat/lon
+
+
+@dataclass
+class BenchmarkResult:
+    """Outcome of one solver mode on one instance"""
+
+    instance: str
+    mode: str
+    n_hotspots: int
+    num_officers: int
+    routes: int
+    total_distance: float
+    unassigned: int
+    violations: Dict[str, int]
+    collected_priority: float
+    wall_time_s: float
+    gap: Optional[float] = None  # Relative distance above the best known cost
+    times_s: List[float] = field(default_factory=list)
+
+
+class EuclideanMatrixCache(DistanceMatrixCache):
+    """Rounded Euclidean distances for planar benchmark coordinates (lat = y, lon = x)"""
+
+    def get_for_coordinates(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        key = self.key(lat, lon)
+        matrix = self._matrices.get(key)
+        if matrix is not None:
+            self.hits += 1
+            return matrix
+        self.misses += 1
+        # CVRPLIB convention: EUC_2D distances are rounded to the nearest integer
+        matrix = np.rint(np.hypot(lat[:, None] - lat[None, :], lon[:, None] - lon[None, :]))
+        matrix.setflags(write=False)
+        self._matrices[key] = matrix
+        while len(self._matrices) > self.max_entries:
+            self._matrices.popitem(last=False)
+        return matrix
+
+
+def synthetic_instance(
+    n_hotspots: int,
+    seed: int = 0,
+    num_officers: Optional[int] = None,
+    max_route_distance_km: float = 50.0,
+    max_shift_hours: float = 8.0,
+) -> BenchmarkInstance:
+    """
+    Chicago-like instance: clustered hotspots with skewed priorities
+
+    Args:
+        n_hotspots: Number of hotspots
+        seed: Random seed; the same seed always gives the same instance
+        num_officers: Fleet size (defaults to about one officer per 25 hotspots)
+        max_route_distance_km: Route length limit
+        max_shift_hours: Shift length limit
+
+    Returns:
+        BenchmarkInstance named ``chicago-<n>``
+    """
+    rng = np.random.default_rng([seed, n_hotspots])
+    lat_min, lat_max, lon_min, lon_max = CHICAGO_BOUNDS
+    n_centres = max(1, int(round(math.sqrt(n_hotspots))))
+    centres_lat = rng.uniform(lat_min, lat_max, n_centres)
+    centres_lon = rng.uniform(lon_min, lon_max, n_centres)
+    # Busy neighbourhoods attract most hotspots
+    weights = rng.pareto(1.5, n_centres) + 1.0
+    members = rng.choice(n_centres, n_hotspots, p=weights / weights.sum())
+    lat = np.clip(centres_lat[members] + rng.normal(0, 0.008, n_hotspots), lat_min, lat_max)
+    lon = np.clip(centres_lon[members] + rng.normal(0, 0.01, n_hotspots), lon_min, lon_max)
+    priority = np.round(rng.lognormal(0.0, 0.5, n_hotspots), 3)
+
+    hotspots = [
+        SimpleNamespace(
+            cluster_id=i,
+            center_lat=float(lat[i]),
+            center_lon=float(lon[i]),
+            priority=float(priority[i]),
+        )
+        for i in range(n_hotspots)
+    ]
+    if num_officers is None:
+        num_officers = max(2, math.ceil(n_hotspots / 25))
+    return BenchmarkInstance(
+        name=f'chicago-{n_hotspots}',
+        depot=CHICAGO_DEPOT,
+        hotspots=hotspots,
+        num_officers=num_officers,
+        max_route_distance_km=max_route_distance_km,
+        max_shift_hours=max_shift_hours,
+    )
+
+
+def load_cvrp_instance(path: str, num_officers: Optional[int] = None) -> BenchmarkInstance:
+    """
+    Load a CVRPLIB instance file (EUC_2D coordinates)
+
+    Args:
+        path: ``.vrp`` file
+        num_officers: Fleet size (defaults to ``-k<N>`` in the name, else
+            total demand / capacity rounded up)
+
+    Returns:
+        Planar BenchmarkInstance; the first depot is the depot
+    """
+    header: Dict[str, str] = {}
+    sections: Dict[str, List[List[str]]] = {}
+    section = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line == 'EOF':
+                continue
+            if line.endswith('_SECTION'):
+                section = line
+                sections[section] = []
+            elif ':' in line and section is None:
+                key, value = line.split(':', 1)
+                header[key.strip().upper()] = value.strip().strip('"')
+            elif section is not None:
+                sections[section].append(line.split())
+
+    weight_type = header.get('EDGE_WEIGHT_TYPE', 'EUC_2D')
+    if weight_type != 'EUC_2D':
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE {weight_type} in {path}")
+    if 'NODE_COORD_SECTION' not in sections:
+        raise ValueError(f"No NODE_COORD_SECTION in {path}")
+
+    coords = {int(row[0]): (float(row[1]), float(row[2])) for row in sections['NODE_COORD_SECTION']}
+    demand = {int(row[0]): float(row[1]) for row in sections.get('DEMAND_SECTION', [])}
+    depots = [int(row[0]) for row in sections.get('DEPOT_SECTION', []) if int(row[0]) > 0]
+    depot_id = depots[0] if depots else min(coords)
+
+    hotspots = [
+        # lat carries y and lon carries x so the matrix cache can stay coordinate-agnostic
+        SimpleNamespace(
+            cluster_id=node_id,
+            center_lat=y,
+            center_lon=x,
+            priority=1.0,
+            demand=demand.get(node_id, 0.0),
+        )
+        for node_id, (x, y) in sorted(coords.items())
+        if node_id != depot_id
+    ]
+    name = header.get('NAME') or os.path.splitext(os.path.basename(path))[0]
+    capacity = float(header['CAPACITY']) if 'CAPACITY' in header else None
+    if num_officers is None:
+        match = re.search(r'-k(\d+)', name)
+        if match:
+            num_officers = int(match.group(1))
+        elif capacity:
+            num_officers = math.ceil(sum(h.demand for h in hotspots) / capacity)
+        else:
+            num_officers = 1
+
+    return BenchmarkInstance(
+        name=name,
+        depot=(coords[depot_id][1], coords[depot_id][0]),
+        hotspots=hotspots,
+        num_officers=num_officers,
+        max_route_distance_km=float(header.get('DISTANCE', math.inf)),
+        max_shift_hours=math.inf,
+        capacity=capacity,
+        best_known=_best_known(path),
+        planar=True,
+    )
+
+
+def _best_known(path: str) -> Optional[float]:
+    """Cost line of the ``.sol`` file next to an instance, if there is one"""
+    solution = os.path.splitext(path)[0] + '.sol'
+    if not os.path.exists(solution):
+        return None
+    with open(solution) as f:
+        for line in f:
+            if line.lower().startswith('cost'):
+                return float(line.split()[-1])
+    return None
+
+
+def solver_modes(seed: int = 0) -> Dict[str, Callable]:
+    """
+    Solver factories keyed by mode name
+
+    Every factory takes ``(instance, distance_cache)`` and returns a solver
+    with a ``solve(hotspots, num_officers, depot_lat, depot_lon, time_limit_ms)``
+    method. Seeds are fixed so repeated runs give the same plans.
+    """
+
+    def build(cls, **extra):
+        def factory(instance: BenchmarkInstance, cache: DistanceMatrixCache):
+            return cls(
+                max_route_distance_km=instance.max_route_distance_km,
+                max_shift_hours=instance.max_shift_hours,
+                distance_cache=cache,
+                seed=seed,
+                n_jobs=1,
+                **extra,
+            )
+
+        return factory
+
+    return {
+        'savings': build(SavingsRouteSolver),
+        'multistart': build(SavingsRouteSolver, n_starts=4),
+        'sector': build(SectorRouteSolver, sector_size=200),
+        'prize': build(PrizeCollectingSolver),
+    }
+
+
+def evaluate(instance: BenchmarkInstance, routes: Sequence, solver) -> Dict[str, int]:
+    """
+    Count constraint violations in a plan
+
+    Returns:
+        Dict with counts of over-long routes, over-long shifts, capacity
+        overflows, hotspots served twice and routes beyond the fleet size
+    """
+    limit = instance.max_route_distance_km
+    if not instance.planar:
+        limit = min(limit, getattr(solver, 'route_limit_km', limit))
+    stops = [h.cluster_id for route in routes for h in route.hotspots]
+    violations = {
+        'distance': sum(1 for r in routes if r.total_distance > limit + 1e-6),
+        'shift': 0,
+        'capacity': 0,
+        'duplicates': len(stops) - len(set(stops)),
+        'fleet': max(0, len(routes) - instance.num_officers),
+    }
+    if not instance.planar:
+        violations['shift'] = sum(
+            1 for r in routes if r.estimated_duration > instance.max_shift_hours + 1e-6
+        )
+    if instance.capacity is not None:
+        violations['capacity'] = sum(
+            1
+            for r in routes
+            if sum(getattr(h, 'demand', 0.0) for h in r.hotspots) > instance.capacity + 1e-9
+        )
+    return violations
+
+
+def run_instance(
+    instance: BenchmarkInstance,
+    mode: str,
+    factory: Callable,
+    repeats: int = 1,
+    time_limit_ms: Optional[float] = None,
+) -> BenchmarkResult:
+    """
+    Solve one instance with one mode
+
+    The distance matrix is built once up front so wall times measure the
+    solver only. With several repeats the median time is reported.
+    """
+    cache = EuclideanMatrixCache() if instance.planar else DistanceMatrixCache()
+    cache.get(instance.hotspots, *instance.depot)
+
+    times = []
+    for _ in range(repeats):
+        solver = factory(instance, cache)
+        start = time.perf_counter()
+        routes = solver.solve(
+            instance.hotspots,
+            instance.num_officers,
+            instance.depot[0],
+            instance.depot[1],
+            time_limit_ms=time_limit_ms,
+        )
+        times.append(time.perf_counter() - start)
+
+    total = float(sum(r.total_distance for r in routes))
+    gap = None
+    if instance.best_known:
+        gap = total / instance.best_known - 1.0
+    return BenchmarkResult(
+        instance=instance.name,
+        mode=mode,
+        n_hotspots=len(instance.hotspots),
+        num_officers=instance.num_officers,
+        routes=len(routes),
+        total_distance=round(total, 6),
+        unassigned=len(solver.unassigned_),
+        violations=evaluate(instance, routes, solver),
+        collected_priority=round(sum(h.priority for r in routes for h in r.hotspots), 6),
+        wall_time_s=float(np.median(times)),
+        gap=gap,
+        times_s=times,
+    )
+
+
+def run_suite(
+    instances: Sequence[BenchmarkInstance],
+    modes: Optional[Sequence[str]] = None,
+    repeats: int = 1,
+    seed: int = 0,
+    time_limit_ms: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Run every mode on every instance
+
+    Args:
+        instances: Instances to solve
+        modes: Mode names from solver_modes() (all modes if omitted)
+        repeats: Runs per instance and mode (median wall time is reported)
+        seed: Solver seed
+        time_limit_ms: Optional per-solve search budget
+
+    Returns:
+        JSON-serializable report
+    """
+    factories = solver_modes(seed)
+    modes = list(modes or factories)
+    unknown = sorted(set(modes) - set(factories))
+    if unknown:
+        raise ValueError(f"Unknown solver modes: {', '.join(unknown)}")
+
+    results = []
+    for instance in instances:
+        for mode in modes:
+            result = run_instance(instance, mode, factories[mode], repeats, time_limit_ms)
+            logger.info(
+                f"{instance.name} [{mode}]: {result.total_distance:.1f} km, "
+                f"{result.unassigned} unassigned, {result.wall_time_s:.3f}s"
+            )
+            results.append(asdict(result))
+
+    return {
+        'version': REPORT_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'settings': {'repeats': repeats, 'seed': seed, 'time_limit_ms': time_limit_ms},
+        'results': results,
+    }
+
+
+def save_report(report: Dict[str, Any], path: str):
+    """Write a report as indented JSON"""
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Read a report written by save_report"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    distance_tolerance: float = DISTANCE_TOLERANCE,
+    time_tolerance: float = TIME_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """
+    Compare a report against a baseline
+
+    A result regresses when it has more violations or unserved hotspots,
+    a longer total distance beyond ``distance_tolerance`` (relative), or a
+    wall time more than ``time_tolerance`` (relative) and TIME_FLOOR_S slower.
+
+    Returns:
+        One entry per (instance, mode) present in both reports, with the
+        deltas and a list of ``regressions`` (empty if none)
+    """
+    base = {(r['instance'], r['mode']): r for r in baseline.get('results', [])}
+    rows = []
+    for result in current.get('results', []):
+        old = base.get((result['instance'], result['mode']))
+        if old is None:
+            continue
+        violations = sum(result['violations'].values())
+        old_violations = sum(old['violations'].values())
+        distance_change = _relative(result['total_distance'], old['total_distance'])
+        time_change = _relative(result['wall_time_s'], old['wall_time_s'])
+
+        regressions = []
+        if violations > old_violations:
+            regressions.append('violations')
+        if result['unassigned'] > old['unassigned']:
+            regressions.append('unassigned')
+        elif result['unassigned'] == old['unassigned'] and distance_change > distance_tolerance:
+            regressions.append('distance')
+        if (
+            time_change > time_tolerance
+            and result['wall_time_s'] - old['wall_time_s'] > TIME_FLOOR_S
+        ):
+            regressions.append('wall_time')
+
+        rows.append(
+            {
+                'instance': result['instance'],
+                'mode': result['mode'],
+                'distance_change': distance_change,
+                'time_change': time_change,
+                'unassigned_change': result['unassigned'] - old['unassigned'],
+                'violations_change': violations - old_violations,
+                'regressions': regressions,
+            }
+        )
+    return rows
+
+
+def _relative(new: float, old: float) -> float:
+    if old == 0:
+        return 0.0 if new == 0 else math.inf
+    return new / old - 1.0
@@ -0,0 +1,321 @@
+"""
+Incremental Patrol Route Sessions
+
+A route session keeps a solved patrol plan in memory and repairs it as the
+shift changes instead of re-solving from scratch:
+
+- add_hotspot: cheapest feasible insertion, then local search around it
+- remove_hotspot: splice it out; freed capacity is offered to unassigned hotspots
+- remove_officer: the officer's hotspots are cheapest-inserted into the other routes
+- move_depot: depot distances are recomputed; over-long routes shed hotspots
+
+New rows of the distance matrix come from the solver's distance cache, so a
+session planned on road distances stays on road distances. With road travel
+times the session keeps a matching duration matrix and repairs respect the
+shift length as the solver does.
+
+Each repair runs the local search only from the nodes around the change,
+under a small time budget, so a delta is answered in tens of milliseconds.
+Node indices are stable for the session's lifetime: the distance matrix
+grows by doubling and removed hotspots leave unused rows behind.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+import time
+
+import numpy as np
+
+from src.models.vrp_solver import LocalSearch, PlannedRoute, SavingsRouteSolver
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionHotspot:
+    """Hotspot as tracked by a route session (same fields as Hotspot)"""
+
+    cluster_id: int
+    center_lat: float
+    center_lon: float
+    priority: float = 1.0
+    density: float = 0.0
+
+
+class RouteSession:
+    """Patrol plan that is repaired incrementally as hotspots and officers change"""
+
+    def __init__(
+        self,
+        hotspots: Sequence,
+        num_officers: int,
+        depot_lat: float,
+        depot_lon: float,
+        solver: Optional[SavingsRouteSolver] = None,
+        time_limit_ms: Optional[float] = None,
+        repair_budget_ms: float = 50.0,
+    ):
+        """
+        Solve the initial plan and set up session state
+
+        Args:
+            hotspots: Hotspot objects (cluster_id/center_lat/center_lon/priority)
+            num_officers: Officers on duty (IDs 0..num_officers-1)
+            depot_lat: Depot latitude
+            depot_lon: Depot longitude
+            solver: Solver for the initial plan (defaults to SavingsRouteSolver())
+            time_limit_ms: Budget for the initial solve
+            repair_budget_ms: Local search budget per delta
+        """
+        self.solver = solver or SavingsRouteSolver()
+        self.repair_budget_ms = repair_budget_ms
+        self.depot = (depot_lat, depot_lon)
+
+        hotspots = list(hotspots)
+        if len({h.cluster_id for h in hotspots}) != len(hotspots):
+            raise ValueError("Hotspot cluster_id values must be unique within a session")
+        planned = self.solver.solve(hotspots, num_officers, depot_lat, depot_lon, time_limit_ms)
+
+        # Node i + 1 is hotspots[i]; node 0 is the depot
+        self._hotspots: List[Any] = [None] + hotspots
+        self._node_of: Dict[int, int] = {h.cluster_id: i + 1 for i, h in enumerate(hotspots)}
+        self._size = len(hotspots) + 1
+        capacity = max(2 * self._size, 64)
+        self._matrix = np.zeros((capacity, capacity))
+        self._coords = np.zeros((capacity, 2))
+        initial, durations = self.solver.distance_cache.get_matrices(hotspots, depot_lat, depot_lon)
+        self._matrix[: self._size, : self._size] = initial
+        self.timed = durations is not None
+        self._durations: Optional[np.ndarray] = None
+        if self.timed:
+            self._durations = np.zeros((capacity, capacity))
+            self._durations[: self._size, : self._size] = durations
+        self._coords[: self._size] = np.column_stack(
+            self.solver.distance_cache.coordinates(hotspots, depot_lat, depot_lon)
+        )
+
+        routes = [[stop + 1 for stop in route.stops] for route in planned]
+        self.officer_ids = list(range(num_officers))
+        routes.extend([] for _ in range(num_officers - len(routes)))
+        self.unassigned: List[int] = [self._node_of[h.cluster_id] for h in self.solver.unassigned_]
+
+        limit, hours = self.solver.limits(self.timed)
+        self._search = LocalSearch(
+            self._matrix,
+            routes,
+            limit,
+            self.solver.n_neighbors,
+            nodes=range(1, self._size),
+            durations=self._durations,
+            time_limit=hours,
+        )
+
+    def add_hotspot(self, hotspot) -> List[PlannedRoute]:
+        """
+        Add a hotspot to the plan
+
+        Args:
+            hotspot: Hotspot object with a cluster_id not already in the session
+
+        Returns:
+            Updated routes
+        """
+        if hotspot.cluster_id in self._node_of:
+            raise ValueError(f"Hotspot {hotspot.cluster_id} is already in the session")
+        deadline = self._deadline()
+        node = self._allocate(hotspot)
+        self._search.add_candidates(node, self._live_nodes())
+
+        if self._search.insert([node]):
+            self.unassigned.append(node)
+            return self.routes()
+        self._repair(deadline, [node] + self._search.neighbors[node])
+        return self.routes()
+
+    def remove_hotspot(self, cluster_id: int) -> List[PlannedRoute]:
+        """
+        Remove a hotspot from the plan
+
+        Args:
+            cluster_id: Hotspot to remove
+
+        Returns:
+            Updated routes
+        """
+        node = self._lookup(cluster_id)
+        deadline = self._deadline()
+        del self._node_of[cluster_id]
+        self._hotspots[node] = None
+        if node in self.unassigned:
+            self.unassigned.remove(node)
+            return self.routes()
+
+        idx = self._search.remove(node)
+        touched = list(self._search.routes[idx]) + self._reinsert_unassigned()
+        self._repair(deadline, touched)
+        return self.routes()
+
+    def remove_officer(self, officer_id: int) -> List[PlannedRoute]:
+        """
+        Take an officer off duty and redistribute their hotspots
+
+        Args:
+            officer_id: Officer to remove
+
+        Returns:
+            Updated routes
+        """
+        if officer_id not in self.officer_ids:
+            raise KeyError(f"Unknown officer {officer_id}")
+        deadline = self._deadline()
+        idx = self.officer_ids.index(officer_id)
+        del self.officer_ids[idx]
+        orphans = self._search.drop_route(idx)
+
+        orphans.sort(key=self._priority, reverse=True)
+        self.unassigned.extend(self._search.insert(orphans))
+        self._repair(deadline, orphans)
+        return self.routes()
+
+    def move_depot(self, depot_lat: float, depot_lon: float) -> List[PlannedRoute]:
+        """
+        Move the depot (start and end of every route)
+
+        Args:
+            depot_lat: New depot latitude
+            depot_lon: New depot longitude
+
+        Returns:
+            Updated routes
+        """
+        deadline = self._deadline()
+        self.depot = (depot_lat, depot_lon)
+        self._set_distances(0, depot_lat, depot_lon)
+        self._search.refresh_lengths()
+
+        # Routes pushed over the limit shed their most expensive stops
+        shed = []
+        for idx, route in enumerate(self._search.routes):
+            while route and self._over_limit(idx):
+                node = self._costliest_stop(route)
+                self._search.remove(node)
+                shed.append(node)
+        shed.sort(key=self._priority, reverse=True)
+        self.unassigned.extend(self._search.insert(shed))
+        self._reinsert_unassigned()
+        self._repair(deadline, self._routed_nodes())
+        return self.routes()
+
+    def routes(self) -> List[PlannedRoute]:
+        """Current plan, one entry per officer with a non-empty route"""
+        planned = []
+        for idx, (officer_id, route, length) in enumerate(
+            zip(self.officer_ids, self._search.routes, self._search.lengths)
+        ):
+            if not route:
+                continue
+            if self.timed:
+                duration = self._search.times[idx]
+            else:
+                duration = length / self.solver.average_speed_kmh
+            planned.append(
+                PlannedRoute(
+                    officer_id=officer_id,
+                    hotspots=[self._hotspots[node] for node in route],
+                    total_distance=float(length),
+                    estimated_duration=float(duration),
+                )
+            )
+        return planned
+
+    def unassigned_hotspots(self) -> List:
+        """Hotspots that do not fit in any route"""
+        return [self._hotspots[node] for node in self.unassigned]
+
+    def _deadline(self) -> float:
+        return time.perf_counter() + self.repair_budget_ms / 1000.0
+
+    def _priority(self, node: int) -> float:
+        return float(getattr(self._hotspots[node], 'priority', 1.0))
+
+    def _lookup(self, cluster_id: int) -> int:
+        if cluster_id not in self._node_of:
+            raise KeyError(f"Unknown hotspot {cluster_id}")
+        return self._node_of[cluster_id]
+
+    def _over_limit(self, idx: int) -> bool:
+        search = self._search
+        if search.lengths[idx] > search.limit:
+            return True
+        return search.times is not None and search.times[idx] > search.time_limit
+
+    def _live_nodes(self) -> List[int]:
+        return list(self._node_of.values())
+
+    def _routed_nodes(self) -> List[int]:
+        return [node for route in self._search.routes for node in route]
+
+    def _allocate(self, hotspot) -> int:
+        """Assign the next node index, growing the matrix if needed"""
+        node = self._size
+        if node >= self._matrix.shape[0]:
+            capacity = 2 * self._matrix.shape[0]
+            grown = np.zeros((capacity, capacity))
+            grown[: self._size, : self._size] = self._matrix[: self._size, : self._size]
+            self._matrix = grown
+            if self.timed:
+                durations = np.zeros((capacity, capacity))
+                durations[: self._size, : self._size] = self._durations[: self._size, : self._size]
+                self._durations = durations
+            self._coords = np.vstack([self._coords, np.zeros_like(self._coords)])
+            self._search.rebind(grown, self._durations)
+        self._size += 1
+        self._hotspots.append(hotspot)
+        self._node_of[hotspot.cluster_id] = node
+        self._set_distances(node, hotspot.center_lat, hotspot.center_lon)
+        return node
+
+    def _set_distances(self, node: int, lat: float, lon: float):
+        """Place a node and fill its matrix row/column (retired nodes' entries go unused)"""
+        self._coords[node] = (lat, lon)
+        coords = self._coords[: self._size]
+        cache = self.solver.distance_cache
+        row = cache.distances_from(lat, lon, coords[:, 0], coords[:, 1])
+        row[node] = 0.0
+        self._matrix[node, : self._size] = row
+        self._matrix[: self._size, node] = row
+        if self.timed:
+            row = cache.durations_from(lat, lon, coords[:, 0], coords[:, 1])
+            row[node] = 0.0
+            self._durations[node, : self._size] = row
+            self._durations[: self._size, node] = row
+
+    def _costliest_stop(self, route: List[int]) -> int:
+        """Stop whose removal shortens its route the most"""
+        seq = [0] + route + [0]
+        d = self._matrix
+        gains = [
+            d[seq[i - 1], seq[i]] + d[seq[i], seq[i + 1]] - d[seq[i - 1], seq[i + 1]]
+            for i in range(1, len(seq) - 1)
+        ]
+        return route[int(np.argmax(gains))]
+
+    def _reinsert_unassigned(self) -> List[int]:
+        """Offer freed capacity to unassigned hotspots; returns those placed"""
+        if not self.unassigned:
+            return []
+        waiting = sorted(self.unassigned, key=self._priority, reverse=True)
+        self.unassigned = self._search.insert(waiting)
+        return [node for node in waiting if node not in self.unassigned]
+
+    def _repair(self, deadline: float, nodes: Sequence[int]):
+        """Local search from the nodes around a change, and their routes"""
+        active = set()
+        for node in nodes:
+            idx = self._search.route_of[node]
+            if idx >= 0:
+                active.update(self._search.routes[idx])
+        active.update(node for node in nodes if self._search.route_of[node] >= 0)
+        moves = self._search.run(deadline, nodes=sorted(active))
+        logger.debug(f"Route session repair: {len(active)} nodes searched, {moves} moves so far")
@@ -0,0 +1,346 @@
+"""
+Cluster-First, Route-Second Patrol Planning
+
+Citywide instances (thousands of hotspots, hundreds of officers) are too
+large for a single savings + local search solve in interactive time, and
+their full distance matrix grows quadratically. This solver decomposes:
+
+1. Partition the hotspots into balanced geographic sectors of about
+   ``sector_size`` hotspots, either by sweep (polar angle around the
+   depot) or by capacity-capped k-means. Officers are shared out in
+   proportion to each sector's estimated route workload.
+2. Solve every sector independently with the savings solver, in a
+   process pool.
+3. Polish the boundaries: local search runs over the routes of each pair
+   of neighbouring sectors, so relocate, exchange and 2-opt* moves can
+   cross the border, and hotspots a sector could not serve are offered to
+   its neighbour.
+
+Every step works on sector-sized matrices, so runtime grows about
+linearly with the number of hotspots.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import math
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from src.models.vrp_solver import (
+    LocalSearch,
+    PlannedRoute,
+    SavingsRouteSolver,
+    _run_start,
+    route_length,
+    worker_pool,
+)
+from src.utils.geo import convex_hull_area_km2, to_local_km
+
+logger = logging.getLogger(__name__)
+
+# Beardwood-Halton-Hammersley constant: a tour through n random points in
+# area A is about BHH * sqrt(n * A) long
+BHH_CONSTANT = 0.7124
+
+# k-means sectors may exceed the average size by this factor
+KMEANS_SLACK = 1.15
+
+# Share of the time budget spent solving sectors (the rest polishes borders)
+SECTOR_BUDGET_SHARE = 0.7
+
+# Each sector's boundary is polished with this many nearest sectors
+POLISH_NEIGHBORS = 2
+
+
+class SectorRouteSolver(SavingsRouteSolver):
+    """Savings solver that decomposes large instances into geographic sectors"""
+
+    def __init__(
+        self,
+        sector_size: int = 200,
+        partition: str = 'sweep',
+        polish_boundaries: bool = True,
+        **kwargs,
+    ):
+        """
+        Initialize solver
+
+        Args:
+            sector_size: Target hotspots per sector; smaller instances are solved whole
+            partition: 'sweep' (angle around the depot) or 'kmeans'
+            polish_boundaries: Run cross-sector local search after the sector solves
+            **kwargs: SavingsRouteSolver arguments (limits, n_neighbors, n_jobs, ...)
+        """
+        if partition not in ('sweep', 'kmeans'):
+            raise ValueError(f"Unknown partition method: {partition}")
+        super().__init__(**kwargs)
+        self.sector_size = sector_size
+        self.partition = partition
+        self.polish_boundaries = polish_boundaries
+
+    def solve(
+        self,
+        hotspots: Sequence,
+        num_officers: int,
+        depot_lat: float,
+        depot_lon: float,
+        time_limit_ms: Optional[float] = None,
+    ) -> List[PlannedRoute]:
+        """
+        Plan patrol routes, sector by sector when the instance is large
+
+        Args:
+            hotspots: Hotspot objects (center_lat/center_lon/priority)
+            num_officers: Maximum number of routes
+            depot_lat: Depot latitude
+            depot_lon: Depot longitude
+            time_limit_ms: Wall-clock budget for the whole plan
+
+        Returns:
+            List of non-empty routes; hotspots left out are in ``unassigned_``
+        """
+        if len(hotspots) <= self.sector_size or num_officers < 2:
+            return super().solve(hotspots, num_officers, depot_lat, depot_lon, time_limit_ms)
+
+        start = time.perf_counter()
+        deadline = None if time_limit_ms is None else start + time_limit_ms / 1000.0
+        hotspots = list(hotspots)
+        depot = (depot_lat, depot_lon)
+        sectors = self.sectors(hotspots, num_officers, depot_lat, depot_lon)
+
+        plan = _SectorPlan(self, hotspots, depot)
+        plan.solve_sectors(sectors, deadline)
+        if self.polish_boundaries:
+            plan.polish(self._neighbor_pairs(hotspots, sectors), deadline)
+
+        self.unassigned_ = [hotspots[i] for i in sorted(plan.unassigned)]
+        planned = plan.to_routes()
+        logger.info(
+            f"Planned {len(planned)} routes over {len(hotspots) - len(self.unassigned_)} "
+            f"hotspots in {len(sectors)} sectors ({sum(plan.lengths):.1f} km) "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        return planned
+
+    def sectors(
+        self, hotspots: Sequence, num_officers: int, depot_lat: float, depot_lon: float
+    ) -> List[Tuple[np.ndarray, int]]:
+        """
+        Partition hotspots into sectors and share out the officers
+
+        Args:
+            hotspots: Hotspot objects
+            num_officers: Officers to distribute (at least one per sector)
+            depot_lat: Depot latitude
+            depot_lon: Depot longitude
+
+        Returns:
+            List of (hotspot indices, officers) per sector
+        """
+        lat = np.fromiter((h.center_lat for h in hotspots), dtype=float, count=len(hotspots))
+        lon = np.fromiter((h.center_lon for h in hotspots), dtype=float, count=len(hotspots))
+        x, y = to_local_km(lat, lon, depot_lat, depot_lon)
+        k = max(1, min(math.ceil(len(hotspots) / self.sector_size), num_officers))
+
+        if self.partition == 'sweep':
+            members = _sweep_sectors(x, y, k)
+        else:
+            members = _kmeans_sectors(x, y, k, self.seed)
+
+        # Workload: depot round trip plus an estimated tour through the sector
+        workload = np.array(
+            [
+                2.0 * np.hypot(x[idx], y[idx]).mean()
+                + BHH_CONSTANT * math.sqrt(len(idx) * convex_hull_area_km2(lat[idx], lon[idx]))
+                for idx in members
+            ]
+        )
+        officers = _apportion(workload, num_officers)
+        return list(zip(members, officers))
+
+    def _neighbor_pairs(
+        self, hotspots: Sequence, sectors: List[Tuple[np.ndarray, int]]
+    ) -> List[Tuple[int, int]]:
+        """Pairs of sectors whose centroids are among each other's nearest"""
+        if len(sectors) < 2:
+            return []
+        lat = np.array([np.mean([hotspots[i].center_lat for i in idx]) for idx, _ in sectors])
+        lon = np.array([np.mean([hotspots[i].center_lon for i in idx]) for idx, _ in sectors])
+        centroids = np.column_stack(to_local_km(lat, lon))
+        k = min(POLISH_NEIGHBORS, len(sectors) - 1)
+        _, nearest = cKDTree(centroids).query(centroids, k=k + 1)
+        pairs = {
+            (min(a, b), max(a, b))
+            for a, row in enumerate(nearest.reshape(len(sectors), -1).tolist())
+            for b in row[1:]
+        }
+        return sorted(pairs)
+
+
+class _SectorPlan:
+    """Routes of a decomposed plan, kept in global hotspot indices"""
+
+    def __init__(self, solver: SectorRouteSolver, hotspots: List, depot: Tuple[float, float]):
+        self.solver = solver
+        self.hotspots = hotspots
+        self.depot = depot
+        self.priorities = [float(getattr(h, 'priority', 1.0)) for h in hotspots]
+        self.routes: List[List[int]] = []
+        self.lengths: List[float] = []
+        self.times: List[float] = []
+        self.route_sector: List[int] = []
+        self.unassigned: Dict[int, int] = {}  # hotspot index -> sector
+        self.timed = hasattr(solver.distance_cache, 'get_durations')
+
+    def matrices(self, members: Sequence[int]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Depot-first distance (and travel-time) matrices for some hotspots"""
+        subset = [self.hotspots[i] for i in members]
+        return self.solver.distance_cache.get_matrices(subset, *self.depot)
+
+    def solve_sectors(self, sectors: List[Tuple[np.ndarray, int]], deadline: Optional[float]):
+        """Solve every sector independently (in parallel when n_jobs > 1)"""
+        workers = min(self.solver.n_jobs, len(sectors))
+        budget = None
+        if deadline is not None:
+            remaining = max(deadline - time.perf_counter(), 0.0) * SECTOR_BUDGET_SHARE
+            budget = remaining / math.ceil(len(sectors) / workers)
+
+        tasks = []
+        for members, officers in sectors:
+            matrix, durations = self.matrices(members)
+            priorities = [self.priorities[i] for i in members]
+            tasks.append(
+                (matrix, durations, self.solver.settings(), officers, priorities, 0, budget)
+            )
+        if workers == 1:
+            results = [_run_start(*task) for task in tasks]
+        else:
+            results = list(worker_pool().map(_run_start, *zip(*tasks)))
+
+        for sector, ((members, _), task, result) in enumerate(zip(sectors, tasks, results)):
+            matrix, durations = task[0], task[1]
+            _, _, routes, unassigned = result
+            for route in routes:
+                if route:
+                    self.routes.append([members[node - 1] for node in route])
+                    self.route_sector.append(sector)
+                    self.lengths.append(route_length(matrix, route))
+                    self.times.append(route_length(durations, route) if self.timed else 0.0)
+            self.unassigned.update((members[node - 1], sector) for node in unassigned)
+
+    def polish(self, pairs: List[Tuple[int, int]], deadline: Optional[float]):
+        """Local search across each pair of neighbouring sectors"""
+        limit, hours = self.solver.limits(self.timed)
+        for done, (a, b) in enumerate(pairs):
+            if deadline is not None and time.perf_counter() > deadline:
+                logger.debug(f"Boundary polish stopped after {done} of {len(pairs)} pairs")
+                break
+            route_ids = [i for i, s in enumerate(self.route_sector) if s in (a, b)]
+            waiting = sorted(
+                (i for i, s in self.unassigned.items() if s in (a, b)),
+                key=lambda i: self.priorities[i],
+                reverse=True,
+            )
+            members = [i for r in route_ids for i in self.routes[r]] + waiting
+            if not members:
+                continue
+            local = {hotspot: node + 1 for node, hotspot in enumerate(members)}
+            matrix, durations = self.matrices(members)
+
+            search = LocalSearch(
+                matrix,
+                [[local[i] for i in self.routes[r]] for r in route_ids],
+                limit,
+                self.solver.n_neighbors,
+                durations=durations,
+                time_limit=hours,
+            )
+            # Only moves starting next to the border can gain anything new
+            side = [-1] + [self.route_sector[r] for r in route_ids for _ in self.routes[r]]
+            side += [self.unassigned[i] for i in waiting]
+            border = [
+                node
+                for node in range(1, len(side))
+                if any(side[other] != side[node] for other in search.neighbors[node])
+            ]
+            search.run(deadline, nodes=border)
+            left = set(search.insert([local[i] for i in waiting]))
+            placed = [i for i in waiting if local[i] not in left]
+            if placed:
+                search.run(deadline, nodes=border + [local[i] for i in placed])
+                for i in placed:
+                    del self.unassigned[i]
+
+            for r, route, length in zip(route_ids, search.routes, search.lengths):
+                self.routes[r] = [members[node - 1] for node in route]
+                self.lengths[r] = length
+            if self.timed:
+                for r, hours_used in zip(route_ids, search.times):
+                    self.times[r] = hours_used
+
+    def to_routes(self) -> List[PlannedRoute]:
+        planned = []
+        for route, length, hours in zip(self.routes, self.lengths, self.times):
+            if not route:
+                continue
+            planned.append(
+                PlannedRoute(
+                    officer_id=len(planned),
+                    hotspots=[self.hotspots[i] for i in route],
+                    total_distance=float(length),
+                    estimated_duration=float(
+                        hours if self.timed else length / self.solver.average_speed_kmh
+                    ),
+                    stops=list(route),
+                )
+            )
+        return planned
+
+
+def _sweep_sectors(x: np.ndarray, y: np.ndarray, k: int) -> List[np.ndarray]:
+    """Equal-count wedges by angle around the depot, starting at the widest gap"""
+    angle = np.arctan2(y, x)
+    order = np.argsort(angle, kind='stable')
+    gaps = np.diff(np.concatenate([angle[order], [angle[order[0]] + 2.0 * np.pi]]))
+    order = np.roll(order, -(int(np.argmax(gaps)) + 1))
+    return [np.sort(part) for part in np.array_split(order, k)]
+
+
+def _kmeans_sectors(x: np.ndarray, y: np.ndarray, k: int, seed: int) -> List[np.ndarray]:
+    """k-means sectors with a size cap: points with most to lose choose first"""
+    from sklearn.cluster import KMeans
+
+    points = np.column_stack([x, y])
+    centers = KMeans(n_clusters=k, n_init=3, random_state=seed).fit(points).cluster_centers_
+    dist = np.linalg.norm(points[:, None, :] - centers[None, :, :], axis=2)
+    preference = np.argsort(dist, axis=1)
+    ranked = np.take_along_axis(dist, preference, axis=1)
+    regret = ranked[:, 1] - ranked[:, 0] if k > 1 else np.zeros(len(points))
+
+    capacity = np.full(k, math.ceil(len(points) / k * KMEANS_SLACK))
+    labels = np.empty(len(points), dtype=int)
+    for point in np.argsort(-regret, kind='stable').tolist():
+        for sector in preference[point].tolist():
+            if capacity[sector] > 0:
+                capacity[sector] -= 1
+                labels[point] = sector
+                break
+    return [np.flatnonzero(labels == sector) for sector in range(k) if np.any(labels == sector)]
+
+
+def _apportion(weights: np.ndarray, total: int) -> List[int]:
+    """Largest-remainder split of total into integer shares, at least one each"""
+    shares = np.ones(len(weights), dtype=int)
+    spare = total - len(weights)
+    if spare > 0:
+        # Officers beyond the first one per sector follow the workload
+        quota = np.clip(weights / weights.sum() * total - 1.0, 0.0, None)
+        if quota.sum() > 0:
+            quota *= spare / quota.sum()
+        base = np.floor(quota).astype(int)
+        shares += base
+        leftover = spare - int(base.sum())
+        shares[np.argsort(-(quota - base), kind='stable')[:leftover]] += 1
+    return shares.tolist()
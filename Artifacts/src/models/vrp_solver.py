@@ -0,0 +1,899 @@
+"""
+Savings + Local Search Patrol Route Solver
+
+Multi-officer patrol routing as a distance-constrained VRP:
+
+1. Clarke-Wright savings builds routes by merging depot round trips in
+   order of the distance they save, within the route limit.
+2. If that leaves more routes than officers, the lowest-priority routes
+   are dissolved and their hotspots cheapest-inserted elsewhere; hotspots
+   that do not fit are retried after local search has shortened routes.
+3. Local search improves the solution with 2-opt, Or-opt (segment
+   relocation), inter-route relocate/exchange and 2-opt* moves. Moves are
+   only evaluated between a hotspot and its k nearest neighbours, so a
+   pass costs O(N * k) rather than O(N^2).
+
+Every route respects ``max_route_distance_km`` and the shift length at the
+average patrol speed. With ``time_limit_ms`` the search stops when the
+budget runs out and returns the best solution found so far (local search
+only accepts improving moves, so the current solution is the best one).
+
+With ``n_starts > 1`` several randomized constructions (perturbed savings,
+shuffled search order) run and the best solution wins; with ``n_jobs > 1``
+they run in the process pool every solver shares (see worker_pool). Workers
+read the distance matrix from shared memory instead of receiving a pickled
+copy each.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.models.distance_matrix import DistanceMatrixCache
+
+logger = logging.getLogger(__name__)
+
+# Minimum gain (km) for a move to count as an improvement
+IMPROVEMENT_EPS = 1e-7
+
+# Worker processes in the pool shared by every solver (and so every request)
+MAX_POOL_WORKERS = os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def worker_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by all solvers, started on first use
+
+    Workers start from a forkserver (spawn where that is unavailable), never
+    by forking the caller, which inside the API is a multithreaded server.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                'forkserver' if 'forkserver' in methods else 'spawn'
+            )
+            _pool = ProcessPoolExecutor(max_workers=MAX_POOL_WORKERS, mp_context=context)
+        return _pool
+
+
+@dataclass
+class PlannedRoute:
+    """Patrol route produced by the solver (same fields as PatrolRoute)"""
+
+    officer_id: int
+    hotspots: List
+    total_distance: float
+    estimated_duration: float
+    stops: List[int] = field(default_factory=list)  # Indices into the input hotspot list
+
+
+class SavingsRouteSolver:
+    """Clarke-Wright savings construction followed by neighbourhood local search"""
+
+    def __init__(
+        self,
+        max_route_distance_km: float = 50.0,
+        max_shift_hours: float = 8.0,
+        average_speed_kmh: float = 30.0,
+        n_neighbors: int = 12,
+        distance_cache: Optional[DistanceMatrixCache] = None,
+        n_starts: int = 1,
+        n_jobs: Optional[int] = None,
+        noise: float = 0.05,
+        seed: int = 42,
+    ):
+        """
+        Initialize solver
+
+        Args:
+            max_route_distance_km: Maximum length of one officer's route
+            max_shift_hours: Maximum patrol time per officer
+            average_speed_kmh: Average patrol speed used for durations
+            n_neighbors: Size of the candidate list per hotspot
+            distance_cache: Distance matrix cache (a private one if omitted)
+            n_starts: Number of constructions; start 0 is the deterministic one
+            n_jobs: Worker processes for multi-start (default 1 runs inline; more use
+                the shared worker_pool, at most MAX_POOL_WORKERS)
+            noise: Relative per-pair perturbation of the savings in randomized starts
+            seed: Base seed; start i uses (seed, i) so results do not depend on n_jobs
+        """
+        self.max_route_distance_km = max_route_distance_km
+        self.max_shift_hours = max_shift_hours
+        self.average_speed_kmh = average_speed_kmh
+        self.n_neighbors = n_neighbors
+        self.distance_cache = distance_cache or DistanceMatrixCache()
+        self.n_starts = n_starts
+        self.n_jobs = min(n_jobs or 1, MAX_POOL_WORKERS)
+        self.noise = noise
+        self.seed = seed
+        self.unassigned_: List = []
+
+    @property
+    def route_limit_km(self) -> float:
+        """Binding route length: distance cap or shift length at patrol speed"""
+        return min(self.max_route_distance_km, self.max_shift_hours * self.average_speed_kmh)
+
+    def limits(self, timed: bool) -> Tuple[float, float]:
+        """
+        Route limits as (km, hours)
+
+        Without a travel-time matrix the shift length is converted to
+        kilometres at the average speed and the hours limit is unbounded.
+        """
+        if timed:
+            return self.max_route_distance_km, self.max_shift_hours
+        return self.route_limit_km, np.inf
+
+    def solve(
+        self,
+        hotspots: Sequence,
+        num_officers: int,
+        depot_lat: float,
+        depot_lon: float,
+        time_limit_ms: Optional[float] = None,
+    ) -> List[PlannedRoute]:
+        """
+        Plan patrol routes covering the hotspots
+
+        Args:
+            hotspots: Hotspot objects (center_lat/center_lon/priority)
+            num_officers: Maximum number of routes
+            depot_lat: Depot latitude
+            depot_lon: Depot longitude
+            time_limit_ms: Wall-clock budget; the best solution so far is returned
+
+        Returns:
+            List of non-empty routes. Hotspots that cannot be served within
+            the limits are left in ``unassigned_``.
+        """
+        start = time.perf_counter()
+        deadline = None if time_limit_ms is None else start + time_limit_ms / 1000.0
+        self.unassigned_ = []
+        if not hotspots or num_officers < 1:
+            self.unassigned_ = list(hotspots)
+            return []
+
+        # Travel times from a road network replace distance / average speed
+        matrix, durations = self.distance_cache.get_matrices(hotspots, depot_lat, depot_lon)
+        priorities = [float(getattr(h, 'priority', 1.0)) for h in hotspots]
+        budget = None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+
+        if self.n_starts > 1:
+            _, length, routes, unassigned = self._multi_start(
+                matrix, durations, num_officers, priorities, budget
+            )
+        else:
+            _, length, routes, unassigned = _run_start(
+                matrix, durations, self.settings(), num_officers, priorities, 0, budget
+            )
+
+        self.unassigned_ = [hotspots[node - 1] for node in unassigned]
+        planned = self._to_routes(hotspots, matrix, routes, durations)
+        logger.info(
+            f"Planned {len(planned)} routes over {len(hotspots) - len(unassigned)} hotspots "
+            f"({length:.1f} km) in {time.perf_counter() - start:.3f}s"
+        )
+        return planned
+
+    def settings(self) -> Dict[str, Any]:
+        """Constructor arguments needed to rebuild the solver in a worker"""
+        return {
+            'max_route_distance_km': self.max_route_distance_km,
+            'max_shift_hours': self.max_shift_hours,
+            'average_speed_kmh': self.average_speed_kmh,
+            'n_neighbors': self.n_neighbors,
+            'noise': self.noise,
+            'seed': self.seed,
+        }
+
+    def _multi_start(
+        self,
+        matrix: np.ndarray,
+        durations: Optional[np.ndarray],
+        num_officers: int,
+        priorities: List[float],
+        budget: Optional[float],
+    ) -> Tuple[int, float, List[List[int]], List[int]]:
+        """Run every start (in parallel when n_jobs > 1) and keep the best"""
+        workers = min(self.n_jobs, self.n_starts)
+        if budget is not None:
+            # Starts beyond the pool size queue behind the first wave
+            budget /= math.ceil(self.n_starts / workers)
+        args = (self.settings(), num_officers, priorities)
+
+        if workers == 1:
+            results = [
+                _run_start(matrix, durations, *args, index, budget)
+                for index in range(self.n_starts)
+            ]
+        else:
+            blocks = [_share(matrix)] + ([_share(durations)] if durations is not None else [])
+            try:
+                specs = [(shm.name, array.shape, array.dtype.str) for shm, array in blocks]
+                if durations is None:
+                    specs.append(None)
+                pool = worker_pool()
+                futures = [
+                    pool.submit(_run_shared_start, *specs, *args, index, budget)
+                    for index in range(self.n_starts)
+                ]
+                results = [future.result() for future in futures]
+            finally:
+                for shm, _ in blocks:
+                    shm.close()
+                    shm.unlink()
+
+        # Serve the most hotspots first, then the shortest total distance
+        best = min(range(len(results)), key=lambda i: (results[i][0], results[i][1], i))
+        logger.debug(
+            f"Multi-start: best of {len(results)} is start {best} "
+            f"({results[best][1]:.1f} km vs {results[0][1]:.1f} km deterministic)"
+        )
+        return results[best]
+
+    def construct(
+        self,
+        matrix: np.ndarray,
+        num_officers: int,
+        priorities: Sequence[float],
+        rng: Optional[np.random.Generator] = None,
+        durations: Optional[np.ndarray] = None,
+    ) -> Tuple[List[List[int]], List[int]]:
+        """
+        Savings construction and fleet-size repair
+
+        Args:
+            matrix: Depot-first distance matrix
+            num_officers: Maximum number of routes
+            priorities: Hotspot priorities (used when hotspots must be dropped)
+            rng: Random generator for perturbed savings (deterministic if omitted)
+            durations: Depot-first travel-time matrix in hours (optional)
+
+        Returns:
+            Tuple of (routes as lists of node indices, unassigned node indices)
+        """
+        limit, hours = self.limits(durations is not None)
+        n = matrix.shape[0] - 1
+        round_trip = np.asarray(matrix[0], dtype=float) + np.asarray(matrix[:, 0], dtype=float)
+        feasible = round_trip <= limit
+        if durations is not None:
+            feasible &= np.asarray(durations[0] + durations[:, 0], dtype=float) <= hours
+        reachable = [node for node in range(1, n + 1) if feasible[node]]
+        unassigned = sorted(set(range(1, n + 1)) - set(reachable))
+
+        routes = self._savings(matrix, reachable, limit, rng, durations, hours)
+        if len(routes) > num_officers:
+            routes, dropped = self._fit_fleet(
+                matrix, routes, num_officers, priorities, limit, durations, hours
+            )
+            unassigned.extend(dropped)
+        return routes, sorted(unassigned)
+
+    def _savings(
+        self,
+        matrix: np.ndarray,
+        nodes: List[int],
+        limit: float,
+        rng: Optional[np.random.Generator] = None,
+        durations: Optional[np.ndarray] = None,
+        hours: float = np.inf,
+    ) -> List[List[int]]:
+        """Clarke-Wright parallel savings over candidate pairs"""
+        if not nodes:
+            return []
+        nodes_arr = np.asarray(nodes)
+        sub = np.asarray(matrix[np.ix_(nodes_arr, nodes_arr)], dtype=float)
+        k = min(max(self.n_neighbors * 2, 20), len(nodes) - 1)
+        if k <= 0:
+            return [[node] for node in nodes]
+        np.fill_diagonal(sub, np.inf)
+        nearest = np.argpartition(sub, k - 1, axis=1)[:, :k]
+        np.fill_diagonal(sub, 0.0)
+
+        rows = np.repeat(np.arange(len(nodes)), k)
+        pairs = np.unique(np.sort(np.column_stack([rows, nearest.ravel()]), axis=1), axis=0)
+
+        i, j = nodes_arr[pairs[:, 0]], nodes_arr[pairs[:, 1]]
+        depot = np.asarray(matrix[0], dtype=float)
+        link = sub[pairs[:, 0], pairs[:, 1]]
+        saving = depot[i] + depot[j] - link
+        order_key = saving
+        if rng is not None:
+            # Randomized start: random route-shape parameter plus per-pair noise
+            shape = rng.uniform(0.6, 1.8)
+            order_key = depot[i] + depot[j] - shape * link
+            order_key *= 1.0 + self.noise * rng.uniform(-1.0, 1.0, len(saving))
+        order = np.argsort(-order_key, kind='stable')
+
+        route_of = {node: idx for idx, node in enumerate(nodes)}
+        routes: Dict[int, List[int]] = {idx: [node] for idx, node in enumerate(nodes)}
+        lengths = {idx: 2.0 * depot[node] for idx, node in enumerate(nodes)}
+        if durations is not None:
+            times = {idx: 2.0 * float(durations[0, node]) for idx, node in enumerate(nodes)}
+
+        for a, b, s in zip(i[order].tolist(), j[order].tolist(), saving[order].tolist()):
+            if s <= 0:
+                continue
+            ra, rb = route_of[a], route_of[b]
+            if ra == rb:
+                continue
+            route_a, route_b = routes[ra], routes[rb]
+            if a not in (route_a[0], route_a[-1]) or b not in (route_b[0], route_b[-1]):
+                continue
+            merged_length = lengths[ra] + lengths[rb] - (depot[a] + depot[b] - matrix[a, b])
+            if merged_length > limit:
+                continue
+            if durations is not None:
+                merged_time = (
+                    times[ra] + times[rb] - durations[0, a] - durations[0, b] + durations[a, b]
+                )
+                if merged_time > hours:
+                    continue
+
+            # Orient so that a ends route_a and b starts route_b
+            if route_a[-1] != a:
+                route_a.reverse()
+            if route_b[0] != b:
+                route_b.reverse()
+            if len(route_a) < len(route_b):
+                route_b[:0] = route_a
+                keep_id, drop_id, moved = rb, ra, route_a
+            else:
+                route_a.extend(route_b)
+                keep_id, drop_id, moved = ra, rb, route_b
+            for node in moved:
+                route_of[node] = keep_id
+            lengths[keep_id] = float(merged_length)
+            del routes[drop_id], lengths[drop_id]
+            if durations is not None:
+                times[keep_id] = float(merged_time)
+                del times[drop_id]
+
+        return list(routes.values())
+
+    def _fit_fleet(
+        self,
+        matrix: np.ndarray,
+        routes: List[List[int]],
+        num_officers: int,
+        priorities: Sequence[float],
+        limit: float,
+        durations: Optional[np.ndarray] = None,
+        hours: float = np.inf,
+    ) -> Tuple[List[List[int]], List[int]]:
+        """Dissolve the lowest-priority routes until there is one per officer"""
+
+        def weight(route):
+            return sum(priorities[node - 1] for node in route)
+
+        routes = sorted(routes, key=weight, reverse=True)
+        kept, dissolved = routes[:num_officers], routes[num_officers:]
+        lengths = [route_length(matrix, route) for route in kept]
+        times = None
+        if durations is not None:
+            times = [route_length(durations, route) for route in kept]
+
+        orphans = sorted(
+            (node for route in dissolved for node in route),
+            key=lambda node: priorities[node - 1],
+            reverse=True,
+        )
+        dropped = []
+        for node in orphans:
+            best = cheapest_insertion(matrix, kept, lengths, node, limit, durations, times, hours)
+            if best is None:
+                dropped.append(node)
+                continue
+            cost, idx, pos = best
+            kept[idx].insert(pos, node)
+            lengths[idx] += cost
+            if times is not None:
+                times[idx] = route_length(durations, kept[idx])
+        return kept, dropped
+
+    def _to_routes(
+        self,
+        hotspots: Sequence,
+        matrix: np.ndarray,
+        routes: List[List[int]],
+        durations: Optional[np.ndarray] = None,
+    ) -> List[PlannedRoute]:
+        planned = []
+        for route in routes:
+            if not route:
+                continue
+            length = route_length(matrix, route)
+            if durations is not None:
+                duration = route_length(durations, route)
+            else:
+                duration = length / self.average_speed_kmh
+            planned.append(
+                PlannedRoute(
+                    officer_id=len(planned),
+                    hotspots=[hotspots[node - 1] for node in route],
+                    total_distance=float(length),
+                    estimated_duration=float(duration),
+                    stops=[node - 1 for node in route],
+                )
+            )
+        return planned
+
+
+def _run_start(
+    matrix: np.ndarray,
+    durations: Optional[np.ndarray],
+    settings: Dict[str, Any],
+    num_officers: int,
+    priorities: List[float],
+    index: int,
+    budget: Optional[float],
+) -> Tuple[int, float, List[List[int]], List[int]]:
+    """
+    One construction + local search run
+
+    Returns:
+        Tuple of (unassigned count, total length, routes, unassigned nodes)
+    """
+    deadline = None if budget is None else time.perf_counter() + budget
+    solver = SavingsRouteSolver(**settings)
+    rng = np.random.default_rng([solver.seed, index]) if index > 0 else None
+    routes, unassigned = solver.construct(
+        matrix, num_officers, priorities, rng=rng, durations=durations
+    )
+    routes.extend([] for _ in range(num_officers - len(routes)))
+
+    limit, hours = solver.limits(durations is not None)
+    search = LocalSearch(
+        matrix,
+        routes,
+        limit,
+        solver.n_neighbors,
+        rng=rng,
+        durations=durations,
+        time_limit=hours,
+    )
+    search.run(deadline)
+    # Shorter routes may now have room for hotspots the construction dropped
+    unassigned.sort(key=lambda node: priorities[node - 1], reverse=True)
+    while unassigned and (deadline is None or time.perf_counter() < deadline):
+        remaining = search.insert(unassigned)
+        if len(remaining) == len(unassigned):
+            break
+        unassigned = remaining
+        search.run(deadline)
+    return len(unassigned), search.total_length(), search.routes, sorted(unassigned)
+
+
+def _share(array: np.ndarray) -> Tuple[SharedMemory, np.ndarray]:
+    """Copy an array into a new shared memory block"""
+    shm = SharedMemory(create=True, size=array.nbytes)
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[:] = array
+    del shared
+    return shm, array
+
+
+def _run_shared_start(matrix_spec: Tuple, durations_spec: Optional[Tuple], *args):
+    """Worker entry point: attach to the shared matrices and run one start"""
+    blocks = [SharedMemory(name=spec[0]) for spec in (matrix_spec, durations_spec) if spec]
+    try:
+        arrays = [
+            np.ndarray(spec[1], dtype=spec[2], buffer=shm.buf)
+            for shm, spec in zip(blocks, (matrix_spec, durations_spec))
+        ]
+        result = _run_start(arrays[0], arrays[1] if len(arrays) > 1 else None, *args)
+        del arrays
+        return result
+    finally:
+        for shm in blocks:
+            shm.close()
+
+
+def cheapest_insertion(
+    matrix: np.ndarray,
+    routes: List[List[int]],
+    lengths: List[float],
+    node: int,
+    limit: float,
+    durations: Optional[np.ndarray] = None,
+    times: Optional[List[float]] = None,
+    time_limit: float = np.inf,
+) -> Optional[Tuple[float, int, int]]:
+    """
+    Cheapest position for a node across all routes within the limits
+
+    Returns:
+        Tuple of (added length, route index, position) or None if nothing fits
+    """
+    best = None
+    for idx, route in enumerate(routes):
+        seq = np.asarray([0] + route + [0])
+        cost = matrix[seq[:-1], node] + matrix[node, seq[1:]] - matrix[seq[:-1], seq[1:]]
+        feasible = lengths[idx] + cost <= limit
+        if durations is not None:
+            extra = (
+                durations[seq[:-1], node] + durations[node, seq[1:]] - durations[seq[:-1], seq[1:]]
+            )
+            feasible &= times[idx] + extra <= time_limit
+        if not feasible.any():
+            continue
+        pos = int(np.argmin(np.where(feasible, cost, np.inf)))
+        if best is None or cost[pos] < best[0]:
+            best = (float(cost[pos]), idx, pos)
+    return best
+
+
+def route_length(matrix, route: Sequence[int]) -> float:
+    """Length of a depot -> route -> depot tour"""
+    if len(route) == 0:
+        return 0.0
+    seq = np.asarray(route)
+    return float(
+        matrix[0, seq[0]] + matrix[seq[:-1], seq[1:]].sum(dtype=float) + matrix[seq[-1], 0]
+    )
+
+
+class LocalSearch:
+    """First-improvement local search over k-nearest-neighbour candidate moves"""
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        routes: List[List[int]],
+        limit: float,
+        n_neighbors: int = 12,
+        rng: Optional[np.random.Generator] = None,
+        nodes: Optional[Sequence[int]] = None,
+        durations: Optional[np.ndarray] = None,
+        time_limit: float = np.inf,
+    ):
+        """
+        Initialize search state
+
+        Args:
+            matrix: Depot-first distance matrix
+            routes: Initial routes (node indices, depot excluded); modified in place
+            limit: Maximum route length in kilometres
+            n_neighbors: Candidate list size per node
+            rng: Random generator used to shuffle the search order
+            nodes: Hotspot nodes in use (all matrix rows after the depot if omitted)
+            durations: Travel-time matrix in hours, checked against time_limit
+            time_limit: Maximum route duration in hours
+        """
+        self.routes = routes
+        self.limit = limit
+        self.rng = rng
+        self.n_neighbors = n_neighbors
+        self.durations = durations
+        self.time_limit = time_limit
+        self.rebind(matrix)
+        self.lengths = [route_length(matrix, route) for route in routes]
+        self.times = None
+        if durations is not None:
+            self.times = [route_length(durations, route) for route in routes]
+
+        n = matrix.shape[0]
+        self.route_of = [-1] * n
+        self.pos = [-1] * n
+        for idx in range(len(routes)):
+            self._index(idx)
+        if nodes is None:
+            nodes = range(1, n)
+        self.neighbors = self._candidate_lists(np.asarray(nodes, dtype=int), n_neighbors)
+        self.moves = 0
+
+    def rebind(self, matrix: np.ndarray, durations: Optional[np.ndarray] = None):
+        """Point the search at a (possibly reallocated) distance and travel-time matrix"""
+        self.matrix = matrix
+        if durations is not None:
+            self.durations = durations
+        # Zero-copy row views: scalar lookups as fast as nested lists
+        flat = memoryview(np.ascontiguousarray(matrix).reshape(-1))
+        n = matrix.shape[0]
+        self.d = [flat[row * n : (row + 1) * n] for row in range(n)]
+        if hasattr(self, 'route_of') and len(self.route_of) < n:
+            self.route_of.extend([-1] * (n - len(self.route_of)))
+            self.pos.extend([-1] * (n - len(self.pos)))
+            self.neighbors.extend([] for _ in range(n - len(self.neighbors)))
+
+    def _candidate_lists(self, nodes: np.ndarray, k: int) -> List[List[int]]:
+        """k nearest hotspot nodes for every node"""
+        neighbors = [[] for _ in range(len(self.route_of))]
+        if len(nodes) < 2:
+            return neighbors
+        k = min(k, len(nodes) - 1)
+        sub = np.asarray(self.matrix[np.ix_(nodes, nodes)], dtype=float)
+        np.fill_diagonal(sub, np.inf)
+        nearest = np.argpartition(sub, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(sub, nearest, axis=1).argsort(axis=1)
+        nearest = nodes[np.take_along_axis(nearest, order, axis=1)]
+        for node, row in zip(nodes.tolist(), nearest.tolist()):
+            neighbors[node] = row
+        return neighbors
+
+    def _index(self, idx: int):
+        for pos, node in enumerate(self.routes[idx]):
+            self.route_of[node] = idx
+            self.pos[node] = pos
+
+    def total_length(self) -> float:
+        return float(sum(self.lengths))
+
+    def add_candidates(self, node: int, pool: Sequence[int]):
+        """Give a new node a candidate list and add it to its neighbours' lists"""
+        pool = np.asarray([other for other in pool if other != node], dtype=int)
+        if len(pool) == 0:
+            return
+        k = min(self.n_neighbors, len(pool))
+        dist = self.matrix[node, pool]
+        nearest = pool[np.argsort(dist, kind='stable')[:k]].tolist()
+        self.neighbors[node] = nearest
+        for other in nearest:
+            self.neighbors[other].append(node)
+
+    def remove(self, node: int) -> int:
+        """
+        Take a node out of its route
+
+        Returns:
+            Index of the route it was in
+        """
+        idx = self.route_of[node]
+        del self.routes[idx][self.pos[node]]
+        self._measure(idx)
+        self._index(idx)
+        self.route_of[node] = self.pos[node] = -1
+        return idx
+
+    def drop_route(self, idx: int) -> List[int]:
+        """
+        Delete a route entirely
+
+        Returns:
+            The nodes it served (now unrouted)
+        """
+        nodes = self.routes.pop(idx)
+        del self.lengths[idx]
+        if self.times is not None:
+            del self.times[idx]
+        for node in nodes:
+            self.route_of[node] = self.pos[node] = -1
+        for later in range(idx, len(self.routes)):
+            self._index(later)
+        return nodes
+
+    def refresh_lengths(self):
+        """Recompute every route length (after distances changed)"""
+        self.lengths = [route_length(self.matrix, route) for route in self.routes]
+        if self.times is not None:
+            self.times = [route_length(self.durations, route) for route in self.routes]
+
+    def _measure(self, idx: int):
+        self.lengths[idx] = route_length(self.matrix, self.routes[idx])
+        if self.times is not None:
+            self.times[idx] = route_length(self.durations, self.routes[idx])
+
+    def insert(self, nodes: Sequence[int]) -> List[int]:
+        """
+        Cheapest-insert unrouted nodes in the given order
+
+        Returns:
+            Nodes that fit nowhere within the route limits
+        """
+        remaining = []
+        for node in nodes:
+            best = cheapest_insertion(
+                self.matrix,
+                self.routes,
+                self.lengths,
+                node,
+                self.limit,
+                self.durations,
+                self.times,
+                self.time_limit,
+            )
+            if best is None:
+                remaining.append(node)
+                continue
+            _, idx, pos = best
+            self.insert_at(node, idx, pos)
+        return remaining
+
+    def insert_at(self, node: int, idx: int, pos: int):
+        """Put an unrouted node into route idx at position pos (no limit check)"""
+        self.routes[idx].insert(pos, node)
+        self._measure(idx)
+        self._index(idx)
+
+    def run(self, deadline: Optional[float] = None, nodes: Optional[Sequence[int]] = None) -> int:
+        """
+        Apply improving moves until none is left or the deadline passes
+
+        Args:
+            deadline: time.perf_counter() value at which to stop
+            nodes: Restrict the search to moves starting at these nodes
+
+        Returns:
+            Number of moves applied
+        """
+        active = list(range(len(self.route_of))) if nodes is None else list(nodes)
+        if self.rng is not None:
+            self.rng.shuffle(active)
+        improved = True
+        while improved:
+            improved = False
+            for node in active:
+                if deadline is not None and time.perf_counter() > deadline:
+                    return self.moves
+                if self.route_of[node] >= 0 and self._improve(node):
+                    improved = True
+        return self.moves
+
+    def _prev(self, node: int) -> int:
+        pos = self.pos[node]
+        return self.routes[self.route_of[node]][pos - 1] if pos > 0 else 0
+
+    def _next(self, node: int) -> int:
+        route = self.routes[self.route_of[node]]
+        pos = self.pos[node]
+        return route[pos + 1] if pos + 1 < len(route) else 0
+
+    def _commit(self, changes: Dict[int, List[int]]) -> bool:
+        """Apply new route lists if they shorten the total and respect the limits"""
+        new_lengths = {idx: route_length(self.matrix, route) for idx, route in changes.items()}
+        if any(length > self.limit for length in new_lengths.values()):
+            return False
+        gain = sum(self.lengths[idx] - new_lengths[idx] for idx in changes)
+        if gain <= IMPROVEMENT_EPS:
+            return False
+        if self.times is not None:
+            new_times = {
+                idx: route_length(self.durations, route) for idx, route in changes.items()
+            }
+            if any(hours > self.time_limit for hours in new_times.values()):
+                return False
+            for idx, hours in new_times.items():
+                self.times[idx] = hours
+        for idx, route in changes.items():
+            self.routes[idx] = route
+            self.lengths[idx] = new_lengths[idx]
+            self._index(idx)
+        self.moves += 1
+        return True
+
+    def _improve(self, u: int) -> bool:
+        for v in self.neighbors[u]:
+            if self.route_of[v] < 0:
+                continue
+            if self.route_of[u] == self.route_of[v]:
+                if self._two_opt(u, v) or self._relocate(u, v):
+                    return True
+            elif self._relocate(u, v) or self._exchange(u, v) or self._two_opt_star(u, v):
+                return True
+        return False
+
+    def _two_opt(self, u: int, v: int) -> bool:
+        """Reverse the path between u and v so that u links to v"""
+        d = self.d
+        if self.pos[u] > self.pos[v]:
+            u, v = v, u
+        nu, nv = self._next(u), self._next(v)
+        if nu == v:
+            return False
+        if d[u][v] + d[nu][nv] - d[u][nu] - d[v][nv] >= -IMPROVEMENT_EPS:
+            return False
+        idx = self.route_of[u]
+        route = self.routes[idx]
+        i, j = self.pos[u], self.pos[v]
+        return self._commit({idx: route[: i + 1] + route[i + 1 : j + 1][::-1] + route[j + 1 :]})
+
+    def _relocate(self, u: int, v: int) -> bool:
+        """Move a segment of 1-3 nodes starting at u next to v (Or-opt / relocate)"""
+        d = self.d
+        ru, rv = self.route_of[u], self.route_of[v]
+        route = self.routes[ru]
+        i = self.pos[u]
+        p = self._prev(u)
+        for size in (1, 2, 3):
+            if i + size > len(route):
+                break
+            segment = route[i : i + size]
+            if v in segment:
+                break
+            s0, s1 = segment[0], segment[-1]
+            nxt = route[i + size] if i + size < len(route) else 0
+            removal = d[p][s0] + d[s1][nxt] - d[p][nxt]
+            for a, b in ((v, self._next(v)), (self._prev(v), v)):
+                if ru == rv and (a in segment or b in segment or a == p and b == s0):
+                    continue
+                forward = d[a][s0] + d[s1][b] - d[a][b]
+                backward = d[a][s1] + d[s0][b] - d[a][b]
+                insert = min(forward, backward)
+                if insert - removal >= -IMPROVEMENT_EPS:
+                    continue
+                moved = segment if forward <= backward else segment[::-1]
+                source = route[:i] + route[i + size :]
+                if ru == rv:
+                    target = source
+                else:
+                    target = list(self.routes[rv])
+                at = target.index(a) + 1 if a != 0 else 0
+                target = target[:at] + moved + target[at:]
+                changes = {ru: target} if ru == rv else {ru: source, rv: target}
+                if self._commit(changes):
+                    return True
+        return False
+
+    def _exchange(self, u: int, v: int) -> bool:
+        """Swap u and v between their routes"""
+        d = self.d
+        pu, nu, pv, nv = self._prev(u), self._next(u), self._prev(v), self._next(v)
+        if v in (pu, nu):
+            return False
+        delta = (
+            d[pu][v] + d[v][nu] - d[pu][u] - d[u][nu] + d[pv][u] + d[u][nv] - d[pv][v] - d[v][nv]
+        )
+        if delta >= -IMPROVEMENT_EPS:
+            return False
+        ru, rv = self.route_of[u], self.route_of[v]
+        route_u, route_v = list(self.routes[ru]), list(self.routes[rv])
+        route_u[self.pos[u]], route_v[self.pos[v]] = v, u
+        return self._commit({ru: route_u, rv: route_v})
+
+    def _two_opt_star(self, u: int, v: int) -> bool:
+        """Exchange route tails so that u links to v (or to v's successor)"""
+        d = self.d
+        ru, rv = self.route_of[u], self.route_of[v]
+        a, b = self.routes[ru], self.routes[rv]
+        i, j = self.pos[u], self.pos[v]
+        nu, nv = self._next(u), self._next(v)
+
+        # u -> v: head of a joined to the reversed head of b, tails joined likewise
+        if d[u][v] + d[nu][nv] - d[u][nu] - d[v][nv] < -IMPROVEMENT_EPS:
+            if self._commit({ru: a[: i + 1] + b[: j + 1][::-1], rv: a[i + 1 :][::-1] + b[j + 1 :]}):
+                return True
+        # u -> v by a plain tail swap; prev(v) takes over u's tail
+        pv = self._prev(v)
+        if d[u][v] + d[pv][nu] - d[u][nu] - d[pv][v] < -IMPROVEMENT_EPS:
+            if self._commit({ru: a[: i + 1] + b[j:], rv: b[:j] + a[i + 1 :]}):
+                return True
+        return False
+
+
+if __name__ == "__main__":
+    # Example usage: 400 hotspots, 8 officers, 2-second budget
+    from types import SimpleNamespace
+
+    rng = np.random.default_rng(0)
+    hotspots = [
+        SimpleNamespace(cluster_id=i, center_lat=lat, center_lon=lon, priority=1.0)
+        for i, (lat, lon) in enumerate(
+            zip(rng.uniform(41.80, 41.95, 400), rng.uniform(-87.75, -87.60, 400))
+        )
+    ]
+    solver = SavingsRouteSolver(max_route_distance_km=80.0, average_speed_kmh=30.0)
+    start = time.perf_counter()
+    routes = solver.solve(
+        hotspots, num_officers=8, depot_lat=41.8781, depot_lon=-87.6298, time_limit_ms=2000
+    )
+    print(f"{len(routes)} routes in {time.perf_counter() - start:.2f}s")
+    for route in routes:
+        print(
+            f"Officer {route.officer_id}: {len(route.hotspots)} hotspots, "
+            f"{route.total_distance:.1f} km, {route.estimated_duration:.1f} h"
+        )
+    print(f"Unassigned: {len(solver.unassigned_)}")
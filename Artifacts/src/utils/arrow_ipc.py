@@ -0,0 +1,112 @@
+"""
+Arrow IPC Responses
+
+Content negotiation between JSON and the Arrow IPC stream format for the
+geo endpoints. Arrow responses carry coordinates and properties as typed
+columns, written in bulk from NumPy arrays; response-level fields travel as
+JSON-encoded schema metadata.
+
+pyarrow is optional: without it only JSON is offered.
+"""
+
+from typing import Dict, Mapping, Optional, Tuple
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+
+    HAS_ARROW = True
+except ImportError:
+    pa = None
+    HAS_ARROW = False
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+JSON = "application/json"
+
+
+def _accepted(accept: str) -> Dict[str, float]:
+    """{media range: q} of an Accept header"""
+    ranges = {}
+    for part in accept.split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        if not media:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges[media.lower()] = max(q, ranges.get(media.lower(), 0.0))
+    return ranges
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Response media type for an Accept header
+
+    Arrow is chosen only when it is named explicitly (wildcards keep the
+    JSON default) and ranked at least as high as JSON.
+
+    Args:
+        accept: Accept header value (None when absent)
+
+    Returns:
+        ARROW_STREAM or JSON, or None when Arrow is the only acceptable type
+        but pyarrow is not installed
+    """
+    if not accept:
+        return JSON
+    ranges = _accepted(accept)
+    arrow_q = ranges.get(ARROW_STREAM, 0.0)
+    json_q = max(ranges.get(JSON, 0.0), ranges.get("application/*", 0.0), ranges.get("*/*", 0.0))
+    if arrow_q > 0 and arrow_q >= json_q:
+        if HAS_ARROW:
+            return ARROW_STREAM
+        if json_q == 0:
+            return None
+    return JSON
+
+
+def to_arrow_stream(columns: Mapping[str, np.ndarray], metadata: Optional[Dict] = None) -> bytes:
+    """
+    Serialize columns as one Arrow IPC stream record batch
+
+    Args:
+        columns: {name: 1-D array}, all of the same length
+        metadata: Response-level fields, stored JSON-encoded in the schema
+
+    Returns:
+        Arrow IPC stream bytes
+    """
+    if not HAS_ARROW:
+        raise ImportError("pyarrow is required for Arrow responses")
+    table = pa.table(
+        {name: pa.array(np.asarray(values)) for name, values in columns.items()},
+        metadata={key: json.dumps(value) for key, value in (metadata or {}).items()},
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def read_arrow_stream(data: bytes) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Client side of to_arrow_stream()
+
+    Returns:
+        Tuple of (DataFrame of the columns, decoded metadata)
+    """
+    if not HAS_ARROW:
+        raise ImportError("pyarrow is required to read Arrow responses")
+    table = pa.ipc.open_stream(data).read_all()
+    metadata = {
+        key.decode(): json.loads(value) for key, value in (table.schema.metadata or {}).items()
+    }
+    return table.to_pandas(), metadata
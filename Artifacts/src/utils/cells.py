@@ -0,0 +1,204 @@
+"""
+Hierarchical Spatial Cells
+
+Quadtree cells over a lat/lon square with integer IDs, so predictions,
+incidents and explanations can be joined by cell and rolled up to any
+coarser resolution with an integer groupby:
+
+    df.groupby(cell_to_parent(df['cell'].to_numpy(), 12))
+
+A cell at resolution r is CELL_ROOT_DEG / 2**r degrees on a side, anchored
+at (-90, -180); resolution 15 is the crime map's 0.02 degree (~2 km) grid.
+IDs pack the Z-order code of the cell's (column, row) at its resolution
+above a single marker bit (as in S2), so a parent ID is a bit mask of its
+children's IDs and IDs sort in Z-order. Externally cells are written as
+hex tokens with the trailing zeros stripped.
+
+All functions are vectorized over NumPy arrays of IDs or coordinates.
+"""
+
+from typing import Tuple
+import re
+
+import numpy as np
+
+from src.utils.mvt import morton
+
+MAX_RESOLUTION = 30
+
+# Side of the resolution-0 cell; halving 15 times gives 0.02 degrees
+CELL_ROOT_DEG = 655.36
+ORIGIN_LAT = -90.0
+ORIGIN_LON = -180.0
+
+_TOKEN = re.compile(r'^[0-9a-f]{1,16}$')
+
+
+def cell_size_deg(resolution: int) -> float:
+    """Side of a cell at a resolution, in degrees"""
+    return CELL_ROOT_DEG / 2**resolution
+
+
+def _check_resolution(resolution: int):
+    if not 0 <= resolution <= MAX_RESOLUTION:
+        raise ValueError(f"Resolution must be in [0, {MAX_RESOLUTION}], got {resolution}")
+
+
+def _compact_bits(v: np.ndarray) -> np.ndarray:
+    """Inverse of the Z-order bit spread: even bits of v packed together"""
+    v = v & np.uint64(0x5555555555555555)
+    v = (v | (v >> np.uint64(1))) & np.uint64(0x3333333333333333)
+    v = (v | (v >> np.uint64(2))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v >> np.uint64(4))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v >> np.uint64(8))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v >> np.uint64(16))) & np.uint64(0x00000000FFFFFFFF)
+    return v
+
+
+def _encode(col: np.ndarray, row: np.ndarray, resolution) -> np.ndarray:
+    shift = (2 * (MAX_RESOLUTION - np.asarray(resolution)) + 1).astype(np.uint64)
+    code = morton(col.astype(np.uint64), row.astype(np.uint64))
+    marker = np.uint64(1) << (shift - np.uint64(1))
+    return ((code << shift) | marker).astype(np.int64)
+
+
+def _decode(cells) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(column, row, resolution) of each cell"""
+    cells = np.asarray(cells, dtype=np.int64)
+    resolution = cell_resolution(cells)
+    shift = (2 * (MAX_RESOLUTION - resolution) + 1).astype(np.uint64)
+    code = cells.astype(np.uint64) >> shift
+    return (
+        _compact_bits(code).astype(np.int64),
+        _compact_bits(code >> np.uint64(1)).astype(np.int64),
+        resolution,
+    )
+
+
+def cell_resolution(cells) -> np.ndarray:
+    """Resolution of each cell, read from the position of its marker bit"""
+    cells = np.asarray(cells, dtype=np.int64)
+    lowest = cells & -cells
+    # Powers of two are exact in float64
+    return MAX_RESOLUTION - np.log2(lowest.astype(float)).astype(np.int64) // 2
+
+
+def is_valid_cell(cells) -> np.ndarray:
+    """Whether each integer is a well-formed cell ID"""
+    cells = np.asarray(cells, dtype=np.int64)
+    lowest = cells & -cells
+    bit = np.log2(np.where(cells > 0, lowest, 1).astype(float)).astype(np.int64)
+    # The code above the marker never reaches bit 2 * MAX_RESOLUTION + 1
+    in_range = (cells > 0) & (cells < np.int64(1) << np.int64(2 * MAX_RESOLUTION + 1))
+    return in_range & (bit % 2 == 0) & (bit <= 2 * MAX_RESOLUTION)
+
+
+def latlng_to_cell(lat, lon, resolution: int) -> np.ndarray:
+    """
+    Cell containing each point
+
+    Args:
+        lat, lon: Coordinates in degrees
+        resolution: Cell resolution in [0, MAX_RESOLUTION]
+
+    Returns:
+        int64 cell IDs
+    """
+    _check_resolution(resolution)
+    size = cell_size_deg(resolution)
+    limit = 2**resolution - 1
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    if not (np.isfinite(lat).all() and np.isfinite(lon).all()):
+        raise ValueError("Coordinates must be finite")
+    col = np.clip(np.floor((lon - ORIGIN_LON) / size), 0, limit).astype(np.int64)
+    row = np.clip(np.floor((lat - ORIGIN_LAT) / size), 0, limit).astype(np.int64)
+    return _encode(col, row, resolution)
+
+
+def cell_to_latlng(cells) -> Tuple[np.ndarray, np.ndarray]:
+    """(lat, lon) of each cell's centre"""
+    col, row, resolution = _decode(cells)
+    size = CELL_ROOT_DEG / 2.0**resolution
+    return ORIGIN_LAT + (row + 0.5) * size, ORIGIN_LON + (col + 0.5) * size
+
+
+def cell_to_boundary(cells) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(south, west, north, east) of each cell in degrees"""
+    col, row, resolution = _decode(cells)
+    size = CELL_ROOT_DEG / 2.0**resolution
+    south = ORIGIN_LAT + row * size
+    west = ORIGIN_LON + col * size
+    return south, west, south + size, west + size
+
+
+def cell_to_parent(cells, resolution: int) -> np.ndarray:
+    """
+    Ancestor of each cell at a coarser resolution
+
+    Raises:
+        ValueError: If any cell is coarser than ``resolution``
+    """
+    _check_resolution(resolution)
+    cells = np.asarray(cells, dtype=np.int64)
+    if (cell_resolution(cells) < resolution).any():
+        raise ValueError(f"Cells are coarser than resolution {resolution}")
+    marker = np.int64(1) << np.int64(2 * (MAX_RESOLUTION - resolution))
+    return (cells & -(marker << np.int64(1))) | marker
+
+
+def cell_to_children(cells) -> np.ndarray:
+    """(n, 4) children of each cell one resolution finer, in Z-order"""
+    cells = np.asarray(cells, dtype=np.int64).ravel()
+    resolution = cell_resolution(cells)
+    if (resolution >= MAX_RESOLUTION).any():
+        raise ValueError(f"Cells at resolution {MAX_RESOLUTION} have no children")
+    lowest = cells & -cells
+    child_marker = lowest >> np.int64(2)
+    # Clear the parent's marker and set each child's quadrant above the new one
+    base = cells - lowest
+    quadrant = np.arange(4, dtype=np.int64)
+    return base[:, None] + (2 * quadrant[None, :] + 1) * child_marker[:, None]
+
+
+def grid_disk(cells, k: int) -> np.ndarray:
+    """
+    Cells within k steps (including diagonal steps) of each cell
+
+    Returns:
+        (n, (2k + 1)**2) array, row-major from the south-west corner; cells
+        that would fall off the grid are -1
+    """
+    if k < 0:
+        raise ValueError("k must be non-negative")
+    col, row, resolution = _decode(np.asarray(cells, dtype=np.int64).ravel())
+    offsets = np.arange(-k, k + 1)
+    d_row, d_col = np.meshgrid(offsets, offsets, indexing='ij')
+    rows = row[:, None] + d_row.ravel()[None, :]
+    cols = col[:, None] + d_col.ravel()[None, :]
+    limit = (np.int64(1) << resolution)[:, None]
+    inside = (rows >= 0) & (rows < limit) & (cols >= 0) & (cols < limit)
+    res = np.broadcast_to(resolution[:, None], rows.shape)
+    ids = _encode(np.where(inside, cols, 0), np.where(inside, rows, 0), res)
+    return np.where(inside, ids, -1)
+
+
+def cell_to_token(cell: int) -> str:
+    """Compact hex form of a cell ID"""
+    return format(int(cell), '016x').rstrip('0')
+
+
+def token_to_cell(token: str) -> int:
+    """
+    Cell ID of a hex token
+
+    Raises:
+        ValueError: If the token is not a valid cell
+    """
+    token = token.strip().lower()
+    if not _TOKEN.match(token):
+        raise ValueError(f"Invalid cell token: {token!r}")
+    cell = int(token.ljust(16, '0'), 16)
+    if cell >= 2**63 or not is_valid_cell(cell):
+        raise ValueError(f"Invalid cell token: {token!r}")
+    return cell
@@ -0,0 +1,109 @@
+"""
+Geospatial Helpers
+
+Vectorized distance, projection and area helpers shared by the hotspot and
+routing modules. All functions accept scalars or NumPy arrays.
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Floor used for clusters whose points are collinear or too few for a hull
+MIN_CLUSTER_AREA_KM2 = 0.01
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Great-circle distance between points, broadcasting over array inputs
+
+    Args:
+        lat1, lon1: Origin coordinates in degrees
+        lat2, lon2: Destination coordinates in degrees
+
+    Returns:
+        Distances in kilometres
+    """
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def to_local_km(
+    lat,
+    lon,
+    origin_lat: Optional[float] = None,
+    origin_lon: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Project coordinates onto a local equirectangular plane in kilometres
+
+    Accurate to well under 1% across a city-sized extent, which is all the
+    grid and clustering code needs.
+
+    Args:
+        lat, lon: Coordinates in degrees
+        origin_lat, origin_lon: Projection origin (defaults to the data mean)
+
+    Returns:
+        Tuple of (x_km, y_km) arrays
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    if origin_lat is None:
+        origin_lat = float(np.mean(lat)) if lat.size else 0.0
+    if origin_lon is None:
+        origin_lon = float(np.mean(lon)) if lon.size else 0.0
+
+    km_per_deg = np.pi * EARTH_RADIUS_KM / 180.0
+    x = (lon - origin_lon) * km_per_deg * np.cos(np.radians(origin_lat))
+    y = (lat - origin_lat) * km_per_deg
+    return x, y
+
+
+def km_to_degrees(distance_km: float, latitude: float) -> Tuple[float, float]:
+    """
+    Convert a distance in kilometres to (lat_degrees, lon_degrees) spans
+
+    Args:
+        distance_km: Distance in kilometres
+        latitude: Latitude at which the longitude span is measured
+
+    Returns:
+        Tuple of (lat_degrees, lon_degrees)
+    """
+    km_per_deg = np.pi * EARTH_RADIUS_KM / 180.0
+    lat_deg = distance_km / km_per_deg
+    lon_deg = distance_km / (km_per_deg * np.cos(np.radians(latitude)))
+    return float(lat_deg), float(lon_deg)
+
+
+def convex_hull_area_km2(lat, lon) -> float:
+    """
+    Area of the convex hull around a set of points
+
+    Args:
+        lat, lon: Point coordinates in degrees
+
+    Returns:
+        Hull area in km², floored at MIN_CLUSTER_AREA_KM2
+    """
+    x, y = to_local_km(lat, lon)
+    points = np.unique(np.column_stack([x, y]), axis=0)
+    if len(points) < 3:
+        return MIN_CLUSTER_AREA_KM2
+
+    from scipy.spatial import ConvexHull
+    from scipy.spatial import QhullError
+
+    try:
+        area = ConvexHull(points).volume  # "volume" is area in 2-D
+    except QhullError:
+        return MIN_CLUSTER_AREA_KM2
+    return float(max(area, MIN_CLUSTER_AREA_KM2))
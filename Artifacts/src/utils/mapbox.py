@@ -4,10 +4,13 @@ Mapbox Integration Utilities
 Helper functions for Mapbox GL visualization and geospatial operations.
 """
 
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence, Iterator
 import pandas as pd
 import numpy as np
 
+from src.utils import geojson
+from src.utils.point_clusters import PointClusterIndex
+
 
 class MapboxVisualizer:
     """Utilities for Mapbox visualization"""
@@ -21,6 +24,8 @@ class MapboxVisualizer:
         """
         self.mapbox_token = mapbox_token or ""
         self.default_style = "open-street-map"
+        self._cluster_index: Optional[PointClusterIndex] = None
+        self._cluster_version: Optional[str] = None
         
     def create_hotspot_map_data(
         self,
@@ -37,44 +42,81 @@ class MapboxVisualizer:
         Returns:
             Dictionary with map data
         """
-        map_data = {
+        lon, lat, properties = self._hotspot_columns(hotspots_df, density_df)
+        keys = list(properties)
+        rows = zip(*(values.tolist() for values in properties.values()))
+        return {
             'type': 'FeatureCollection',
-            'features': []
-        }
-        
-        if density_df is not None:
-            for _, row in density_df.iterrows():
-                feature = {
+            'features': [
+                {
                     'type': 'Feature',
                     'geometry': {
                         'type': 'Point',
-                        'coordinates': [row['center_longitude'], row['center_latitude']]
+                        'coordinates': [x, y]
                     },
-                    'properties': {
-                        'cluster_id': int(row['cluster_id']),
-                        'n_incidents': int(row['n_incidents']),
-                        'density_per_km2': float(row['density_per_km2']),
-                        'area_km2': float(row['area_km2'])
-                    }
+                    'properties': dict(zip(keys, row))
                 }
-                map_data['features'].append(feature)
-        else:
-            # Fallback to hotspots_df
-            if 'latitude' in hotspots_df.columns and 'longitude' in hotspots_df.columns:
-                for _, row in hotspots_df.iterrows():
-                    feature = {
-                        'type': 'Feature',
-                        'geometry': {
-                            'type': 'Point',
-                            'coordinates': [row['longitude'], row['latitude']]
-                        },
-                        'properties': {
-                            'cluster_id': int(row.get('cluster', -1))
-                        }
-                    }
-                    map_data['features'].append(feature)
-        
-        return map_data
+                for x, y, row in zip(lon.tolist(), lat.tolist(), rows)
+            ]
+        }
+    
+    def create_hotspot_map_json(
+        self,
+        hotspots_df: pd.DataFrame,
+        density_df: Optional[pd.DataFrame] = None,
+        chunk_size: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Serialize hotspot map data without building per-feature dicts
+        
+        The chunks join to the same bytes as a JSONResponse of
+        create_hotspot_map_data(), so they can back a StreamingResponse.
+        
+        Args:
+            hotspots_df: DataFrame with hotspot locations
+            density_df: Optional density statistics
+            chunk_size: Features per chunk (default: geojson.CHUNK_FEATURES)
+            
+        Returns:
+            Iterator of UTF-8 JSON chunks
+        """
+        lon, lat, properties = self._hotspot_columns(hotspots_df, density_df)
+        return geojson.iter_feature_collection(
+            lon, lat, properties, chunk_size=chunk_size or geojson.CHUNK_FEATURES
+        )
+    
+    @staticmethod
+    def _hotspot_columns(
+        hotspots_df: pd.DataFrame,
+        density_df: Optional[pd.DataFrame]
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Coordinate and property columns of the hotspot features"""
+        if density_df is not None:
+            return (
+                density_df['center_longitude'].to_numpy(dtype=float),
+                density_df['center_latitude'].to_numpy(dtype=float),
+                {
+                    'cluster_id': density_df['cluster_id'].astype(np.int64).to_numpy(),
+                    'n_incidents': density_df['n_incidents'].astype(np.int64).to_numpy(),
+                    'density_per_km2': density_df['density_per_km2'].to_numpy(dtype=float),
+                    'area_km2': density_df['area_km2'].to_numpy(dtype=float)
+                }
+            )
+        
+        # Fallback to hotspots_df
+        if 'latitude' in hotspots_df.columns and 'longitude' in hotspots_df.columns:
+            if 'cluster' in hotspots_df.columns:
+                cluster = hotspots_df['cluster'].astype(np.int64).to_numpy()
+            else:
+                cluster = np.full(len(hotspots_df), -1, dtype=np.int64)
+            return (
+                hotspots_df['longitude'].to_numpy(dtype=float),
+                hotspots_df['latitude'].to_numpy(dtype=float),
+                {'cluster_id': cluster}
+            )
+        
+        empty = np.empty(0)
+        return empty, empty, {}
     
     def create_route_map_data(
         self,
@@ -193,6 +235,74 @@ class MapboxVisualizer:
                 df[intensity_column] = 1.0
         
         return df[[intensity_column, 'latitude', 'longitude']].dropna()
+    
+    def build_cluster_index(
+        self,
+        df: pd.DataFrame,
+        version: str,
+        property_columns: Sequence[str] = ('crime_type',),
+        **index_kwargs
+    ) -> PointClusterIndex:
+        """
+        Build the point-cluster index for a dataset version (once per version)
+        
+        Args:
+            df: DataFrame with latitude/longitude columns
+            version: Dataset version; the index is rebuilt only when it changes
+            property_columns: Columns returned as properties of unclustered points
+            **index_kwargs: Passed to PointClusterIndex (radius, max_zoom, ...)
+            
+        Returns:
+            The index for ``version``
+        """
+        if self._cluster_index is not None and self._cluster_version == version:
+            return self._cluster_index
+        
+        df = df.dropna(subset=['latitude', 'longitude'])
+        properties = {
+            column: df[column].to_numpy()
+            for column in property_columns if column in df.columns
+        }
+        self._cluster_index = PointClusterIndex(
+            df['latitude'].to_numpy(dtype=float),
+            df['longitude'].to_numpy(dtype=float),
+            properties=properties,
+            **index_kwargs
+        )
+        self._cluster_version = version
+        return self._cluster_index
+    
+    def create_cluster_map_data(
+        self,
+        bbox: Sequence[float],
+        zoom: float,
+        df: Optional[pd.DataFrame] = None,
+        version: Optional[str] = None
+    ) -> Dict:
+        """
+        Create clustered point data for the visible map area
+        
+        Args:
+            bbox: (west, south, east, north) of the viewport in degrees
+            zoom: Map zoom level
+            df: Incidents; (re)indexes them when ``version`` is new
+            version: Dataset version of ``df``
+            
+        Returns:
+            GeoJSON FeatureCollection of clusters (with point_count) and
+            single incidents
+        """
+        if df is not None:
+            if version is None:
+                raise ValueError("A dataset version is required to index incidents")
+            self.build_cluster_index(df, version)
+        if self._cluster_index is None:
+            raise ValueError("No cluster index built; pass incidents and a version")
+        
+        return {
+            'type': 'FeatureCollection',
+            'features': self._cluster_index.get_clusters(bbox, zoom)
+        }
 
 
 if __name__ == "__main__":
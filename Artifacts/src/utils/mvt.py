@@ -0,0 +1,466 @@
+"""
+Mapbox Vector Tile Encoding
+
+Serves point and rectangle layers (incidents, hotspot centroids, risk grid
+cells) as Mapbox Vector Tiles (spec v2.1) without a protobuf dependency.
+
+Points are stored once as 32-bit Web Mercator world coordinates sorted by
+their Morton (Z-order) code. Every tile (z, x, y) is a quadtree node, so
+its points form one contiguous slice of the sorted array, found with two
+binary searches. Crowded tiles (low zooms) are aggregated into pixel bins
+with a ``point_count`` property so a tile never carries more than
+``max_features`` points.
+
+Encoding is vectorized: each feature is a fixed sequence of varints, so
+the whole tile is laid out as a varint matrix and serialized with NumPy.
+Tiles are cached in an LRU and optionally on disk, keyed by layer
+version, so replacing a layer's data invalidates its tiles.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import logging
+import math
+import os
+import shutil
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tile coordinate extent and clip buffer (in extent units) for polygons
+EXTENT = 4096
+BUFFER = 64
+
+# World coordinates are 32-bit per axis: 1 unit = 1 extent unit at zoom 20
+WORLD_BITS = 32
+MAX_ZOOM = 24
+
+# Points per tile before they are aggregated into bins
+MAX_TILE_FEATURES = 4096
+# Aggregation bin edge in extent units (64 x 64 bins per tile)
+BIN_SIZE = 64
+
+MAX_LATITUDE = 85.0511287798066
+
+MEDIA_TYPE = 'application/vnd.mapbox-vector-tile'
+
+# MVT geometry types and commands
+POINT, POLYGON = 1, 3
+MOVE_TO_1 = (1 << 3) | 1
+LINE_TO_3 = (3 << 3) | 2
+CLOSE_PATH = (1 << 3) | 7
+
+
+def lonlat_to_world(lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Web Mercator world coordinates as uint64 in [0, 2**WORLD_BITS)
+
+    y grows southwards, as in tile coordinates.
+    """
+    lat = np.clip(np.asarray(lat, dtype=float), -MAX_LATITUDE, MAX_LATITUDE)
+    lon = np.asarray(lon, dtype=float)
+    scale = float(1 << WORLD_BITS)
+    x = (lon + 180.0) / 360.0 * scale
+    sin = np.sin(np.radians(lat))
+    y = (0.5 - np.log((1 + sin) / (1 - sin)) / (4 * np.pi)) * scale
+    top = scale - 1
+    return (
+        np.clip(np.floor(x), 0, top).astype(np.uint64),
+        np.clip(np.floor(y), 0, top).astype(np.uint64),
+    )
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Tile bounds as (west, south, east, north) in degrees"""
+    n = 2.0**z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit after each of the low 32 bits"""
+    v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in (
+        (16, 0x0000FFFF0000FFFF),
+        (8, 0x00FF00FF00FF00FF),
+        (4, 0x0F0F0F0F0F0F0F0F),
+        (2, 0x3333333333333333),
+        (1, 0x5555555555555555),
+    ):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def morton(x, y) -> np.ndarray:
+    """Z-order code interleaving x (even bits) and y (odd bits)"""
+    return _spread_bits(np.asarray(x)) | (_spread_bits(np.asarray(y)) << np.uint64(1))
+
+
+def _varint_lengths(values: np.ndarray) -> np.ndarray:
+    lengths = np.ones(values.shape, dtype=np.int64)
+    for k in range(1, 10):
+        lengths += values >= np.uint64(1 << (7 * k))
+    return lengths
+
+
+def _encode_varints(values: np.ndarray) -> bytes:
+    """Protobuf base-128 varints of a flat uint64 array, concatenated"""
+    values = np.ascontiguousarray(values, dtype=np.uint64).ravel()
+    lengths = _varint_lengths(values)
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for k in range(int(lengths.max(initial=0))):
+        has = lengths > k
+        chunk = (values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[has] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + k] = (chunk | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(v: np.ndarray) -> np.ndarray:
+    v = np.asarray(v, dtype=np.int64)
+    return ((v << 1) ^ (v >> 63)).astype(np.uint64)
+
+
+def _field(number: int, payload: bytes) -> bytes:
+    """Length-delimited protobuf field"""
+    return _varint((number << 3) | 2) + _varint(len(payload)) + payload
+
+
+def _value_messages(values: np.ndarray) -> List[bytes]:
+    """Layer value table entries: strings, bools or doubles"""
+    if values.dtype.kind in 'US' or values.dtype == object:
+        return [_field(1, str(v).encode('utf-8')) for v in values]
+    if values.dtype.kind == 'b':
+        return [b'\x38' + (b'\x01' if v else b'\x00') for v in values]
+    doubles = np.ascontiguousarray(values, dtype='<f8')
+    return [b'\x19' + doubles[i : i + 1].tobytes() for i in range(len(doubles))]
+
+
+def _encode_features(tags: np.ndarray, geometry: np.ndarray, geom_type: int) -> bytes:
+    """
+    Serialize features that share one layout
+
+    Args:
+        tags: (n, 2k) key/value index pairs
+        geometry: (n, g) geometry command integers
+        geom_type: MVT geometry type
+
+    Returns:
+        Concatenated ``Layer.features`` fields
+    """
+    n = len(geometry)
+    tag_len = _varint_lengths(tags).sum(axis=1)
+    geom_len = _varint_lengths(geometry).sum(axis=1)
+    feature_len = (
+        1 + _varint_lengths(tag_len) + tag_len + 2 + 1 + _varint_lengths(geom_len) + geom_len
+    )
+    if tags.shape[1] == 0:
+        feature_len -= 1 + _varint_lengths(tag_len)
+    columns = [np.full(n, 0x12), feature_len]
+    if tags.shape[1]:
+        columns += [np.full(n, 0x12), tag_len, *tags.T]
+    columns += [np.full(n, 0x18), np.full(n, geom_type), np.full(n, 0x22), geom_len, *geometry.T]
+    return _encode_varints(np.column_stack(columns).astype(np.uint64))
+
+
+class TileLayer:
+    """Features of one tile layer with a Morton-ordered spatial index"""
+
+    def __init__(
+        self,
+        name: str,
+        lat,
+        lon,
+        properties: Optional[Mapping[str, Sequence]] = None,
+        version: str = '0',
+        cell_size_deg: Optional[float] = None,
+        max_features: int = MAX_TILE_FEATURES,
+    ):
+        """
+        Build a layer
+
+        Args:
+            name: Layer name inside the tile
+            lat, lon: Point coordinates (cell centres for a cell layer)
+            properties: Per-feature attribute arrays (numbers, bools or strings)
+            version: Dataset version; changing it invalidates cached tiles
+            cell_size_deg: If set, features are square lat/lon cells of this
+                size centred on the points and encoded as polygons
+            max_features: Points per tile before bins are aggregated
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        self.name = name
+        self.version = str(version)
+        self.cell_size_deg = cell_size_deg
+        self.max_features = max_features
+        properties = {k: np.asarray(v) for k, v in (properties or {}).items()}
+        for key, values in properties.items():
+            if len(values) != len(lat):
+                raise ValueError(f"Property {key} has {len(values)} values for {len(lat)} features")
+
+        if cell_size_deg is None:
+            wx, wy = lonlat_to_world(lat, lon)
+            codes = morton(wx, wy)
+            order = np.argsort(codes, kind='stable')
+            self.codes = codes[order]
+            self.x, self.y = wx[order], wy[order]
+        else:
+            half = cell_size_deg / 2.0
+            x0, y1 = lonlat_to_world(lat - half, lon - half)
+            x1, y0 = lonlat_to_world(lat + half, lon + half)
+            order = np.arange(len(lat))
+            self.bounds = np.column_stack([x0, y0, x1, y1]).astype(np.int64)
+        self.properties = {k: v[order] for k, v in properties.items()}
+
+    def __len__(self) -> int:
+        return len(self.codes) if self.cell_size_deg is None else len(self.bounds)
+
+    def encode(self, z: int, x: int, y: int) -> bytes:
+        """
+        Encoded Layer message for one tile (empty bytes if the tile has no features)
+        """
+        if not 0 <= z <= MAX_ZOOM or not (0 <= x < 1 << z and 0 <= y < 1 << z):
+            raise ValueError(f"Invalid tile {z}/{x}/{y}")
+        if self.cell_size_deg is None:
+            features = self._point_features(z, x, y)
+        else:
+            features = self._cell_features(z, x, y)
+        if features is None:
+            return b''
+        keys, values, body = features
+        layer = b'\x78\x02' + _field(1, self.name.encode('utf-8')) + body
+        layer += b''.join(_field(3, key.encode('utf-8')) for key in keys)
+        layer += b''.join(_field(4, value) for value in values)
+        layer += b'\x28' + _varint(EXTENT)
+        return _field(3, layer)
+
+    def _to_extent(self, world: np.ndarray, origin: int, shift: int) -> np.ndarray:
+        """World coordinates to tile extent units relative to the tile origin"""
+        local = world.astype(np.int64) - origin
+        if shift >= 0:
+            return local >> shift
+        return local << -shift
+
+    def _tags(self, index: np.ndarray, extra: Optional[Dict[str, np.ndarray]] = None):
+        """Key list, value table and (n, 2k) tag matrix for the selected features"""
+        columns = {key: values[index] for key, values in self.properties.items()}
+        columns.update(extra or {})
+        keys, values, tags = [], [], []
+        for k, (key, column) in enumerate(columns.items()):
+            unique, inverse = np.unique(column, return_inverse=True)
+            tags.append(np.full(len(inverse), k))
+            tags.append(inverse + len(values))
+            keys.append(key)
+            values.extend(_value_messages(unique))
+        matrix = np.column_stack(tags) if tags else np.empty((len(index), 0), dtype=np.int64)
+        return keys, values, matrix
+
+    def _point_features(self, z: int, x: int, y: int):
+        level = WORLD_BITS - z
+        prefix = int(morton(np.uint64(x), np.uint64(y)))
+        # Codes of the tile's quadtree node span [lo, hi]
+        lo = np.uint64(prefix << (2 * level))
+        hi = np.uint64(((prefix + 1) << (2 * level)) - 1)
+        start = int(np.searchsorted(self.codes, lo, side='left'))
+        stop = int(np.searchsorted(self.codes, hi, side='right'))
+        if start == stop:
+            return None
+
+        if stop - start > self.max_features:
+            # Every bin is a quadtree node too: its points are a contiguous run
+            bin_bits = int(math.log2(EXTENT // BIN_SIZE))
+            n_bins = 1 << (2 * bin_bits)
+            firsts = (np.uint64(prefix << (2 * bin_bits)) + np.arange(n_bins, dtype=np.uint64)) << (
+                np.uint64(2 * (level - bin_bits))
+            )
+            bounds = np.append(np.searchsorted(self.codes[start:stop], firsts), stop - start)
+            counts = np.diff(bounds)
+            occupied = counts > 0
+            # Each bin is drawn at its first point
+            index = start + bounds[:-1][occupied]
+            counts = counts[occupied]
+            keys, values, tags = _count_only(counts)
+        else:
+            index = np.arange(start, stop)
+            keys, values, tags = self._tags(index, {'point_count': np.ones(len(index), dtype=int)})
+
+        shift = level - int(math.log2(EXTENT))
+        px = self._to_extent(self.x[index], x << level, shift)
+        py = self._to_extent(self.y[index], y << level, shift)
+        geometry = np.column_stack([np.full(len(px), MOVE_TO_1), _zigzag(px), _zigzag(py)])
+        return keys, values, _encode_features(tags, geometry, POINT)
+
+    def _cell_features(self, z: int, x: int, y: int):
+        level = WORLD_BITS - z
+        shift = level - int(math.log2(EXTENT))
+        # Cell bounds in extent units, clipped to the buffered tile
+        local = np.column_stack(
+            [
+                self._to_extent(self.bounds[:, 0], x << level, shift),
+                self._to_extent(self.bounds[:, 1], y << level, shift),
+                self._to_extent(self.bounds[:, 2], x << level, shift),
+                self._to_extent(self.bounds[:, 3], y << level, shift),
+            ]
+        )
+        local = np.clip(local, -BUFFER, EXTENT + BUFFER)
+        keep = (local[:, 2] > local[:, 0]) & (local[:, 3] > local[:, 1])
+        if not keep.any():
+            return None
+        index = np.flatnonzero(keep)
+        x0, y0, x1, y1 = local[index].T
+        width, height = x1 - x0, y1 - y0
+        # Clockwise exterior ring (y down): top-left, top-right, bottom-right, bottom-left
+        geometry = np.column_stack(
+            [
+                np.full(len(index), MOVE_TO_1),
+                _zigzag(x0),
+                _zigzag(y0),
+                np.full(len(index), LINE_TO_3),
+                _zigzag(width),
+                np.zeros(len(index), dtype=np.uint64),
+                np.zeros(len(index), dtype=np.uint64),
+                _zigzag(height),
+                _zigzag(-width),
+                np.zeros(len(index), dtype=np.uint64),
+                np.full(len(index), CLOSE_PATH),
+            ]
+        )
+        keys, values, tags = self._tags(index)
+        return keys, values, _encode_features(tags, geometry, POLYGON)
+
+
+def _count_only(counts: np.ndarray):
+    """Tags for aggregated bins, which only carry their point count"""
+    unique, inverse = np.unique(counts, return_inverse=True)
+    tags = np.column_stack([np.zeros(len(inverse), dtype=np.int64), inverse])
+    return ['point_count'], _value_messages(unique.astype(float)), tags
+
+
+class TileCache:
+    """LRU of encoded tiles, optionally backed by a directory, keyed by layer version"""
+
+    def __init__(self, max_entries: int = 4096, cache_dir: Optional[str] = None):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Tiles kept in memory (least recently used evicted)
+            cache_dir: Directory for the on-disk cache (memory only if omitted)
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._tiles: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: Tuple) -> str:
+        layer, version, z, x, y = key
+        return os.path.join(self.cache_dir, layer, version, str(z), str(x), f'{y}.mvt')
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """Cached tile for (layer, version, z, x, y), or None"""
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+        if self.cache_dir:
+            path = self._path(key)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    tile = f.read()
+                self.disk_hits += 1
+                self._remember(key, tile)
+                return tile
+        self.misses += 1
+        return None
+
+    def put(self, key: Tuple, tile: bytes):
+        """Store an encoded tile"""
+        self._remember(key, tile)
+        if self.cache_dir:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(tile)
+            os.replace(tmp, path)
+
+    def _remember(self, key: Tuple, tile: bytes):
+        with self._lock:
+            self._tiles[key] = tile
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_entries:
+                self._tiles.popitem(last=False)
+
+    def invalidate(self, layer: str, keep_version: Optional[str] = None):
+        """Drop a layer's tiles of every version except ``keep_version``"""
+        with self._lock:
+            for key in [k for k in self._tiles if k[0] == layer and k[1] != keep_version]:
+                del self._tiles[key]
+        if self.cache_dir:
+            layer_dir = os.path.join(self.cache_dir, layer)
+            if os.path.isdir(layer_dir):
+                for version in os.listdir(layer_dir):
+                    if version != keep_version:
+                        shutil.rmtree(os.path.join(layer_dir, version), ignore_errors=True)
+
+    def info(self) -> Dict[str, int]:
+        """Cache statistics"""
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'entries': len(self._tiles),
+        }
+
+
+class TileStore:
+    """Named tile layers plus their tile cache"""
+
+    def __init__(self, cache: Optional[TileCache] = None):
+        self.cache = cache or TileCache()
+        self.layers: Dict[str, TileLayer] = {}
+
+    def set_layer(self, layer: TileLayer):
+        """Add or replace a layer; tiles of its other versions are invalidated"""
+        previous = self.layers.get(layer.name)
+        self.layers[layer.name] = layer
+        if previous is None or previous.version != layer.version:
+            self.cache.invalidate(layer.name, keep_version=layer.version)
+        logger.info(f"Tile layer {layer.name} v{layer.version}: {len(layer)} features")
+
+    def tile(self, name: str, z: int, x: int, y: int) -> bytes:
+        """
+        Encoded tile for one layer
+
+        Raises:
+            KeyError: Unknown layer
+            ValueError: Tile coordinates out of range
+        """
+        layer = self.layers[name]
+        key = (name, layer.version, z, x, y)
+        tile = self.cache.get(key)
+        if tile is None:
+            tile = layer.encode(z, x, y)
+            self.cache.put(key, tile)
+        return tile
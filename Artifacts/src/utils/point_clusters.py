@@ -0,0 +1,281 @@
+"""
+Hierarchical Point Clustering
+
+Supercluster-style zoom-dependent clustering for map payloads: the index
+is built once per dataset, bottom-up from the finest zoom level, and
+answers "clusters in this bbox at this zoom" with one KD-tree range query.
+
+Each level merges the clusters of the level below that fall into the same
+cell of a grid whose spacing is the cluster radius at that zoom; the merged
+cluster sits at the count-weighted centroid of its members. Grid merging is
+a single vectorized group-by per level, so 5M points index in seconds,
+whereas greedy radius clustering would need a Python loop per point.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import math
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+# Cluster radius in pixels, relative to a tile extent of EXTENT pixels
+DEFAULT_RADIUS = 40
+EXTENT = 512
+
+# Zoom levels that are clustered; above MAX_ZOOM the raw points are returned
+MIN_ZOOM = 0
+MAX_ZOOM = 16
+
+MAX_LATITUDE = 85.0511287798066
+
+
+def project(lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+    """Web Mercator coordinates in [0, 1] (y grows southwards)"""
+    lat = np.clip(np.asarray(lat, dtype=float), -MAX_LATITUDE, MAX_LATITUDE)
+    x = np.asarray(lon, dtype=float) / 360.0 + 0.5
+    sin = np.sin(np.radians(lat))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / np.pi
+    return np.clip(x, 0.0, 1.0), np.clip(y, 0.0, 1.0)
+
+
+def unproject(x, y) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of project(): (lat, lon) in degrees"""
+    lon = (np.asarray(x, dtype=float) - 0.5) * 360.0
+    lat = np.degrees(
+        2 * np.arctan(np.exp((0.5 - np.asarray(y, dtype=float)) * 2 * np.pi)) - np.pi / 2
+    )
+    return lat, lon
+
+
+def abbreviate(count: int) -> str:
+    """Count label as used by Mapbox GL (1234 -> '1.2k')"""
+    if count >= 10000:
+        return f"{round(count / 1000)}k"
+    if count >= 1000:
+        return f"{round(count / 100) / 10:g}k"
+    return str(count)
+
+
+def _centroids(level, label: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count-weighted centroids and total counts of the groups in ``label``"""
+    count = np.bincount(label, weights=level.count)
+    x = np.bincount(label, weights=level.x * level.count) / count
+    y = np.bincount(label, weights=level.y * level.count) / count
+    return x, y, count.astype(np.int64)
+
+
+def _python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class _Level:
+    """Clusters of one zoom level"""
+
+    def __init__(self, x, y, count, point, parent=None):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.point = point  # Original point index (meaningful where count == 1)
+        self.parent = parent  # Cluster index one level up, set when that level is built
+        self.tree = cKDTree(np.column_stack([x, y]))
+        self._children: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def children_of(self, parent_index: int) -> np.ndarray:
+        """Indices of the clusters in this level that merged into parent_index"""
+        if self._children is None:
+            order = np.argsort(self.parent, kind='stable')
+            offsets = np.searchsorted(self.parent[order], np.arange(self.parent.max() + 2))
+            self._children = (order, offsets)
+        order, offsets = self._children
+        return order[offsets[parent_index] : offsets[parent_index + 1]]
+
+
+class PointClusterIndex:
+    """Zoom-dependent point clusters over a fixed point set"""
+
+    def __init__(
+        self,
+        lat,
+        lon,
+        properties: Optional[Dict[str, np.ndarray]] = None,
+        radius: float = DEFAULT_RADIUS,
+        extent: int = EXTENT,
+        min_zoom: int = MIN_ZOOM,
+        max_zoom: int = MAX_ZOOM,
+    ):
+        """
+        Build the index
+
+        Args:
+            lat, lon: Point coordinates in degrees
+            properties: Optional {name: per-point array} columns returned
+                as the properties of unclustered points
+            radius: Cluster radius in pixels
+            extent: Tile extent the radius refers to
+            min_zoom: Coarsest clustered zoom level
+            max_zoom: Finest clustered zoom level
+        """
+        self.radius = radius
+        self.extent = extent
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.properties = {k: np.asarray(v) for k, v in (properties or {}).items()}
+
+        x, y = project(lat, lon)
+        n = len(x)
+        self.n_points = n
+        # Level max_zoom + 1 holds the raw points
+        self.levels: Dict[int, _Level] = {
+            max_zoom + 1: _Level(x, y, np.ones(n, dtype=np.int64), np.arange(n))
+        }
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            self.levels[zoom] = self._merge(self.levels[zoom + 1], zoom)
+        logger.info(
+            f"Clustered {n} points: "
+            + ", ".join(f"z{z}={len(self.levels[z].x)}" for z in (min_zoom, max_zoom))
+        )
+
+    def _merge(self, below: _Level, zoom: int) -> _Level:
+        """Group the clusters of the finer level by grid cell at this zoom"""
+        radius = self.radius / (self.extent * 2.0**zoom)
+        cols = np.floor(below.x / radius).astype(np.int64)
+        rows = np.floor(below.y / radius).astype(np.int64)
+        keys = rows * (int(math.ceil(1.0 / radius)) + 1) + cols
+        _, label = np.unique(keys, return_inverse=True)
+        label = label.ravel()
+        x, y, count = _centroids(below, label)
+
+        # A group straddling a cell edge is split by the grid: fold each cell
+        # into its nearest neighbour within the radius when that one is larger
+        # (a single step, so folds never chain across the map)
+        if len(count) > 1:
+            points = np.column_stack([x, y])
+            dist, nearest = cKDTree(points).query(points, k=2, distance_upper_bound=radius)
+            ids = np.arange(len(count))
+            has = np.isfinite(dist[:, 1])
+            target = np.where(has, nearest[:, 1], ids)
+            folds = has & ((count[target] > count) | ((count[target] == count) & (target < ids)))
+            folds &= ~folds[target]
+            _, merged = np.unique(np.where(folds, target, ids), return_inverse=True)
+            label = merged.ravel()[label]
+            x, y, count = _centroids(below, label)
+
+        _, first = np.unique(label, return_index=True)
+        below.parent = label
+        return _Level(x, y, count, below.point[first])
+
+    def _zoom(self, zoom: float) -> int:
+        return int(max(self.min_zoom, min(math.floor(zoom), self.max_zoom + 1)))
+
+    def cluster_id(self, zoom: int, index: int) -> int:
+        """
+        Stable ID of a cluster: index and zoom packed into one integer
+
+        Offset by the number of points, as in supercluster, so cluster IDs
+        never collide with the point IDs of unclustered features.
+        """
+        return (index << 5) + zoom + self.n_points
+
+    def _unpack(self, cluster_id: int) -> Tuple[int, int]:
+        """(index, zoom) of a cluster ID"""
+        packed = cluster_id - self.n_points
+        index, zoom = packed >> 5, packed & 31
+        if packed < 0 or zoom not in self.levels or index >= len(self.levels[zoom].x):
+            raise ValueError(f"Unknown cluster {cluster_id}")
+        return index, zoom
+
+    def query(self, bbox: Sequence[float], zoom: float) -> Tuple[int, np.ndarray]:
+        """
+        Clusters whose centre lies inside a bbox
+
+        Args:
+            bbox: (west, south, east, north) in degrees
+            zoom: Map zoom (fractional zooms use the level below)
+
+        Returns:
+            Tuple of (index zoom level, cluster indices in that level)
+        """
+        west, south, east, north = bbox
+        if south > north:
+            raise ValueError(f"Invalid bbox {tuple(bbox)}: south > north")
+        z = self._zoom(zoom)
+        level = self.levels[z]
+        if east < west:
+            # Crosses the antimeridian: query both sides
+            _, left = self.query((west, south, 180.0, north), zoom)
+            _, right = self.query((-180.0, south, east, north), zoom)
+            return z, np.concatenate([left, right])
+        x0, x1 = project(0.0, west)[0], project(0.0, east)[0]
+        y0, y1 = project(north, 0.0)[1], project(south, 0.0)[1]
+        center = [(x0 + x1) / 2.0, (y0 + y1) / 2.0]
+        half = max(x1 - x0, y1 - y0) / 2.0
+        candidates = np.asarray(level.tree.query_ball_point(center, half, p=np.inf), dtype=int)
+        inside = (
+            (level.x[candidates] >= x0)
+            & (level.x[candidates] <= x1)
+            & (level.y[candidates] >= y0)
+            & (level.y[candidates] <= y1)
+        )
+        return z, np.sort(candidates[inside])
+
+    def get_clusters(self, bbox: Sequence[float], zoom: float) -> List[Dict]:
+        """
+        GeoJSON features for a bbox and zoom
+
+        Clusters carry ``cluster``, ``cluster_id``, ``point_count`` and
+        ``point_count_abbreviated`` like Mapbox GL's client-side clustering;
+        single points carry their original properties.
+        """
+        z, indices = self.query(bbox, zoom)
+        return self._features(z, indices)
+
+    def get_children(self, cluster_id: int) -> List[Dict]:
+        """Features one zoom level below a cluster (the clusters it was merged from)"""
+        index, zoom = self._unpack(cluster_id)
+        if zoom + 1 not in self.levels:
+            raise ValueError(f"Cluster {cluster_id} has no children")
+        return self._features(zoom + 1, self.levels[zoom + 1].children_of(index))
+
+    def expansion_zoom(self, cluster_id: int) -> int:
+        """Zoom at which a cluster splits into several features"""
+        index, zoom = self._unpack(cluster_id)
+        while zoom < self.max_zoom + 1:
+            children = self.levels[zoom + 1].children_of(index)
+            zoom += 1
+            if len(children) != 1:
+                break
+            index = int(children[0])
+        return zoom
+
+    def _features(self, zoom: int, indices: np.ndarray) -> List[Dict]:
+        level = self.levels[zoom]
+        lat, lon = unproject(level.x[indices], level.y[indices])
+        features = []
+        for i, index in enumerate(indices.tolist()):
+            count = int(level.count[index])
+            geometry = {'type': 'Point', 'coordinates': [float(lon[i]), float(lat[i])]}
+            if count == 1:
+                point = int(level.point[index])
+                properties = {k: _python(v[point]) for k, v in self.properties.items()}
+                features.append(
+                    {'type': 'Feature', 'id': point, 'geometry': geometry, 'properties': properties}
+                )
+                continue
+            cluster_id = self.cluster_id(zoom, index)
+            features.append(
+                {
+                    'type': 'Feature',
+                    'id': cluster_id,
+                    'geometry': geometry,
+                    'properties': {
+                        'cluster': True,
+                        'cluster_id': cluster_id,
+                        'point_count': count,
+                        'point_count_abbreviated': abbreviate(count),
+                    },
+                }
+            )
+        return features
@@ -0,0 +1,38 @@
+"""
+Shared test fixtures
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+DEPOT = (41.8781, -87.6298)
+
+
+def hotspot_factory(n, seed=0, spread=0.3, center=DEPOT, start_id=0, priority=None):
+    """
+    Hotspot-like objects scattered uniformly over a square around a center
+
+    Args:
+        n: Number of hotspots
+        seed: Random seed
+        spread: Side of the square in degrees
+        center: (lat, lon) of the square's center
+        start_id: cluster_id of the first hotspot
+        priority: Priority of every hotspot (default: uniform in [0.5, 2))
+    """
+    rng = np.random.default_rng(seed)
+    lat = center[0] + rng.uniform(-spread, spread, n) / 2
+    lon = center[1] + rng.uniform(-spread, spread, n) / 2
+    priorities = rng.uniform(0.5, 2.0, n) if priority is None else np.full(n, priority)
+    return [
+        SimpleNamespace(cluster_id=start_id + i, center_lat=la, center_lon=lo, priority=p)
+        for i, (la, lo, p) in enumerate(zip(lat.tolist(), lon.tolist(), priorities.tolist()))
+    ]
+
+
+@pytest.fixture
+def make_hotspots():
+    """Factory of hotspot-like objects for the routing tests (see hotspot_factory)"""
+    return hotspot_factory
@@ -0,0 +1,42 @@
+"""
+Tests for Arrow content negotiation and serialization
+"""
+
+import pytest
+import numpy as np
+from src.utils import arrow_ipc
+from src.utils.arrow_ipc import ARROW_STREAM, JSON, negotiate
+
+
+def test_negotiate_prefers_json_unless_arrow_is_named(monkeypatch):
+    """Arrow needs an explicit, at least equally ranked Accept entry"""
+    monkeypatch.setattr(arrow_ipc, 'HAS_ARROW', True)
+    assert negotiate(None) == JSON
+    assert negotiate('*/*') == JSON
+    assert negotiate('text/html, application/*;q=0.8') == JSON
+    assert negotiate(ARROW_STREAM) == ARROW_STREAM
+    assert negotiate(f'application/json;q=0.9, {ARROW_STREAM}') == ARROW_STREAM
+    assert negotiate(f'application/json, {ARROW_STREAM};q=0.5') == JSON
+    assert negotiate(f'{ARROW_STREAM};q=0') == JSON
+
+    # Without pyarrow Arrow-only clients cannot be served; others fall back to JSON
+    monkeypatch.setattr(arrow_ipc, 'HAS_ARROW', False)
+    assert negotiate(ARROW_STREAM) is None
+    assert negotiate(f'{ARROW_STREAM}, */*;q=0.1') == JSON
+
+
+def test_arrow_stream_round_trip():
+    """Columns keep their types and metadata survives JSON encoding"""
+    pytest.importorskip('pyarrow')
+    columns = {
+        'cluster_id': np.arange(5),
+        'center_latitude': np.linspace(41.8, 41.9, 5),
+        'risk_level': np.array(['low', 'high', 'low', 'medium', 'critical']),
+    }
+    data = arrow_ipc.to_arrow_stream(columns, {'model_version': 'v1', 'area': {'radius_km': 20}})
+    df, metadata = arrow_ipc.read_arrow_stream(data)
+    assert list(df.columns) == list(columns)
+    assert df['cluster_id'].tolist() == list(range(5))
+    assert df['center_latitude'].to_numpy() == pytest.approx(columns['center_latitude'])
+    assert df['risk_level'].tolist() == columns['risk_level'].tolist()
+    assert metadata == {'model_version': 'v1', 'area': {'radius_km': 20}}
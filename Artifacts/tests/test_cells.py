@@ -0,0 +1,106 @@
+"""
+Tests for hierarchical spatial cells
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.cells import (
+    MAX_RESOLUTION,
+    cell_resolution,
+    cell_size_deg,
+    cell_to_boundary,
+    cell_to_children,
+    cell_to_latlng,
+    cell_to_parent,
+    cell_to_token,
+    grid_disk,
+    is_valid_cell,
+    latlng_to_cell,
+    token_to_cell,
+)
+
+CENTER = (41.8781, -87.6298)
+
+
+def make_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(-89.9, 89.9, n), rng.uniform(-179.9, 179.9, n)
+
+
+def test_points_fall_inside_their_cells():
+    """Every point lies within its cell's boundary at every resolution"""
+    lat, lon = make_points(5000)
+    assert cell_size_deg(15) == pytest.approx(0.02)
+    for resolution in (0, 1, 7, 15, 24, MAX_RESOLUTION):
+        cells = latlng_to_cell(lat, lon, resolution)
+        assert (cell_resolution(cells) == resolution).all()
+        assert is_valid_cell(cells).all()
+        south, west, north, east = cell_to_boundary(cells)
+        assert ((lat >= south) & (lat < north) & (lon >= west) & (lon < east)).all()
+        center_lat, center_lon = cell_to_latlng(cells)
+        assert np.allclose(center_lat, (south + north) / 2)
+        assert np.allclose(center_lon, (west + east) / 2)
+
+    with pytest.raises(ValueError):
+        latlng_to_cell(lat, lon, MAX_RESOLUTION + 1)
+    with pytest.raises(ValueError):
+        latlng_to_cell([np.nan], [0.0], 10)
+
+
+def test_parents_and_children_nest():
+    """Parents match coarser lookups; children cover their parent"""
+    lat, lon = make_points(5000, seed=1)
+    cells = latlng_to_cell(lat, lon, 18)
+    for resolution in (0, 5, 12, 18):
+        np.testing.assert_array_equal(
+            cell_to_parent(cells, resolution), latlng_to_cell(lat, lon, resolution)
+        )
+    with pytest.raises(ValueError):
+        cell_to_parent(cells, 19)
+
+    children = cell_to_children(cells[:100])
+    assert children.shape == (100, 4)
+    np.testing.assert_array_equal(cell_to_parent(children.ravel(), 18), np.repeat(cells[:100], 4))
+    south, west, north, east = cell_to_boundary(children)
+    parent = cell_to_boundary(cells[:100])
+    assert np.allclose(south.min(axis=1), parent[0]) and np.allclose(north.max(axis=1), parent[2])
+    assert np.allclose(west.min(axis=1), parent[1]) and np.allclose(east.max(axis=1), parent[3])
+
+
+def test_rollup_is_an_integer_groupby():
+    """Counts aggregated by parent cell equal counts at the coarser resolution"""
+    rng = np.random.default_rng(2)
+    lat = CENTER[0] + rng.normal(0, 0.05, 20000)
+    lon = CENTER[1] + rng.normal(0, 0.05, 20000)
+    df = pd.DataFrame({'cell': latlng_to_cell(lat, lon, 15)})
+    rolled = df.groupby(cell_to_parent(df['cell'].to_numpy(), 12)).size()
+    direct = pd.Series(latlng_to_cell(lat, lon, 12)).value_counts()
+    assert rolled.to_dict() == direct.to_dict()
+
+
+def test_grid_disk_neighbours():
+    """The k-disk is the (2k+1)^2 block of same-resolution cells around a cell"""
+    cell = latlng_to_cell(*CENTER, 15)
+    disk = grid_disk(cell, 2)
+    assert disk.shape == (1, 25) and disk[0, 12] == cell
+    lat, lon = cell_to_latlng(disk[0])
+    center_lat, center_lon = cell_to_latlng(cell)
+    assert np.allclose(np.unique(np.round((lat - center_lat) / 0.02)), [-2, -1, 0, 1, 2])
+    assert np.allclose(np.unique(np.round((lon - center_lon) / 0.02)), [-2, -1, 0, 1, 2])
+    assert (cell_resolution(disk) == 15).all()
+
+    corner = grid_disk(latlng_to_cell(-89.99, -179.99, 3), 1)[0]
+    assert (corner == -1).sum() == 5
+
+
+def test_tokens_round_trip():
+    """Tokens are compact hex and reject malformed input"""
+    cells = latlng_to_cell(*make_points(200, seed=3), 15)
+    for cell in cells:
+        token = cell_to_token(cell)
+        assert not token.endswith('0')
+        assert token_to_cell(token) == cell
+    for bad in ('', 'xyz', '0', '3', 'f' * 17):
+        with pytest.raises(ValueError):
+            token_to_cell(bad)
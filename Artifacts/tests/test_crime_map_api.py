@@ -98,13 +98,23 @@ class TestCrimeMapAPI:
 
     def test_temporal_patterns_endpoint(self):
         """Test temporal patterns endpoint"""
-        response = client.get("/api/crime-map/temporal-patterns?grid_id=grid_0_0&days=7")
+        hotspots = client.get("/api/crime-map/hotspots").json()["hotspots"]
+        grid_id = hotspots[0]["grid_id"]
+        response = client.get(f"/api/crime-map/temporal-patterns?grid_id={grid_id}&days=7")
         
         assert response.status_code == 200
         data = response.json()
         
         assert "grid_id" in data
-        assert data["grid_id"] == "grid_0_0"
+        assert data["grid_id"] == grid_id
+        assert data["resolution"] == 15
+        assert data["center"]["lat"] == pytest.approx(hotspots[0]["lat"])
+
+        # Legacy offsets from the center cell resolve to the same cells
+        legacy = client.get("/api/crime-map/temporal-patterns?grid_id=grid_0_0").json()
+        assert legacy["center"] == {"lat": pytest.approx(41.87), "lng": pytest.approx(-87.63)}
+        bad = client.get("/api/crime-map/temporal-patterns?grid_id=not-a-cell")
+        assert bad.status_code == 400
         assert "hourly_pattern" in data
         assert "daily_pattern" in data
         assert "peak_hours" in data
@@ -118,6 +128,52 @@ class TestCrimeMapAPI:
         assert len(data["daily_pattern"]) == 7
         assert all("date" in item and "incidents" in item for item in data["daily_pattern"])
 
+    def test_response_times_endpoint(self):
+        """Response-time raster uses the heatmap grid layout"""
+        response = client.get(
+            "/api/crime-map/response-times?depots=41.8781,-87.6298;41.95,-87.70&thresholds=5,15"
+        )
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["rows"] == data["cols"] == 20
+        assert len(data["minutes"]) == 20 and all(len(row) == 20 for row in data["minutes"])
+        assert data["origin"]["lat"] == pytest.approx(41.87 - 10 * data["cell_deg"])
+        # The center cell holds the first station
+        center = client.get("/api/crime-map/temporal-patterns?grid_id=grid_0_0").json()
+        assert data["grid_ids"][10][10] == center["grid_id"]
+        assert data["minutes"][10][10] == min(min(row[9:12]) for row in data["minutes"][9:12])
+        assert data["nearest_depot"][10][10] == 0
+        assert set(data["coverage"]) == {"5.0", "15.0"}
+        assert data["coverage"]["5.0"] <= data["coverage"]["15.0"]
+
+        assert client.get("/api/crime-map/response-times?depots=oops").status_code == 400
+
+    def test_hotspots_arrow_response(self):
+        """Arrow clients get the hotspots as columns and the other fields as metadata"""
+        pytest.importorskip("pyarrow")
+        from src.utils.arrow_ipc import ARROW_STREAM, read_arrow_stream
+
+        response = client.get("/api/crime-map/hotspots", headers={"Accept": ARROW_STREAM})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == ARROW_STREAM
+        assert "Accept" in response.headers["vary"]
+        df, metadata = read_arrow_stream(response.content)
+
+        assert list(df.columns) == [
+            "lat", "lng", "intensity", "crime_type", "predicted_incidents",
+            "confidence", "grid_id", "risk_level"
+        ]
+        assert len(df) > 0 and df["predicted_incidents"].dtype.kind == "i"
+        assert metadata["model_version"] == "v2.3.1"
+        assert metadata["coverage_area"]["radius_km"] == 20
+        assert metadata["total_predicted_incidents"] == df["predicted_incidents"].sum()
+
+        # Wildcards and missing headers keep the JSON default
+        for accept in ("*/*", "application/json", f"application/json, {ARROW_STREAM};q=0.5"):
+            json_response = client.get("/api/crime-map/hotspots", headers={"Accept": accept})
+            assert json_response.headers["content-type"] == "application/json"
+
     def test_coverage_area_structure(self):
         """Test coverage area structure"""
         response = client.get("/api/crime-map/hotspots")
@@ -179,6 +235,20 @@ class TestCrimeMapAPI:
         assert set(data1.keys()) == set(data2.keys())
         assert len(data1["hotspots"]) == len(data2["hotspots"])
 
+    def test_hotspots_viewport_filter(self):
+        """Only hotspots inside the bbox are returned"""
+        bbox = (-87.65, 41.86, -87.60, 41.90)
+        response = client.get(
+            "/api/crime-map/hotspots", params={"bbox": ",".join(map(str, bbox))}
+        )
+        assert response.status_code == 200
+        for hotspot in response.json()["hotspots"]:
+            assert bbox[0] <= hotspot["lng"] <= bbox[2]
+            assert bbox[1] <= hotspot["lat"] <= bbox[3]
+
+        response = client.get("/api/crime-map/hotspots", params={"bbox": "0,1,0"})
+        assert response.status_code == 400
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -0,0 +1,142 @@
+"""
+Tests for real-time dispatch insertion
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+from src.models.dispatch import Dispatcher, DispatchUnit, UnitGridIndex
+from src.models.vrp_solver import SavingsRouteSolver
+from src.utils.geo import haversine_km, to_local_km
+
+DEPOT = (41.8781, -87.6298)
+
+
+def point(rng, cluster_id=-1):
+    return SimpleNamespace(
+        cluster_id=cluster_id,
+        center_lat=DEPOT[0] + rng.uniform(-0.15, 0.15),
+        center_lon=DEPOT[1] + rng.uniform(-0.15, 0.15),
+        priority=1.0,
+    )
+
+
+def make_dispatcher(n_units, stops=6, seed=0, budget=150.0, **kwargs):
+    rng = np.random.default_rng(seed)
+    dispatcher = Dispatcher(*DEPOT, **kwargs)
+    for unit_id in range(n_units):
+        start = point(rng)
+        dispatcher.add_unit(
+            DispatchUnit(
+                officer_id=unit_id,
+                lat=start.center_lat,
+                lon=start.center_lon,
+                stops=[point(rng, unit_id * 100 + i) for i in range(stops)],
+                budget_km=budget,
+            )
+        )
+    return dispatcher
+
+
+def brute_force(dispatcher, hotspot, unit_ids):
+    """Cheapest feasible insertion by evaluating every position of every unit"""
+    best = None
+    for unit_id in unit_ids:
+        unit = dispatcher.units[unit_id]
+        path = [(unit.lat, unit.lon)] + [(h.center_lat, h.center_lon) for h in unit.stops] + [DEPOT]
+        remaining = sum(haversine_km(*a, *b) for a, b in zip(path, path[1:]))
+        new = (hotspot.center_lat, hotspot.center_lon)
+        for pos, (a, b) in enumerate(zip(path, path[1:])):
+            added = haversine_km(*a, *new) + haversine_km(*new, *b) - haversine_km(*a, *b)
+            if remaining + added <= unit.budget_km and (best is None or added < best[2]):
+                best = (unit_id, pos, added)
+    return best
+
+
+def test_grid_index_nearest_matches_brute_force():
+    """Ring search returns the exact k nearest units, also after moves"""
+    rng = np.random.default_rng(1)
+    index = UnitGridIndex(*DEPOT, cell_km=0.5)
+    lat = DEPOT[0] + rng.uniform(-0.2, 0.2, 500)
+    lon = DEPOT[1] + rng.uniform(-0.2, 0.2, 500)
+    for unit_id in range(500):
+        index.update(unit_id, lat[unit_id], lon[unit_id])
+    for unit_id in range(0, 500, 3):
+        lat[unit_id] += 0.05
+        index.update(unit_id, lat[unit_id], lon[unit_id])
+    index.remove(7)
+
+    x, y = to_local_km(lat, lon, *DEPOT)
+    alive = np.array([i for i in range(500) if i != 7])
+    for q_lat, q_lon in [DEPOT, (42.1, -87.4), (DEPOT[0] + 0.01, DEPOT[1] - 0.03)]:
+        qx, qy = to_local_km(q_lat, q_lon, *DEPOT)
+        expected = alive[np.argsort(np.hypot(x[alive] - qx, y[alive] - qy))[:10]]
+        result = index.nearest(q_lat, q_lon, 10)
+        assert [unit_id for _, unit_id in result] == expected.tolist()
+    assert len(index) == 499
+
+
+def test_best_insertion_matches_exhaustive_search():
+    """With every unit as a candidate the decision is the global cheapest insertion"""
+    dispatcher = make_dispatcher(30, candidates=30)
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        hotspot = point(rng)
+        decision = dispatcher.best_insertion(hotspot)
+        unit_id, pos, added = brute_force(dispatcher, hotspot, dispatcher.units)
+        assert (decision.officer_id, decision.position) == (unit_id, pos)
+        assert decision.added_km == pytest.approx(added)
+
+
+def test_assign_respects_budgets_and_updates_routes():
+    """Inserted stops appear in the route; units without budget are skipped"""
+    dispatcher = make_dispatcher(10, candidates=10)
+    rng = np.random.default_rng(3)
+    hotspot = point(rng, cluster_id=999)
+    decision = dispatcher.best_insertion(hotspot)
+    # Leave the chosen unit exactly its current remaining distance
+    chosen = dispatcher.units[decision.officer_id]
+    chosen.budget_km = dispatcher.remaining_distance(decision.officer_id)
+
+    applied = dispatcher.assign(hotspot)
+    assert applied.officer_id != decision.officer_id
+    unit = dispatcher.units[applied.officer_id]
+    assert unit.stops[applied.position].cluster_id == 999
+    assert dispatcher.remaining_distance(unit.officer_id) <= unit.budget_km + 1e-9
+
+    for unit in dispatcher.units.values():
+        unit.budget_km = 0.0
+    assert dispatcher.assign(point(rng)) is None
+
+
+def test_position_updates_consume_budget_and_stops():
+    """Moving a unit drops visited stops and charges the distance driven"""
+    dispatcher = make_dispatcher(3, stops=4, candidates=3)
+    unit = dispatcher.units[1]
+    first = unit.stops[0]
+    driven = float(haversine_km(unit.lat, unit.lon, first.center_lat, first.center_lon))
+
+    dispatcher.update_position(1, first.center_lat, first.center_lon, visited=1)
+    assert len(unit.stops) == 3
+    assert unit.budget_km == pytest.approx(150.0 - driven)
+    nearest = dispatcher.index.nearest(first.center_lat, first.center_lon, 1)
+    assert nearest[0] == (pytest.approx(0.0, abs=1e-9), 1)
+
+    dispatcher.remove_unit(1)
+    assert 1 not in dispatcher.units and len(dispatcher.index) == 2
+
+
+def test_from_planned_routes():
+    """A shift plan becomes one unit per route, all starting at the depot"""
+    rng = np.random.default_rng(4)
+    hotspots = [point(rng, i) for i in range(40)]
+    routes = SavingsRouteSolver(max_route_distance_km=60.0).solve(hotspots, 4, *DEPOT)
+    dispatcher = Dispatcher.from_routes(routes, *DEPOT, max_route_distance_km=60.0)
+    assert sorted(dispatcher.units) == sorted(r.officer_id for r in routes)
+    for route in routes:
+        assert dispatcher.remaining_distance(route.officer_id) == pytest.approx(
+            route.total_distance
+        )
+    decision = dispatcher.assign(point(rng, 100))
+    assert decision is None or decision.added_km >= 0
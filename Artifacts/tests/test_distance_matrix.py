@@ -0,0 +1,59 @@
+"""
+Tests for the routing distance-matrix layer
+"""
+
+import pytest
+import numpy as np
+from src.models.distance_matrix import DistanceMatrixCache, haversine_matrix
+from src.utils.geo import haversine_km
+
+# Hotspots spread over Chicago
+CHICAGO = dict(center=(41.825, -87.725), spread=0.35)
+
+
+def test_matrix_matches_pointwise_haversine(make_hotspots):
+    """Broadcasted matrix equals pointwise great-circle distances"""
+    hotspots = make_hotspots(50, **CHICAGO)
+    lat = np.array([h.center_lat for h in hotspots])
+    lon = np.array([h.center_lon for h in hotspots])
+
+    matrix = haversine_matrix(lat, lon)
+    expected = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    assert matrix == pytest.approx(expected, abs=1e-9)
+    assert (np.diag(matrix) == 0).all()
+
+    matrix32 = haversine_matrix(lat, lon, dtype=np.float32)
+    assert matrix32.dtype == np.float32
+    assert np.abs(matrix32 - expected).max() < 0.005
+
+
+def test_depot_is_row_zero(make_hotspots):
+    """Row 0 holds depot distances"""
+    hotspots = make_hotspots(10, **CHICAGO)
+    matrix = DistanceMatrixCache().get(hotspots, 41.8781, -87.6298)
+
+    assert matrix.shape == (11, 11)
+    assert matrix[0, 3] == pytest.approx(
+        haversine_km(41.8781, -87.6298, hotspots[2].center_lat, hotspots[2].center_lon)
+    )
+
+
+def test_cache_reuses_matrix_for_same_hotspot_set(make_hotspots):
+    """Repeated optimizations of the same shift reuse the matrix"""
+    cache = DistanceMatrixCache(max_entries=2)
+    hotspots = make_hotspots(20, **CHICAGO)
+
+    first = cache.get(hotspots, 41.88, -87.63)
+    assert cache.get(hotspots, 41.88, -87.63) is first
+    assert cache.get(hotspots[:-1], 41.88, -87.63) is not first
+    assert cache.get(hotspots, 41.80, -87.63) is not first
+    assert cache.info() == {'hits': 1, 'misses': 3, 'entries': 2}
+    assert not first.flags.writeable
+
+
+def test_large_sets_use_float32(make_hotspots):
+    """2,000 hotspots are stored in float32"""
+    matrix = DistanceMatrixCache().get(make_hotspots(2000, **CHICAGO), 41.88, -87.63)
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (2001, 2001)
+    assert np.allclose(matrix, matrix.T)
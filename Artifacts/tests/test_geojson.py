@@ -0,0 +1,103 @@
+"""
+Tests for the columnar GeoJSON writer
+"""
+
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.geojson import dumps_feature_collection, format_column, iter_feature_collection
+from src.utils.mapbox import MapboxVisualizer
+
+
+def render(content):
+    """JSONResponse rendering"""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def test_columns_format_like_json_dumps():
+    """Every supported dtype is written exactly as json.dumps writes it"""
+    columns = [
+        np.array([0.1, -87.6298, 1e-7, 1e17, 3.0]),
+        np.array([-1, 0, 2**40]),
+        np.array([True, False]),
+        np.array(['THEFT', 'é"\\\n', '']),
+        np.array([None, 1, 2.5, 'x', np.int64(7), True], dtype=object),
+    ]
+    for column in columns:
+        assert format_column(column) == [
+            render(v.item() if hasattr(v, 'item') else v).decode() for v in column
+        ]
+    with pytest.raises(ValueError):
+        format_column(np.array([1.0, np.nan]))
+
+
+def test_stream_matches_dict_rendering():
+    """Chunked output joins to the bytes of the equivalent dicts"""
+    rng = np.random.default_rng(0)
+    lon, lat = rng.normal(-87.6, 0.1, 250), rng.normal(41.9, 0.1, 250)
+    properties = {'count': rng.integers(0, 9, 250), 'type': rng.choice(['A', 'B'], 250)}
+    expected = render(
+        {
+            'type': 'FeatureCollection',
+            'features': [
+                {
+                    'type': 'Feature',
+                    'geometry': {'type': 'Point', 'coordinates': [x, y]},
+                    'properties': {'count': int(c), 'type': str(t)},
+                }
+                for x, y, c, t in zip(lon, lat, properties['count'], properties['type'])
+            ],
+        }
+    )
+    chunks = list(iter_feature_collection(lon, lat, properties, chunk_size=60))
+    assert len(chunks) == 2 + 5
+    assert b''.join(chunks) == expected == dumps_feature_collection(lon, lat, properties)
+    assert dumps_feature_collection([], [], {}) == render(
+        {'type': 'FeatureCollection', 'features': []}
+    )
+    with pytest.raises(ValueError):
+        dumps_feature_collection(lon, lat, {'count': properties['count'][:10]})
+
+
+def test_hotspot_map_json_matches_map_data():
+    """The streamed hotspot map is byte-identical to the rendered dict version"""
+    rng = np.random.default_rng(1)
+    density = pd.DataFrame(
+        {
+            'cluster_id': np.arange(40),
+            'n_incidents': rng.integers(1, 100, 40),
+            'center_latitude': rng.normal(41.9, 0.05, 40),
+            'center_longitude': rng.normal(-87.6, 0.05, 40),
+            'density_per_km2': rng.random(40) * 50,
+            'area_km2': rng.random(40),
+        }
+    )
+    hotspots = pd.DataFrame(
+        {
+            'latitude': rng.normal(41.9, 0.05, 30),
+            'longitude': rng.normal(-87.6, 0.05, 30),
+            'cluster': rng.integers(-1, 5, 30),
+        }
+    )
+    visualizer = MapboxVisualizer()
+    for args in [
+        (hotspots, density),
+        (hotspots, None),
+        (hotspots.drop(columns='cluster'), None),
+        (hotspots.drop(columns='latitude'), None),
+    ]:
+        data = visualizer.create_hotspot_map_data(*args)
+        streamed = b''.join(visualizer.create_hotspot_map_json(*args, chunk_size=7))
+        assert streamed == render(data)
+
+    feature = visualizer.create_hotspot_map_data(hotspots, density)['features'][0]
+    assert feature['properties'] == {
+        'cluster_id': 0,
+        'n_incidents': int(density['n_incidents'][0]),
+        'density_per_km2': float(density['density_per_km2'][0]),
+        'area_km2': float(density['area_km2'][0]),
+    }
@@ -0,0 +1,88 @@
+"""
+Tests for Gi* / local Moran's I hotspot statistics
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.models.gi_star import GiStarHotspotAnalyzer
+from src.models.hotspot_summary import DENSITY_COLUMNS
+
+
+def make_incidents(seed=5):
+    """Uniform background plus one dense cluster"""
+    rng = np.random.default_rng(seed)
+    background = np.column_stack([rng.uniform(41.84, 41.92, 1500), rng.uniform(-87.68, -87.58, 1500)])
+    cluster = rng.normal([41.88, -87.63], 0.002, (400, 2))
+    coords = np.vstack([background, cluster])
+    return pd.DataFrame({'latitude': coords[:, 0], 'longitude': coords[:, 1]})
+
+
+def test_analyzer_initialization():
+    """Test defaults and weights validation"""
+    analyzer = GiStarHotspotAnalyzer()
+    assert analyzer.weights == 'distance_band'
+    assert analyzer.permutations == 0
+
+    with pytest.raises(ValueError):
+        GiStarHotspotAnalyzer(weights='queen')
+
+
+def test_gi_star_matches_dense_formula():
+    """Sparse z-scores equal the textbook Gi* computed densely"""
+    df = make_incidents()
+    analyzer = GiStarHotspotAnalyzer(cell_size_m=500, band_m=800)
+    cells = analyzer.analyze(df)
+
+    x = cells['n_incidents'].values.astype(float)
+    n = len(x)
+    W = analyzer.spatial_weights(cells).toarray() + np.eye(n)
+    mean = x.mean()
+    s = np.sqrt((x ** 2).mean() - mean ** 2)
+    w_sum = W.sum(axis=1)
+    expected = (W @ x - mean * w_sum) / (
+        s * np.sqrt((n * (W ** 2).sum(axis=1) - w_sum ** 2) / (n - 1))
+    )
+    assert cells['gi_z'].values == pytest.approx(expected)
+
+
+def test_weights_are_cached_per_grid():
+    """The weights matrix is built once per grid"""
+    df = make_incidents()
+    analyzer = GiStarHotspotAnalyzer(weights='knn', k=4)
+    cells = analyzer.aggregate(df)
+
+    first = analyzer.spatial_weights(cells)
+    assert analyzer.spatial_weights(cells) is first
+    assert (np.diff(first.indptr) == 4).all()
+
+
+def test_hot_cells_in_density_shape():
+    """Significant hot cells are returned in the density-table shape"""
+    df = make_incidents()
+    analyzer = GiStarHotspotAnalyzer()
+    density_df = analyzer.calculate_hotspot_density(df)
+
+    assert list(density_df.columns[:len(DENSITY_COLUMNS)]) == DENSITY_COLUMNS
+    assert len(density_df) > 0
+    top = density_df.iloc[0]
+    assert top['center_latitude'] == pytest.approx(41.88, abs=0.005)
+    assert top['center_longitude'] == pytest.approx(-87.63, abs=0.005)
+    assert (density_df['gi_p'] <= 0.05).all()
+
+
+def test_permutations_independent_of_worker_count():
+    """Pseudo p-values are reproducible across process counts"""
+    df = make_incidents()
+    inline = GiStarHotspotAnalyzer(permutations=99, n_jobs=1).analyze(df)
+    pooled = GiStarHotspotAnalyzer(permutations=99, n_jobs=2).analyze(df)
+
+    assert (inline['gi_p'].values == pooled['gi_p'].values).all()
+    assert (inline['moran_p'].values == pooled['moran_p'].values).all()
+    # Two-sided like the analytical p-values: at least 2 / (permutations + 1)
+    assert inline['gi_p'].between(0.02, 1.0).all()
+    analytical = GiStarHotspotAnalyzer().analyze(df)
+    top = analytical['gi_z'].idxmax()
+    assert inline.loc[top, 'hotspot_type'] == analytical.loc[top, 'hotspot_type'] == 'hot'
+    hh = inline[inline['moran_quadrant'] == 'HH']
+    assert (hh['local_i'] > 0).all()
@@ -0,0 +1,224 @@
+"""
+Tests for live hotspot delta streams
+"""
+
+from dataclasses import replace
+from datetime import date
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from starlette.requests import Request
+
+from src.api.routers import crime_map
+from src.models import hotspot_stream
+from src.models.hotspot_stream import HotspotBroadcaster, HotspotLayer
+from src.models.prediction_store import PredictionStore, PredictionTensor, grid_cells
+from src.utils.cells import cell_to_latlng, cell_to_token
+
+CHICAGO = (41.8781, -87.6298)
+
+
+def make_layer(intensity, cells=None):
+    cells = grid_cells(CHICAGO, 15, 5) if cells is None else cells
+    lat, lng = cell_to_latlng(cells)
+    intensity = np.asarray(intensity, dtype=float)
+    keep = intensity > 0.1
+    return HotspotLayer(
+        grid_id=np.array([cell_to_token(c) for c in cells])[keep],
+        lat=lat[keep],
+        lng=lng[keep],
+        intensity=intensity[keep],
+        cell_deg=0.02,
+    )
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_first_message_is_a_viewport_snapshot():
+    async def scenario():
+        broadcaster = HotspotBroadcaster()
+        layer = make_layer(np.linspace(0.2, 0.9, 100))
+        broadcaster.publish('chicago', layer)
+        bbox = (-87.65, 41.86, -87.61, 41.90)
+        subscription = broadcaster.subscribe('chicago', bbox)
+        message = await subscription.next_message(1.0, coalesce_seconds=0)
+        subscription.close()
+        return layer, bbox, message
+
+    layer, bbox, message = run(scenario())
+    assert message['type'] == 'snapshot'
+    assert message['version'] == 1
+    visible = layer.in_bbox(bbox)
+    assert 0 < len(visible) < len(layer.grid_id)
+    assert {c['grid_id'] for c in message['cells']} == set(layer.grid_id[visible])
+    cell = message['cells'][0]
+    assert set(cell) == {'grid_id', 'lat', 'lng', 'intensity', 'risk_level'}
+
+
+def test_deltas_carry_only_changed_cells():
+    async def scenario():
+        broadcaster = HotspotBroadcaster()
+        intensity = np.full(100, 0.5)
+        broadcaster.publish('chicago', make_layer(intensity))
+        subscription = broadcaster.subscribe('chicago')
+        await subscription.next_message(1.0, coalesce_seconds=0)
+
+        updated = intensity.copy()
+        updated[3] = 0.9  # Changed
+        updated[7] = 0.0  # Dropped below the threshold
+        updated[11] = 0.5002  # Below the served precision
+        n_changed = broadcaster.publish('chicago', make_layer(updated))
+        message = await subscription.next_message(1.0, coalesce_seconds=0)
+        # Republishing the same layer is not a change
+        assert broadcaster.publish('chicago', make_layer(updated)) == 0
+        quiet = await subscription.next_message(0.05, coalesce_seconds=0)
+        subscription.close()
+        return n_changed, message, quiet
+
+    n_changed, message, quiet = run(scenario())
+    tokens = [cell_to_token(c) for c in grid_cells(CHICAGO, 15, 5)]
+    assert n_changed == 2
+    assert message['type'] == 'delta'
+    assert message['version'] == 2
+    assert [c['grid_id'] for c in message['cells']] == [tokens[3]]
+    assert message['cells'][0]['intensity'] == 0.9
+    assert message['cells'][0]['risk_level'] == 'critical'
+    assert message['removed'] == [tokens[7]]
+    assert quiet is None
+
+
+def test_subscribers_only_see_their_viewport():
+    async def scenario():
+        broadcaster = HotspotBroadcaster()
+        layer = make_layer(np.full(100, 0.5))
+        broadcaster.publish('chicago', layer)
+        west = broadcaster.subscribe('chicago', (-87.74, 41.70, -87.64, 42.00))
+        east = broadcaster.subscribe('chicago', (-87.62, 41.70, -87.52, 42.00))
+        for subscription in (west, east):
+            await subscription.next_message(1.0, coalesce_seconds=0)
+
+        updated = np.full(100, 0.5)
+        updated[np.argmax(layer.lng)] = 0.7  # Easternmost cell only
+        broadcaster.publish('chicago', make_layer(updated))
+        messages = [await s.next_message(0.05, coalesce_seconds=0) for s in (west, east)]
+        west.close()
+        east.close()
+        return messages
+
+    west_message, east_message = run(scenario())
+    assert west_message is None
+    assert len(east_message['cells']) == 1
+
+
+def test_bursts_coalesce_to_latest_values():
+    async def scenario():
+        broadcaster = HotspotBroadcaster()
+        broadcaster.publish('chicago', make_layer(np.full(100, 0.5)))
+        subscription = broadcaster.subscribe('chicago')
+        await subscription.next_message(1.0, coalesce_seconds=0)
+
+        for value in (0.6, 0.7, 0.8):
+            updated = np.full(100, 0.5)
+            updated[:10] = value
+            broadcaster.publish('chicago', make_layer(updated))
+        message = await subscription.next_message(1.0, coalesce_seconds=0)
+        subscription.close()
+        return message
+
+    message = run(scenario())
+    assert message['type'] == 'delta'
+    assert message['version'] == 4
+    assert len(message['cells']) == 10
+    assert all(c['intensity'] == 0.8 for c in message['cells'])
+
+
+def test_slow_subscribers_are_resynchronized(monkeypatch):
+    monkeypatch.setattr(hotspot_stream, 'MAX_PENDING_CELLS', 20)
+
+    async def scenario():
+        broadcaster = HotspotBroadcaster()
+        broadcaster.publish('chicago', make_layer(np.full(100, 0.5)))
+        subscription = broadcaster.subscribe('chicago')
+        await subscription.next_message(1.0, coalesce_seconds=0)
+        for step in range(5):
+            updated = np.full(100, 0.5)
+            updated[step * 10 : step * 10 + 10] = 0.9
+            broadcaster.publish('chicago', make_layer(updated))
+        message = await subscription.next_message(1.0, coalesce_seconds=0)
+        subscription.close()
+        return broadcaster, message
+
+    broadcaster, message = run(scenario())
+    # 50 cells changed in total, more than the backlog bound: a snapshot replaces them
+    assert message['type'] == 'snapshot'
+    assert len(message['cells']) == 100
+    assert broadcaster.subscriber_count('chicago') == 0
+
+
+class TestStreamEndpoint:
+    """The crime-map stream serves the live layer of the prediction store"""
+
+    @pytest.fixture(autouse=True)
+    def store(self, monkeypatch):
+        cells = grid_cells(CHICAGO, 15, 5)
+        expected = np.zeros((1, 3, len(cells)), dtype=np.float32)
+        expected[0, :, :50] = 5.0
+        tensor = PredictionTensor(
+            'chicago',
+            date.today(),
+            15,
+            cells,
+            ('all',),
+            expected,
+            np.full((1, len(cells)), 0.8, dtype=np.float32),
+            'test',
+        )
+        store = PredictionStore()
+        store.put(tensor)
+        monkeypatch.setattr(crime_map, 'prediction_store', store)
+        monkeypatch.setattr(crime_map, 'broadcaster', HotspotBroadcaster())
+        monkeypatch.setattr(crime_map, '_live_keys', {})
+        monkeypatch.setattr(crime_map, '_live_checked', {})
+        return store
+
+    def test_stream_sends_snapshot_then_deltas(self, store):
+        async def receive():
+            await asyncio.sleep(10)
+            return {'type': 'http.disconnect'}
+
+        async def scenario():
+            request = Request({'type': 'http', 'method': 'GET', 'headers': []}, receive)
+            response = await crime_map.stream_hotspots(request, city='chicago', bbox=None)
+            assert response.media_type == 'text/event-stream'
+            events = response.body_iterator
+            first = await events.__anext__()
+
+            # The batch job replaces today's predictions for ten cells
+            tensor = store.get('chicago')
+            expected = tensor.expected.copy()
+            expected[0, 0, :10] = 9.0
+            store.put(replace(tensor, expected=expected))
+            crime_map.refresh_live_layer('chicago', force=True)
+            second = await events.__anext__()
+            await events.aclose()
+            return first, second
+
+        first, second = run(scenario())
+        for frame in (first, second):
+            assert frame.endswith('\n\n')
+        event, _, data = first.split('\n')[:3]
+        assert event == 'event: snapshot'
+        snapshot = json.loads(data[len('data: ') :])
+        assert len(snapshot['cells']) == 50
+        assert {c['intensity'] for c in snapshot['cells']} == {0.5}
+
+        event, _, data = second.split('\n')[:3]
+        assert event == 'event: delta'
+        delta = json.loads(data[len('data: ') :])
+        assert len(delta['cells']) == 10
+        assert {c['intensity'] for c in delta['cells']} == {0.9}
+        assert crime_map.broadcaster.subscriber_count('chicago') == 0
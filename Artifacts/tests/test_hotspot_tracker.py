@@ -0,0 +1,121 @@
+"""
+Tests for incremental sliding-window hotspot tracking
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.cluster import DBSCAN
+from src.models.hotspot_tracker import IncrementalHotspotTracker
+from src.utils.geo import to_local_km
+
+
+def make_day(day, rng, n=150):
+    """One day of incidents: background plus two persistent hotspots"""
+    hotspot = rng.random(n) < 0.4
+    coords = np.column_stack([rng.uniform(41.85, 41.91, n), rng.uniform(-87.67, -87.59, n)])
+    centres = np.array([[41.88, -87.63], [41.86, -87.61]])[rng.integers(0, 2, hotspot.sum())]
+    coords[hotspot] = centres + rng.normal(0, 0.002, (hotspot.sum(), 2))
+    return pd.DataFrame(
+        {
+            'latitude': coords[:, 0],
+            'longitude': coords[:, 1],
+            'incident_date': pd.Timestamp('2024-03-01') + pd.Timedelta(days=day),
+        }
+    )
+
+
+def assert_matches_batch_dbscan(tracker):
+    """Core points are grouped exactly as a full recluster of the window would"""
+    df = tracker.assignments()
+    x, y = to_local_km(df['latitude'].values, df['longitude'].values, *tracker.origin)
+    model = DBSCAN(eps=tracker.eps_km, min_samples=tracker.min_samples).fit(np.column_stack([x, y]))
+    core = model.core_sample_indices_
+
+    pairs = pd.DataFrame(
+        {
+            'incremental': df['cluster'].values[core],
+            'batch': model.labels_[core],
+        }
+    ).drop_duplicates()
+    assert (pairs['incremental'] >= 0).all()
+    assert pairs['incremental'].is_unique
+    assert pairs['batch'].is_unique
+
+    # Every labelled point is core or next to a core point of its cluster
+    assert ((df['cluster'] >= 0) == (model.labels_ >= 0)).all()
+
+
+def test_tracker_initialization():
+    """Test tracker defaults"""
+    tracker = IncrementalHotspotTracker()
+    assert tracker.eps == 0.01
+    assert tracker.window_days == 30
+    assert len(tracker) == 0
+    assert len(tracker.calculate_hotspot_density()) == 0
+
+
+@pytest.mark.parametrize('min_samples', [5, 12])
+def test_sliding_window_matches_full_recluster(min_samples):
+    """Incremental updates agree with batch DBSCAN on the current window"""
+    rng = np.random.default_rng(min_samples)
+    tracker = IncrementalHotspotTracker(eps=0.002, min_samples=min_samples, window_days=5)
+
+    for day in range(12):
+        stats = tracker.update(make_day(day, rng))
+        assert stats['added'] == 150
+        assert_matches_batch_dbscan(tracker)
+
+    assert len(tracker) == 5 * 150
+    assert stats['expired'] == 150
+
+
+def test_cluster_ids_stable_across_days():
+    """Persistent hotspots keep their cluster_id as the window slides"""
+    rng = np.random.default_rng(1)
+    tracker = IncrementalHotspotTracker(eps=0.003, min_samples=20, window_days=7)
+
+    history = []
+    for day in range(20):
+        tracker.update(make_day(day, rng))
+        density_df = tracker.calculate_hotspot_density()
+        top = density_df.nlargest(2, 'n_incidents')
+        history.append(dict(zip(top['center_latitude'].round(2), top['cluster_id'])))
+
+    assert all(h == history[-1] for h in history[7:])
+
+
+def test_split_and_dissolve_on_expiry():
+    """A bridge expiring splits a cluster; the larger part keeps the ID"""
+    lat = np.concatenate([np.full(10, 41.88), np.full(6, 41.88), [41.88]])
+    lon = np.concatenate(
+        [
+            -87.650 + np.linspace(0, 0.0005, 10),
+            -87.640 + np.linspace(0, 0.0005, 6),
+            [-87.645],
+        ]
+    )
+    dates = ['2024-01-02'] * 16 + ['2024-01-01']
+    df = pd.DataFrame({'latitude': lat, 'longitude': lon, 'incident_date': pd.to_datetime(dates)})
+
+    # Bridge chain between the two groups, all on the first day
+    bridge = pd.DataFrame(
+        {
+            'latitude': 41.88,
+            'longitude': np.linspace(-87.6495, -87.6405, 40),
+            'incident_date': pd.Timestamp('2024-01-01'),
+        }
+    )
+    tracker = IncrementalHotspotTracker(eps=0.0006, min_samples=3, window_days=2)
+    tracker.update(pd.concat([df, bridge]), as_of='2024-01-02')
+    before = tracker.assignments()
+    assert before['cluster'].nunique() == 1
+    original_id = before['cluster'].iloc[0]
+
+    stats = tracker.update(df.iloc[:0], as_of='2024-01-03')
+    after = tracker.assignments()
+    assert stats['expired'] == 41
+    assert stats['split'] == 1
+    assert after['cluster'].nunique() == 2
+    big = after[after['longitude'] < -87.645]['cluster'].unique()
+    assert list(big) == [original_id]
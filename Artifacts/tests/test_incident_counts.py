@@ -0,0 +1,161 @@
+"""
+Tests for the summed-area incident count cube
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import main
+from src.models.incident_counts import IncidentCountCube
+from src.utils.cells import cell_to_boundary, latlng_to_cell
+
+
+def make_incidents(n=5000, seed=11):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            'latitude': rng.uniform(41.70, 42.00, n),
+            'longitude': rng.uniform(-87.85, -87.55, n),
+            'incident_date': pd.Timestamp('2024-01-01')
+            + pd.to_timedelta(rng.integers(0, 120, n), unit='D'),
+            'crime_type': rng.choice(['THEFT', 'BATTERY', 'ASSAULT'], n),
+        }
+    )
+
+
+def brute_force(df, crime_type=None, bbox=None, start=None, end=None, resolution=15):
+    """
+    Mask count at cell granularity: incidents in any cell the bbox touches
+
+    bbox edges must not fall on cell boundaries, where float rounding decides.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if crime_type is not None:
+        mask &= (df['crime_type'] == crime_type).to_numpy()
+    if bbox is not None:
+        cells = latlng_to_cell(df['latitude'], df['longitude'], resolution)
+        south, west, north, east = cell_to_boundary(cells)
+        mask &= (east > bbox[0]) & (west <= bbox[2]) & (north > bbox[1]) & (south <= bbox[3])
+    days = pd.to_datetime(df['incident_date']).dt.date
+    if start is not None:
+        mask &= (days >= start).to_numpy()
+    if end is not None:
+        mask &= (days <= end).to_numpy()
+    return int(mask.sum())
+
+
+@pytest.fixture(scope='module')
+def incidents():
+    return make_incidents()
+
+
+@pytest.fixture(scope='module')
+def cube(incidents):
+    return IncidentCountCube.from_incidents(incidents)
+
+
+def test_cube_covers_all_incidents(cube, incidents):
+    assert cube.count() == len(incidents)
+    assert cube.counts() == incidents['crime_type'].value_counts().to_dict()
+    assert cube.start_date == date(2024, 1, 1)
+    assert cube.end_date == pd.to_datetime(incidents['incident_date']).max().date()
+
+
+@pytest.mark.parametrize(
+    'crime_type,bbox,start,end',
+    [
+        ('THEFT', None, None, None),
+        (None, (-87.703, 41.805, -87.621, 41.887), None, None),
+        ('BATTERY', (-87.803, 41.751, -87.607, 41.953), date(2024, 2, 1), date(2024, 3, 15)),
+        (None, None, date(2024, 4, 1), None),
+        ('ASSAULT', (-87.661, 41.913, -87.661, 41.913), None, date(2024, 1, 31)),
+    ],
+)
+def test_count_matches_mask(cube, incidents, crime_type, bbox, start, end):
+    """Eight-corner lookups agree with masking the incidents"""
+    assert cube.count(crime_type, bbox, start, end) == brute_force(
+        incidents, crime_type, bbox, start, end
+    )
+
+
+def test_out_of_range_queries_are_empty(cube):
+    assert cube.count(bbox=(10.0, 10.0, 11.0, 11.0)) == 0
+    assert cube.count(start=date(2025, 1, 1)) == 0
+    assert cube.count(end=date(2023, 12, 31)) == 0
+    assert cube.count(start=date(2024, 3, 1), end=date(2024, 2, 1)) == 0
+    assert cube.count('ARSON') == 0
+    with pytest.raises(ValueError):
+        cube.count(bbox=(-87.6, 41.9, -87.7, 41.8))
+
+
+def test_bbox_across_the_antimeridian(cube, incidents):
+    """west > east wraps around through 180 degrees"""
+    assert cube.count(bbox=(170.0, 41.0, -170.0, 42.0)) == 0
+    wrapped = cube.count('THEFT', bbox=(100.0, 41.805, -87.621, 41.887))
+    assert wrapped == brute_force(incidents, 'THEFT', (-180.0, 41.805, -87.621, 41.887))
+
+
+def test_incidents_without_location_or_date_count_when_unfiltered():
+    df = make_incidents(100)
+    df.loc[:9, 'latitude'] = np.nan
+    df.loc[10:14, 'incident_date'] = pd.NaT
+    df = df.drop(columns='crime_type')
+    cube = IncidentCountCube.from_incidents(df)
+    assert cube.crime_types == ('UNKNOWN',)
+    assert cube.count() == 100
+    # A date filter drops the undated, a rectangle also the unlocated
+    days = pd.to_datetime(df['incident_date']).dt.date
+    assert cube.count(start=date(2024, 1, 1)) == 95
+    assert cube.count(end=date(2024, 2, 1)) == int((days <= date(2024, 2, 1)).sum())
+    bbox = (-87.9, 41.6, -87.5, 42.1)
+    assert cube.count(bbox=bbox) == 85
+
+
+def test_bad_geocodes_spill_out_of_the_table(incidents):
+    df = incidents.copy()
+    # A handful of incidents geocoded to southern Missouri
+    df.loc[:4, ['latitude', 'longitude']] = (36.6, -91.7)
+    cube = IncidentCountCube.from_incidents(df)
+    assert cube.shape[0] * cube.shape[1] < 400
+    assert len(cube.spill) == 5
+    assert cube.count() == len(df)
+    assert cube.counts() == df['crime_type'].value_counts().to_dict()
+    assert cube.count(bbox=(-91.75, 36.55, -91.65, 36.65)) == 5
+    chicago = (-87.703, 41.805, -87.621, 41.887)
+    assert cube.count(bbox=chicago) == brute_force(df, bbox=chicago)
+    start, end = date(2024, 2, 1), date(2024, 3, 1)
+    assert cube.count('THEFT', start=start, end=end) == brute_force(df, 'THEFT', None, start, end)
+
+
+def test_stats_endpoint_filters(cube, incidents, monkeypatch):
+    monkeypatch.setattr(main, 'incident_counts', cube)
+    client = TestClient(main.app)
+
+    data = client.get('/api/v1/stats').json()
+    assert data['total_incidents'] == len(incidents)
+    assert data['date_range'] == {
+        'start': incidents['incident_date'].min().isoformat(),
+        'end': incidents['incident_date'].max().isoformat(),
+    }
+
+    bbox = (-87.703, 41.805, -87.621, 41.887)
+    params = {
+        'crime_type': 'THEFT',
+        'start_date': '2024-02-01',
+        'end_date': '2024-02-29',
+        'bbox': ','.join(map(str, bbox)),
+    }
+    data = client.get('/api/v1/stats', params=params).json()
+    expected = brute_force(incidents, 'THEFT', bbox, date(2024, 2, 1), date(2024, 2, 29))
+    assert data['total_incidents'] == expected
+    assert data['top_crime_types'] == {'THEFT': expected}
+    assert data['filters']['bbox'] == list(bbox)
+
+    assert client.get('/api/v1/stats', params={'start_date': 'Feb'}).status_code == 400
+    assert client.get('/api/v1/stats', params={'bbox': '1,2'}).status_code == 400
+    response = client.get('/api/v1/stats', params={'bbox': '170,41,-170,42'})
+    assert response.status_code == 200 and response.json()['total_incidents'] == 0
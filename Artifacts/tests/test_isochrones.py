@@ -0,0 +1,95 @@
+"""
+Tests for response-time isochrone rasters
+"""
+
+import pytest
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from src.models.isochrones import (
+    ACCESS_SPEED_KMH,
+    DETOUR_FACTOR,
+    RasterGrid,
+    response_time_raster,
+)
+from src.models.road_network import RoadNetwork
+from src.utils.geo import haversine_km
+from tests.test_road_network import ORIGIN, write_grid_extract
+
+CENTER = (41.8781, -87.6298)
+
+
+def test_grid_matches_crime_map_layout():
+    """Row i + half and column j + half hold the cell i rows and j columns from the centre"""
+    grid = RasterGrid.centered(*CENTER, 0.02, 10)
+    assert grid.shape == (20, 20)
+    for i, j in [(-10, -10), (0, 0), (3, -7), (9, 9)]:
+        row, col = grid.cell_of(CENTER[0] + i * 0.02, CENTER[1] + j * 0.02)
+        assert (row, col) == (i + 10, j + 10)
+        assert grid.lat[row] == pytest.approx(CENTER[0] + i * 0.02)
+        assert grid.lon[col] == pytest.approx(CENTER[1] + j * 0.02)
+    assert grid.cell_of(CENTER[0] + 0.5, CENTER[1]) == (-1, -1)
+
+
+def test_straight_line_times_and_nearest_depot():
+    """Single speed: detour-scaled distance to the closest station"""
+    grid = RasterGrid.centered(*CENTER, 0.02, 10)
+    depots = [CENTER, (CENTER[0] + 0.1, CENTER[1] - 0.1)]
+    raster = response_time_raster(grid, depots, speed_kmh=40.0)
+    assert raster.source == 'straight_line'
+
+    lat, lon = grid.centers()
+    distance = np.stack([haversine_km(lat, lon, *depot) for depot in depots])
+    np.testing.assert_allclose(raster.minutes, distance.min(axis=0) * DETOUR_FACTOR / 40 * 60)
+    np.testing.assert_array_equal(raster.nearest_depot, distance.argmin(axis=0))
+
+    coverage = raster.coverage([5, 10, 1000])
+    assert coverage[5.0] <= coverage[10.0] and coverage[1000.0] == 1.0
+    # Risk x response time is an elementwise product on the same grid
+    risk = np.random.default_rng(0).uniform(size=grid.shape)
+    assert (risk * raster.minutes).shape == grid.shape
+    assert raster.sample(CENTER[0], CENTER[1]) == pytest.approx(raster.minutes[10, 10])
+
+
+def test_speed_grid_routes_around_barriers():
+    """A wall of impassable cells lengthens the trip to the cells behind it"""
+    grid = RasterGrid.centered(*CENTER, 0.01, 10)
+    speed = np.full(grid.shape, 30.0)
+    open_raster = response_time_raster(grid, [CENTER], speed_kmh=speed)
+    assert open_raster.source == 'speed_grid'
+    # 8-connected moves on cells ~1.1 x 0.8 km stay within ~12% of the straight line
+    straight = response_time_raster(grid, [CENTER], speed_kmh=30.0)
+    far = straight.minutes > 5
+    ratio = open_raster.minutes[far] / straight.minutes[far]
+    assert ratio.min() > 0.99 and ratio.max() < 1.15
+
+    # Wall along row 14 with a gap at the last column
+    speed[14, :-1] = 0.0
+    walled = response_time_raster(grid, [CENTER], speed_kmh=speed)
+    assert np.all(np.isinf(walled.minutes[14, :-1]))
+    assert np.all(walled.nearest_depot[14, :-1] == -1)
+    assert walled.minutes[17, 10] > open_raster.minutes[17, 10] + 5
+    np.testing.assert_allclose(walled.minutes[:12], open_raster.minutes[:12])
+
+    with pytest.raises(ValueError):
+        response_time_raster(grid, [CENTER], speed_kmh=np.ones((3, 3)))
+
+
+def test_road_network_times(tmp_path):
+    """Road mode equals Dijkstra from the nearest station plus access legs"""
+    network = RoadNetwork.from_osm(write_grid_extract(tmp_path / 'city.osm'), cache=False)
+    graph = network.graph
+    grid = RasterGrid(ORIGIN[0] + 0.001, ORIGIN[1] + 0.001, 0.004, 6, 8)
+    depots = [(ORIGIN[0] + 0.003, ORIGIN[1] + 0.004), (ORIGIN[0] + 0.02, ORIGIN[1] + 0.025)]
+    raster = response_time_raster(grid, depots, network=network)
+    assert raster.source == 'road'
+
+    adjacency = csr_matrix((graph.time_h, (graph.src, graph.dst)), shape=(graph.n_nodes,) * 2)
+    depot_nodes, depot_access = network.snap(*np.array(depots).T)
+    from_depots = dijkstra(adjacency, directed=True, indices=depot_nodes)
+    from_depots += (depot_access / ACCESS_SPEED_KMH)[:, None]
+    lat, lon = grid.centers()
+    nodes, access = network.snap(lat.ravel(), lon.ravel())
+    expected = from_depots[:, nodes] + access / ACCESS_SPEED_KMH
+    np.testing.assert_allclose(raster.minutes.ravel(), expected.min(axis=0) * 60, rtol=1e-9)
+    np.testing.assert_array_equal(raster.nearest_depot.ravel(), expected.argmin(axis=0))
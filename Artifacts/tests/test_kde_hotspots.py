@@ -0,0 +1,79 @@
+"""
+Tests for KDE hotspot engine
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.models.kde_hotspots import KDEHotspotEngine
+
+
+def make_incidents(n=2000, seed=3):
+    """Incidents around one dense centre plus uniform background"""
+    rng = np.random.default_rng(seed)
+    dense = rng.normal([41.88, -87.63], 0.002, (n // 2, 2))
+    background = np.column_stack([
+        rng.uniform(41.80, 41.96, n // 2),
+        rng.uniform(-87.72, -87.54, n // 2),
+    ])
+    coords = np.vstack([dense, background])
+    return pd.DataFrame({
+        'latitude': coords[:, 0],
+        'longitude': coords[:, 1],
+        'incident_date': pd.Timestamp('2024-06-30') - pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'crime_type': rng.choice(['THEFT', 'HOMICIDE'], n),
+    })
+
+
+def test_kde_engine_initialization():
+    """Test engine defaults and kernel validation"""
+    engine = KDEHotspotEngine()
+    assert engine.cell_size_m == 50.0
+    assert engine.kernel == 'gaussian'
+
+    with pytest.raises(ValueError):
+        KDEHotspotEngine(kernel='epanechnikov')
+
+
+@pytest.mark.parametrize('kernel', ['gaussian', 'quartic'])
+def test_surface_preserves_mass_and_peaks_at_centre(kernel):
+    """Smoothing redistributes but does not create or lose incidents"""
+    df = make_incidents()
+    surface = KDEHotspotEngine(kernel=kernel).fit(df)
+
+    cell_area_km2 = (surface.cell_size_m / 1000.0) ** 2
+    assert surface.density.sum() * cell_area_km2 == pytest.approx(len(df), rel=1e-6)
+
+    row, col = np.unravel_index(surface.density.argmax(), surface.shape)
+    assert surface.lat_centers[row] == pytest.approx(41.88, abs=0.003)
+    assert surface.lon_centers[col] == pytest.approx(-87.63, abs=0.003)
+
+
+def test_weights_apply_decay_and_severity():
+    """Recency decay halves per half-life and severity multiplies"""
+    df = pd.DataFrame({
+        'latitude': [41.88, 41.88, 41.88],
+        'longitude': [-87.63, -87.63, -87.63],
+        'incident_date': pd.to_datetime(['2024-01-31', '2024-01-01', '2024-01-31']),
+        'crime_type': ['THEFT', 'THEFT', 'HOMICIDE'],
+    })
+    engine = KDEHotspotEngine(half_life_days=30, severity_weights={'HOMICIDE': 4.0})
+    weights = engine.compute_weights(df)
+
+    assert weights == pytest.approx([1.0, 0.5, 4.0])
+
+
+def test_fixed_bounds_and_sampling():
+    """Surfaces on fixed bounds line up and can be sampled"""
+    df = make_incidents()
+    bounds = (41.80, -87.72, 41.96, -87.54)
+    surface = KDEHotspotEngine(cell_size_m=100).fit(df, bounds=bounds)
+
+    assert surface.min_lat == 41.80
+    values = surface.sample([41.88, 10.0], [-87.63, 10.0])
+    assert values[0] > 0
+    assert values[1] == 0
+
+    cells = surface.to_dataframe(min_intensity=0.5)
+    assert len(cells) > 0
+    assert cells['intensity'].max() == pytest.approx(1.0)
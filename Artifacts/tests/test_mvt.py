@@ -0,0 +1,201 @@
+"""
+Tests for Mapbox Vector Tile encoding and the tile cache
+"""
+
+import os
+import struct
+
+import pytest
+import numpy as np
+from src.utils.mvt import (
+    EXTENT,
+    TileCache,
+    TileLayer,
+    TileStore,
+    lonlat_to_world,
+    tile_bounds,
+)
+
+CENTER = (41.8781, -87.6298)
+
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def read_message(data):
+    """Protobuf message as a list of (field number, value) pairs"""
+    fields, pos = [], 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        number, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = read_varint(data, pos)
+        elif wire == 1:
+            value, pos = struct.unpack('<d', data[pos : pos + 8])[0], pos + 8
+        elif wire == 2:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos : pos + length], pos + length
+        else:
+            raise AssertionError(f"Unexpected wire type {wire}")
+        fields.append((number, value))
+    return fields
+
+
+def packed(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def unzigzag(v):
+    return (v >> 1) ^ -(v & 1)
+
+
+def decode_tile(data):
+    """{layer name: (extent, [(geometry type, geometry ints, properties), ...])}"""
+    layers = {}
+    for number, layer_bytes in read_message(data):
+        assert number == 3
+        fields = read_message(layer_bytes)
+        name = next(v for n, v in fields if n == 1).decode()
+        keys = [v.decode() for n, v in fields if n == 3]
+        values = []
+        for n, v in fields:
+            if n == 4:
+                ((kind, value),) = read_message(v)
+                values.append(value.decode() if kind == 1 else value)
+        assert dict(fields)[15] == 2
+        features = []
+        for n, v in fields:
+            if n != 2:
+                continue
+            feature = dict(read_message(v))
+            tags = packed(feature.get(2, b''))
+            props = {keys[k]: values[i] for k, i in zip(tags[::2], tags[1::2])}
+            features.append((feature[3], packed(feature[4]), props))
+        layers[name] = (dict(fields)[5], features)
+    return layers
+
+
+def decode_points(geometry):
+    assert geometry[0] == 9
+    return unzigzag(geometry[1]), unzigzag(geometry[2])
+
+
+def tile_of(lat, lon, z):
+    wx, wy = lonlat_to_world(lat, lon)
+    return int(wx) >> (32 - z), int(wy) >> (32 - z)
+
+
+def make_incidents(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = CENTER[0] + rng.normal(0, 0.05, n)
+    lon = CENTER[1] + rng.normal(0, 0.05, n)
+    crime = rng.choice(['THEFT', 'BATTERY', 'ASSAULT'], n)
+    return lat, lon, crime
+
+
+def test_point_tile_round_trip():
+    """Every point inside a tile is present once with its position and properties"""
+    lat, lon, crime = make_incidents(2000)
+    layer = TileLayer('incidents', lat, lon, {'crime_type': crime, 'weight': np.arange(2000)})
+    z = 13
+    x, y = tile_of(*CENTER, z)
+    extent, features = decode_tile(layer.encode(z, x, y))['incidents']
+    assert extent == EXTENT
+
+    west, south, east, north = tile_bounds(z, x, y)
+    inside = (lon >= west) & (lon < east) & (lat > south) & (lat <= north)
+    assert len(features) == inside.sum() > 0
+    by_weight = {int(props['weight']): (geom, props) for _, geom, props in features}
+    assert sorted(by_weight) == np.flatnonzero(inside).tolist()
+    for i in np.flatnonzero(inside)[:50]:
+        geom, props = by_weight[i]
+        px, py = decode_points(geom)
+        assert 0 <= px < EXTENT and 0 <= py < EXTENT
+        assert west + (east - west) * px / EXTENT == pytest.approx(
+            lon[i], abs=(east - west) / EXTENT
+        )
+        assert props['crime_type'] == crime[i] and props['point_count'] == 1
+
+    # Empty tiles encode to nothing
+    assert layer.encode(z, x + 50, y) == b''
+    with pytest.raises(ValueError):
+        layer.encode(3, 8, 0)
+
+
+def test_crowded_tiles_are_aggregated():
+    """Low-zoom tiles carry bins whose counts add up to every point"""
+    lat, lon, crime = make_incidents(20000, seed=1)
+    layer = TileLayer('incidents', lat, lon, {'crime_type': crime}, max_features=1000)
+    x, y = tile_of(*CENTER, 8)
+    _, features = decode_tile(layer.encode(8, x, y))['incidents']
+    assert len(features) <= (EXTENT // 64) ** 2
+    wx, wy = lonlat_to_world(lat, lon)
+    in_tile = ((wx >> np.uint64(24)) == x) & ((wy >> np.uint64(24)) == y)
+    assert sum(props['point_count'] for _, _, props in features) == in_tile.sum() > 1000
+    assert all(set(props) == {'point_count'} for _, _, props in features)
+
+    _, world = decode_tile(layer.encode(0, 0, 0))['incidents']
+    assert sum(props['point_count'] for _, _, props in world) == 20000
+
+
+def test_cell_layer_polygons_are_clipped():
+    """Risk cells become clockwise rectangles clipped to the buffered tile"""
+    rows, cols = np.meshgrid(np.arange(-10, 10), np.arange(-10, 10), indexing='ij')
+    lat = CENTER[0] + rows.ravel() * 0.02
+    lon = CENTER[1] + cols.ravel() * 0.02
+    risk = np.linspace(0, 1, lat.size)
+    layer = TileLayer('risk', lat, lon, {'risk': risk}, cell_size_deg=0.02)
+
+    z = 12
+    x, y = tile_of(*CENTER, z)
+    _, features = decode_tile(layer.encode(z, x, y))['risk']
+    assert 0 < len(features) < lat.size
+    for geom_type, geom, props in features:
+        assert geom_type == 3
+        assert geom[0] == 9 and geom[3] == 26 and geom[-1] == 15
+        x0, y0 = unzigzag(geom[1]), unzigzag(geom[2])
+        dx, _, _, dy, back, _ = [unzigzag(v) for v in geom[4:10]]
+        assert dx > 0 and dy > 0 and back == -dx
+        assert -64 <= x0 and x0 + dx <= EXTENT + 64 and -64 <= y0 and y0 + dy <= EXTENT + 64
+        assert 0 <= props['risk'] <= 1
+
+    _, whole = decode_tile(layer.encode(8, *tile_of(*CENTER, 8)))['risk']
+    assert len(whole) >= lat.size // 2
+
+
+def test_store_caches_and_invalidates_by_version(tmp_path):
+    """Tiles are served from memory, then disk; a new version drops old tiles"""
+    lat, lon, crime = make_incidents(500)
+    cache = TileCache(max_entries=2, cache_dir=str(tmp_path))
+    store = TileStore(cache)
+    store.set_layer(TileLayer('incidents', lat, lon, {'crime_type': crime}, version='v1'))
+
+    x, y = tile_of(*CENTER, 12)
+    first = store.tile('incidents', 12, x, y)
+    assert store.tile('incidents', 12, x, y) == first
+    assert cache.info()['hits'] == 1
+    assert os.path.exists(tmp_path / 'incidents' / 'v1' / '12' / str(x) / f'{y}.mvt')
+
+    # Evicted from memory, still on disk
+    store.tile('incidents', 12, x + 1, y)
+    store.tile('incidents', 12, x, y + 1)
+    assert store.tile('incidents', 12, x, y) == first
+    assert cache.info()['disk_hits'] == 1
+
+    store.set_layer(TileLayer('incidents', lat[:100], lon[:100], version='v2'))
+    assert not os.path.exists(tmp_path / 'incidents' / 'v1')
+    assert store.tile('incidents', 12, x, y) != first
+    with pytest.raises(KeyError):
+        store.tile('hotspots', 12, x, y)
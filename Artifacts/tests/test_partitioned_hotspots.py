@@ -0,0 +1,83 @@
+"""
+Tests for partitioned hotspot detection
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.cluster import DBSCAN
+from src.models.partitioned_hotspots import PartitionedHotspotDetector
+
+
+def make_incidents(n=3000, seed=7):
+    """Incidents around a few centres, one of them straddling a district border"""
+    rng = np.random.default_rng(seed)
+    centres = np.array([[41.88, -87.63], [41.90, -87.66], [41.85, -87.60]])
+    which = rng.integers(0, len(centres), n)
+    coords = centres[which] + rng.normal(0, 0.004, (n, 2))
+    df = pd.DataFrame({'latitude': coords[:, 0], 'longitude': coords[:, 1]})
+    # District border runs straight through the first centre
+    df['district'] = np.where(df['longitude'] > -87.63, 1, 2)
+    df['crime_type'] = rng.choice(['THEFT', 'BATTERY', 'NARCOTICS'], n, p=[0.5, 0.3, 0.2])
+    return df
+
+
+def test_partitioned_detector_initialization():
+    """Test defaults and halo selection"""
+    detector = PartitionedHotspotDetector()
+    assert detector.eps == 0.01
+    assert detector.halo is True
+
+    detector = PartitionedHotspotDetector(partition_by='crime_type')
+    assert detector.halo is False
+
+
+def test_border_clusters_match_global_dbscan():
+    """Clusters cut by a district border are merged back together"""
+    df = make_incidents()
+    detector = PartitionedHotspotDetector(eps=0.003, min_samples=15, n_jobs=1)
+    hotspots_df = detector.detect_hotspots(df)
+
+    model = DBSCAN(eps=0.003, min_samples=15).fit(df[['latitude', 'longitude']].values)
+    core = model.core_sample_indices_
+
+    # Core points must be grouped exactly as a single global run groups them
+    pairs = pd.DataFrame({
+        'partitioned': hotspots_df['cluster'].values[core],
+        'global': model.labels_[core],
+    }).drop_duplicates()
+    assert pairs['partitioned'].is_unique
+    assert pairs['global'].is_unique
+    assert (hotspots_df['cluster'].values[core] >= 0).all()
+
+
+def test_process_pool_matches_inline():
+    """Running in a process pool gives the same clusters"""
+    df = make_incidents(n=1500)
+    inline = PartitionedHotspotDetector(eps=0.003, min_samples=10, n_jobs=1).detect_hotspots(df)
+    pooled = PartitionedHotspotDetector(eps=0.003, min_samples=10, n_jobs=2).detect_hotspots(df)
+
+    assert (inline['cluster'].values == pooled['cluster'].values).all()
+
+
+def test_crime_type_partitions_density():
+    """Density table carries the partition key"""
+    df = make_incidents()
+    detector = PartitionedHotspotDetector(
+        eps=0.003, min_samples=10, partition_by='crime_type', top_n_partitions=2, n_jobs=1
+    )
+    hotspots_df = detector.detect_hotspots(df)
+    assert set(hotspots_df['crime_type']) == {'THEFT', 'BATTERY'}
+
+    density_df = detector.calculate_hotspot_density(hotspots_df)
+    assert len(density_df) > 0
+    assert 'crime_type' in density_df.columns
+    assert 'density_per_km2' in density_df.columns
+    assert density_df['cluster_id'].is_unique
+
+
+def test_missing_partition_column():
+    """Unknown partition column raises"""
+    df = make_incidents(n=100).drop(columns=['district'])
+    with pytest.raises(ValueError):
+        PartitionedHotspotDetector().detect_hotspots(df)
@@ -0,0 +1,111 @@
+"""
+Tests for the hierarchical point-cluster index
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.mapbox import MapboxVisualizer
+from src.utils.point_clusters import PointClusterIndex, abbreviate, project, unproject
+
+CENTER = (41.8781, -87.6298)
+CITY_BBOX = (-88.2, 41.4, -87.0, 42.3)
+
+
+def make_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = CENTER[0] + rng.normal(0, 0.05, n)
+    lon = CENTER[1] + rng.normal(0, 0.05, n)
+    return lat, lon
+
+
+def total(features):
+    return sum(f['properties'].get('point_count', 1) for f in features)
+
+
+def test_projection_round_trip():
+    """Mercator projection inverts to the original coordinates"""
+    lat, lon = make_points(100)
+    back_lat, back_lon = unproject(*project(lat, lon))
+    assert np.allclose(back_lat, lat) and np.allclose(back_lon, lon)
+
+
+def test_counts_are_preserved_at_every_zoom():
+    """Every point is counted exactly once, with fewer features at lower zooms"""
+    lat, lon = make_points(5000)
+    index = PointClusterIndex(lat, lon, properties={'weight': np.arange(5000)})
+    previous = 0
+    for zoom in range(0, 18):
+        features = index.get_clusters(CITY_BBOX, zoom)
+        assert total(features) == 5000
+        assert len(features) >= previous
+        previous = len(features)
+    assert len(index.get_clusters(CITY_BBOX, 2)) == 1
+
+    # Beyond max_zoom the raw points come back with their properties
+    points = index.get_clusters(CITY_BBOX, 20)
+    assert len(points) == 5000
+    assert sorted(f['properties']['weight'] for f in points) == list(range(5000))
+
+
+def test_bbox_filters_cluster_centres():
+    """Only clusters whose centre is inside the bbox are returned"""
+    lat, lon = make_points(3000, seed=1)
+    index = PointClusterIndex(lat, lon)
+    west, south, east, north = bbox = (-87.65, 41.86, -87.60, 41.90)
+    features = index.get_clusters(bbox, 12)
+    assert features
+    for f in features:
+        x, y = f['geometry']['coordinates']
+        assert west <= x <= east and south <= y <= north
+
+    raw = index.get_clusters(bbox, 17)
+    inside = (lon >= west) & (lon <= east) & (lat >= south) & (lat <= north)
+    assert len(raw) == inside.sum()
+    assert index.get_clusters((10.0, 10.0, 11.0, 11.0), 12) == []
+    with pytest.raises(ValueError):
+        index.get_clusters((west, north, east, south), 12)
+
+
+def test_cluster_children_and_expansion():
+    """A cluster's children add up to it, and it splits at its expansion zoom"""
+    lat, lon = make_points(2000, seed=2)
+    index = PointClusterIndex(lat, lon)
+    cluster = max(
+        index.get_clusters(CITY_BBOX, 8), key=lambda f: f['properties'].get('point_count', 1)
+    )
+    cluster_id = cluster['properties']['cluster_id']
+    assert total(index.get_children(cluster_id)) == cluster['properties']['point_count']
+
+    zoom = index.expansion_zoom(cluster_id)
+    assert zoom > 8
+
+    # Point IDs are indices into the input; cluster IDs start after them
+    features = index.get_clusters(CITY_BBOX, 13)
+    points = [f['id'] for f in features if not f['properties'].get('cluster')]
+    clusters = [f['id'] for f in features if f['properties'].get('cluster')]
+    assert points and clusters
+    assert max(points) < len(lat) <= min(clusters)
+    with pytest.raises(ValueError):
+        index.get_children(max(points))
+    assert abbreviate(1234) == '1.2k' and abbreviate(56789) == '57k' and abbreviate(12) == '12'
+
+
+def test_visualizer_builds_index_once_per_version():
+    """MapboxVisualizer reuses the index until the dataset version changes"""
+    lat, lon = make_points(1000, seed=3)
+    df = pd.DataFrame({'latitude': lat, 'longitude': lon, 'crime_type': 'THEFT'})
+    visualizer = MapboxVisualizer()
+    with pytest.raises(ValueError):
+        visualizer.create_cluster_map_data(CITY_BBOX, 10)
+
+    data = visualizer.create_cluster_map_data(CITY_BBOX, 10, df=df, version='v1')
+    assert data['type'] == 'FeatureCollection' and total(data['features']) == 1000
+    index = visualizer._cluster_index
+    visualizer.create_cluster_map_data(CITY_BBOX, 12, df=df, version='v1')
+    assert visualizer._cluster_index is index
+
+    visualizer.create_cluster_map_data(CITY_BBOX, 12, df=df.iloc[:10], version='v2')
+    assert visualizer._cluster_index is not index
+    single = visualizer.create_cluster_map_data(CITY_BBOX, 20)['features']
+    assert len(single) == 10 and single[0]['properties'] == {'crime_type': 'THEFT'}
@@ -0,0 +1,345 @@
+"""
+Tests for the crime-map prediction store
+"""
+
+from dataclasses import replace
+from datetime import date, timedelta
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.api.routers import crime_map
+from src.models.prediction_store import (
+    ALL_TYPES,
+    PredictionStore,
+    PredictionTensor,
+    build_prediction_tensor,
+    grid_cells,
+    resolution_for_zoom,
+    risk_levels,
+    roll_up,
+)
+from src.utils.cells import cell_resolution, cell_to_boundary, cell_to_latlng, cell_to_token
+
+CHICAGO = (41.8781, -87.6298)
+START = date(2024, 7, 1)
+
+
+def make_incidents(n=3000, seed=5):
+    """Incidents around one dense centre plus uniform background, over 13 weeks"""
+    rng = np.random.default_rng(seed)
+    dense = rng.normal(CHICAGO, 0.01, (n // 2, 2))
+    background = np.column_stack(
+        [
+            rng.uniform(41.68, 42.08, n // 2),
+            rng.uniform(-87.83, -87.43, n // 2),
+        ]
+    )
+    coords = np.vstack([dense, background])
+    return pd.DataFrame(
+        {
+            'latitude': coords[:, 0],
+            'longitude': coords[:, 1],
+            'incident_date': pd.Timestamp('2024-06-30')
+            - pd.to_timedelta(rng.integers(0, 91, n), unit='D'),
+            'crime_type': rng.choice(['THEFT', 'BATTERY'], n),
+        }
+    )
+
+
+@pytest.fixture(scope='module')
+def tensor():
+    cells = grid_cells(CHICAGO, 15, 10)
+    return build_prediction_tensor(make_incidents(), 'chicago', cells, START, horizon_days=14)
+
+
+def test_risk_levels_use_exclusive_lower_bounds():
+    """Thresholds belong to the lower level, as in the per-cell risk rules"""
+    levels = risk_levels(np.array([0.0, 0.3, 0.31, 0.6, 0.61, 0.8, 0.81, 1.0]))
+    assert levels.tolist() == [
+        'low',
+        'low',
+        'medium',
+        'medium',
+        'high',
+        'high',
+        'critical',
+        'critical',
+    ]
+
+
+def test_grid_cells_cover_city_grid():
+    """Row-major grid of distinct cells around the centre cell"""
+    cells = grid_cells(CHICAGO, 15, 10)
+    assert len(cells) == 400
+    assert len(np.unique(cells)) == 400
+    lat, lon = cell_to_latlng(cells)
+    assert np.all(np.diff(lat.reshape(20, 20)[:, 0]) > 0)
+    assert np.all(np.diff(lon.reshape(20, 20)[0]) > 0)
+    assert abs(lat.mean() - CHICAGO[0]) < 0.02 and abs(lon.mean() - CHICAGO[1]) < 0.02
+
+
+def test_tensor_totals_follow_weekday_means(tensor):
+    """Daily city totals are the weekday means of the history"""
+    incidents = make_incidents()
+    dates = pd.to_datetime(incidents['incident_date'])
+    history = pd.date_range(dates.min(), dates.max(), freq='D')
+    per_weekday = np.bincount(dates.dt.weekday, minlength=7) / np.bincount(history.weekday)
+
+    assert tensor.crime_types[0] == ALL_TYPES
+    assert set(tensor.crime_types[1:]) == {'THEFT', 'BATTERY'}
+    assert tensor.expected.shape == (3, 14, 400)
+    horizon = pd.date_range(pd.Timestamp(START), periods=14, freq='D')
+    np.testing.assert_allclose(
+        tensor.expected[0].sum(axis=1), per_weekday[horizon.weekday], rtol=1e-4
+    )
+    # Types split the total between them
+    np.testing.assert_allclose(
+        tensor.expected[1:].sum(axis=(0, 2)), tensor.expected[0].sum(axis=1), rtol=1e-4
+    )
+    assert np.all((tensor.confidence >= 0.5) & (tensor.confidence <= 0.95))
+
+
+def test_tensor_peaks_at_dense_centre(tensor):
+    """The cell holding the dense cluster expects the most incidents"""
+    expected, confidence = tensor.window(ALL_TYPES, START, 7)
+    lat, lon = tensor.centers
+    peak = np.argmax(expected)
+    assert abs(lat[peak] - CHICAGO[0]) < 0.03 and abs(lon[peak] - CHICAGO[1]) < 0.03
+    assert confidence[peak] == confidence.max()
+
+
+def test_window_sums_days_and_checks_horizon(tensor):
+    expected, _ = tensor.window('THEFT', START + timedelta(days=2), 3)
+    theft = tensor.crime_types.index('THEFT')
+    np.testing.assert_allclose(expected, tensor.expected[theft, 2:5].sum(axis=0))
+    assert tensor.end_date == START + timedelta(days=13)
+    tensor.window(ALL_TYPES, START + timedelta(days=13), 1)
+    with pytest.raises(ValueError):
+        tensor.window(ALL_TYPES, START + timedelta(days=13), 2)
+    with pytest.raises(ValueError):
+        tensor.window(ALL_TYPES, START - timedelta(days=1), 1)
+    with pytest.raises(KeyError):
+        tensor.window('ARSON', START, 1)
+
+
+def test_between_uses_running_totals(tensor):
+    """Any date range equals the sum of its daily layers"""
+    assert tensor.cumulative.shape == (3, 15, 400)
+    np.testing.assert_array_equal(tensor.cumulative[:, 0], 0.0)
+    for first, last in [(0, 0), (0, 13), (3, 9), (13, 13)]:
+        expected, _ = tensor.between(
+            'BATTERY', START + timedelta(days=first), START + timedelta(days=last)
+        )
+        battery = tensor.crime_types.index('BATTERY')
+        np.testing.assert_allclose(
+            expected, tensor.expected[battery, first : last + 1].sum(axis=0), rtol=1e-6
+        )
+
+    cells = np.array([5, 17, 390])
+    subset, confidence = tensor.between(ALL_TYPES, START, START + timedelta(days=6), cells)
+    full, _ = tensor.window(ALL_TYPES, START, 7)
+    np.testing.assert_array_equal(subset, full[cells])
+    np.testing.assert_array_equal(confidence, tensor.confidence[0, cells])
+    with pytest.raises(ValueError):
+        tensor.between(ALL_TYPES, START + timedelta(days=2), START + timedelta(days=1))
+
+
+def test_cells_in_matches_brute_force(tensor):
+    """The spatial index returns exactly the cells centred in the bbox"""
+    lat, lon = tensor.centers
+    bbox = (-87.70, 41.85, -87.61, 41.93)
+    brute = np.flatnonzero(
+        (lon >= bbox[0]) & (lon <= bbox[2]) & (lat >= bbox[1]) & (lat <= bbox[3])
+    )
+    np.testing.assert_array_equal(tensor.cells_in(bbox), brute)
+    assert 0 < len(brute) < len(tensor.cells)
+
+    grown = tensor.cells_in(bbox, margin=0.02)
+    assert set(brute) < set(grown)
+    assert len(tensor.cells_in((10.0, 10.0, 11.0, 11.0))) == 0
+    with pytest.raises(ValueError):
+        tensor.cells_in((-87.7, 41.9, -87.6, 41.8))
+
+
+def test_roll_up_sums_into_parents(tensor):
+    """Expected incidents are conserved and confidence averaged per parent"""
+    expected, confidence = tensor.window(ALL_TYPES, START, 7)
+    parents, summed, mean_confidence = roll_up(tensor.cells, expected, confidence, 13)
+    assert np.all(cell_resolution(parents) == 13)
+    np.testing.assert_allclose(summed.sum(), expected.sum(), rtol=1e-6)
+
+    south, west, north, east = cell_to_boundary(parents[:1])
+    lat, lon = tensor.centers
+    inside = (lat > south) & (lat < north) & (lon > west) & (lon < east)
+    np.testing.assert_allclose(summed[0], expected[inside].sum(), rtol=1e-6)
+    np.testing.assert_allclose(mean_confidence[0], confidence[inside].mean(), rtol=1e-6)
+
+
+def test_resolution_for_zoom():
+    """One resolution per zoom level, capped at the stored resolution"""
+    assert resolution_for_zoom(10, 15) == 15
+    assert resolution_for_zoom(8.7, 15) == 13
+    assert resolution_for_zoom(18, 15) == 15
+    assert resolution_for_zoom(0, 15) == 5
+
+
+def test_daily_totals_rescale_every_type():
+    """A forecast of city totals sets the 'all' total and scales each type alike"""
+    cells = grid_cells(CHICAGO, 15, 4)
+    totals = np.linspace(20, 40, 7)
+    base = build_prediction_tensor(make_incidents(), 'chicago', cells, START, horizon_days=7)
+    scaled = build_prediction_tensor(
+        make_incidents(), 'chicago', cells, START, horizon_days=7, daily_totals=totals
+    )
+    np.testing.assert_allclose(scaled.expected[0].sum(axis=1), totals, rtol=1e-4)
+    ratio = scaled.expected[1].sum(axis=1) / base.expected[1].sum(axis=1)
+    np.testing.assert_allclose(ratio, totals / base.expected[0].sum(axis=1), rtol=1e-4)
+
+    with pytest.raises(ValueError):
+        build_prediction_tensor(
+            make_incidents(), 'chicago', cells, START, horizon_days=7, daily_totals=totals[:3]
+        )
+
+
+def test_store_round_trip_and_reload(tensor, tmp_path):
+    """Tensors persist to disk and are reloaded when the file is replaced"""
+    store = PredictionStore(str(tmp_path))
+    assert store.get('chicago') is None
+    store.put(tensor)
+
+    loaded = PredictionStore(str(tmp_path)).get('chicago')
+    assert isinstance(loaded, PredictionTensor)
+    assert loaded.start_date == tensor.start_date
+    assert loaded.crime_types == tensor.crime_types
+    np.testing.assert_array_equal(loaded.cells, tensor.cells)
+    np.testing.assert_array_equal(loaded.expected, tensor.expected)
+
+    reader = PredictionStore(str(tmp_path))
+    assert reader.get('chicago').model_version == tensor.model_version
+    PredictionStore(str(tmp_path)).put(replace(tensor, model_version='next'))
+    path = tmp_path / 'chicago.npz'
+    mtime = os.stat(path).st_mtime
+    os.utime(path, (mtime + 5, mtime + 5))
+    assert reader.get('chicago').model_version == 'next'
+
+
+class TestStoredHotspotsEndpoint:
+    """The crime-map endpoint serves slices of a stored tensor"""
+
+    @pytest.fixture(autouse=True)
+    def store(self, tensor, monkeypatch):
+        store = PredictionStore()
+        store.put(tensor)
+        monkeypatch.setattr(crime_map, 'prediction_store', store)
+
+    def test_hotspots_come_from_the_tensor(self, tensor):
+        client = TestClient(app)
+        response = client.get(
+            '/api/crime-map/hotspots',
+            params={'city': 'chicago', 'date': '2024-07-03', 'time_window': '7d'},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data['model_version'] == tensor.model_version
+        assert data['prediction_date'] == '2024-07-03'
+
+        expected, _ = tensor.window(ALL_TYPES, date(2024, 7, 3), 7)
+        intensity = np.round(np.clip(expected / 70.0, 0, 1), 3)
+        tokens = [cell_to_token(c) for c in tensor.cells]
+        assert len(data['hotspots']) == int((intensity > 0.1).sum()) > 0
+        for hotspot in data['hotspots']:
+            i = tokens.index(hotspot['grid_id'])
+            assert hotspot['intensity'] == intensity[i]
+            assert hotspot['predicted_incidents'] == int(expected[i])
+            assert hotspot['risk_level'] == risk_levels(np.array([hotspot['intensity']]))[0]
+            assert hotspot['crime_type'] == 'all'
+        assert data['total_predicted_incidents'] == sum(
+            h['predicted_incidents'] for h in data['hotspots']
+        )
+
+    def test_crime_type_and_window_validation(self):
+        client = TestClient(app)
+        ok = client.get(
+            '/api/crime-map/hotspots', params={'crime_type': 'theft', 'date': '2024-07-01'}
+        )
+        assert ok.status_code == 200
+        assert all(h['crime_type'] == 'theft' for h in ok.json()['hotspots'])
+
+        assert (
+            client.get(
+                '/api/crime-map/hotspots', params={'crime_type': 'ARSON', 'date': '2024-07-01'}
+            ).status_code
+            == 404
+        )
+        assert (
+            client.get(
+                '/api/crime-map/hotspots', params={'date': '2024-07-10', 'time_window': '30d'}
+            ).status_code
+            == 404
+        )
+        assert (
+            client.get(
+                '/api/crime-map/hotspots', params={'date': '2024-07-01', 'time_window': '1y'}
+            ).status_code
+            == 400
+        )
+        assert client.get('/api/crime-map/hotspots', params={'date': 'July'}).status_code == 400
+
+    def test_viewport_returns_overlapping_cells_only(self, tensor, monkeypatch):
+        monkeypatch.setattr(crime_map, 'MIN_HOTSPOT_INTENSITY', -1.0)
+        client = TestClient(app)
+        bbox = (-87.70, 41.85, -87.61, 41.93)
+        params = {'date': '2024-07-01', 'bbox': ','.join(map(str, bbox))}
+        hotspots = client.get('/api/crime-map/hotspots', params=params).json()['hotspots']
+
+        south, west, north, east = cell_to_boundary(tensor.cells)
+        overlapping = (
+            (east >= bbox[0]) & (west <= bbox[2]) & (north >= bbox[1]) & (south <= bbox[3])
+        )
+        tokens = tensor.tokens[overlapping]
+        assert sorted(h['grid_id'] for h in hotspots) == sorted(tokens)
+        assert len(hotspots) < len(tensor.cells)
+
+    def test_zoom_aggregates_to_coarser_cells(self, tensor, monkeypatch):
+        monkeypatch.setattr(crime_map, 'MIN_HOTSPOT_INTENSITY', -1.0)
+        client = TestClient(app)
+        fine = client.get('/api/crime-map/hotspots', params={'date': '2024-07-01'}).json()
+        coarse = client.get(
+            '/api/crime-map/hotspots', params={'date': '2024-07-01', 'zoom': 8}
+        ).json()
+        assert coarse['grid_resolution'] == '9km'
+        assert len(coarse['hotspots']) < len(fine['hotspots'])
+
+        expected, _ = tensor.window(ALL_TYPES, START, 1)
+        parents, summed, _ = roll_up(tensor.cells, expected, tensor.confidence[0], 13)
+        by_token = {cell_to_token(c): total for c, total in zip(parents, summed)}
+        for hotspot in coarse['hotspots']:
+            total = by_token[hotspot['grid_id']]
+            assert hotspot['predicted_incidents'] == int(total)
+            # Mean intensity of the 16 stored cells the parent covers
+            assert hotspot['intensity'] == round(min(total / (10.0 * 16), 1.0), 3)
+
+    def test_bad_viewport_is_rejected(self):
+        client = TestClient(app)
+        for bbox in ('1,2,3', 'a,b,c,d', '-87.7,41.9,-87.6,41.8'):
+            response = client.get('/api/crime-map/hotspots', params={'bbox': bbox})
+            assert response.status_code == 400
+
+    def test_custom_window_from_end_date(self, tensor):
+        client = TestClient(app)
+        params = {'date': '2024-07-02', 'end_date': '2024-07-11'}
+        data = client.get('/api/crime-map/hotspots', params=params).json()
+        expected, _ = tensor.between(ALL_TYPES, date(2024, 7, 2), date(2024, 7, 11))
+        intensity = np.round(np.clip(expected / 100.0, 0, 1), 3)
+        assert len(data['hotspots']) == int((intensity > 0.1).sum())
+
+        # Beyond the horizon, or ending before it starts
+        params = {'date': '2024-07-02', 'end_date': '2024-07-20'}
+        assert client.get('/api/crime-map/hotspots', params=params).status_code == 404
+        params = {'date': '2024-07-02', 'end_date': '2024-07-01'}
+        assert client.get('/api/crime-map/hotspots', params=params).status_code == 400
@@ -0,0 +1,63 @@
+"""
+Tests for the prize-collecting (orienteering) route mode
+"""
+
+from types import SimpleNamespace
+import time
+
+import pytest
+from src.models.prize_collecting import PrizeCollectingSolver
+from src.models.vrp_solver import SavingsRouteSolver
+
+DEPOT = (41.8781, -87.6298)
+
+
+def collected(routes):
+    return sum(h.priority for route in routes for h in route.hotspots)
+
+
+def test_collects_at_least_the_savings_plan(make_hotspots):
+    """With tight limits the plan covers at least as much priority as savings"""
+    for seed in range(3):
+        hotspots = make_hotspots(150, seed=seed)
+        savings = SavingsRouteSolver(max_route_distance_km=30.0).solve(hotspots, 3, *DEPOT)
+        solver = PrizeCollectingSolver(max_route_distance_km=30.0)
+        routes = solver.solve(hotspots, 3, *DEPOT)
+
+        assert collected(routes) >= collected(savings) - 1e-9
+        assert solver.collected_priority_ == pytest.approx(collected(routes))
+        stops = [stop for route in routes for stop in route.stops]
+        assert len(stops) == len(set(stops))
+        assert len(stops) + len(solver.unassigned_) == len(hotspots)
+        assert all(route.total_distance <= 30.0 + 1e-9 for route in routes)
+
+
+def test_prefers_high_priority_hotspots():
+    """Of two equally placed hotspots only the more important one is served"""
+    hotspots = [
+        SimpleNamespace(cluster_id=0, center_lat=DEPOT[0] + 0.05, center_lon=DEPOT[1], priority=1),
+        SimpleNamespace(cluster_id=1, center_lat=DEPOT[0] - 0.05, center_lon=DEPOT[1], priority=5),
+    ]
+    # One round trip is ~11 km, both would need ~22 km
+    solver = PrizeCollectingSolver(max_route_distance_km=15.0)
+    routes = solver.solve(hotspots, 1, *DEPOT)
+    assert [route.stops for route in routes] == [[1]]
+    assert [h.cluster_id for h in solver.unassigned_] == [0]
+
+
+def test_shift_limit_and_time_budget(make_hotspots):
+    """Routes fit the shift and a short budget returns a valid plan quickly"""
+    hotspots = make_hotspots(400, seed=5)
+    solver = PrizeCollectingSolver(max_route_distance_km=60.0, max_shift_hours=1.0)
+    start = time.perf_counter()
+    routes = solver.solve(hotspots, 4, *DEPOT, time_limit_ms=50)
+    assert time.perf_counter() - start < 1.0
+    assert routes and len(routes) <= 4
+    assert all(route.estimated_duration <= 1.0 + 1e-9 for route in routes)
+    assert all(route.total_distance <= 60.0 + 1e-9 for route in routes)
+
+
+def test_empty_input():
+    solver = PrizeCollectingSolver()
+    assert solver.solve([], 3, *DEPOT) == []
+    assert solver.collected_priority_ == 0.0
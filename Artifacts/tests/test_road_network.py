@@ -0,0 +1,227 @@
+"""
+Tests for the local road-network travel-time engine
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import os
+
+import pytest
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from src.models.road_network import (
+    ContractionHierarchy,
+    RoadNetwork,
+    RoadNetworkMatrixCache,
+    load_osm_graph,
+)
+from src.models.route_session import RouteSession
+from src.models.vrp_solver import SavingsRouteSolver, route_length
+
+ORIGIN = (41.8700, -87.6500)
+
+
+def write_grid_extract(path, size=12, seed=0):
+    """
+    Street grid as OSM XML: residential blocks with a primary and a
+    secondary artery, some one-way rows/columns and one footway
+    """
+    rng = np.random.default_rng(seed)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<osm version="0.6">']
+    for r in range(size):
+        for c in range(size):
+            lat = ORIGIN[0] + r * 0.002 + rng.uniform(-2e-4, 2e-4)
+            lon = ORIGIN[1] + c * 0.0026 + rng.uniform(-2e-4, 2e-4)
+            lines.append(f'  <node id="{r * size + c + 1}" lat="{lat:.7f}" lon="{lon:.7f}"/>')
+
+    def way(way_id, refs, **tags):
+        nds = ''.join(f'<nd ref="{ref}"/>' for ref in refs)
+        kvs = ''.join(f'<tag k="{k}" v="{v}"/>' for k, v in tags.items())
+        lines.append(f'  <way id="{way_id}">{nds}{kvs}</way>')
+
+    for r in range(size):
+        tags = {'highway': 'primary' if r == size // 2 else 'residential'}
+        if r % 4 == 1:
+            tags['oneway'] = 'yes'
+        way(r + 1, [r * size + c + 1 for c in range(size)], **tags)
+    for c in range(size):
+        tags = {'highway': 'secondary', 'maxspeed': '30 mph'} if c == size // 2 else {}
+        tags.setdefault('highway', 'residential')
+        if c % 4 == 3:
+            tags['oneway'] = '-1'
+        way(size + c + 1, [r * size + c + 1 for r in range(size)], **tags)
+    way(3 * size, [1, size * size], highway='footway')
+    lines.append('</osm>')
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+    return str(path)
+
+
+@pytest.fixture
+def extract(tmp_path):
+    return write_grid_extract(tmp_path / 'city.osm')
+
+
+def plain_dijkstra(graph, weight, sources, targets):
+    adjacency = csr_matrix((weight, (graph.src, graph.dst)), shape=(graph.n_nodes,) * 2)
+    return dijkstra(adjacency, directed=True, indices=sources)[:, targets]
+
+
+def test_load_osm_graph(extract):
+    """Drivable ways only, with one-way streets as single directed edges"""
+    graph = load_osm_graph(extract)
+    size = 12
+    assert graph.n_nodes == size * size
+
+    rows_oneway = sum(1 for r in range(size) if r % 4 == 1)
+    cols_oneway = sum(1 for c in range(size) if c % 4 == 3)
+    segments = 2 * size * (size - 1)
+    assert len(graph.src) == 2 * segments - (rows_oneway + cols_oneway) * (size - 1)
+
+    # oneway=-1 runs against the way's node order (here: southwards)
+    lat_from, lat_to = graph.lat[graph.src], graph.lat[graph.dst]
+    vertical = np.isclose(graph.lon[graph.src], graph.lon[graph.dst], atol=5e-4)
+    assert np.all(graph.time_h > 0) and np.all(graph.length_km > 0)
+    assert (vertical & (lat_to < lat_from)).sum() > (vertical & (lat_to > lat_from)).sum()
+
+
+
+def test_node_tags_do_not_leak_into_ways(tmp_path):
+    """A tagged node before a way does not lend it its highway or oneway tags"""
+    path = tmp_path / 'tagged.osm'
+    path.write_text(
+        '<osm version="0.6">'
+        '<node id="1" lat="41.870" lon="-87.650">'
+        '<tag k="highway" v="primary"/><tag k="oneway" v="yes"/></node>'
+        '<node id="2" lat="41.871" lon="-87.650"/>'
+        '<node id="3" lat="41.872" lon="-87.650"/>'
+        '<way id="1"><nd ref="1"/><nd ref="2"/><tag k="highway" v="residential"/></way>'
+        '<way id="2"><nd ref="2"/><nd ref="3"/></way>'
+        '</osm>'
+    )
+    graph = load_osm_graph(str(path))
+    assert graph.n_nodes == 2
+    assert len(graph.src) == 2
+
+@pytest.mark.parametrize('metric', ['time', 'distance'])
+def test_contraction_hierarchy_matches_dijkstra(extract, metric):
+    """Many-to-many CH queries equal plain Dijkstra, including repeated nodes"""
+    graph = load_osm_graph(extract)
+    weight = graph.time_h if metric == 'time' else graph.length_km
+    hierarchy = ContractionHierarchy.build(graph.n_nodes, graph.src, graph.dst, weight)
+
+    rng = np.random.default_rng(1)
+    sources = rng.choice(graph.n_nodes, 40)
+    targets = np.concatenate([rng.choice(graph.n_nodes, 30), sources[:5]])
+    result = hierarchy.many_to_many(sources, targets)
+    expected = plain_dijkstra(graph, weight, sources, targets)
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-12)
+
+
+def test_road_network_matrices_and_disk_cache(extract):
+    """Matrices include access legs; hierarchies are cached next to the extract"""
+    network = RoadNetwork.from_osm(extract)
+    lat = ORIGIN[0] + np.array([0.001, 0.011, 0.02])
+    lon = ORIGIN[1] + np.array([0.001, 0.015, 0.025])
+    distance, duration = network.matrices(lat, lon)
+
+    nodes, access = network.snap(lat, lon)
+    road = network.hierarchy('distance').many_to_many(nodes, nodes)
+    assert distance.shape == duration.shape == (3, 3)
+    assert np.all(np.diag(distance) == 0) and np.all(np.diag(duration) == 0)
+    assert distance[0, 2] == pytest.approx(road[0, 2] + access[0] + access[2])
+    assert np.all(duration[~np.eye(3, dtype=bool)] > 0)
+
+    cached = [name for name in os.listdir(os.path.dirname(extract)) if name.endswith('.ch.npz')]
+    assert len(cached) == 2
+    reloaded = RoadNetwork.from_osm(extract)
+    np.testing.assert_allclose(reloaded.matrices(lat, lon)[1], duration)
+
+    with pytest.raises(ValueError):
+        load_osm_graph(extract + '.pbf')
+
+
+def test_solver_uses_road_travel_times(extract):
+    """Route durations come from the road time matrix and respect the shift"""
+    network = RoadNetwork.from_osm(extract, cache=False)
+    rng = np.random.default_rng(2)
+    hotspots = [
+        SimpleNamespace(
+            cluster_id=i,
+            center_lat=ORIGIN[0] + rng.uniform(0, 0.022),
+            center_lon=ORIGIN[1] + rng.uniform(0, 0.028),
+            priority=1.0,
+        )
+        for i in range(25)
+    ]
+    cache = RoadNetworkMatrixCache(network)
+    solver = SavingsRouteSolver(max_shift_hours=0.25, distance_cache=cache)
+    routes = solver.solve(hotspots, num_officers=3, depot_lat=ORIGIN[0], depot_lon=ORIGIN[1])
+
+    durations = cache.get_durations(hotspots, *ORIGIN)
+    matrix = cache.get(hotspots, *ORIGIN)
+    assert cache.info() == {'hits': 2, 'misses': 1, 'entries': 1}
+    assert routes
+    for route in routes:
+        nodes = [stop + 1 for stop in route.stops]
+        assert route.estimated_duration == pytest.approx(route_length(durations, nodes))
+        assert route.total_distance == pytest.approx(route_length(matrix, nodes))
+        assert route.estimated_duration <= 0.25 + 1e-9
+
+
+def test_route_session_grows_on_road_distances(extract):
+    """Hotspots added to a session, and a moved depot, get road distances and times too"""
+    network = RoadNetwork.from_osm(extract, cache=False)
+    rng = np.random.default_rng(3)
+    hotspots = [
+        SimpleNamespace(
+            cluster_id=i,
+            center_lat=ORIGIN[0] + rng.uniform(0, 0.022),
+            center_lon=ORIGIN[1] + rng.uniform(0, 0.028),
+            priority=1.0,
+        )
+        for i in range(12)
+    ]
+    cache = RoadNetworkMatrixCache(network)
+    solver = SavingsRouteSolver(max_shift_hours=0.25, distance_cache=cache)
+    session = RouteSession(hotspots[:10], 2, *ORIGIN, solver=solver)
+    for hotspot in hotspots[10:]:
+        session.add_hotspot(hotspot)
+    depot = (ORIGIN[0] + 0.01, ORIGIN[1] + 0.012)
+    session.move_depot(*depot)
+
+    matrix, durations = cache.get_matrices(hotspots, *depot)
+    np.testing.assert_allclose(session._matrix[:13, :13], matrix)
+    np.testing.assert_allclose(session._durations[:13, :13], durations)
+    # Repairs keep the solver's shift limit, measured in road travel time
+    for route in session.routes():
+        nodes = [session._node_of[h.cluster_id] for h in route.hotspots]
+        assert route.estimated_duration == pytest.approx(route_length(durations, nodes))
+        assert route.estimated_duration <= 0.25 + 1e-9
+
+
+def test_matrix_cache_is_thread_safe(extract):
+    """Concurrent requests evicting each other still get matching matrix pairs"""
+    network = RoadNetwork.from_osm(extract, cache=False)
+    cache = RoadNetworkMatrixCache(network, max_entries=1)
+    rng = np.random.default_rng(4)
+    sets = [
+        [
+            SimpleNamespace(
+                cluster_id=i,
+                center_lat=ORIGIN[0] + rng.uniform(0, 0.022),
+                center_lon=ORIGIN[1] + rng.uniform(0, 0.028),
+            )
+            for i in range(5 + k)
+        ]
+        for k in range(4)
+    ]
+
+    def lookup(k):
+        matrix, durations = cache.get_matrices(sets[k % 4], *ORIGIN)
+        return matrix.shape == durations.shape == (6 + k % 4,) * 2
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(pool.map(lookup, range(200)))
+    assert cache.info()['entries'] == 1
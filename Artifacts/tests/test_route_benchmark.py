@@ -0,0 +1,138 @@
+"""
+Tests for the route solver benchmark suite
+"""
+
+import copy
+
+import pytest
+from src.models.route_benchmark import (
+    CHICAGO_BOUNDS,
+    compare_reports,
+    load_cvrp_instance,
+    load_report,
+    run_suite,
+    save_report,
+    synthetic_instance,
+)
+
+TOY_CVRP = """NAME : T-n8-k2
+COMMENT : "toy instance"
+TYPE : CVRP
+DIMENSION : 8
+EDGE_WEIGHT_TYPE : EUC_2D
+CAPACITY : 10
+NODE_COORD_SECTION
+ 1 50 50
+ 2 60 50
+ 3 70 55
+ 4 65 65
+ 5 40 50
+ 6 30 45
+ 7 35 35
+ 8 50 30
+DEMAND_SECTION
+1 0
+2 3
+3 3
+4 3
+5 3
+6 3
+7 3
+8 3
+DEPOT_SECTION
+ 1
+ -1
+EOF
+"""
+
+
+@pytest.fixture
+def cvrp_file(tmp_path):
+    path = tmp_path / 'T-n8-k2.vrp'
+    path.write_text(TOY_CVRP)
+    (tmp_path / 'T-n8-k2.sol').write_text("Route #1: 1 2 3\nRoute #2: 4 5 6 7\nCost 100\n")
+    return str(path)
+
+
+def test_synthetic_instances_are_reproducible():
+    """Same seed, same instance; hotspots stay inside the city bounds"""
+    first = synthetic_instance(100, seed=3)
+    second = synthetic_instance(100, seed=3)
+    assert first.name == 'chicago-100'
+    assert [(h.center_lat, h.center_lon, h.priority) for h in first.hotspots] == [
+        (h.center_lat, h.center_lon, h.priority) for h in second.hotspots
+    ]
+    lat_min, lat_max, lon_min, lon_max = CHICAGO_BOUNDS
+    assert all(lat_min <= h.center_lat <= lat_max for h in first.hotspots)
+    assert all(lon_min <= h.center_lon <= lon_max for h in first.hotspots)
+    assert synthetic_instance(100, seed=4).hotspots[0].center_lat != first.hotspots[0].center_lat
+
+
+def test_load_cvrp_instance(cvrp_file):
+    """Depot, demands, fleet size from the name and best known cost from .sol"""
+    instance = load_cvrp_instance(cvrp_file)
+    assert instance.name == 'T-n8-k2'
+    assert instance.num_officers == 2
+    assert instance.capacity == 10
+    assert instance.best_known == 100
+    assert instance.depot == (50.0, 50.0)
+    assert [h.cluster_id for h in instance.hotspots] == list(range(2, 9))
+    assert sum(h.demand for h in instance.hotspots) == 21
+
+    with pytest.raises(ValueError):
+        bad = cvrp_file.replace('.vrp', '-geo.vrp')
+        with open(bad, 'w') as f:
+            f.write(TOY_CVRP.replace('EUC_2D', 'GEO'))
+        load_cvrp_instance(bad)
+
+
+def test_suite_report_round_trip(cvrp_file, tmp_path):
+    """Every mode runs on every instance and the report survives JSON"""
+    instances = [synthetic_instance(30), load_cvrp_instance(cvrp_file)]
+    report = run_suite(instances, modes=['savings', 'prize'])
+    assert [(r['instance'], r['mode']) for r in report['results']] == [
+        ('chicago-30', 'savings'),
+        ('chicago-30', 'prize'),
+        ('T-n8-k2', 'savings'),
+        ('T-n8-k2', 'prize'),
+    ]
+    for result in report['results']:
+        assert result['wall_time_s'] >= 0
+        assert result['violations']['distance'] == 0
+        assert result['violations']['duplicates'] == 0
+    cvrp = report['results'][2]
+    assert cvrp['unassigned'] == 0
+    assert cvrp['gap'] == pytest.approx(cvrp['total_distance'] / 100 - 1)
+
+    path = tmp_path / 'report.json'
+    save_report(report, str(path))
+    assert load_report(str(path)) == report
+
+    with pytest.raises(ValueError):
+        run_suite(instances, modes=['genetic'])
+
+
+def test_compare_reports_flags_regressions():
+    """Longer routes, new violations and slowdowns are flagged"""
+    result = {
+        'instance': 'chicago-100',
+        'mode': 'savings',
+        'total_distance': 100.0,
+        'unassigned': 2,
+        'violations': {'distance': 0, 'capacity': 0},
+        'wall_time_s': 1.0,
+    }
+    baseline = {'results': [result]}
+    assert compare_reports(baseline, baseline)[0]['regressions'] == []
+
+    current = copy.deepcopy(baseline)
+    current['results'][0].update(total_distance=105.0, wall_time_s=2.0)
+    current['results'][0]['violations']['capacity'] = 1
+    row = compare_reports(current, baseline)[0]
+    assert row['regressions'] == ['violations', 'distance', 'wall_time']
+    assert row['distance_change'] == pytest.approx(0.05)
+
+    # Serving more hotspots may take a longer route
+    current = copy.deepcopy(baseline)
+    current['results'][0].update(total_distance=120.0, unassigned=1)
+    assert compare_reports(current, baseline)[0]['regressions'] == []
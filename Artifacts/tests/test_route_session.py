@@ -0,0 +1,173 @@
+"""
+Tests for incremental patrol route sessions
+"""
+
+import time
+
+import pytest
+import numpy as np
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.api.routers import route_sessions
+from src.models.distance_matrix import DistanceMatrixCache
+from src.models.route_session import RouteSession, SessionHotspot
+from src.models.vrp_solver import SavingsRouteSolver, route_length
+from src.utils.geo import haversine_km
+
+DEPOT = (41.8781, -87.6298)
+
+client = TestClient(app)
+
+
+def make_hotspots(n, seed=0, start_id=0):
+    """Session hotspots spread around the depot"""
+    rng = np.random.default_rng(seed)
+    return [
+        SessionHotspot(start_id + i, lat, lon)
+        for i, (lat, lon) in enumerate(
+            zip(rng.uniform(41.80, 41.95, n), rng.uniform(-87.72, -87.55, n))
+        )
+    ]
+
+
+def make_session(n=200, officers=6, limit=40.0):
+    solver = SavingsRouteSolver(max_route_distance_km=limit)
+    return RouteSession(make_hotspots(n), officers, *DEPOT, solver=solver)
+
+
+def assert_consistent(session):
+    """Every live hotspot is routed once or unassigned; lengths are exact and feasible"""
+    routed = [h.cluster_id for route in session.routes() for h in route.hotspots]
+    unassigned = [h.cluster_id for h in session.unassigned_hotspots()]
+    assert len(routed) == len(set(routed))
+    assert sorted(routed + unassigned) == sorted(session._node_of)
+    for route, length in zip(session._search.routes, session._search.lengths):
+        assert length == pytest.approx(route_length(session._matrix, route))
+        assert length <= session.solver.route_limit_km + 1e-9
+
+
+def test_add_and_remove_hotspots():
+    """Added hotspots are inserted, removed ones disappear"""
+    session = make_session()
+    for hotspot in make_hotspots(100, seed=1, start_id=1000):
+        session.add_hotspot(hotspot)
+    assert_consistent(session)
+    assert session._matrix.shape[0] >= 301
+
+    for cluster_id in range(0, 200, 3):
+        session.remove_hotspot(cluster_id)
+    assert_consistent(session)
+    assert 3 not in {h.cluster_id for r in session.routes() for h in r.hotspots}
+
+    with pytest.raises(ValueError):
+        session.add_hotspot(SessionHotspot(1000, 41.9, -87.6))
+    with pytest.raises(KeyError):
+        session.remove_hotspot(3)
+
+
+def test_remove_officer_redistributes_hotspots():
+    """An officer's hotspots move to the remaining officers"""
+    session = make_session(officers=6, limit=80.0)
+    gone = session.routes()[0]
+    session.remove_officer(gone.officer_id)
+
+    assert_consistent(session)
+    assert gone.officer_id not in [route.officer_id for route in session.routes()]
+    assert not session.unassigned
+    assert len(session.routes()) <= 5
+
+
+def test_move_depot_keeps_routes_within_limit():
+    """Routes stretched by a depot move shed stops to stay feasible"""
+    session = make_session(limit=25.0)
+    session.move_depot(41.98, -87.75)
+    assert_consistent(session)
+    first = session._hotspots[1]
+    assert session._matrix[0, 1] == pytest.approx(
+        haversine_km(41.98, -87.75, first.center_lat, first.center_lon)
+    )
+
+
+def test_deltas_are_fast():
+    """Each delta is repaired in tens of milliseconds"""
+    session = make_session(n=800, officers=12, limit=60.0)
+    rng = np.random.default_rng(3)
+    timings = []
+    for step in range(40):
+        start = time.perf_counter()
+        if step % 2:
+            session.remove_hotspot(int(rng.choice(list(session._node_of))))
+        else:
+            session.add_hotspot(
+                SessionHotspot(5000 + step, rng.uniform(41.8, 41.95), rng.uniform(-87.72, -87.55))
+            )
+        timings.append(time.perf_counter() - start)
+    assert_consistent(session)
+    assert np.median(timings) < 0.1
+
+
+def test_route_session_api():
+    """Create a session, apply deltas and delete it over HTTP"""
+    hotspots = [
+        {"cluster_id": h.cluster_id, "latitude": h.center_lat, "longitude": h.center_lon}
+        for h in make_hotspots(30)
+    ]
+    response = client.post(
+        "/api/v1/route-sessions",
+        json={
+            "hotspots": hotspots,
+            "num_officers": 3,
+            "depot_latitude": DEPOT[0],
+            "depot_longitude": DEPOT[1],
+        },
+    )
+    assert response.status_code == 200
+    state = response.json()
+    session_id = state["session_id"]
+    served = sorted(i for route in state["routes"] for i in route["hotspot_ids"])
+    assert sorted(served + state["unassigned_hotspot_ids"]) == list(range(30))
+
+    response = client.post(
+        f"/api/v1/route-sessions/{session_id}/deltas",
+        json={
+            "op": "add_hotspot",
+            "hotspot": {"cluster_id": 99, "latitude": 41.9, "longitude": -87.65},
+        },
+    )
+    assert response.status_code == 200
+    assert 99 in [i for route in response.json()["routes"] for i in route["hotspot_ids"]]
+
+    response = client.post(
+        f"/api/v1/route-sessions/{session_id}/deltas", json={"op": "remove_hotspot"}
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        f"/api/v1/route-sessions/{session_id}/deltas",
+        json={"op": "remove_hotspot", "hotspot_id": 12345},
+    )
+    assert response.status_code == 404
+
+    assert client.delete(f"/api/v1/route-sessions/{session_id}").status_code == 200
+    assert client.get(f"/api/v1/route-sessions/{session_id}").status_code == 404
+
+
+def test_route_session_api_uses_configured_cache(monkeypatch):
+    """Sessions are planned on the server's distance cache (road distances when configured)"""
+    cache = DistanceMatrixCache()
+    monkeypatch.setattr(route_sessions, "road_matrix_cache", cache)
+    hotspots = [
+        {"cluster_id": h.cluster_id, "latitude": h.center_lat, "longitude": h.center_lon}
+        for h in make_hotspots(20)
+    ]
+    response = client.post(
+        "/api/v1/route-sessions",
+        json={
+            "hotspots": hotspots,
+            "num_officers": 2,
+            "depot_latitude": DEPOT[0],
+            "depot_longitude": DEPOT[1],
+        },
+    )
+    assert response.status_code == 200
+    assert cache.info()["entries"] == 1
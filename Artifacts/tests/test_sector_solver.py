@@ -0,0 +1,77 @@
+"""
+Tests for the cluster-first, route-second sector solver
+"""
+
+import math
+
+import pytest
+import numpy as np
+from src.models.sector_solver import KMEANS_SLACK, SectorRouteSolver
+from src.models.vrp_solver import SavingsRouteSolver
+
+DEPOT = (41.8781, -87.6298)
+
+
+def assert_feasible(routes, solver, hotspots, num_officers):
+    """Every hotspot served at most once, routes within the limits"""
+    stops = [stop for route in routes for stop in route.stops]
+    assert len(stops) == len(set(stops))
+    assert len(stops) + len(solver.unassigned_) == len(hotspots)
+    assert len(routes) <= num_officers
+    for route in routes:
+        assert route.total_distance <= solver.route_limit_km + 1e-9
+        assert [h.cluster_id for h in route.hotspots] == route.stops
+
+
+@pytest.mark.parametrize('partition', ['sweep', 'kmeans'])
+def test_sectors_are_balanced_and_share_all_officers(partition, make_hotspots):
+    """Sector sizes stay near sector_size and every officer is assigned once"""
+    hotspots = make_hotspots(1000)
+    solver = SectorRouteSolver(sector_size=150, partition=partition)
+    sectors = solver.sectors(hotspots, 40, *DEPOT)
+
+    sizes = [len(members) for members, _ in sectors]
+    officers = [count for _, count in sectors]
+    assert len(sectors) == math.ceil(1000 / 150)
+    assert sorted(np.concatenate([members for members, _ in sectors])) == list(range(1000))
+    assert max(sizes) <= math.ceil(1000 / len(sectors) * KMEANS_SLACK)
+    assert sum(officers) == 40 and min(officers) >= 1
+
+
+def test_small_instance_is_solved_whole(make_hotspots):
+    """Below sector_size the plan is the plain savings solver's"""
+    hotspots = make_hotspots(80, seed=1)
+    sector = SectorRouteSolver(sector_size=100).solve(hotspots, 4, *DEPOT)
+    whole = SavingsRouteSolver().solve(hotspots, 4, *DEPOT)
+    assert [r.stops for r in sector] == [r.stops for r in whole]
+
+
+def test_decomposed_plan_is_feasible_and_polished(make_hotspots):
+    """Sector plans respect the limits; boundary polish never makes them worse"""
+    hotspots = make_hotspots(1200, seed=2)
+    kwargs = dict(sector_size=150, max_route_distance_km=40.0, max_shift_hours=1.5, n_jobs=1)
+    polished = SectorRouteSolver(**kwargs)
+    routes = polished.solve(hotspots, 30, *DEPOT)
+    assert_feasible(routes, polished, hotspots, 30)
+
+    rough = SectorRouteSolver(polish_boundaries=False, **kwargs)
+    rough_routes = rough.solve(hotspots, 30, *DEPOT)
+    assert len(polished.unassigned_) <= len(rough.unassigned_)
+    if len(polished.unassigned_) == len(rough.unassigned_):
+        assert (
+            sum(r.total_distance for r in routes)
+            <= sum(r.total_distance for r in rough_routes) + 1e-6
+        )
+
+
+def test_parallel_sectors_match_inline(make_hotspots):
+    """Sector solves give the same plan in a process pool"""
+    hotspots = make_hotspots(600, seed=3)
+    inline = SectorRouteSolver(sector_size=150, n_jobs=1).solve(hotspots, 12, *DEPOT)
+    pooled = SectorRouteSolver(sector_size=150, n_jobs=2).solve(hotspots, 12, *DEPOT)
+    assert [r.stops for r in pooled] == [r.stops for r in inline]
+
+
+def test_unknown_partition_rejected():
+    with pytest.raises(ValueError):
+        SectorRouteSolver(partition='grid')
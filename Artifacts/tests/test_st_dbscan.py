@@ -0,0 +1,97 @@
+"""
+Tests for space-time hotspot detection
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.models.st_dbscan import SpaceTimeHotspotDetector
+from src.utils.geo import to_local_km
+
+
+def make_incidents(n=1500, seed=11):
+    """Random incidents over a small area and a year"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'latitude': 41.88 + rng.uniform(0, 0.02, n),
+        'longitude': -87.63 + rng.uniform(0, 0.02, n),
+        'incident_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.uniform(0, 365, n), unit='D'),
+    })
+
+
+def brute_force_core_pairs(df, eps_km, eps_days):
+    """Pairwise neighbour matrix computed the slow way"""
+    x, y = to_local_km(df['latitude'].values, df['longitude'].values)
+    t = (df['incident_date'] - df['incident_date'].min()).dt.total_seconds().values / 86400.0
+    spatial = (x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2 <= eps_km ** 2
+    temporal = np.abs(t[:, None] - t[None, :]) <= eps_days
+    return spatial & temporal
+
+
+def test_st_detector_initialization():
+    """Test detector defaults"""
+    detector = SpaceTimeHotspotDetector()
+    assert detector.eps == 0.01
+    assert detector.eps_days == 7.0
+    assert detector.eps_km == pytest.approx(1.112, abs=0.001)
+
+
+def test_index_matches_brute_force_neighbours():
+    """Grid/time index finds exactly the brute-force neighbour pairs"""
+    df = make_incidents()
+    detector = SpaceTimeHotspotDetector(eps=0.002, eps_days=5)
+    i, j = detector.build_index(df).neighbor_pairs(chunk_size=400)
+
+    expected = brute_force_core_pairs(df, detector.eps_km, detector.eps_days)
+    found = np.zeros_like(expected)
+    found[i, j] = True
+    assert (found == expected).all()
+    assert len(i) == expected.sum()
+
+
+def test_clusters_match_brute_force_core_components():
+    """Core points are grouped as connected components of the core graph"""
+    df = make_incidents()
+    detector = SpaceTimeHotspotDetector(eps=0.002, eps_days=5, min_samples=4)
+    hotspots_df = detector.detect_hotspots(df)
+
+    adjacency = brute_force_core_pairs(df, detector.eps_km, detector.eps_days)
+    core = adjacency.sum(axis=1) >= 4
+    labels = hotspots_df['cluster'].values
+    assert (labels[core] >= 0).all()
+
+    core_idx = np.flatnonzero(core)
+    for a in core_idx[:50]:
+        linked = core_idx[adjacency[a, core_idx]]
+        assert (labels[linked] == labels[a]).all()
+
+
+def test_temporal_radius_separates_bursts():
+    """The same location active in two separate weeks gives two hotspots"""
+    rng = np.random.default_rng(0)
+    dates = np.concatenate([
+        pd.Timestamp('2023-03-01') + pd.to_timedelta(rng.uniform(0, 7, 30), unit='D'),
+        pd.Timestamp('2023-09-01') + pd.to_timedelta(rng.uniform(0, 7, 30), unit='D'),
+    ])
+    df = pd.DataFrame({
+        'latitude': 41.88 + rng.normal(0, 0.0005, 60),
+        'longitude': -87.63 + rng.normal(0, 0.0005, 60),
+        'incident_date': dates,
+    })
+    detector = SpaceTimeHotspotDetector(eps=0.005, eps_days=3, min_samples=5)
+    hotspots_df = detector.detect_hotspots(df)
+
+    density_df = detector.calculate_hotspot_density(hotspots_df)
+    assert len(density_df) == 2
+    assert (density_df['active_days'] <= 8).all()
+
+    emerging = detector.find_emerging_hotspots(hotspots_df, window_days=30)
+    assert len(emerging) == 1
+    assert pd.Timestamp(emerging['first_seen'].iloc[0]) >= pd.Timestamp('2023-09-01')
+
+
+def test_missing_time_column():
+    """Detector requires the time column"""
+    df = make_incidents(n=10).drop(columns=['incident_date'])
+    with pytest.raises(ValueError):
+        SpaceTimeHotspotDetector().detect_hotspots(df)
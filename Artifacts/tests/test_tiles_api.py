@@ -0,0 +1,122 @@
+"""
+Tests for the vector tile endpoints
+"""
+
+from dataclasses import replace
+from datetime import date
+
+import pandas as pd
+import numpy as np
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.api.routers import crime_map, tiles
+from src.models.prediction_store import PredictionStore, PredictionTensor, grid_cells
+from src.utils.mvt import MEDIA_TYPE, lonlat_to_world
+
+client = TestClient(app)
+
+CENTER = (41.8781, -87.6298)
+
+
+def tile_of(z):
+    wx, wy = lonlat_to_world(*CENTER)
+    return int(wx) >> (32 - z), int(wy) >> (32 - z)
+
+
+def test_prediction_layers_are_served():
+    """Risk cells and hotspots come back as MVT; empty tiles as 204"""
+    layers = client.get("/tiles/layers").json()["layers"]
+    assert {"hotspots", "risk"} <= {layer["name"] for layer in layers}
+
+    x, y = tile_of(10)
+    response = client.get(f"/tiles/risk/10/{x}/{y}.mvt")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MEDIA_TYPE
+    assert response.content[:1] == b"\x1a" and b"risk" in response.content
+
+    # Same data version, same bytes and ETag; revalidation returns 304
+    again = client.get(f"/tiles/risk/10/{x}/{y}.mvt")
+    assert again.content == response.content
+    etag = response.headers["etag"]
+    cached = client.get(f"/tiles/risk/10/{x}/{y}.mvt", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    assert client.get("/tiles/risk/10/0/0.mvt").status_code == 204
+    assert client.get("/tiles/risk/2/9/0.mvt").status_code == 400
+    assert client.get("/tiles/unknown/0/0/0.mvt").status_code == 404
+
+
+def test_incident_layer_versioning():
+    """Publishing new incidents changes the version and the tiles"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "latitude": CENTER[0] + rng.normal(0, 0.01, 300),
+            "longitude": CENTER[1] + rng.normal(0, 0.01, 300),
+            "crime_type": rng.choice(["THEFT", "BATTERY"], 300),
+            "arrest": rng.random(300) < 0.3,
+        }
+    )
+    tiles.set_incidents(df)
+    x, y = tile_of(12)
+    first = client.get(f"/tiles/incidents/12/{x}/{y}.mvt")
+    assert first.status_code == 200 and b"THEFT" in first.content
+
+    tiles.set_incidents(df.iloc[:50])
+    second = client.get(f"/tiles/incidents/12/{x}/{y}.mvt")
+    assert second.headers["etag"] != first.headers["etag"]
+    assert len(second.content) < len(first.content)
+
+
+def test_incident_clusters_endpoint():
+    """Clusters for a viewport add up to the incidents inside it"""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        {
+            "latitude": CENTER[0] + rng.normal(0, 0.02, 2000),
+            "longitude": CENTER[1] + rng.normal(0, 0.02, 2000),
+            "crime_type": rng.choice(["THEFT", "BATTERY"], 2000),
+        }
+    )
+    tiles.set_incidents(df)
+    response = client.get("/tiles/clusters", params={"bbox": "-88.5,41,-86.5,42.5", "zoom": 9})
+    assert response.status_code == 200
+    features = response.json()["features"]
+    assert sum(f["properties"].get("point_count", 1) for f in features) == 2000
+    assert any(f["properties"].get("cluster") for f in features)
+
+    assert client.get("/tiles/clusters", params={"bbox": "1,2,3", "zoom": 9}).status_code == 400
+    assert client.get("/tiles/clusters", params={"bbox": "a,b,c,d", "zoom": 9}).status_code == 400
+    assert client.get("/tiles/clusters", params={"bbox": "-88,42,-87,41", "zoom": 9}).status_code == 400
+
+
+def test_prediction_layers_follow_the_store(monkeypatch):
+    """Tiles show the stored predictions and a republished tensor changes the version"""
+    cells = grid_cells(CENTER, 15, 5)
+    expected = np.zeros((1, 2, len(cells)), dtype=np.float32)
+    expected[0, :, :30] = 5.0
+    tensor = PredictionTensor(
+        "chicago",
+        date.today(),
+        15,
+        cells,
+        ("all",),
+        expected,
+        np.full((1, len(cells)), 0.8, dtype=np.float32),
+        "kde-test",
+    )
+    store = PredictionStore()
+    store.put(tensor)
+    monkeypatch.setattr(crime_map, "prediction_store", store)
+
+    layers = {layer["name"]: layer for layer in client.get("/tiles/layers").json()["layers"]}
+    assert layers["risk"]["features"] == 30
+    assert "kde-test" in layers["risk"]["version"]
+    stream_ids = set(crime_map.live_layer("chicago", tensor, date.today()).grid_id)
+    assert set(tiles.tile_store.layers["risk"].properties["grid_id"]) == stream_ids
+
+    expected = expected.copy()
+    expected[0, :, :40] = 5.0
+    store.put(replace(tensor, expected=expected))
+    layers = {layer["name"]: layer for layer in client.get("/tiles/layers").json()["layers"]}
+    assert layers["risk"]["features"] == 40
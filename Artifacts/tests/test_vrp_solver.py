@@ -0,0 +1,110 @@
+"""
+Tests for the savings + local search patrol route solver
+"""
+
+from itertools import permutations
+import time
+
+import pytest
+from src.models.vrp_solver import SavingsRouteSolver, route_length
+
+DEPOT = (41.8781, -87.6298)
+
+
+def assert_feasible(routes, solver, hotspots, num_officers):
+    """Every hotspot served at most once, routes within the limits"""
+    stops = [stop for route in routes for stop in route.stops]
+    assert len(stops) == len(set(stops))
+    assert len(stops) + len(solver.unassigned_) == len(hotspots)
+    assert len(routes) <= num_officers
+    for route in routes:
+        assert route.total_distance <= solver.route_limit_km + 1e-9
+        assert route.estimated_duration <= solver.max_shift_hours + 1e-9
+        assert [h.cluster_id for h in route.hotspots] == [100 + s for s in route.stops]
+
+
+def test_single_route_is_optimal_on_small_instance(make_hotspots):
+    """Local search reaches the brute-force tour on a small instance"""
+    hotspots = make_hotspots(7, seed=3, spread=0.15, start_id=100, priority=1.0)
+    solver = SavingsRouteSolver(max_route_distance_km=200.0)
+    routes = solver.solve(hotspots, num_officers=1, depot_lat=DEPOT[0], depot_lon=DEPOT[1])
+
+    matrix = solver.distance_cache.get(hotspots, *DEPOT)
+    best = min(route_length(matrix, list(p)) for p in permutations(range(1, 8)))
+    assert len(routes) == 1
+    assert routes[0].total_distance == pytest.approx(best)
+
+
+def test_local_search_improves_savings_and_respects_limits(make_hotspots):
+    """Solution is feasible and no longer than the savings construction"""
+    hotspots = make_hotspots(300, seed=1, spread=0.15, start_id=100, priority=1.0)
+    solver = SavingsRouteSolver(max_route_distance_km=40.0, max_shift_hours=1.2)
+    routes = solver.solve(hotspots, num_officers=10, depot_lat=DEPOT[0], depot_lon=DEPOT[1])
+    assert_feasible(routes, solver, hotspots, 10)
+    assert solver.route_limit_km == pytest.approx(36.0)
+
+    matrix = solver.distance_cache.get(hotspots, *DEPOT)
+    initial, _ = solver.construct(matrix, 10, [1.0] * len(hotspots))
+    constructed = sum(route_length(matrix, route) for route in initial)
+    assert sum(route.total_distance for route in routes) < constructed
+
+
+def test_fleet_limit_drops_lowest_priority_hotspots(make_hotspots):
+    """With too few officers, the low-priority group is left unserved"""
+    north = make_hotspots(10, seed=2, spread=0.005, start_id=100, priority=1.0)
+    south = make_hotspots(10, seed=3, spread=0.005, start_id=100, priority=1.0)
+    for hotspot in north:
+        hotspot.center_lat += 0.05
+        hotspot.priority = 5.0
+    for i, hotspot in enumerate(south):
+        hotspot.center_lat -= 0.05
+        hotspot.cluster_id = 110 + i
+    hotspots = north + south
+
+    solver = SavingsRouteSolver(max_route_distance_km=15.0)
+    routes = solver.solve(hotspots, num_officers=1, depot_lat=DEPOT[0], depot_lon=DEPOT[1])
+    assert_feasible(routes, solver, hotspots, 1)
+    assert sorted(routes[0].stops) == list(range(10))
+    assert solver.unassigned_ == south
+
+
+def test_time_limit_returns_best_so_far(make_hotspots):
+    """A small budget still returns a feasible solution promptly"""
+    hotspots = make_hotspots(1500, seed=4, spread=0.15, start_id=100, priority=1.0)
+    solver = SavingsRouteSolver(max_route_distance_km=60.0)
+
+    start = time.perf_counter()
+    routes = solver.solve(
+        hotspots, num_officers=16, depot_lat=DEPOT[0], depot_lon=DEPOT[1], time_limit_ms=50
+    )
+    assert time.perf_counter() - start < 2.0
+    assert_feasible(routes, solver, hotspots, 16)
+
+
+def test_empty_input():
+    """No hotspots gives no routes"""
+    solver = SavingsRouteSolver()
+    assert solver.solve([], num_officers=3, depot_lat=DEPOT[0], depot_lon=DEPOT[1]) == []
+
+
+def test_multi_start_is_reproducible_across_worker_counts(make_hotspots):
+    """Parallel multi-start matches the inline run and beats a single start"""
+    hotspots = make_hotspots(150, seed=5, spread=0.3, start_id=100, priority=1.0)
+    kwargs = dict(max_route_distance_km=40.0, n_starts=4)
+    single = SavingsRouteSolver(max_route_distance_km=40.0)
+    inline = SavingsRouteSolver(n_jobs=1, **kwargs)
+    pooled = SavingsRouteSolver(n_jobs=2, **kwargs)
+
+    args = dict(num_officers=6, depot_lat=DEPOT[0], depot_lon=DEPOT[1])
+    baseline = single.solve(hotspots, **args)
+    inline_routes = inline.solve(hotspots, **args)
+    pooled_routes = pooled.solve(hotspots, **args)
+
+    assert_feasible(pooled_routes, pooled, hotspots, 6)
+    assert [r.stops for r in inline_routes] == [r.stops for r in pooled_routes]
+    assert len(pooled.unassigned_) <= len(single.unassigned_)
+    if len(pooled.unassigned_) == len(single.unassigned_):
+        assert (
+            sum(r.total_distance for r in pooled_routes)
+            <= sum(r.total_distance for r in baseline) + 1e-9
+        )